@@ -11,6 +11,7 @@ import com.github.ajalt.clikt.parameters.options.defaultLazy
 import com.github.ajalt.clikt.parameters.options.flag
 import com.github.ajalt.clikt.parameters.options.option
 import com.github.ajalt.clikt.parameters.types.int
+import com.github.ajalt.clikt.parameters.types.long
 import com.github.ajalt.mordant.rendering.TextColors.green
 import com.github.ajalt.mordant.rendering.TextColors.yellow
 import io.ktor.network.tls.certificates.buildKeyStore
@@ -21,16 +22,22 @@ import io.ktor.server.engine.connector
 import io.ktor.server.engine.embeddedServer
 import io.ktor.server.engine.sslConnector
 import io.ktor.server.netty.Netty
+import kotlinx.coroutines.runBlocking
 import kotlinx.io.buffered
 import kotlinx.io.files.Path
 import kotlinx.io.files.SystemFileSystem
 import kotlinx.io.writeString
 import org.flywaydb.core.Flyway
+import pos.ambrosia.api.LOGIN_BACKOFF_UNIT_CONFIG
+import pos.ambrosia.api.LoginRateLimiter
 import pos.ambrosia.config.AppConfig
 import pos.ambrosia.config.EnvVars
 import pos.ambrosia.config.InjectLogs
 import pos.ambrosia.config.ListValueSource
 import pos.ambrosia.config.SeedGenerator
+import pos.ambrosia.db.DatabaseConnection
+import pos.ambrosia.services.SalesRollupService
+import pos.ambrosia.utils.runInTransaction
 import java.io.File
 import java.security.KeyStore
 
@@ -79,6 +86,8 @@ class Ambrosia : CliktCommand() {
                 }
                 value
             }
+        val httpsBindPort by
+            option("--https-bind-port", help = "Bind port for the https api").int().default(9443)
         val secret by
             option("--secret", help = "Secret key for the server", envvar = "AMBROSIA_SECRET").defaultLazy {
                 val seed = SeedGenerator.generateSeed() // Generate a new seed
@@ -111,6 +120,12 @@ class Ambrosia : CliktCommand() {
             }
         val jwtAccessTokenExpirationSeconds by
             option("--jwt-access-token-expiration", help = "Access token expiration in seconds").default("60")
+
+        // Testing only: compresses the login backoff schedule (one unit = one minute by default)
+        val loginBackoffUnitMs by
+            option("--login-backoff-unit-ms", help = "Login backoff time unit in milliseconds", hidden = true)
+                .long()
+                .default(LoginRateLimiter.DEFAULT_BACKOFF_UNIT_MS)
         val phoenixdWebhookSecret by
             option(
                 "--phoenixd-webhook-secret",
@@ -126,6 +141,11 @@ class Ambrosia : CliktCommand() {
             }
         val docker by
             option("--docker", help = "Running in a Docker container", envvar = "IS_DOCKER").flag()
+        val rebuildSalesRollup by
+            option(
+                "--rebuild-sales-rollup",
+                help = "Recompute the daily sales rollup used by /reports from all orders, then exit",
+            ).flag()
         val phoenixdWebhookUrl by
             option(
                 "--phoenixd-webhook",
@@ -150,6 +170,22 @@ class Ambrosia : CliktCommand() {
 
         runDatabaseMigrations()
 
+        if (options.rebuildSalesRollup) {
+            // Through the server's pool, so the rebuild gets its storage profile and its single writer
+            val rows =
+                try {
+                    runBlocking {
+                        DatabaseConnection.pool.write { connection ->
+                            runInTransaction(connection) { SalesRollupService(connection).rebuild() }
+                        }
+                    }
+                } finally {
+                    DatabaseConnection.closeConnection()
+                }
+            echo(green("Rebuilt daily sales rollup: $rows rows"))
+            return
+        }
+
         try {
             val (keyStore, storePassword, privateKeyPassword) = ensureKeyStore()
 
@@ -161,6 +197,7 @@ class Ambrosia : CliktCommand() {
                             config =
                                 MapApplicationConfig().apply {
                                     put("jwt.accessTokenExpirationSeconds", options.jwtAccessTokenExpirationSeconds)
+                                    put(LOGIN_BACKOFF_UNIT_CONFIG, options.loginBackoffUnitMs.toString())
                                     put("jwt.issuer", "ambrosia-pos")
                                     put("jwt.audience", "ambrosia-pos-users")
                                     put("secret", options.secret)
@@ -180,7 +217,7 @@ class Ambrosia : CliktCommand() {
                             keyStorePassword = { storePassword.toCharArray() },
                             privateKeyPassword = { privateKeyPassword.toCharArray() },
                         ) {
-                            port = 9443
+                            port = options.httpsBindPort
                             host = options.httpBindIp
                         }
                     },
@@ -133,13 +133,13 @@ class Api {
                     val scope = credential.payload.getClaim("scope").asString()
                     val userId = credential.payload.getClaim("userId").asString()
                     val walletAccessToken = request.cookies["walletAccessToken"]
-                    val connection = DatabaseConnection.getConnection()
-                    val tokenService = TokenService(application.environment, connection)
                     val isValidWalletSession =
                         scope == "wallet_access" &&
                             userId.isNotEmpty() &&
                             walletAccessToken != null &&
-                            tokenService.isWalletTokenValid(userId, walletAccessToken)
+                            DatabaseConnection.pool.read {
+                                TokenService(application.environment, it).isWalletTokenValid(userId, walletAccessToken)
+                            }
                     if (isValidWalletSession) JWTPrincipal(credential.payload) else null
                 }
             }
@@ -3,6 +3,7 @@ package pos.ambrosia.api
 import io.ktor.http.Cookie
 import io.ktor.http.HttpStatusCode
 import io.ktor.server.application.Application
+import io.ktor.server.application.ApplicationEnvironment
 import io.ktor.server.auth.authenticate
 import io.ktor.server.auth.jwt.JWTPrincipal
 import io.ktor.server.auth.principal
@@ -15,6 +16,7 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
 import io.ktor.util.date.GMTDate
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.AuthRequest
@@ -25,49 +27,57 @@ import pos.ambrosia.services.AuthService
 import pos.ambrosia.services.PermissionsService
 import pos.ambrosia.services.TokenService
 import pos.ambrosia.utils.InvalidTokenException
-import java.sql.Connection
 import java.util.concurrent.ConcurrentHashMap
 
-private object LoginRateLimiter {
+// Config key of the login backoff time unit, set by the hidden --login-backoff-unit-ms option (testing only)
+internal const val LOGIN_BACKOFF_UNIT_CONFIG = "auth.loginBackoffUnitMs"
+
+internal class LoginRateLimiter(
+    private val backoffUnitMs: Long = DEFAULT_BACKOFF_UNIT_MS,
+) {
     private data class IpState(
         val failureCount: Int,
         val blockUntil: Long,
     )
 
     private val state = ConcurrentHashMap<String, IpState>()
-    private const val FREE_ATTEMPTS = 5
-    private const val MINUTE_MS = 60_000L
-
-    // Fibonacci minutes of backoff after FREE_ATTEMPTS failures. Counts beyond the array reuse the last entry (≈ 52 days).
-    private val FIB =
-        longArrayOf(
-            0, // index 0 — unused
-            1,
-            1,
-            2,
-            3,
-            5,
-            8,
-            13,
-            21,
-            34,
-            55,
-            89,
-            144,
-            233,
-            377,
-            610,
-            987,
-            1_597,
-            2_584,
-            4_181,
-            6_765,
-            10_946,
-            17_711,
-            28_657,
-            46_368,
-            75_025,
-        )
+
+    companion object {
+        const val DEFAULT_BACKOFF_UNIT_MS = 60_000L
+        private const val FREE_ATTEMPTS = 5
+
+        // Fibonacci backoff units (minutes by default) after FREE_ATTEMPTS failures.
+        // Counts beyond the array reuse the last entry (≈ 52 days).
+        private val FIB =
+            longArrayOf(
+                0, // index 0 — unused
+                1,
+                1,
+                2,
+                3,
+                5,
+                8,
+                13,
+                21,
+                34,
+                55,
+                89,
+                144,
+                233,
+                377,
+                610,
+                987,
+                1_597,
+                2_584,
+                4_181,
+                6_765,
+                10_946,
+                17_711,
+                28_657,
+                46_368,
+                75_025,
+            )
+    }
 
     fun isBlocked(ip: String): Boolean {
         val s = state[ip] ?: return false
@@ -85,7 +95,7 @@ private object LoginRateLimiter {
         state.compute(ip) { _, existing ->
             val newCount = (existing?.failureCount ?: 0) + 1
             val fibIndex = newCount - FREE_ATTEMPTS
-            val blockMs = if (fibIndex > 0) FIB.getOrElse(fibIndex) { FIB.last() } * MINUTE_MS else 0L
+            val blockMs = if (fibIndex > 0) FIB.getOrElse(fibIndex) { FIB.last() } * backoffUnitMs else 0L
             IpState(newCount, now + blockMs)
         }
     }
@@ -96,33 +106,39 @@ private object LoginRateLimiter {
 }
 
 fun Application.configureAuth() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val authService = AuthService(environment, connection)
-    val tokenService = TokenService(environment, connection)
-    val permissionsService = PermissionsService(environment, connection)
-    routing { route("/auth") { auth(tokenService, authService, permissionsService) } }
+    val backoffUnitMs =
+        environment.config
+            .propertyOrNull(LOGIN_BACKOFF_UNIT_CONFIG)
+            ?.getString()
+            ?.toLong()
+            ?: LoginRateLimiter.DEFAULT_BACKOFF_UNIT_MS
+    if (backoffUnitMs != LoginRateLimiter.DEFAULT_BACKOFF_UNIT_MS) {
+        logger.warn("Login backoff unit set to $backoffUnitMs ms (default ${LoginRateLimiter.DEFAULT_BACKOFF_UNIT_MS} ms)")
+    }
+    val rateLimiter = LoginRateLimiter(backoffUnitMs)
+    routing { route("/auth") { auth(environment, DatabaseConnection.pool, rateLimiter) } }
 }
 
-fun Route.auth(
-    tokenService: TokenService,
-    authService: AuthService,
-    permissionsService: PermissionsService,
+internal fun Route.auth(
+    env: ApplicationEnvironment,
+    pool: ConnectionPool,
+    rateLimiter: LoginRateLimiter,
 ) {
     post("/login") {
         val ip = call.request.origin.remoteAddress
-        if (LoginRateLimiter.isBlocked(ip)) {
-            val retryAfter = LoginRateLimiter.getRemainingSeconds(ip)
+        if (rateLimiter.isBlocked(ip)) {
+            val retryAfter = rateLimiter.getRemainingSeconds(ip)
             call.response.headers.append("Retry-After", retryAfter.toString())
             call.respond(HttpStatusCode.TooManyRequests, mapOf("retryAfter" to retryAfter))
             return@post
         }
 
         val loginRequest = call.receive<AuthRequest>()
-        val userInfo = authService.authenticateUser(loginRequest.name, loginRequest.pin.toCharArray())
+        val userInfo = pool.read { AuthService(env, it).authenticateUser(loginRequest.name, loginRequest.pin.toCharArray()) }
 
         if (userInfo == null) {
-            LoginRateLimiter.recordFailure(ip)
-            val retryAfter = LoginRateLimiter.getRemainingSeconds(ip)
+            rateLimiter.recordFailure(ip)
+            val retryAfter = rateLimiter.getRemainingSeconds(ip)
             if (retryAfter > 0) {
                 call.response.headers.append("Retry-After", retryAfter.toString())
                 call.respond(HttpStatusCode.TooManyRequests, mapOf("retryAfter" to retryAfter))
@@ -137,11 +153,11 @@ fun Route.auth(
             call.request.origin.scheme == "https" ||
                 call.request.header("X-Forwarded-Proto") == "https"
 
-        LoginRateLimiter.reset(ip)
-        val accessTokenResponse = tokenService.generateAccessToken(userInfo)
-        val refreshTokenResponse = tokenService.generateRefreshToken(userInfo)
+        rateLimiter.reset(ip)
+        val accessTokenResponse = pool.read { TokenService(env, it).generateAccessToken(userInfo) }
+        val refreshTokenResponse = pool.write { TokenService(env, it).generateRefreshToken(userInfo) }
 
-        val perms = permissionsService.getByRole(userInfo.roleId) ?: emptyList()
+        val perms = pool.read { PermissionsService(env, it).getByRole(userInfo.roleId) } ?: emptyList()
         if (perms.isEmpty()) {
             logger.info("The user doesn't have a permissions")
             call.respond(HttpStatusCode.Forbidden)
@@ -192,17 +208,17 @@ fun Route.auth(
             call.request.origin.scheme == "https" ||
                 call.request.header("X-Forwarded-Proto") == "https"
 
-        val isValidRefreshToken = tokenService.validateRefreshToken(refreshToken)
+        val isValidRefreshToken = pool.read { TokenService(env, it).validateRefreshToken(refreshToken) }
         if (!isValidRefreshToken) {
             throw InvalidTokenException("Invalid refresh token")
         }
 
-        val userInfo = tokenService.getUserFromRefreshToken(refreshToken)
+        val userInfo = pool.read { TokenService(env, it).getUserFromRefreshToken(refreshToken) }
         if (userInfo == null) {
             throw InvalidTokenException("Unable to extract user information from refresh token")
         }
 
-        val newAccessToken = tokenService.generateAccessToken(userInfo)
+        val newAccessToken = pool.read { TokenService(env, it).generateAccessToken(userInfo) }
 
         call.response.cookies.append(
             Cookie(
@@ -230,7 +246,7 @@ fun Route.auth(
                 principal?.getClaim("userId", String::class)
                     ?: throw InvalidTokenException("User ID not found in token")
 
-            tokenService.revokeRefreshToken(userId)
+            pool.write { TokenService(env, it).revokeRefreshToken(userId) }
 
             call.response.cookies.append(
                 Cookie(
@@ -11,20 +11,18 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.CategoryItem
 import pos.ambrosia.models.CategoryUpsert
 import pos.ambrosia.services.CategoryService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureCategories() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val service = CategoryService(connection)
-    routing { route("/categories") { categories(service) } }
+    routing { route("/categories") { categories(DatabaseConnection.pool) } }
 }
 
-fun Route.categories(service: CategoryService) {
+fun Route.categories(pool: ConnectionPool) {
     authorizePermission("categories_read") {
         get("") {
             val type = call.request.queryParameters["type"]
@@ -32,7 +30,7 @@ fun Route.categories(service: CategoryService) {
                 call.respond(HttpStatusCode.BadRequest, "Missing or malformed type")
                 return@get
             }
-            val items = service.getCategories(type)
+            val items = pool.read { CategoryService(it).getCategories(type) }
             if (items == null) {
                 call.respond(HttpStatusCode.NotFound, "No category type found")
                 return@get
@@ -51,7 +49,7 @@ fun Route.categories(service: CategoryService) {
                 call.respond(HttpStatusCode.BadRequest, "Missing or malformed ID/type")
                 return@get
             }
-            val item = service.getCategoryById(id, type)
+            val item = pool.read { CategoryService(it).getCategoryById(id, type) }
             if (item == null) {
                 call.respond(HttpStatusCode.NotFound, "Category not found")
                 return@get
@@ -67,7 +65,7 @@ fun Route.categories(service: CategoryService) {
                 call.respond(HttpStatusCode.BadRequest, "Missing or malformed type")
                 return@post
             }
-            val id = service.addCategory(type, CategoryItem(name = body.name))
+            val id = pool.write { CategoryService(it).addCategory(type, CategoryItem(name = body.name)) }
             if (id == null) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to create category")
                 return@post
@@ -87,7 +85,7 @@ fun Route.categories(service: CategoryService) {
                 call.respond(HttpStatusCode.BadRequest, "Missing or malformed ID/type")
                 return@put
             }
-            val ok = service.updateCategory(type, CategoryItem(id = id, name = body.name))
+            val ok = pool.write { CategoryService(it).updateCategory(type, CategoryItem(id = id, name = body.name)) }
             if (!ok) {
                 call.respond(HttpStatusCode.NotFound, "Category with ID: $id not found")
                 return@put
@@ -106,7 +104,7 @@ fun Route.categories(service: CategoryService) {
                 call.respond(HttpStatusCode.BadRequest, "Missing or malformed ID/type")
                 return@delete
             }
-            val ok = service.deleteCategory(id, type)
+            val ok = pool.write { CategoryService(it).deleteCategory(id, type) }
             if (!ok) {
                 call.respond(
                     HttpStatusCode.BadRequest,
@@ -8,31 +8,30 @@ import io.ktor.server.routing.Route
 import io.ktor.server.routing.post
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.Message
 import pos.ambrosia.models.StoreCheckoutRequest
 import pos.ambrosia.services.CheckoutService
 import pos.ambrosia.services.PhoenixService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 private const val CHECKOUT_FAILED_MSG = "Checkout failed: check items, stock levels, and payment details"
 
 fun Application.configureCheckout() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val checkoutService = CheckoutService(connection)
     val phoenixService = PhoenixService(environment)
-    routing { route("/store/orders") { checkout(checkoutService, phoenixService) } }
+    routing { route("/store/orders") { checkout(DatabaseConnection.pool, phoenixService) } }
 }
 
+// Checkouts take the writer one at a time, so their transactions never interleave
 fun Route.checkout(
-    checkoutService: CheckoutService,
+    pool: ConnectionPool,
     phoenixService: PhoenixService,
 ) {
     authorizePermission("orders_create") {
         post("/checkout") {
             val checkoutRequest = call.receive<StoreCheckoutRequest>()
-            val checkoutResponse = checkoutService.checkout(checkoutRequest)
+            val checkoutResponse = pool.write { CheckoutService(it).checkout(checkoutRequest) }
             if (checkoutResponse == null) {
                 call.respond(
                     HttpStatusCode.BadRequest,
@@ -48,7 +47,7 @@ fun Route.checkout(
                 checkoutRequest.paymentHash
                     ?: return@post call.respond(HttpStatusCode.BadRequest, Message("paymentHash required"))
 
-            val existing = checkoutService.findCheckoutByPaymentHash(paymentHash)
+            val existing = pool.read { CheckoutService(it).findCheckoutByPaymentHash(paymentHash) }
             if (existing != null) {
                 return@post call.respond(HttpStatusCode.OK, existing)
             }
@@ -58,7 +57,7 @@ fun Route.checkout(
                 return@post call.respond(HttpStatusCode.Accepted, mapOf("status" to "pending"))
             }
 
-            val result = checkoutService.checkout(checkoutRequest)
+            val result = pool.write { CheckoutService(it).checkout(checkoutRequest) }
             if (result == null) {
                 call.respond(
                     HttpStatusCode.BadRequest,
@@ -9,21 +9,19 @@ import io.ktor.server.routing.get
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.Config
 import pos.ambrosia.services.ConfigService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureConfig() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val configService = ConfigService(connection)
-    routing { route("/config") { config(configService) } }
+    routing { route("/config") { config(DatabaseConnection.pool) } }
 }
 
-fun Route.config(configService: ConfigService) {
+fun Route.config(pool: ConnectionPool) {
     get("") {
-        val config = configService.getConfig()
+        val config = pool.read { ConfigService(it).getConfig() }
         if (config == null) {
             call.respond(HttpStatusCode.NotFound, "Config not found")
             return@get
@@ -33,7 +31,7 @@ fun Route.config(configService: ConfigService) {
     authorizePermission("settings_update") {
         put("") {
             val config = call.receive<Config>()
-            val isUpdated = configService.updateConfig(config)
+            val isUpdated = pool.write { ConfigService(it).updateConfig(config) }
             if (!isUpdated) {
                 call.respond(HttpStatusCode.NotFound, "Failed to update config")
                 return@put
@@ -14,17 +14,15 @@ import pos.ambrosia.models.Message
 import pos.ambrosia.models.SetBaseCurrencyRequest
 import pos.ambrosia.services.CurrencyService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureCurrency() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val service = CurrencyService(connection)
+    val pool = DatabaseConnection.pool
 
     routing {
         route("/currencies") {
             authorizePermission("settings_read") {
                 get("") {
-                    val list = service.list()
+                    val list = pool.read { CurrencyService(it).list() }
                     call.respond(HttpStatusCode.OK, list)
                 }
             }
@@ -33,7 +31,7 @@ fun Application.configureCurrency() {
         route("/base-currency") {
             authorizePermission("settings_read") {
                 get("") {
-                    val curr = service.getBaseCurrency()
+                    val curr = pool.read { CurrencyService(it).getBaseCurrency() }
                     if (curr == null) {
                         call.respond(HttpStatusCode.NotFound, Message("Base currency not set"))
                     } else {
@@ -48,12 +46,12 @@ fun Application.configureCurrency() {
                         call.respond(HttpStatusCode.BadRequest, Message("Acronym is required"))
                         return@put
                     }
-                    val ok = service.setBaseCurrencyByAcronym(req.acronym)
+                    val ok = pool.write { CurrencyService(it).setBaseCurrencyByAcronym(req.acronym) }
                     if (!ok) {
                         call.respond(HttpStatusCode.NotFound, Message("Unknown currency acronym: ${req.acronym}"))
                         return@put
                     }
-                    val curr = service.getBaseCurrency()
+                    val curr = pool.read { CurrencyService(it).getBaseCurrency() }
                     call.respond(HttpStatusCode.OK, curr ?: Message("Base currency updated"))
                 }
             }
@@ -11,23 +11,21 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Dish
 import pos.ambrosia.services.DishService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureDishes() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val dishService = DishService(connection)
-    routing { route("/dishes") { dishes(dishService) } }
+    routing { route("/dishes") { dishes(DatabaseConnection.pool) } }
 }
 
-fun Route.dishes(dishService: DishService) {
+fun Route.dishes(pool: ConnectionPool) {
     authorizePermission("dish_read") {
         get("") {
-            val dishes = dishService.getDishes()
+            val dishes = pool.read { DishService(it).getDishes() }
             if (dishes.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No dishes found")
                 return@get
@@ -41,7 +39,7 @@ fun Route.dishes(dishService: DishService) {
                 return@get
             }
 
-            val dish = dishService.getDishById(id)
+            val dish = pool.read { DishService(it).getDishById(id) }
             if (dish == null) {
                 call.respond(HttpStatusCode.NotFound, "Dish not found")
                 return@get
@@ -53,7 +51,7 @@ fun Route.dishes(dishService: DishService) {
     authorizePermission("dish_create") {
         post("") {
             val dish = call.receive<Dish>()
-            val id = dishService.addDish(dish)
+            val id = pool.write { DishService(it).addDish(dish) }
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("id" to id, "message" to "Dish added successfully"),
@@ -69,7 +67,7 @@ fun Route.dishes(dishService: DishService) {
             }
 
             val updatedDish = call.receive<Dish>()
-            val isUpdated = dishService.updateDish(updatedDish.copy(id = id))
+            val isUpdated = pool.write { DishService(it).updateDish(updatedDish.copy(id = id)) }
             logger.info(isUpdated.toString())
 
             if (!isUpdated) {
@@ -88,7 +86,7 @@ fun Route.dishes(dishService: DishService) {
                 return@delete
             }
 
-            dishService.deleteDish(id)
+            pool.write { DishService(it).deleteDish(id) }
             call.respond(HttpStatusCode.NoContent)
         }
     }
@@ -11,6 +11,7 @@ import pos.ambrosia.logger
 import pos.ambrosia.models.Message
 import pos.ambrosia.models.WalletErrorResponse
 import pos.ambrosia.utils.AdminOnlyException
+import pos.ambrosia.utils.DatabaseBusyException
 import pos.ambrosia.utils.DatabaseException
 import pos.ambrosia.utils.DuplicateProductSkuException
 import pos.ambrosia.utils.DuplicateUserNameException
@@ -123,6 +124,10 @@ fun Application.handler() {
                 ),
             )
         }
+        exception<DatabaseBusyException> { call, cause ->
+            logger.warn("Database busy: ${cause.message}")
+            call.respond(HttpStatusCode.ServiceUnavailable, Message("Database is busy, try again"))
+        }
         exception<DatabaseException> { call, cause ->
             logger.error("Database operation failed: ${cause.message}")
             call.respond(HttpStatusCode.InternalServerError, Message(cause.message ?: "Database operation failed"))
@@ -8,6 +8,8 @@ import io.ktor.server.routing.get
 import io.ktor.server.routing.post
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.DatabaseConnection
+import pos.ambrosia.utils.authenticateAdmin
 
 fun Application.configureHealth() {
     routing { route("/api") { healthRoutes() } }
@@ -24,5 +26,11 @@ fun Route.healthRoutes() {
                 ),
             )
         }
+        // Pool, checkpoint and statement cache counters; these describe the server's load, so admins only
+        authenticateAdmin {
+            get("/database") {
+                call.respond(HttpStatusCode.OK, DatabaseConnection.stats())
+            }
+        }
     }
 }
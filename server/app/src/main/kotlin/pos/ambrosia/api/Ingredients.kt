@@ -11,23 +11,21 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Ingredient
 import pos.ambrosia.services.IngredientService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureIngredients() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val ingredientService = IngredientService(connection)
-    routing { route("/ingredients") { ingredients(ingredientService) } }
+    routing { route("/ingredients") { ingredients(DatabaseConnection.pool) } }
 }
 
-fun Route.ingredients(ingredientService: IngredientService) {
+fun Route.ingredients(pool: ConnectionPool) {
     authorizePermission("ingredients_read") {
         get("") {
-            val ingredients = ingredientService.getIngredients()
+            val ingredients = pool.read { IngredientService(it).getIngredients() }
             if (ingredients.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No ingredients found")
                 return@get
@@ -41,7 +39,7 @@ fun Route.ingredients(ingredientService: IngredientService) {
                 return@get
             }
 
-            val ingredient = ingredientService.getIngredientById(id)
+            val ingredient = pool.read { IngredientService(it).getIngredientById(id) }
             if (ingredient == null) {
                 call.respond(HttpStatusCode.NotFound, "Ingredient not found")
                 return@get
@@ -55,7 +53,7 @@ fun Route.ingredients(ingredientService: IngredientService) {
                 call.respond(HttpStatusCode.BadRequest, "Invalid or missing threshold parameter")
                 return@get
             }
-            val lowStockIngredients = ingredientService.getLowStockIngredients() // Example threshold
+            val lowStockIngredients = pool.read { IngredientService(it).getLowStockIngredients() } // Example threshold
             if (lowStockIngredients.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No low stock ingredients found")
                 return@get
@@ -66,7 +64,7 @@ fun Route.ingredients(ingredientService: IngredientService) {
     authorizePermission("ingredients_create") {
         post("") {
             val ingredient = call.receive<Ingredient>()
-            val createdId = ingredientService.addIngredient(ingredient)
+            val createdId = pool.write { IngredientService(it).addIngredient(ingredient) }
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("id" to createdId, "message" to "Ingredient added successfully"),
@@ -82,7 +80,7 @@ fun Route.ingredients(ingredientService: IngredientService) {
             }
 
             val updatedIngredient = call.receive<Ingredient>()
-            val isUpdated = ingredientService.updateIngredient(updatedIngredient.copy(id = id))
+            val isUpdated = pool.write { IngredientService(it).updateIngredient(updatedIngredient.copy(id = id)) }
             logger.info(isUpdated.toString())
 
             if (!isUpdated) {
@@ -104,7 +102,7 @@ fun Route.ingredients(ingredientService: IngredientService) {
                 return@delete
             }
 
-            val isDeleted = ingredientService.deleteIngredient(id)
+            val isDeleted = pool.write { IngredientService(it).deleteIngredient(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.NotFound, "Ingredient not found")
                 return@delete
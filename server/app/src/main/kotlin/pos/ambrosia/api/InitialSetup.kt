@@ -9,6 +9,7 @@ import io.ktor.server.routing.get
 import io.ktor.server.routing.post
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Config
@@ -22,19 +23,16 @@ import pos.ambrosia.services.PermissionsService
 import pos.ambrosia.services.RolesService
 import pos.ambrosia.services.UsersService
 import pos.ambrosia.utils.InitialSetupException
-import java.sql.Connection
 
 fun Application.configureInitialSetup() {
-    val connection: Connection = DatabaseConnection.getConnection()
     routing {
-        route("/initial-setup") { initialSetupRoutes(connection) }
+        route("/initial-setup") { initialSetupRoutes(DatabaseConnection.pool) }
     }
 }
 
-private fun Route.initialSetupRoutes(connection: Connection) {
+private fun Route.initialSetupRoutes(pool: ConnectionPool) {
     get("") {
-        val configService = ConfigService(connection)
-        val config = configService.getConfig()
+        val config = pool.read { ConfigService(it).getConfig() }
         val needsBusinessType = config != null && !config.businessTypeConfirmed
         call.respond(
             HttpStatusCode.OK,
@@ -45,8 +43,7 @@ private fun Route.initialSetupRoutes(connection: Connection) {
     post("") {
         val req = call.receive<InitialSetupRequest>()
 
-        val configService = ConfigService(connection)
-        val existingConfig = configService.getConfig()
+        val existingConfig = pool.read { ConfigService(it).getConfig() }
         if (existingConfig != null) {
             if (!existingConfig.businessTypeConfirmed) {
                 val businessType = req.businessType
@@ -56,9 +53,11 @@ private fun Route.initialSetupRoutes(connection: Connection) {
                 }
 
                 val saved =
-                    configService.updateConfig(
-                        existingConfig.copy(businessType = businessType, businessTypeConfirmed = true),
-                    )
+                    pool.write {
+                        ConfigService(it).updateConfig(
+                            existingConfig.copy(businessType = businessType, businessTypeConfirmed = true),
+                        )
+                    }
                 if (!saved) {
                     throw InitialSetupException("Failed to update business type")
                 }
@@ -98,62 +97,64 @@ private fun Route.initialSetupRoutes(connection: Connection) {
         val logoUrl = req.businessLogoUrl ?: req.businessLogo
 
         val env = call.application.environment
-        val rolesService = RolesService(env, connection)
-        val usersService = UsersService(env, connection)
-        val permissionsService = PermissionsService(env, connection)
-        val currencyService = CurrencyService(connection)
-
-        val currency = currencyService.getByAcronym(businessCurrency)
+        val currency = pool.read { CurrencyService(it).getByAcronym(businessCurrency) }
         if (currency == null) {
             call.respond(HttpStatusCode.NotFound, mapOf("message" to "Unknown currency acronym: $businessCurrency"))
             return@post
         }
 
-        try {
-            connection.autoCommit = false
-
-            val roleId =
-                rolesService.addRole(Role(role = "Admin", password = userPassword, isAdmin = true))
-                    ?: throw InitialSetupException("Failed to create admin role")
-
-            permissionsService.assignAllEnabledToRole(roleId)
-
-            val userId =
-                usersService.addUser(User(name = userName, pin = userPin, role = roleId))
-                    ?: throw InitialSetupException("Failed to create user")
-
-            val saved =
-                configService.updateConfig(
-                    Config(
-                        businessType = businessType,
-                        businessName = businessName,
-                        businessAddress = req.businessAddress,
-                        businessPhone = req.businessPhone,
-                        businessEmail = req.businessEmail,
-                        businessTaxId = taxId,
-                        businessLogoUrl = logoUrl,
-                        businessTypeConfirmed = true,
-                    ),
-                )
-            if (!saved) throw InitialSetupException("Failed to save config")
-
-            val currencyId = currency.id ?: throw InitialSetupException("Currency ID missing")
-            if (!currencyService.setBaseCurrencyById(currencyId)) throw InitialSetupException("Failed to set base currency")
-
-            connection.commit()
-            call.respond(HttpStatusCode.Created, mapOf("message" to "Initial setup completed", "userId" to userId, "roleId" to roleId))
-        } catch (e: Exception) {
-            logger.error("Initial setup failed: ${e.message}")
-            try {
-                connection.rollback()
-            } catch (_: Exception) {
-            }
-            throw if (e is InitialSetupException) e else InitialSetupException(e.message ?: "Setup failed")
-        } finally {
-            try {
-                connection.autoCommit = true
-            } catch (_: Exception) {
+        // Role, user, config and base currency are created together or not at all
+        val (userId, roleId) =
+            pool.write { connection ->
+                try {
+                    connection.autoCommit = false
+
+                    val roleId =
+                        RolesService(env, connection).addRole(Role(role = "Admin", password = userPassword, isAdmin = true))
+                            ?: throw InitialSetupException("Failed to create admin role")
+
+                    PermissionsService(env, connection).assignAllEnabledToRole(roleId)
+
+                    val userId =
+                        UsersService(env, connection).addUser(User(name = userName, pin = userPin, role = roleId))
+                            ?: throw InitialSetupException("Failed to create user")
+
+                    val saved =
+                        ConfigService(connection).updateConfig(
+                            Config(
+                                businessType = businessType,
+                                businessName = businessName,
+                                businessAddress = req.businessAddress,
+                                businessPhone = req.businessPhone,
+                                businessEmail = req.businessEmail,
+                                businessTaxId = taxId,
+                                businessLogoUrl = logoUrl,
+                                businessTypeConfirmed = true,
+                            ),
+                        )
+                    if (!saved) throw InitialSetupException("Failed to save config")
+
+                    val currencyId = currency.id ?: throw InitialSetupException("Currency ID missing")
+                    if (!CurrencyService(connection).setBaseCurrencyById(currencyId)) {
+                        throw InitialSetupException("Failed to set base currency")
+                    }
+
+                    connection.commit()
+                    userId to roleId
+                } catch (e: Exception) {
+                    logger.error("Initial setup failed: ${e.message}")
+                    try {
+                        connection.rollback()
+                    } catch (_: Exception) {
+                    }
+                    throw if (e is InitialSetupException) e else InitialSetupException(e.message ?: "Setup failed")
+                } finally {
+                    try {
+                        connection.autoCommit = true
+                    } catch (_: Exception) {
+                    }
+                }
             }
-        }
+        call.respond(HttpStatusCode.Created, mapOf("message" to "Initial setup completed", "userId" to userId, "roleId" to roleId))
     }
 }
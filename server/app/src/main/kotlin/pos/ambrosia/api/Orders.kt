@@ -11,6 +11,7 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.AddOrderDishRequest
@@ -22,18 +23,17 @@ import pos.ambrosia.services.OrderService
 import pos.ambrosia.utils.DatabaseException
 import pos.ambrosia.utils.ResourceNotFoundException
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
+import pos.ambrosia.utils.executeInTransaction
 
 fun Application.configureOrders() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val orderService = OrderService(connection)
-    routing { route("/orders") { orders(orderService) } }
+    routing { route("/orders") { orders(DatabaseConnection.pool) } }
 }
 
-fun Route.orders(orderService: OrderService) {
+// Each call borrows a pooled connection and runs on the database threads, not on Ktor's
+fun Route.orders(pool: ConnectionPool) {
     authorizePermission("orders_read") {
         get("") {
-            val orders = orderService.getOrders()
+            val orders = pool.read { OrderService(it).getOrders() }
             if (orders.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No orders found")
                 return@get
@@ -48,7 +48,7 @@ fun Route.orders(orderService: OrderService) {
                 return@get
             }
 
-            val order = orderService.getOrderById(id)
+            val order = pool.read { OrderService(it).getOrderById(id) }
             if (order == null) {
                 throw ResourceNotFoundException("Order $id not found")
             }
@@ -63,12 +63,12 @@ fun Route.orders(orderService: OrderService) {
                 return@get
             }
 
-            val order = orderService.getOrderById(id)
+            val order = pool.read { OrderService(it).getOrderById(id) }
             if (order == null) {
                 throw ResourceNotFoundException("Order $id not found")
             }
 
-            val dishes = orderService.getOrderDishes(id)
+            val dishes = pool.read { OrderService(it).getOrderDishes(id) }
             val completeOrder = CompleteOrder(order, dishes)
             call.respond(HttpStatusCode.OK, completeOrder)
         }
@@ -80,7 +80,7 @@ fun Route.orders(orderService: OrderService) {
                 return@get
             }
 
-            val dishes = orderService.getOrderDishes(orderId)
+            val dishes = pool.read { OrderService(it).getOrderDishes(orderId) }
             if (dishes.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No dishes found for this order")
                 return@get
@@ -96,7 +96,7 @@ fun Route.orders(orderService: OrderService) {
                 return@get
             }
 
-            val orders = orderService.getOrdersByUserId(userId)
+            val orders = pool.read { OrderService(it).getOrdersByUserId(userId) }
             if (orders == null) {
                 call.respond(HttpStatusCode.NotFound, "User not found")
                 return@get
@@ -115,7 +115,7 @@ fun Route.orders(orderService: OrderService) {
                 return@get
             }
 
-            val orders = orderService.getOrdersByTableId(tableId)
+            val orders = pool.read { OrderService(it).getOrdersByTableId(tableId) }
             if (orders == null) {
                 call.respond(HttpStatusCode.NotFound, "Table not found")
                 return@get
@@ -134,7 +134,7 @@ fun Route.orders(orderService: OrderService) {
                 return@get
             }
 
-            val orders = orderService.getOrdersByStatus(status)
+            val orders = pool.read { OrderService(it).getOrdersByStatus(status) }
             if (orders == null) {
                 call.respond(HttpStatusCode.NotFound, "Invalid order status")
                 return@get
@@ -154,7 +154,7 @@ fun Route.orders(orderService: OrderService) {
                 return@get
             }
 
-            val orders = orderService.getOrdersByDateRange(startDate, endDate)
+            val orders = pool.read { OrderService(it).getOrdersByDateRange(startDate, endDate) }
             if (orders.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No orders found in date range")
                 return@get
@@ -166,7 +166,7 @@ fun Route.orders(orderService: OrderService) {
     authorizePermission("orders_create") {
         post("") {
             val order = call.receive<Order>()
-            val orderId = orderService.addOrder(order)
+            val orderId = pool.write { OrderService(it).addOrder(order) }
             if (orderId == null) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to create order")
                 return@post
@@ -177,23 +177,26 @@ fun Route.orders(orderService: OrderService) {
             )
         }
 
-        // Create order with dishes
+        // Create order with dishes; the order, its dishes and its total are committed together or not at all
         post("/with-dishes") {
             val request = call.receive<OrderWithDishesRequest>()
-            val orderId = orderService.addOrder(request.order)
+            val orderId =
+                pool.write { connection ->
+                    val service = OrderService(connection)
+                    executeInTransaction(connection) {
+                        val id = service.addOrder(request.order) ?: throw DatabaseException("Failed to create order")
+                        if (!service.addDishesToOrder(id, request.dishes)) {
+                            throw DatabaseException("Failed to add some dishes to order $id")
+                        }
+                        service.updateOrderTotal(id)
+                        id
+                    }
+                }
             if (orderId == null) {
-                call.respond(HttpStatusCode.BadRequest, "Failed to create order")
-                return@post
-            }
-
-            val dishesAdded = orderService.addDishesToOrder(orderId, request.dishes)
-            if (!dishesAdded) {
-                call.respond(HttpStatusCode.BadRequest, "Order created but failed to add some dishes")
+                call.respond(HttpStatusCode.BadRequest, "Failed to create order with dishes")
                 return@post
             }
 
-            // Update order total based on dishes
-            orderService.updateOrderTotal(orderId)
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("message" to "Order with dishes created successfully", "id" to orderId),
@@ -224,14 +227,14 @@ fun Route.orders(orderService: OrderService) {
                     )
                 }
 
-            val added = orderService.addDishesToOrder(orderId, dishes)
+            val added = pool.write { OrderService(it).addDishesToOrder(orderId, dishes) }
             if (!added) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to add dishes to order")
                 return@post
             }
 
             // Update order total
-            orderService.updateOrderTotal(orderId)
+            pool.write { OrderService(it).updateOrderTotal(orderId) }
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("orderId" to orderId, "message" to "Dishes added to order successfully"),
@@ -249,7 +252,7 @@ fun Route.orders(orderService: OrderService) {
 
             val updatedOrder = call.receive<Order>()
             val orderWithId = updatedOrder.copy(id = id)
-            val isUpdated = orderService.updateOrder(orderWithId)
+            val isUpdated = pool.write { OrderService(it).updateOrder(orderWithId) }
             if (!isUpdated) {
                 throw ResourceNotFoundException("Order $id not found")
             }
@@ -268,13 +271,13 @@ fun Route.orders(orderService: OrderService) {
 
             val updatedDish = call.receive<OrderDish>()
             val dishWithId = updatedDish.copy(id = dishId, orderId = orderId)
-            val isUpdated = orderService.updateOrderDish(dishWithId)
+            val isUpdated = pool.write { OrderService(it).updateOrderDish(dishWithId) }
             if (!isUpdated) {
                 throw ResourceNotFoundException("Order dish $dishId not found in order $orderId")
             }
 
             // Update order total
-            orderService.updateOrderTotal(orderId)
+            pool.write { OrderService(it).updateOrderTotal(orderId) }
             call.respond(
                 HttpStatusCode.OK,
                 mapOf(
@@ -293,8 +296,8 @@ fun Route.orders(orderService: OrderService) {
                 return@put
             }
 
-            val newTotal = orderService.calculateOrderTotal(orderId)
-            val isUpdated = orderService.updateOrderTotal(orderId)
+            val newTotal = pool.read { OrderService(it).calculateOrderTotal(orderId) }
+            val isUpdated = pool.write { OrderService(it).updateOrderTotal(orderId) }
             if (!isUpdated) {
                 throw ResourceNotFoundException("Order $orderId not found")
             }
@@ -313,7 +316,7 @@ fun Route.orders(orderService: OrderService) {
                 return@delete
             }
 
-            val isDeleted = orderService.deleteOrder(id)
+            val isDeleted = pool.write { OrderService(it).deleteOrder(id) }
             if (!isDeleted) {
                 throw ResourceNotFoundException("Order $id not found")
             }
@@ -328,13 +331,13 @@ fun Route.orders(orderService: OrderService) {
                 return@delete
             }
 
-            val isDeleted = orderService.removeOrderDish(dishId)
+            val isDeleted = pool.write { OrderService(it).removeOrderDish(dishId) }
             if (!isDeleted) {
                 throw ResourceNotFoundException("Order dish $dishId not found")
             }
 
             // Update order total
-            orderService.updateOrderTotal(orderId)
+            pool.write { OrderService(it).updateOrderTotal(orderId) }
             call.respond(HttpStatusCode.NoContent)
         }
 
@@ -345,13 +348,13 @@ fun Route.orders(orderService: OrderService) {
                 return@delete
             }
 
-            val isDeleted = orderService.removeAllOrderDishes(orderId)
+            val isDeleted = pool.write { OrderService(it).removeAllOrderDishes(orderId) }
             if (!isDeleted) {
                 throw DatabaseException("Failed to remove dishes from order")
             }
 
             // Update order total to 0
-            orderService.updateOrderTotal(orderId)
+            pool.write { OrderService(it).updateOrderTotal(orderId) }
             call.respond(HttpStatusCode.NoContent)
         }
     }
@@ -11,28 +11,22 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.Payment
 import pos.ambrosia.models.TicketPayment
 import pos.ambrosia.services.PaymentService
 import pos.ambrosia.services.TicketPaymentService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configurePayments() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val paymentService = PaymentService(connection)
-    val ticketPaymentService = TicketPaymentService(connection)
-    routing { route("/payments") { payments(paymentService, ticketPaymentService) } }
+    routing { route("/payments") { payments(DatabaseConnection.pool) } }
 }
 
-fun Route.payments(
-    paymentService: PaymentService,
-    ticketPaymentService: TicketPaymentService,
-) {
+fun Route.payments(pool: ConnectionPool) {
     authorizePermission("payments_read") {
         get("") {
-            val payments = paymentService.getPayments()
+            val payments = pool.read { PaymentService(it).getPayments() }
             if (payments.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No payments found")
                 return@get
@@ -46,7 +40,7 @@ fun Route.payments(
                 return@get
             }
 
-            val payment = paymentService.getPaymentById(id)
+            val payment = pool.read { PaymentService(it).getPaymentById(id) }
             if (payment == null) {
                 call.respond(HttpStatusCode.NotFound, "Payment not found")
                 return@get
@@ -55,7 +49,7 @@ fun Route.payments(
             call.respond(HttpStatusCode.OK, payment)
         }
         get("/methods") {
-            val paymentMethods = paymentService.getPaymentMethods()
+            val paymentMethods = pool.read { PaymentService(it).getPaymentMethods() }
             if (paymentMethods.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No payment methods found")
                 return@get
@@ -69,7 +63,7 @@ fun Route.payments(
                 return@get
             }
 
-            val paymentMethod = paymentService.getPaymentMethodById(id)
+            val paymentMethod = pool.read { PaymentService(it).getPaymentMethodById(id) }
             if (paymentMethod == null) {
                 call.respond(HttpStatusCode.NotFound, "Payment method not found")
                 return@get
@@ -78,7 +72,7 @@ fun Route.payments(
             call.respond(HttpStatusCode.OK, paymentMethod)
         }
         get("/currencies") {
-            val currencies = paymentService.getCurrencies()
+            val currencies = pool.read { PaymentService(it).getCurrencies() }
             if (currencies.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No currencies found")
                 return@get
@@ -92,7 +86,7 @@ fun Route.payments(
                 return@get
             }
 
-            val currency = paymentService.getCurrencyById(id)
+            val currency = pool.read { PaymentService(it).getCurrencyById(id) }
             if (currency == null) {
                 call.respond(HttpStatusCode.NotFound, "Currency not found")
                 return@get
@@ -107,7 +101,7 @@ fun Route.payments(
                 return@get
             }
 
-            val payments = ticketPaymentService.getTicketPaymentsByTicket(ticketId)
+            val payments = pool.read { TicketPaymentService(it).getTicketPaymentsByTicket(ticketId) }
             if (payments == null) {
                 call.respond(HttpStatusCode.NotFound, "Ticket not found")
                 return@get
@@ -126,7 +120,7 @@ fun Route.payments(
                 return@get
             }
 
-            val tickets = ticketPaymentService.getTicketPaymentsByPayment(paymentId)
+            val tickets = pool.read { TicketPaymentService(it).getTicketPaymentsByPayment(paymentId) }
             if (tickets == null) {
                 call.respond(HttpStatusCode.NotFound, "Payment not found")
                 return@get
@@ -141,7 +135,7 @@ fun Route.payments(
     authorizePermission("payments_create") {
         post("") {
             val payment = call.receive<Payment>()
-            val paymentId = paymentService.addPayment(payment)
+            val paymentId = pool.write { PaymentService(it).addPayment(payment) }
             if (paymentId == null) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to create payment")
                 return@post
@@ -161,7 +155,7 @@ fun Route.payments(
             }
 
             val updatedPayment = call.receive<Payment>().copy(id = id)
-            val isUpdated = paymentService.updatePayment(updatedPayment)
+            val isUpdated = pool.write { PaymentService(it).updatePayment(updatedPayment) }
             if (!isUpdated) {
                 call.respond(HttpStatusCode.NotFound, "Payment with ID: $id not found")
                 return@put
@@ -174,7 +168,7 @@ fun Route.payments(
         }
         post("/ticket-payments") {
             val ticketPayment = call.receive<TicketPayment>()
-            val isAdded = ticketPaymentService.addTicketPayment(ticketPayment)
+            val isAdded = pool.write { TicketPaymentService(it).addTicketPayment(ticketPayment) }
             if (!isAdded) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to create ticket payment relationship")
                 return@post
@@ -197,7 +191,7 @@ fun Route.payments(
                 return@delete
             }
 
-            val isDeleted = paymentService.deletePayment(id)
+            val isDeleted = pool.write { PaymentService(it).deletePayment(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to delete payment or payment is in use")
                 return@delete
@@ -215,7 +209,7 @@ fun Route.payments(
                 return@delete
             }
 
-            val isDeleted = ticketPaymentService.deleteTicketPayment(paymentId, ticketId)
+            val isDeleted = pool.write { TicketPaymentService(it).deleteTicketPayment(paymentId, ticketId) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to delete ticket payment relationship")
                 return@delete
@@ -231,7 +225,7 @@ fun Route.payments(
                 return@delete
             }
 
-            ticketPaymentService.deleteTicketPaymentsByTicket(ticketId)
+            pool.write { TicketPaymentService(it).deleteTicketPaymentsByTicket(ticketId) }
             call.respond(HttpStatusCode.NoContent)
         }
     }
@@ -9,16 +9,14 @@ import io.ktor.server.routing.routing
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.services.PermissionsService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configurePermissions() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val permissionsService = PermissionsService(environment, connection)
+    val pool = DatabaseConnection.pool
     routing {
         route("/permissions") {
             authorizePermission("permissions_read") {
                 get("") {
-                    val list = permissionsService.getAll()
+                    val list = pool.read { PermissionsService(environment, it).getAll() }
                     if (list.isEmpty()) {
                         call.respond(HttpStatusCode.OK, "No permissions found")
                     } else {
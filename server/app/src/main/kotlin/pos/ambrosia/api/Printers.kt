@@ -13,6 +13,7 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.PrintRequest
 import pos.ambrosia.models.PrinterConfigCreateRequest
@@ -24,27 +25,22 @@ import pos.ambrosia.services.PrinterConfigService
 import pos.ambrosia.services.PrinterConfigUpdateStatus
 import pos.ambrosia.services.TicketTemplateService
 import pos.ambrosia.utils.PrintTicketException
+import java.sql.Connection
 
 fun Application.configurePrinters() {
-    val connection = DatabaseConnection.getConnection()
-    val ticketTemplateService = TicketTemplateService(connection)
-    val printerConfigService = PrinterConfigService(connection)
-    val printService = PrintService(ticketTemplateService, printerConfigService)
-    val configService = ConfigService(connection)
-    routing { route("/printers") { printers(printService, configService, printerConfigService) } }
+    routing { route("/printers") { printers(DatabaseConnection.pool) } }
 }
 
-fun Route.printers(
-    printService: PrintService,
-    configService: ConfigService,
-    printerConfigService: PrinterConfigService,
-) {
+private fun printService(connection: Connection): PrintService =
+    PrintService(TicketTemplateService(connection), PrinterConfigService(connection))
+
+fun Route.printers(pool: ConnectionPool) {
     authenticate("auth-jwt") {
-        get("/available") { call.respond(printService.getAvailablePrinters()) }
-        get("/configs") { call.respond(printerConfigService.getPrinterConfigs()) }
+        get("/available") { call.respond(pool.read { printService(it).getAvailablePrinters() }) }
+        get("/configs") { call.respond(pool.read { PrinterConfigService(it).getPrinterConfigs() }) }
         post("/configs") {
             val request = call.receive<PrinterConfigCreateRequest>()
-            val configId = printerConfigService.createPrinterConfig(request)
+            val configId = pool.write { PrinterConfigService(it).createPrinterConfig(request) }
             if (configId != null) {
                 call.respond(HttpStatusCode.Created, mapOf("id" to configId))
             } else {
@@ -57,7 +53,7 @@ fun Route.printers(
         put("/configs/{id}") {
             val id = call.parameters["id"] ?: return@put call.respond(HttpStatusCode.BadRequest)
             val request = call.receive<PrinterConfigUpdateRequest>()
-            when (printerConfigService.updatePrinterConfig(id, request)) {
+            when (pool.write { PrinterConfigService(it).updatePrinterConfig(id, request) }) {
                 PrinterConfigUpdateStatus.UPDATED -> {
                     call.respond(HttpStatusCode.OK)
                 }
@@ -76,7 +72,7 @@ fun Route.printers(
         }
         delete("/configs/{id}") {
             val id = call.parameters["id"] ?: return@delete call.respond(HttpStatusCode.BadRequest)
-            val success = printerConfigService.deletePrinterConfig(id)
+            val success = pool.write { PrinterConfigService(it).deletePrinterConfig(id) }
             if (success) {
                 call.respond(HttpStatusCode.NoContent)
             } else {
@@ -85,7 +81,7 @@ fun Route.printers(
         }
         post("/configs/{id}/default") {
             val id = call.parameters["id"] ?: return@post call.respond(HttpStatusCode.BadRequest)
-            val success = printerConfigService.setDefault(id)
+            val success = pool.write { PrinterConfigService(it).setDefault(id) }
             if (success) {
                 call.respond(HttpStatusCode.OK)
             } else {
@@ -95,7 +91,7 @@ fun Route.printers(
         post("/set") {
             val request = call.receive<SetPrinterRequest>()
 
-            val configId = printService.setPrinter(request.printerType, request.printerName)
+            val configId = pool.write { printService(it).setPrinter(request.printerType, request.printerName) }
             if (configId == null) {
                 call.respond(
                     HttpStatusCode.Conflict,
@@ -112,8 +108,7 @@ fun Route.printers(
             val request = call.receive<PrintRequest>()
 
             try {
-                val config = configService.getConfig()
-                printService.printTicket(request, config)
+                pool.read { printService(it).printTicket(request, ConfigService(it).getConfig()) }
                 call.respondText("Print job sent", status = HttpStatusCode.OK)
             } catch (e: Exception) {
                 throw PrintTicketException(e.message ?: "An unknown error occurred during printing.")
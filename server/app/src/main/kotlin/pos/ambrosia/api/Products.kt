@@ -11,24 +11,22 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.Message
 import pos.ambrosia.models.Product
 import pos.ambrosia.models.ProductStockAdjustment
 import pos.ambrosia.services.ProductService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureProducts() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val service = ProductService(connection)
-    routing { route("/products") { products(service) } }
+    routing { route("/products") { products(DatabaseConnection.pool) } }
 }
 
-fun Route.products(service: ProductService) {
+fun Route.products(pool: ConnectionPool) {
     authorizePermission("products_read") {
         get("") {
-            val items = service.getProducts()
+            val items = pool.read { ProductService(it).getProducts() }
             if (items.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No products found")
                 return@get
@@ -43,7 +41,7 @@ fun Route.products(service: ProductService) {
                         "Missing or malformed ID",
                     )
             val item =
-                service.getProductById(id)
+                pool.read { ProductService(it).getProductById(id) }
                     ?: return@get call.respond(HttpStatusCode.NotFound, "Product not found")
             call.respond(HttpStatusCode.OK, item)
         }
@@ -51,7 +49,7 @@ fun Route.products(service: ProductService) {
     authorizePermission("products_create") {
         post("") {
             val body = call.receive<Product>()
-            val id = service.addProduct(body)
+            val id = pool.write { ProductService(it).addProduct(body) }
             if (id == null) {
                 call.respond(HttpStatusCode.BadRequest, Message("Invalid product data"))
                 return@post
@@ -72,9 +70,9 @@ fun Route.products(service: ProductService) {
                     )
             val body = call.receive<Product>()
             val existing =
-                service.getProductById(id)
+                pool.read { ProductService(it).getProductById(id) }
                     ?: return@put call.respond(HttpStatusCode.NotFound, Message("Product with ID $id not found"))
-            val ok = service.updateProduct(body.copy(id = id))
+            val ok = pool.write { ProductService(it).updateProduct(body.copy(id = id)) }
             if (!ok) {
                 call.respond(HttpStatusCode.BadRequest, Message("Invalid product data"))
                 return@put
@@ -92,7 +90,7 @@ fun Route.products(service: ProductService) {
                 call.respond(HttpStatusCode.BadRequest, "No stock adjustments provided")
                 return@post
             }
-            val ok = service.adjustStock(adjustments)
+            val ok = pool.write { ProductService(it).adjustStock(adjustments) }
             if (!ok) {
                 call.respond(HttpStatusCode.BadRequest, "Invalid or insufficient stock")
                 return@post
@@ -108,7 +106,7 @@ fun Route.products(service: ProductService) {
                         HttpStatusCode.BadRequest,
                         "Missing or malformed ID",
                     )
-            service.deleteProduct(id)
+            pool.write { ProductService(it).deleteProduct(id) }
             call.respond(HttpStatusCode.NoContent)
         }
     }
@@ -7,12 +7,12 @@ import io.ktor.server.routing.Route
 import io.ktor.server.routing.get
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.Message
 import pos.ambrosia.models.OrderWithPaymentFilters
 import pos.ambrosia.services.ReportService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 import java.time.LocalDate
 
 private fun parseDateQueryParam(
@@ -35,16 +35,24 @@ private fun parseDoubleQueryParam(
     return value.toDoubleOrNull() ?: throw IllegalArgumentException("Invalid $name: $value")
 }
 
+private fun parseCountQueryParam(
+    value: String?,
+    name: String,
+): Int? {
+    if (value.isNullOrBlank()) return null
+    return value.toIntOrNull()?.takeIf { it >= 0 } ?: throw IllegalArgumentException("Invalid $name: $value")
+}
+
 fun Application.configureReports() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val reportService = ReportService(connection)
+    // Reports only read, so each request borrows a pooled read-only connection
+    val pool = DatabaseConnection.pool
     routing {
-        route("/reports") { reports(reportService) }
-        route("/orders") { orderReports(reportService) }
+        route("/reports") { reports(pool) }
+        route("/orders") { orderReports(pool) }
     }
 }
 
-fun Route.reports(reportService: ReportService) {
+fun Route.reports(pool: ConnectionPool) {
     authorizePermission("reports_read") {
         get("") {
             val period = call.request.queryParameters["period"]?.takeIf { it.isNotBlank() }
@@ -54,7 +62,12 @@ fun Route.reports(reportService: ReportService) {
 
             val startDate: String?
             val endDate: String?
+            val limit: Int?
+            val offset: Int
             try {
+                // limit pages the line items; limit=0 returns only the totals
+                limit = parseCountQueryParam(call.request.queryParameters["limit"], "limit")
+                offset = parseCountQueryParam(call.request.queryParameters["offset"], "offset") ?: 0
                 startDate = parseDateQueryParam(call.request.queryParameters["startDate"], "startDate")
                 endDate = parseDateQueryParam(call.request.queryParameters["endDate"], "endDate")
                 if (startDate != null && endDate == null) {
@@ -73,14 +86,18 @@ fun Route.reports(reportService: ReportService) {
 
             val productSalesReport =
                 try {
-                    reportService.getProductSalesReport(
-                        period = period,
-                        startDate = startDate,
-                        endDate = endDate,
-                        productName = productName,
-                        userId = userId,
-                        paymentMethod = paymentMethod,
-                    )
+                    pool.read {
+                        ReportService(it).getProductSalesReport(
+                            period = period,
+                            startDate = startDate,
+                            endDate = endDate,
+                            productName = productName,
+                            userId = userId,
+                            paymentMethod = paymentMethod,
+                            limit = limit,
+                            offset = offset,
+                        )
+                    }
                 } catch (exception: IllegalArgumentException) {
                     call.respond(HttpStatusCode.BadRequest, Message(exception.message ?: "Invalid query parameters"))
                     return@get
@@ -91,7 +108,7 @@ fun Route.reports(reportService: ReportService) {
     }
 }
 
-fun Route.orderReports(reportService: ReportService) {
+fun Route.orderReports(pool: ConnectionPool) {
     authorizePermission("orders_read") {
         get("/with-payments") {
             val filters =
@@ -118,7 +135,7 @@ fun Route.orderReports(reportService: ReportService) {
 
             val orders =
                 try {
-                    reportService.getOrdersWithPaymentsFiltered(filters)
+                    pool.read { ReportService(it).getOrdersWithPaymentsFiltered(filters) }
                 } catch (error: IllegalArgumentException) {
                     call.respond(HttpStatusCode.BadRequest, Message(error.message ?: "Invalid query parameters"))
                     return@get
@@ -138,7 +155,7 @@ fun Route.orderReports(reportService: ReportService) {
                 return@get
             }
 
-            val totalSales = reportService.getTotalSalesByDate(date)
+            val totalSales = pool.read { ReportService(it).getTotalSalesByDate(date) }
             call.respond(HttpStatusCode.OK, mapOf("date" to date, "total_sales" to totalSales.toString()))
         }
     }
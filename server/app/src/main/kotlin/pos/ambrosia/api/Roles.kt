@@ -2,6 +2,7 @@ package pos.ambrosia.api
 
 import io.ktor.http.HttpStatusCode
 import io.ktor.server.application.Application
+import io.ktor.server.application.ApplicationEnvironment
 import io.ktor.server.request.receive
 import io.ktor.server.response.respond
 import io.ktor.server.routing.Route
@@ -11,6 +12,7 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Role
@@ -19,18 +21,14 @@ import pos.ambrosia.models.RolePermissionsUpdateResult
 import pos.ambrosia.services.PermissionsService
 import pos.ambrosia.services.RolesService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureRoles() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val roleService = RolesService(environment, connection)
-    val permissionsService = PermissionsService(environment, connection)
-    routing { route("/roles") { roles(roleService, permissionsService) } }
+    routing { route("/roles") { roles(environment, DatabaseConnection.pool) } }
 }
 
 fun Route.roles(
-    roleService: RolesService,
-    permissionsService: PermissionsService,
+    env: ApplicationEnvironment,
+    pool: ConnectionPool,
 ) {
     authorizePermission("roles_read") {
         get("/{id}") {
@@ -40,7 +38,7 @@ fun Route.roles(
                 return@get
             }
 
-            val role = roleService.getRoleById(id)
+            val role = pool.read { RolesService(env, it).getRoleById(id) }
             if (role == null) {
                 call.respond(HttpStatusCode.NotFound, "Role not found")
                 return@get
@@ -49,7 +47,7 @@ fun Route.roles(
             call.respond(HttpStatusCode.OK, role)
         }
         get("") {
-            val roles = roleService.getRoles()
+            val roles = pool.read { RolesService(env, it).getRoles() }
             if (roles.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No roles found")
                 return@get
@@ -62,7 +60,7 @@ fun Route.roles(
                 call.respond(HttpStatusCode.BadRequest, "Missing or malformed ID")
                 return@get
             }
-            val perms = permissionsService.getByRole(id)
+            val perms = pool.read { PermissionsService(env, it).getByRole(id) }
             if (perms == null) {
                 call.respond(HttpStatusCode.NotFound, "Role not found")
                 return@get
@@ -77,7 +75,7 @@ fun Route.roles(
     authorizePermission("roles_create") {
         post("") {
             val user = call.receive<Role>()
-            val id = roleService.addRole(user)
+            val id = pool.write { RolesService(env, it).addRole(user) }
             if (id == null) {
                 call.respond(HttpStatusCode.BadRequest, "Invalid role data")
                 return@post
@@ -101,7 +99,7 @@ fun Route.roles(
                 call.respond(HttpStatusCode.BadRequest, "Invalid role data")
                 return@put
             }
-            val isUpdated = roleService.updateRole(id, updatedRole)
+            val isUpdated = pool.write { RolesService(env, it).updateRole(id, updatedRole) }
 
             if (!isUpdated) {
                 call.respond(HttpStatusCode.NotFound, "Role with ID: $id not found")
@@ -117,13 +115,13 @@ fun Route.roles(
                 return@put
             }
 
-            if (!permissionsService.roleExists(id)) {
+            if (!pool.read { PermissionsService(env, it).roleExists(id) }) {
                 call.respond(HttpStatusCode.NotFound, "Role with ID: $id not found")
                 return@put
             }
 
             val payload = call.receive<RolePermissionsUpdateRequest>()
-            val count = permissionsService.replaceRolePermissions(id, payload.permissions.distinct())
+            val count = pool.write { PermissionsService(env, it).replaceRolePermissions(id, payload.permissions.distinct()) }
             call.respond(HttpStatusCode.OK, RolePermissionsUpdateResult(roleId = id, assigned = count))
         }
     }
@@ -135,7 +133,7 @@ fun Route.roles(
                 return@delete
             }
 
-            val isDeleted = roleService.deleteRole(id)
+            val isDeleted = pool.write { RolesService(env, it).deleteRole(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.NotFound, "Role with ID: $id not found")
                 return@delete
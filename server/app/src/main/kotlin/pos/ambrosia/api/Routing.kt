@@ -7,18 +7,16 @@ import io.ktor.server.routing.get
 import io.ktor.server.routing.routing
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.services.BaseCurrencyService
-import java.sql.Connection
 
 fun Application.configureRouting() {
-    val connection: Connection = DatabaseConnection.getConnection()
+    val pool = DatabaseConnection.pool
     routing {
         get("/") {
             // TODO: Add link to the documentation
             call.respondText("Root path of the API Nothing to see here")
         }
         get("/base-currency") {
-            val baseCurrencyService = BaseCurrencyService(connection)
-            val baseCurrency = baseCurrencyService.getBaseCurrency()
+            val baseCurrency = pool.read { BaseCurrencyService(it).getBaseCurrency() }
             if (baseCurrency == null) {
                 call.respond(mapOf("currency_id" to null))
             } else {
@@ -11,24 +11,22 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.CloseShiftRequest
 import pos.ambrosia.models.Shift
 import pos.ambrosia.services.ShiftService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureShifts() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val shiftService = ShiftService(connection)
-    routing { route("/shifts") { shifts(shiftService) } }
+    routing { route("/shifts") { shifts(DatabaseConnection.pool) } }
 }
 
-fun Route.shifts(shiftService: ShiftService) {
+fun Route.shifts(pool: ConnectionPool) {
     authorizePermission("shifts_read") {
         get("") {
-            val shifts = shiftService.getShifts()
+            val shifts = pool.read { ShiftService(it).getShifts() }
             if (shifts.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No shifts found")
                 return@get
@@ -38,7 +36,7 @@ fun Route.shifts(shiftService: ShiftService) {
 
         get("/open") {
             val userId = call.request.queryParameters["user_id"]
-            val openShift = shiftService.getOpenShift(userId)
+            val openShift = pool.read { ShiftService(it).getOpenShift(userId) }
             if (openShift == null) {
                 call.respond(HttpStatusCode.NoContent)
                 return@get
@@ -53,7 +51,7 @@ fun Route.shifts(shiftService: ShiftService) {
                 return@get
             }
 
-            val shift = shiftService.getShiftById(id)
+            val shift = pool.read { ShiftService(it).getShiftById(id) }
             if (shift == null) {
                 call.respond(HttpStatusCode.NotFound, "Shift not found")
                 return@get
@@ -64,14 +62,14 @@ fun Route.shifts(shiftService: ShiftService) {
     }
     authorizePermission("shifts_create") {
         post("") {
-            val open = shiftService.getOpenShift(null)
+            val open = pool.read { ShiftService(it).getOpenShift(null) }
             if (open != null) {
                 call.respond(HttpStatusCode.Conflict, "There is already an open shift")
                 return@post
             }
 
             val shift = call.receive<Shift>()
-            val createdShift = shiftService.addShift(shift)
+            val createdShift = pool.write { ShiftService(it).addShift(shift) }
             if (createdShift == null) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to add shift")
                 return@post
@@ -90,7 +88,7 @@ fun Route.shifts(shiftService: ShiftService) {
                 }
 
                 val updatedShift = call.receive<Shift>()
-                val isUpdated = shiftService.updateShift(updatedShift.copy(id = id))
+                val isUpdated = pool.write { ShiftService(it).updateShift(updatedShift.copy(id = id)) }
                 logger.info(isUpdated.toString())
 
                 if (!isUpdated) {
@@ -115,7 +113,7 @@ fun Route.shifts(shiftService: ShiftService) {
                 } catch (_: Exception) {
                     CloseShiftRequest()
                 }
-            val closed = shiftService.closeShift(id, request.finalAmount, request.difference)
+            val closed = pool.write { ShiftService(it).closeShift(id, request.finalAmount, request.difference) }
             if (!closed) {
                 call.respond(HttpStatusCode.NotFound, "Shift not found or already closed")
                 return@post
@@ -131,7 +129,7 @@ fun Route.shifts(shiftService: ShiftService) {
                 return@delete
             }
 
-            val isDeleted = shiftService.deleteShift(id)
+            val isDeleted = pool.write { ShiftService(it).deleteShift(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.NotFound, "Shift not found")
                 return@delete
@@ -11,23 +11,21 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Space
 import pos.ambrosia.services.SpaceService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureSpaces() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val spaceService = SpaceService(connection)
-    routing { route("/spaces") { spaces(spaceService) } }
+    routing { route("/spaces") { spaces(DatabaseConnection.pool) } }
 }
 
-fun Route.spaces(spaceService: SpaceService) {
+fun Route.spaces(pool: ConnectionPool) {
     authorizePermission("spaces_read") {
         get("") {
-            val spaces = spaceService.getSpaces()
+            val spaces = pool.read { SpaceService(it).getSpaces() }
             if (spaces.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No spaces found")
                 return@get
@@ -41,7 +39,7 @@ fun Route.spaces(spaceService: SpaceService) {
                 return@get
             }
 
-            val space = spaceService.getSpaceById(id)
+            val space = pool.read { SpaceService(it).getSpaceById(id) }
             if (space == null) {
                 call.respond(HttpStatusCode.NotFound, "Space not found")
                 return@get
@@ -53,7 +51,7 @@ fun Route.spaces(spaceService: SpaceService) {
     authorizePermission("spaces_create") {
         post("") {
             val space = call.receive<Space>()
-            val createdId = spaceService.addSpace(space)
+            val createdId = pool.write { SpaceService(it).addSpace(space) }
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("id" to createdId, "message" to "Space added successfully"),
@@ -69,7 +67,7 @@ fun Route.spaces(spaceService: SpaceService) {
             }
 
             val updatedSpace = call.receive<Space>()
-            val isUpdated = spaceService.updateSpace(updatedSpace.copy(id = id))
+            val isUpdated = pool.write { SpaceService(it).updateSpace(updatedSpace.copy(id = id)) }
             logger.info(isUpdated.toString())
 
             if (!isUpdated) {
@@ -89,7 +87,7 @@ fun Route.spaces(spaceService: SpaceService) {
                 return@delete
             }
 
-            val isDeleted = spaceService.deleteSpace(id)
+            val isDeleted = pool.write { SpaceService(it).deleteSpace(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.BadRequest, "Space not found")
                 return@delete
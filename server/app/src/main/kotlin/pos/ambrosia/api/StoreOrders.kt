@@ -8,23 +8,21 @@ import io.ktor.server.routing.delete
 import io.ktor.server.routing.get
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.Message
 import pos.ambrosia.services.CheckoutService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureStoreOrders() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val checkoutService = CheckoutService(connection)
-    routing { route("/store/orders") { storeOrders(checkoutService) } }
+    routing { route("/store/orders") { storeOrders(DatabaseConnection.pool) } }
 }
 
-fun Route.storeOrders(checkoutService: CheckoutService) {
+fun Route.storeOrders(pool: ConnectionPool) {
     authorizePermission("orders_read") {
         get("") {
             val orderStatus = call.request.queryParameters["status"]
-            val orders = checkoutService.getStoreOrders(orderStatus)
+            val orders = pool.read { CheckoutService(it).getStoreOrders(orderStatus) }
             call.respond(HttpStatusCode.OK, orders)
         }
         get("/{id}") {
@@ -32,7 +30,7 @@ fun Route.storeOrders(checkoutService: CheckoutService) {
                 call.parameters["id"]
                     ?: return@get call.respond(HttpStatusCode.BadRequest, Message("Missing order ID"))
             val order =
-                checkoutService.getStoreOrderById(id)
+                pool.read { CheckoutService(it).getStoreOrderById(id) }
                     ?: return@get call.respond(HttpStatusCode.NotFound, Message("Order not found"))
             call.respond(HttpStatusCode.OK, order)
         }
@@ -42,7 +40,7 @@ fun Route.storeOrders(checkoutService: CheckoutService) {
             val id =
                 call.parameters["id"]
                     ?: return@delete call.respond(HttpStatusCode.BadRequest, Message("Missing order ID"))
-            val cancelled = checkoutService.cancelStoreOrder(id)
+            val cancelled = pool.write { CheckoutService(it).cancelStoreOrder(id) }
             if (!cancelled) {
                 return@delete call.respond(
                     HttpStatusCode.NotFound,
@@ -11,23 +11,21 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Supplier
 import pos.ambrosia.services.SupplierService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureSuppliers() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val supplierService = SupplierService(connection)
-    routing { route("/suppliers") { suppliers(supplierService) } }
+    routing { route("/suppliers") { suppliers(DatabaseConnection.pool) } }
 }
 
-fun Route.suppliers(supplierService: SupplierService) {
+fun Route.suppliers(pool: ConnectionPool) {
     authorizePermission("suppliers_read") {
         get("") {
-            val suppliers = supplierService.getSuppliers()
+            val suppliers = pool.read { SupplierService(it).getSuppliers() }
             if (suppliers.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No suppliers found")
                 return@get
@@ -41,7 +39,7 @@ fun Route.suppliers(supplierService: SupplierService) {
                 return@get
             }
 
-            val supplier = supplierService.getSupplierById(id)
+            val supplier = pool.read { SupplierService(it).getSupplierById(id) }
             if (supplier == null) {
                 call.respond(HttpStatusCode.NotFound, "Supplier not found")
                 return@get
@@ -53,7 +51,7 @@ fun Route.suppliers(supplierService: SupplierService) {
     authorizePermission("suppliers_create") {
         post("") {
             val supplier = call.receive<Supplier>()
-            val createdId = supplierService.addSupplier(supplier)
+            val createdId = pool.write { SupplierService(it).addSupplier(supplier) }
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("id" to createdId, "message" to "Supplier added successfully"),
@@ -69,7 +67,7 @@ fun Route.suppliers(supplierService: SupplierService) {
             }
 
             val updatedSupplier = call.receive<Supplier>()
-            val isUpdated = supplierService.updateSupplier(updatedSupplier.copy(id = id))
+            val isUpdated = pool.write { SupplierService(it).updateSupplier(updatedSupplier.copy(id = id)) }
             logger.info(isUpdated.toString())
 
             if (!isUpdated) {
@@ -91,7 +89,7 @@ fun Route.suppliers(supplierService: SupplierService) {
                 return@delete
             }
 
-            val isDeleted = supplierService.deleteSupplier(id)
+            val isDeleted = pool.write { SupplierService(it).deleteSupplier(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.NotFound, "Supplier not found")
                 return@delete
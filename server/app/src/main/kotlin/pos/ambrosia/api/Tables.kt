@@ -11,23 +11,21 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Table
 import pos.ambrosia.services.TableService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureTables() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val tableService = TableService(connection)
-    routing { route("/tables") { tables(tableService) } }
+    routing { route("/tables") { tables(DatabaseConnection.pool) } }
 }
 
-fun Route.tables(tableService: TableService) {
+fun Route.tables(pool: ConnectionPool) {
     authorizePermission("tables_read") {
         get("") {
-            val tables = tableService.getTables()
+            val tables = pool.read { TableService(it).getTables() }
             if (tables.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No tables found")
                 return@get
@@ -41,7 +39,7 @@ fun Route.tables(tableService: TableService) {
                 return@get
             }
 
-            val tables = tableService.getTablesBySpace(spaceId = id)
+            val tables = pool.read { TableService(it).getTablesBySpace(spaceId = id) }
             if (tables == null) {
                 call.respond(HttpStatusCode.NotFound, "Space not found")
                 return@get
@@ -59,7 +57,7 @@ fun Route.tables(tableService: TableService) {
                 return@get
             }
 
-            val table = tableService.getTableById(id)
+            val table = pool.read { TableService(it).getTableById(id) }
             if (table == null) {
                 call.respond(HttpStatusCode.NotFound, "Table not found")
                 return@get
@@ -71,7 +69,7 @@ fun Route.tables(tableService: TableService) {
     authorizePermission("tables_create") {
         post("") {
             val table = call.receive<Table>()
-            val createdId = tableService.addTable(table)
+            val createdId = pool.write { TableService(it).addTable(table) }
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("id" to createdId, "message" to "Table added successfully"),
@@ -87,7 +85,7 @@ fun Route.tables(tableService: TableService) {
             }
 
             val updatedTable = call.receive<Table>()
-            val isUpdated = tableService.updateTable(updatedTable.copy(id = id))
+            val isUpdated = pool.write { TableService(it).updateTable(updatedTable.copy(id = id)) }
             logger.info(isUpdated.toString())
 
             if (!isUpdated) {
@@ -106,7 +104,7 @@ fun Route.tables(tableService: TableService) {
                 return@delete
             }
 
-            val isDeleted = tableService.deleteTable(id)
+            val isDeleted = pool.write { TableService(it).deleteTable(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.NotFound, "Table not found")
                 return@delete
@@ -12,22 +12,21 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.TicketTemplate
 import pos.ambrosia.models.TicketTemplateRequest
 import pos.ambrosia.services.TicketTemplateService
 
 fun Application.configureTicketTemplates() {
-    val connection = DatabaseConnection.getConnection()
-    val ticketTemplateService = TicketTemplateService(connection)
-    routing { route("/templates") { templatesAPI(ticketTemplateService) } }
+    routing { route("/templates") { templatesAPI(DatabaseConnection.pool) } }
 }
 
-fun Route.templatesAPI(ticketTemplateService: TicketTemplateService) {
+fun Route.templatesAPI(pool: ConnectionPool) {
     authenticate("auth-jwt") {
         post {
             val templateRequest = call.receive<TicketTemplateRequest>()
-            val templateId = ticketTemplateService.addTemplate(templateRequest)
+            val templateId = pool.write { TicketTemplateService(it).addTemplate(templateRequest) }
             if (templateId != null) {
                 call.respond(HttpStatusCode.Created, mapOf("id" to templateId))
             } else {
@@ -36,13 +35,13 @@ fun Route.templatesAPI(ticketTemplateService: TicketTemplateService) {
         }
 
         get {
-            val templates = ticketTemplateService.getTemplates()
+            val templates = pool.read { TicketTemplateService(it).getTemplates() }
             call.respond(templates)
         }
 
         get("/{id}") {
             val id = call.parameters["id"] ?: return@get call.respond(HttpStatusCode.BadRequest)
-            val template = ticketTemplateService.getTemplateById(id)
+            val template = pool.read { TicketTemplateService(it).getTemplateById(id) }
             if (template != null) {
                 call.respond(template)
             } else {
@@ -53,7 +52,7 @@ fun Route.templatesAPI(ticketTemplateService: TicketTemplateService) {
         put("/{id}") {
             val id = call.parameters["id"] ?: return@put call.respond(HttpStatusCode.BadRequest)
             val templateRequest = call.receive<TicketTemplateRequest>()
-            val success = ticketTemplateService.updateTemplate(id, templateRequest)
+            val success = pool.write { TicketTemplateService(it).updateTemplate(id, templateRequest) }
             if (success) {
                 call.respond(HttpStatusCode.OK)
             } else {
@@ -67,7 +66,7 @@ fun Route.templatesAPI(ticketTemplateService: TicketTemplateService) {
 
         delete("/{id}") {
             val id = call.parameters["id"] ?: return@delete call.respond(HttpStatusCode.BadRequest)
-            val success = ticketTemplateService.deleteTemplate(id)
+            val success = pool.write { TicketTemplateService(it).deleteTemplate(id) }
             if (success) {
                 call.respond(HttpStatusCode.NoContent)
             } else {
@@ -11,23 +11,21 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.Ticket
 import pos.ambrosia.services.TicketService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureTickets() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val ticketService = TicketService(connection)
-    routing { route("/tickets") { tickets(ticketService) } }
+    routing { route("/tickets") { tickets(DatabaseConnection.pool) } }
 }
 
-fun Route.tickets(ticketService: TicketService) {
+fun Route.tickets(pool: ConnectionPool) {
     authorizePermission("tickets_read") {
         get("") {
-            val tickets = ticketService.getTickets()
+            val tickets = pool.read { TicketService(it).getTickets() }
             if (tickets.isEmpty()) {
                 call.respond(HttpStatusCode.OK, "No tickets found")
                 return@get
@@ -41,7 +39,7 @@ fun Route.tickets(ticketService: TicketService) {
                 return@get
             }
 
-            val ticket = ticketService.getTicketById(id)
+            val ticket = pool.read { TicketService(it).getTicketById(id) }
             if (ticket == null) {
                 call.respond(HttpStatusCode.NotFound, "Ticket not found")
                 return@get
@@ -53,7 +51,7 @@ fun Route.tickets(ticketService: TicketService) {
     authorizePermission("tickets_create") {
         post("") {
             val ticket = call.receive<Ticket>()
-            val generatedId = ticketService.addTicket(ticket)
+            val generatedId = pool.write { TicketService(it).addTicket(ticket) }
             call.respond(
                 HttpStatusCode.Created,
                 mapOf("id" to generatedId, "message" to "Ticket added successfully"),
@@ -69,7 +67,7 @@ fun Route.tickets(ticketService: TicketService) {
             }
 
             val updatedTicket = call.receive<Ticket>()
-            val isUpdated = ticketService.updateTicket(updatedTicket.copy(id = id))
+            val isUpdated = pool.write { TicketService(it).updateTicket(updatedTicket.copy(id = id)) }
             logger.info(isUpdated.toString())
 
             if (!isUpdated) {
@@ -88,7 +86,7 @@ fun Route.tickets(ticketService: TicketService) {
                 return@delete
             }
 
-            val isDeleted = ticketService.deleteTicket(id)
+            val isDeleted = pool.write { TicketService(it).deleteTicket(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.NotFound, "Ticket not found")
                 return@delete
@@ -24,14 +24,13 @@ import java.nio.file.Paths
 fun Application.configureUploads() {
     val uploadRoot: Path = Paths.get(datadir.toString(), "uploads")
     val uploadService = UploadService(uploadRoot)
-    val connection = DatabaseConnection.getConnection()
-    val configService = ConfigService(connection)
+    val pool = DatabaseConnection.pool
 
     routing {
         staticFiles("/uploads", uploadRoot.toFile())
         authenticate("auth-jwt", optional = true) {
             post("/uploads") {
-                val configExists = configService.getConfig() != null
+                val configExists = pool.read { ConfigService(it).getConfig() } != null
                 if (configExists && call.principal<JWTPrincipal>() == null) {
                     call.respond(HttpStatusCode.Unauthorized, mapOf("message" to "Unauthorized"))
                     return@post
@@ -2,6 +2,7 @@ package pos.ambrosia.api
 
 import io.ktor.http.HttpStatusCode
 import io.ktor.server.application.Application
+import io.ktor.server.application.ApplicationEnvironment
 import io.ktor.server.auth.authenticate
 import io.ktor.server.request.receive
 import io.ktor.server.response.respond
@@ -12,6 +13,7 @@ import io.ktor.server.routing.post
 import io.ktor.server.routing.put
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.models.UpdateUserRequest
@@ -22,23 +24,17 @@ import pos.ambrosia.services.PermissionsService
 import pos.ambrosia.services.TokenService
 import pos.ambrosia.services.UsersService
 import pos.ambrosia.utils.authorizePermission
-import java.sql.Connection
 
 fun Application.configureUsers() {
-    val connection: Connection = DatabaseConnection.getConnection()
-    val userService = UsersService(environment, connection)
-    val tokenService = TokenService(environment, connection)
-    val permissionsService = PermissionsService(environment, connection)
-    routing { route("/users") { users(userService, tokenService, permissionsService) } }
+    routing { route("/users") { users(environment, DatabaseConnection.pool) } }
 }
 
 fun Route.users(
-    userService: UsersService,
-    tokenService: TokenService,
-    permissionsService: PermissionsService,
+    env: ApplicationEnvironment,
+    pool: ConnectionPool,
 ) {
     get("") {
-        val users = userService.getUsers()
+        val users = pool.read { UsersService(env, it).getUsers() }
         if (users.isEmpty()) {
             call.respond(HttpStatusCode.OK, "No users found")
             return@get
@@ -52,7 +48,7 @@ fun Route.users(
             return@get
         }
 
-        val user = userService.getUserById(id)
+        val user = pool.read { UsersService(env, it).getUserById(id) }
         if (user == null) {
             call.respond(HttpStatusCode.NotFound, "User not found")
             return@get
@@ -72,20 +68,20 @@ fun Route.users(
                         )
                         return@get
                     }
-            val isValidRefreshToken = tokenService.validateRefreshToken(refreshToken)
+            val isValidRefreshToken = pool.read { TokenService(env, it).validateRefreshToken(refreshToken) }
             if (!isValidRefreshToken) {
                 call.respond(HttpStatusCode.Unauthorized)
                 return@get
             }
 
-            val userInfo = tokenService.getUserFromRefreshToken(refreshToken)
+            val userInfo = pool.read { TokenService(env, it).getUserFromRefreshToken(refreshToken) }
 
             if (userInfo == null) {
                 call.respond(HttpStatusCode.NotFound, "User not found")
                 return@get
             }
 
-            val perms = permissionsService.getByRole(userInfo.roleId) ?: emptyList()
+            val perms = pool.read { PermissionsService(env, it).getByRole(userInfo.roleId) } ?: emptyList()
             if (perms.isEmpty()) {
                 logger.info("The user doesn't have a permissions")
                 call.respond(HttpStatusCode.Forbidden)
@@ -117,7 +113,7 @@ fun Route.users(
                 call.respond(HttpStatusCode.BadRequest, "Failed to add user, pin must be at least 4 characters long")
                 return@post
             }
-            val result = userService.addUser(user)
+            val result = pool.write { UsersService(env, it).addUser(user) }
             if (result == null) {
                 call.respond(HttpStatusCode.BadRequest, "Failed to add user")
                 return@post
@@ -157,7 +153,7 @@ fun Route.users(
                 return@put
             }
 
-            val isUpdated = userService.updateUser(id, updatedUser)
+            val isUpdated = pool.write { UsersService(env, it).updateUser(id, updatedUser) }
             logger.info(isUpdated.toString())
 
             if (!isUpdated) {
@@ -176,7 +172,7 @@ fun Route.users(
                 return@delete
             }
 
-            val isDeleted = userService.deleteUser(id)
+            val isDeleted = pool.write { UsersService(env, it).deleteUser(id) }
             if (!isDeleted) {
                 call.respond(HttpStatusCode.NotFound, "User with ID: $id not found")
                 return@delete
@@ -4,6 +4,7 @@ import com.auth0.jwt.JWT
 import io.ktor.http.Cookie
 import io.ktor.http.HttpStatusCode
 import io.ktor.server.application.Application
+import io.ktor.server.application.ApplicationEnvironment
 import io.ktor.server.auth.authenticate
 import io.ktor.server.plugins.origin
 import io.ktor.server.request.header
@@ -14,6 +15,7 @@ import io.ktor.server.routing.get
 import io.ktor.server.routing.post
 import io.ktor.server.routing.route
 import io.ktor.server.routing.routing
+import pos.ambrosia.db.ConnectionPool
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.models.IncomingPaymentWithRate
 import pos.ambrosia.models.OutgoingPaymentWithRate
@@ -36,25 +38,16 @@ import pos.ambrosia.utils.Bolt11Decoder
 import pos.ambrosia.utils.InvalidCredentialsException
 import pos.ambrosia.utils.authenticateAdmin
 import pos.ambrosia.utils.getCurrentUser
-import java.sql.Connection
 
 fun Application.configureWallet() {
-    val connection: Connection = DatabaseConnection.getConnection()
     val phoenixService = PhoenixService(environment)
-    val authService = AuthService(environment, connection)
-    val tokenService = TokenService(environment, connection)
-    val walletRateService = WalletRateService(connection)
-    val paymentService = PaymentService(connection)
-
-    routing { route("/wallet") { wallet(phoenixService, tokenService, authService, paymentService, walletRateService) } }
+    routing { route("/wallet") { wallet(phoenixService, environment, DatabaseConnection.pool) } }
 }
 
 fun Route.wallet(
     phoenixService: PhoenixService,
-    tokenService: TokenService,
-    authService: AuthService,
-    paymentService: PaymentService,
-    walletRateService: WalletRateService,
+    env: ApplicationEnvironment,
+    pool: ConnectionPool,
 ) {
     authenticate("auth-jwt") {
         post("/invoice") {
@@ -70,9 +63,9 @@ fun Route.wallet(
                     call.request.header("X-Forwarded-Proto") == "https"
             val rolePassword = call.receive<RolePassword>()
             val userInfo = call.getCurrentUser() ?: throw InvalidCredentialsException()
-            val result = authService.authenticateByRole(userInfo.userId, rolePassword.password.toCharArray())
+            val result = pool.read { AuthService(env, it).authenticateByRole(userInfo.userId, rolePassword.password.toCharArray()) }
             if (result == true) {
-                val token = tokenService.generateWalletAccessToken(userInfo.userId)
+                val token = pool.write { TokenService(env, it).generateWalletAccessToken(userInfo.userId) }
                 val decoded = JWT.decode(token)
                 val expiresAt = decoded.expiresAt?.time ?: System.currentTimeMillis()
                 call.response.cookies.append(
@@ -91,7 +84,7 @@ fun Route.wallet(
             }
         }
         post("/logout") {
-            call.getCurrentUser()?.let { userInfo -> tokenService.revokeWalletToken(userInfo.userId) }
+            call.getCurrentUser()?.let { userInfo -> pool.write { TokenService(env, it).revokeWalletToken(userInfo.userId) } }
             call.response.cookies.append("walletAccessToken", "", maxAge = 0)
             call.respond(HttpStatusCode.OK, mapOf("status" to "ok"))
         }
@@ -101,15 +94,17 @@ fun Route.wallet(
             val request = call.receive<CreateInvoiceRequest>()
             val invoice = phoenixService.createInvoice(request)
             if (request.exchangeRate != null && request.exchangeRateCurrency != null) {
-                walletRateService.saveInvoiceRate(
-                    WalletInvoiceRate(
-                        paymentHash = invoice.paymentHash,
-                        satoshiAmount = request.amountSat,
-                        exchangeRate = request.exchangeRate,
-                        exchangeRateCurrency = request.exchangeRateCurrency,
-                        fiatAmount = request.fiatAmount,
-                    ),
-                )
+                pool.write {
+                    WalletRateService(it).saveInvoiceRate(
+                        WalletInvoiceRate(
+                            paymentHash = invoice.paymentHash,
+                            satoshiAmount = request.amountSat,
+                            exchangeRate = request.exchangeRate,
+                            exchangeRateCurrency = request.exchangeRateCurrency,
+                            fiatAmount = request.fiatAmount,
+                        ),
+                    )
+                }
             }
             call.respond(HttpStatusCode.OK, invoice)
         }
@@ -133,15 +128,17 @@ fun Route.wallet(
             val result = phoenixService.payInvoice(request)
             if (request.exchangeRate != null && request.exchangeRateCurrency != null) {
                 val fiatAmount = (result.recipientAmountSat.toDouble() / 100_000_000) * request.exchangeRate
-                walletRateService.saveInvoiceRate(
-                    WalletInvoiceRate(
-                        paymentHash = result.paymentHash,
-                        satoshiAmount = result.recipientAmountSat,
-                        exchangeRate = request.exchangeRate,
-                        exchangeRateCurrency = request.exchangeRateCurrency,
-                        fiatAmount = fiatAmount,
-                    ),
-                )
+                pool.write {
+                    WalletRateService(it).saveInvoiceRate(
+                        WalletInvoiceRate(
+                            paymentHash = result.paymentHash,
+                            satoshiAmount = result.recipientAmountSat,
+                            exchangeRate = request.exchangeRate,
+                            exchangeRateCurrency = request.exchangeRateCurrency,
+                            fiatAmount = fiatAmount,
+                        ),
+                    )
+                }
             }
             call.respond(HttpStatusCode.OK, result)
         }
@@ -194,8 +191,9 @@ fun Route.wallet(
 
                 val payments = phoenixService.listIncomingPayments(from, to, limit, offset, all, externalId)
                 val hashes = payments.map { it.paymentHash }
-                val salesPaymentRates = paymentService.getExchangeRatesByPaymentHashes(hashes)
-                val walletInvoiceRates = walletRateService.getRatesByPaymentHashes(hashes.filter { it !in salesPaymentRates })
+                val salesPaymentRates = pool.read { PaymentService(it).getExchangeRatesByPaymentHashes(hashes) }
+                val unmatchedHashes = hashes.filter { it !in salesPaymentRates }
+                val walletInvoiceRates = pool.read { WalletRateService(it).getRatesByPaymentHashes(unmatchedHashes) }
                 val bitcoinPaymentDataByHash = salesPaymentRates + walletInvoiceRates
                 val enriched =
                     payments.map { payment ->
@@ -241,8 +239,9 @@ fun Route.wallet(
 
                 val payments = phoenixService.listOutgoingPayments(from, to, limit, offset, all)
                 val hashes = payments.mapNotNull { it.paymentHash }
-                val salesPaymentRates = paymentService.getExchangeRatesByPaymentHashes(hashes)
-                val walletInvoiceRates = walletRateService.getRatesByPaymentHashes(hashes.filter { it !in salesPaymentRates })
+                val salesPaymentRates = pool.read { PaymentService(it).getExchangeRatesByPaymentHashes(hashes) }
+                val unmatchedHashes = hashes.filter { it !in salesPaymentRates }
+                val walletInvoiceRates = pool.read { WalletRateService(it).getRatesByPaymentHashes(unmatchedHashes) }
                 val bitcoinDataByHash = salesPaymentRates + walletInvoiceRates
                 val enriched =
                     payments.map { payment ->
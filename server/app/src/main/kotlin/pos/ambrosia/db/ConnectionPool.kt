@@ -0,0 +1,163 @@
+package pos.ambrosia.db
+
+import kotlinx.coroutines.sync.Mutex
+import kotlinx.coroutines.sync.Semaphore
+import kotlinx.coroutines.withContext
+import kotlinx.coroutines.withTimeoutOrNull
+import kotlinx.serialization.Serializable
+import pos.ambrosia.logger
+import pos.ambrosia.utils.DatabaseBusyException
+import java.sql.Connection
+import java.util.concurrent.ConcurrentLinkedQueue
+import java.util.concurrent.TimeUnit
+import java.util.concurrent.atomic.AtomicInteger
+import java.util.concurrent.atomic.AtomicLong
+
+@Serializable
+data class ConnectionPoolStats(
+    val readers: Int,
+    val openReaders: Int,
+    val idleReaders: Int,
+    val waiting: Int,
+    val maxWaiting: Int,
+    val readBorrows: Long,
+    val readWaitMs: Long,
+    val writeBorrows: Long,
+    val writeWaitMs: Long,
+    val timeouts: Long,
+    val rejected: Long,
+    val readDispatcher: DispatcherStats,
+    val writeDispatcher: DispatcherStats,
+)
+
+/**
+ * A small set of read-only connections plus one writer.
+ *
+ * SQLite allows a single writer, so writes are serialized on [writer]; reads borrow one of up to
+ * [readers] read-only connections for the duration of an operation, so they do not queue behind
+ * writes inside the driver. Borrowers suspend while waiting; at most [maxWaiting] may wait at
+ * once and none longer than [acquireTimeoutMs], otherwise [DatabaseBusyException] is thrown.
+ *
+ * The blocks run on [DbDispatcher]s rather than on the caller's thread: one thread per reader
+ * and a single thread for the writer, so blocking JDBC calls never occupy Ktor's request threads.
+ */
+class ConnectionPool(
+    private val readers: Int = DEFAULT_READERS,
+    private val maxWaiting: Int = DEFAULT_MAX_WAITING,
+    private val acquireTimeoutMs: Long = DEFAULT_ACQUIRE_TIMEOUT_MS,
+    private val open: (readOnly: Boolean) -> Connection,
+) {
+    companion object {
+        const val DEFAULT_READERS = 4
+        const val DEFAULT_MAX_WAITING = 64
+        const val DEFAULT_ACQUIRE_TIMEOUT_MS = 5_000L
+    }
+
+    private val writerConnection = lazy { open(false) }
+
+    // Only ever used inside [write], under the write lock and on the write dispatcher
+    private val writer: Connection by writerConnection
+
+    private val readDispatcher = DbDispatcher("db-read", readers)
+    private val writeDispatcher = DbDispatcher("db-write", 1)
+
+    private val writeLock = Mutex()
+    private val readPermits = Semaphore(readers)
+    private val idle = ConcurrentLinkedQueue<Connection>()
+    private val openReaders = AtomicInteger()
+    private val waiting = AtomicInteger()
+    private val readBorrows = AtomicLong()
+    private val readWaitNanos = AtomicLong()
+    private val writeBorrows = AtomicLong()
+    private val writeWaitNanos = AtomicLong()
+    private val timeouts = AtomicLong()
+    private val rejected = AtomicLong()
+
+    /** Opens the writer now instead of on the first [write], e.g. so it sets the journal mode before any reader opens. */
+    fun openWriter() {
+        writer
+    }
+
+    /** Runs [block] with a read-only connection borrowed for its duration. */
+    suspend fun <T> read(block: suspend (Connection) -> T): T {
+        acquire("read", readWaitNanos, { readPermits.tryAcquire() }) { readPermits.acquire() }
+        readBorrows.incrementAndGet()
+        try {
+            return withContext(readDispatcher.dispatcher) {
+                val connection = idle.poll() ?: open(true).also { openReaders.incrementAndGet() }
+                try {
+                    block(connection)
+                } finally {
+                    idle.offer(connection)
+                }
+            }
+        } finally {
+            readPermits.release()
+        }
+    }
+
+    /** Runs [block] with the writer connection, excluding other [write] callers. */
+    suspend fun <T> write(block: suspend (Connection) -> T): T {
+        acquire("write", writeWaitNanos, { writeLock.tryLock() }) { writeLock.lock() }
+        writeBorrows.incrementAndGet()
+        try {
+            return withContext(writeDispatcher.dispatcher) { block(writer) }
+        } finally {
+            writeLock.unlock()
+        }
+    }
+
+    private suspend fun acquire(
+        kind: String,
+        waitNanos: AtomicLong,
+        tryAcquire: () -> Boolean,
+        acquire: suspend () -> Unit,
+    ) {
+        if (tryAcquire()) return
+        if (waiting.incrementAndGet() > maxWaiting) {
+            waiting.decrementAndGet()
+            rejected.incrementAndGet()
+            throw DatabaseBusyException("Too many queued database ${kind}s")
+        }
+        val started = System.nanoTime()
+        try {
+            withTimeoutOrNull(acquireTimeoutMs) { acquire() }
+                ?: run {
+                    timeouts.incrementAndGet()
+                    logger.warn("Timed out after ${acquireTimeoutMs}ms waiting for a database $kind connection")
+                    throw DatabaseBusyException("Timed out waiting for a database $kind connection")
+                }
+        } finally {
+            waiting.decrementAndGet()
+            waitNanos.addAndGet(System.nanoTime() - started)
+        }
+    }
+
+    fun stats(): ConnectionPoolStats =
+        ConnectionPoolStats(
+            readers = readers,
+            openReaders = openReaders.get(),
+            idleReaders = idle.size,
+            waiting = waiting.get(),
+            maxWaiting = maxWaiting,
+            readBorrows = readBorrows.get(),
+            readWaitMs = TimeUnit.NANOSECONDS.toMillis(readWaitNanos.get()),
+            writeBorrows = writeBorrows.get(),
+            writeWaitMs = TimeUnit.NANOSECONDS.toMillis(writeWaitNanos.get()),
+            timeouts = timeouts.get(),
+            rejected = rejected.get(),
+            readDispatcher = readDispatcher.stats(),
+            writeDispatcher = writeDispatcher.stats(),
+        )
+
+    fun close() {
+        readDispatcher.close()
+        writeDispatcher.close()
+        while (true) {
+            val connection = idle.poll() ?: break
+            if (!connection.isClosed) connection.close()
+            openReaders.decrementAndGet()
+        }
+        if (writerConnection.isInitialized() && !writer.isClosed) writer.close()
+    }
+}
@@ -1,36 +1,85 @@
 package pos.ambrosia.db
 
 import kotlinx.io.files.Path
+import kotlinx.serialization.Serializable
 import pos.ambrosia.datadir
 import pos.ambrosia.logger
+import java.io.File
 import java.sql.Connection
 import java.sql.DriverManager
 import java.sql.SQLException
 
+@Serializable
+data class DatabaseStats(
+    val pool: ConnectionPoolStats,
+    val checkpoint: CheckpointStats? = null,
+    val statements: StatementCacheStats? = null,
+)
+
 object DatabaseConnection {
-    @Volatile private var instance: Connection? = null
+    private val profile = StorageProfile.DEFAULT
+
+    // A truncate checkpoint waits at most this long for readers, so writers are never held up longer
+    private const val CHECKPOINT_BUSY_TIMEOUT_MS = 1_000
+
+    @Volatile private var instance: ConnectionPool? = null
+
+    @Volatile private var checkpointer: WalCheckpointer? = null
+
+    private val statementMetrics = StatementCacheMetrics()
+
+    val pool: ConnectionPool
+        get() = instance ?: synchronized(this) { instance ?: createPool().also { instance = it } }
 
-    fun getConnection(): Connection = instance ?: synchronized(this) { instance ?: createConnection().also { instance = it } }
+    fun stats(): DatabaseStats =
+        DatabaseStats(
+            pool = pool.stats(),
+            checkpoint = checkpointer?.stats(),
+            statements = statementMetrics.stats(),
+        )
 
-    private fun createConnection(): Connection {
-        // load the SQLite datapath from the config file
-        val dbPath = Path(datadir, "ambrosia.db").toString()
-        return try {
-            DriverManager.getConnection("jdbc:sqlite:$dbPath")
+    // load the SQLite datapath from the config file
+    private fun databasePath(): String = Path(datadir, "ambrosia.db").toString()
+
+    private fun createPool(): ConnectionPool {
+        val pool =
+            ConnectionPool(
+                open = { readOnly -> CachingConnection(createConnection(readOnly, profile), metrics = statementMetrics) },
+            )
+        // The writer switches the database to the profile's journal mode before any reader opens
+        pool.openWriter()
+        if (profile.journalMode.equals("WAL", ignoreCase = true)) {
+            val wal = File("${databasePath()}-wal")
+            checkpointer =
+                WalCheckpointer(
+                    open = { createConnection(false, profile.copy(busyTimeoutMs = CHECKPOINT_BUSY_TIMEOUT_MS)) },
+                    walBytes = { wal.length() },
+                ).also { it.start() }
+        }
+        return pool
+    }
+
+    private fun createConnection(
+        readOnly: Boolean,
+        profile: StorageProfile,
+    ): Connection =
+        try {
+            DriverManager.getConnection("jdbc:sqlite:${databasePath()}", profile.config(readOnly).toProperties()).also {
+                profile.apply(it, readOnly)
+            }
         } catch (e: SQLException) {
             logger.error("Error connecting to SQLite database: ${e.message}")
             logger.error("Shutting down the application use ./install.sh to install the application")
             System.exit(1) // Exit the program with a non-zero status
             throw IllegalStateException("This code should not be reached") // To satisfy the compiler
         }
-    }
 
     fun closeConnection() {
         synchronized(this) {
+            checkpointer?.stop()
+            checkpointer = null
             instance?.let {
-                if (!it.isClosed) {
-                    it.close()
-                }
+                it.close()
                 instance = null
             }
         }
@@ -0,0 +1,80 @@
+package pos.ambrosia.db
+
+import kotlinx.coroutines.CoroutineDispatcher
+import kotlinx.coroutines.asCoroutineDispatcher
+import kotlinx.serialization.Serializable
+import java.util.concurrent.Executor
+import java.util.concurrent.LinkedBlockingQueue
+import java.util.concurrent.ThreadPoolExecutor
+import java.util.concurrent.TimeUnit
+import java.util.concurrent.atomic.AtomicInteger
+import java.util.concurrent.atomic.AtomicLong
+
+@Serializable
+data class DispatcherStats(
+    val threads: Int,
+    val active: Int,
+    val queued: Int,
+    val maxQueued: Int,
+    val tasks: Long,
+    val waitMs: Long,
+    val maxWaitMs: Long,
+)
+
+/**
+ * A fixed set of threads for blocking JDBC calls.
+ *
+ * JDBC blocks the calling thread, so running it on Ktor's request threads lets one slow report
+ * hold up unrelated requests. [dispatcher] runs coroutines on [threads] daemon threads of their
+ * own instead, and records how many tasks wait for a thread and for how long.
+ *
+ * The task queue is not bounded here. Blocks only reach it through [ConnectionPool], which lets at
+ * most one block per thread in at a time and at most `maxWaiting` callers wait for that, so those
+ * limits bound the queue; rejecting a dispatch instead would fail a coroutine at an arbitrary
+ * suspension point.
+ */
+class DbDispatcher(
+    name: String,
+    private val threads: Int,
+) {
+    private val threadCount = AtomicInteger()
+    private val executor =
+        ThreadPoolExecutor(threads, threads, 0L, TimeUnit.MILLISECONDS, LinkedBlockingQueue()) { task ->
+            Thread(task, "$name-${threadCount.incrementAndGet()}").apply { isDaemon = true }
+        }
+
+    private val maxQueued = AtomicInteger()
+    private val tasks = AtomicLong()
+    private val waitNanos = AtomicLong()
+    private val maxWaitNanos = AtomicLong()
+
+    val dispatcher: CoroutineDispatcher =
+        Executor { task ->
+            val queued = System.nanoTime()
+            // Sampled before the task is handed over, so a thread cannot take it off the queue first
+            val depth = executor.queue.size + if (executor.activeCount >= threads) 1 else 0
+            maxQueued.accumulateAndGet(depth) { a, b -> maxOf(a, b) }
+            executor.execute {
+                val waited = System.nanoTime() - queued
+                tasks.incrementAndGet()
+                waitNanos.addAndGet(waited)
+                maxWaitNanos.accumulateAndGet(waited) { a, b -> maxOf(a, b) }
+                task.run()
+            }
+        }.asCoroutineDispatcher()
+
+    fun stats(): DispatcherStats =
+        DispatcherStats(
+            threads = threads,
+            active = executor.activeCount,
+            queued = executor.queue.size,
+            maxQueued = maxQueued.get(),
+            tasks = tasks.get(),
+            waitMs = TimeUnit.NANOSECONDS.toMillis(waitNanos.get()),
+            maxWaitMs = TimeUnit.NANOSECONDS.toMillis(maxWaitNanos.get()),
+        )
+
+    fun close() {
+        executor.shutdown()
+    }
+}
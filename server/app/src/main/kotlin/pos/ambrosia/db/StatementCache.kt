@@ -0,0 +1,177 @@
+package pos.ambrosia.db
+
+import kotlinx.serialization.Serializable
+import java.lang.ref.Cleaner
+import java.sql.Connection
+import java.sql.PreparedStatement
+import java.sql.ResultSet
+import java.sql.SQLException
+import java.util.concurrent.atomic.AtomicBoolean
+import java.util.concurrent.atomic.AtomicInteger
+import java.util.concurrent.atomic.AtomicLong
+
+@Serializable
+data class StatementCacheStats(
+    val hits: Long,
+    val misses: Long,
+    val evictions: Long,
+    val reclaimed: Long,
+    val cached: Int,
+)
+
+/** Counters shared by the statement caches of every pooled connection. */
+class StatementCacheMetrics {
+    internal val hits = AtomicLong()
+    internal val misses = AtomicLong()
+    internal val evictions = AtomicLong()
+    internal val reclaimed = AtomicLong()
+    internal val cached = AtomicInteger()
+
+    fun stats(): StatementCacheStats =
+        StatementCacheStats(
+            hits = hits.get(),
+            misses = misses.get(),
+            evictions = evictions.get(),
+            reclaimed = reclaimed.get(),
+            cached = cached.get(),
+        )
+}
+
+/**
+ * Prepared statements of one connection, keyed by SQL text.
+ *
+ * [prepare] hands out an idle statement for the SQL if there is one, so SQLite does not compile
+ * it again. Closing the handed-out statement returns it to the cache instead of finalizing it;
+ * at most one idle statement is kept per SQL and at most [capacity] in total, the least recently
+ * used one being closed first. A statement is only ever used by the caller it was handed to, so
+ * concurrent callers on a shared connection never share one.
+ *
+ * Statements that callers drop without closing are closed once they are garbage collected, so
+ * they no longer hold native SQLite handles until the connection closes.
+ */
+class StatementCache(
+    private val connection: Connection,
+    private val capacity: Int = DEFAULT_CAPACITY,
+    private val metrics: StatementCacheMetrics = StatementCacheMetrics(),
+) {
+    companion object {
+        const val DEFAULT_CAPACITY = 128
+
+        private val cleaner: Cleaner = Cleaner.create()
+    }
+
+    private val idle = LinkedHashMap<String, PreparedStatement>(16, 0.75f, true)
+    private var closed = false
+
+    fun prepare(sql: String): PreparedStatement {
+        val statement =
+            synchronized(this) { idle.remove(sql) }
+                ?.also {
+                    metrics.cached.decrementAndGet()
+                    metrics.hits.incrementAndGet()
+                }
+                ?: connection.prepareStatement(sql).also { metrics.misses.incrementAndGet() }
+        return CachedStatement(statement, sql)
+    }
+
+    private fun release(
+        sql: String,
+        statement: PreparedStatement,
+    ) {
+        try {
+            statement.clearParameters()
+            statement.clearBatch()
+        } catch (_: SQLException) {
+            statement.close()
+            return
+        }
+        val evicted =
+            synchronized(this) {
+                if (closed || idle.containsKey(sql)) return@synchronized statement
+                idle[sql] = statement
+                metrics.cached.incrementAndGet()
+                if (idle.size <= capacity) return@synchronized null
+                val eldest = idle.entries.iterator().next()
+                idle.remove(eldest.key)
+                metrics.cached.decrementAndGet()
+                metrics.evictions.incrementAndGet()
+                eldest.value
+            }
+        evicted?.close()
+    }
+
+    /** Closes every idle statement; statements handed out are closed when their callers close them. */
+    fun close() {
+        val statements =
+            synchronized(this) {
+                closed = true
+                idle.values.toList().also {
+                    metrics.cached.addAndGet(-it.size)
+                    idle.clear()
+                }
+            }
+        statements.forEach { runCatching { it.close() } }
+    }
+
+    /** Closes a statement that was garbage collected without being closed. */
+    private class Reclaim(
+        private val statement: PreparedStatement,
+        private val metrics: StatementCacheMetrics,
+    ) : Runnable {
+        @Volatile var released = false
+
+        override fun run() {
+            if (released) return
+            metrics.reclaimed.incrementAndGet()
+            runCatching { statement.close() }
+        }
+    }
+
+    private inner class CachedStatement(
+        private val statement: PreparedStatement,
+        private val sql: String,
+    ) : PreparedStatement by statement {
+        private val returned = AtomicBoolean(false)
+        private val reclaim = Reclaim(statement, metrics)
+        private val cleanable = cleaner.register(this, reclaim)
+
+        override fun close() {
+            if (!returned.compareAndSet(false, true)) return
+            reclaim.released = true
+            cleanable.clean()
+            release(sql, statement)
+        }
+
+        override fun isClosed(): Boolean = returned.get() || statement.isClosed
+
+        // Result sets keep this wrapper reachable, so it is not reclaimed while they are read
+        override fun executeQuery(): ResultSet = CachedResultSet(statement.executeQuery(), this)
+
+        override fun getResultSet(): ResultSet? = statement.resultSet?.let { CachedResultSet(it, this) }
+
+        override fun getGeneratedKeys(): ResultSet = CachedResultSet(statement.generatedKeys, this)
+    }
+
+    private class CachedResultSet(
+        private val resultSet: ResultSet,
+        private val owner: PreparedStatement,
+    ) : ResultSet by resultSet {
+        override fun getStatement(): PreparedStatement = owner
+    }
+}
+
+/** A connection whose [prepareStatement] goes through a [StatementCache]. */
+class CachingConnection(
+    private val connection: Connection,
+    capacity: Int = StatementCache.DEFAULT_CAPACITY,
+    metrics: StatementCacheMetrics = StatementCacheMetrics(),
+) : Connection by connection {
+    val statements = StatementCache(connection, capacity, metrics)
+
+    override fun prepareStatement(sql: String): PreparedStatement = statements.prepare(sql)
+
+    override fun close() {
+        statements.close()
+        connection.close()
+    }
+}
@@ -0,0 +1,58 @@
+package pos.ambrosia.db
+
+import org.sqlite.SQLiteConfig
+import java.sql.Connection
+
+/**
+ * SQLite settings applied to every connection the server opens.
+ *
+ * The default profile runs the database in write-ahead-log mode, so readers keep reading the last
+ * committed state while a checkout commits, instead of being locked out by the rollback journal.
+ * `synchronous=NORMAL` is durable across application crashes in WAL mode (only a power loss can
+ * drop the last commits), and saves an fsync per transaction.
+ */
+data class StorageProfile(
+    val journalMode: String = "WAL",
+    val synchronous: String = "NORMAL",
+    // Negative values are KiB rather than pages
+    val cacheSizeKib: Int = 16 * 1024,
+    val mmapSizeBytes: Long = 256L * 1024 * 1024,
+    val busyTimeoutMs: Int = 5_000,
+    // Pages after which a commit runs a passive checkpoint itself (SQLite's default)
+    val walAutocheckpointPages: Int = 1_000,
+    // Size the WAL file is truncated to after a checkpoint
+    val journalSizeLimitBytes: Long = 64L * 1024 * 1024,
+) {
+    companion object {
+        val DEFAULT = StorageProfile()
+    }
+
+    /** Open flags; the pragmas are applied by [apply] once the connection is open. */
+    fun config(readOnly: Boolean): SQLiteConfig =
+        SQLiteConfig().apply {
+            setReadOnly(readOnly)
+            setBusyTimeout(busyTimeoutMs)
+        }
+
+    fun apply(
+        connection: Connection,
+        readOnly: Boolean,
+    ) {
+        val pragmas =
+            buildList {
+                // The journal mode is stored in the database file, so only the writer sets it
+                if (!readOnly) {
+                    add("journal_mode = $journalMode")
+                    add("wal_autocheckpoint = $walAutocheckpointPages")
+                    add("journal_size_limit = $journalSizeLimitBytes")
+                }
+                add("synchronous = $synchronous")
+                add("cache_size = -$cacheSizeKib")
+                add("mmap_size = $mmapSizeBytes")
+                add("temp_store = MEMORY")
+            }
+        connection.createStatement().use { statement ->
+            for (pragma in pragmas) statement.execute("PRAGMA $pragma")
+        }
+    }
+}
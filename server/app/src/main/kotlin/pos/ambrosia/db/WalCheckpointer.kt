@@ -0,0 +1,133 @@
+package pos.ambrosia.db
+
+import kotlinx.serialization.Serializable
+import pos.ambrosia.logger
+import java.sql.Connection
+import java.sql.SQLException
+import java.util.concurrent.Executors
+import java.util.concurrent.ScheduledExecutorService
+import java.util.concurrent.TimeUnit
+
+@Serializable
+data class CheckpointStats(
+    val runs: Long,
+    val truncates: Long,
+    val busy: Long,
+    val failures: Long,
+    val walBytes: Long,
+    val maxWalBytes: Long,
+    val lastLogFrames: Int,
+    val lastCheckpointedFrames: Int,
+    val lastDurationMs: Long,
+    val totalDurationMs: Long,
+)
+
+/**
+ * Keeps the `-wal` file of a WAL-mode database bounded.
+ *
+ * Commits already run passive checkpoints every `wal_autocheckpoint` pages, but a passive
+ * checkpoint cannot reset the WAL while a reader still uses it, so under steady reads the file
+ * keeps growing. Every [intervalMs] this runs a passive checkpoint on its own connection, or a
+ * TRUNCATE checkpoint once the WAL is larger than [truncateAboveBytes]; TRUNCATE waits (up to
+ * the connection's busy timeout) for readers to move past the log and then empties the file.
+ */
+class WalCheckpointer(
+    private val open: () -> Connection,
+    private val walBytes: () -> Long,
+    private val intervalMs: Long = DEFAULT_INTERVAL_MS,
+    private val truncateAboveBytes: Long = DEFAULT_TRUNCATE_ABOVE_BYTES,
+) {
+    companion object {
+        const val DEFAULT_INTERVAL_MS = 30_000L
+        const val DEFAULT_TRUNCATE_ABOVE_BYTES = 16L * 1024 * 1024
+    }
+
+    private var executor: ScheduledExecutorService? = null
+    private var connection: Connection? = null
+
+    private var runs = 0L
+    private var truncates = 0L
+    private var busy = 0L
+    private var failures = 0L
+    private var lastWalBytes = 0L
+    private var maxWalBytes = 0L
+    private var lastLogFrames = 0
+    private var lastCheckpointedFrames = 0
+    private var lastDurationMs = 0L
+    private var totalDurationMs = 0L
+
+    fun start() {
+        val scheduler =
+            Executors.newSingleThreadScheduledExecutor { task ->
+                Thread(task, "wal-checkpointer").apply { isDaemon = true }
+            }
+        scheduler.scheduleWithFixedDelay(::runSafely, intervalMs, intervalMs, TimeUnit.MILLISECONDS)
+        executor = scheduler
+    }
+
+    private fun runSafely() {
+        try {
+            checkpoint()
+        } catch (e: SQLException) {
+            synchronized(this) { failures++ }
+            logger.warn("WAL checkpoint failed: ${e.message}")
+        }
+    }
+
+    /** Runs one checkpoint now; returns whether it had to give up because of other connections. */
+    @Synchronized
+    fun checkpoint(): Boolean {
+        val size = walBytes()
+        lastWalBytes = size
+        maxWalBytes = maxOf(maxWalBytes, size)
+        val mode = if (size > truncateAboveBytes) "TRUNCATE" else "PASSIVE"
+
+        val started = System.nanoTime()
+        val connection = connection ?: open().also { connection = it }
+        val wasBusy =
+            connection.createStatement().use { statement ->
+                statement.executeQuery("PRAGMA wal_checkpoint($mode)").use { result ->
+                    result.next()
+                    lastLogFrames = result.getInt(2)
+                    lastCheckpointedFrames = result.getInt(3)
+                    result.getInt(1) != 0
+                }
+            }
+        lastDurationMs = TimeUnit.NANOSECONDS.toMillis(System.nanoTime() - started)
+        totalDurationMs += lastDurationMs
+        runs++
+        if (mode == "TRUNCATE") truncates++
+        if (wasBusy) busy++
+        if (mode == "TRUNCATE") {
+            logger.info("WAL was ${size / 1024} KiB, truncate checkpoint took ${lastDurationMs}ms (busy=$wasBusy)")
+        }
+        return wasBusy
+    }
+
+    @Synchronized
+    fun stats(): CheckpointStats =
+        CheckpointStats(
+            runs = runs,
+            truncates = truncates,
+            busy = busy,
+            failures = failures,
+            walBytes = lastWalBytes,
+            maxWalBytes = maxWalBytes,
+            lastLogFrames = lastLogFrames,
+            lastCheckpointedFrames = lastCheckpointedFrames,
+            lastDurationMs = lastDurationMs,
+            totalDurationMs = totalDurationMs,
+        )
+
+    fun stop() {
+        executor?.let {
+            it.shutdown()
+            it.awaitTermination(intervalMs, TimeUnit.MILLISECONDS)
+        }
+        executor = null
+        synchronized(this) {
+            connection?.close()
+            connection = null
+        }
+    }
+}
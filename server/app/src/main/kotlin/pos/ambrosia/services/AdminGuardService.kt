@@ -43,37 +43,35 @@ class AdminGuardService(
             """
     }
 
-    fun activeAdminUserCount(): Long {
-        val statement = connection.prepareStatement(COUNT_ACTIVE_ADMIN_USERS)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) resultSet.getLong(1) else 0L
-    }
+    fun activeAdminUserCount(): Long =
+        connection.prepareStatement(COUNT_ACTIVE_ADMIN_USERS).use { statement ->
+            statement.executeQuery().use { resultSet -> if (resultSet.next()) resultSet.getLong(1) else 0L }
+        }
 
-    fun activeAdminUsersByRole(roleId: String): Long {
-        val statement = connection.prepareStatement(COUNT_ACTIVE_ADMIN_USERS_BY_ROLE)
-        statement.setString(1, roleId)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) resultSet.getLong(1) else 0L
-    }
+    fun activeAdminUsersByRole(roleId: String): Long =
+        connection.prepareStatement(COUNT_ACTIVE_ADMIN_USERS_BY_ROLE).use { statement ->
+            statement.setString(1, roleId)
+            statement.executeQuery().use { resultSet -> if (resultSet.next()) resultSet.getLong(1) else 0L }
+        }
 
-    fun isRoleAdmin(roleId: String): Boolean? {
-        val statement = connection.prepareStatement(GET_ROLE_ADMIN_STATE)
-        statement.setString(1, roleId)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) resultSet.getBoolean("isAdmin") else null
-    }
+    fun isRoleAdmin(roleId: String): Boolean? =
+        connection.prepareStatement(GET_ROLE_ADMIN_STATE).use { statement ->
+            statement.setString(1, roleId)
+            statement.executeQuery().use { resultSet -> if (resultSet.next()) resultSet.getBoolean("isAdmin") else null }
+        }
 
-    fun getUserAdminState(userId: String): UserAdminState? {
-        val statement = connection.prepareStatement(GET_USER_ADMIN_STATE)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            UserAdminState(
-                roleId = resultSet.getString("role_id"),
-                isAdmin = resultSet.getBoolean("isAdmin"),
-            )
-        } else {
-            null
+    fun getUserAdminState(userId: String): UserAdminState? =
+        connection.prepareStatement(GET_USER_ADMIN_STATE).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    UserAdminState(
+                        roleId = resultSet.getString("role_id"),
+                        isAdmin = resultSet.getBoolean("isAdmin"),
+                    )
+                } else {
+                    null
+                }
+            }
         }
-    }
 }
@@ -33,33 +33,35 @@ class AuthService(
         name: String,
         pin: CharArray,
     ): AuthResponse? {
-        val statement = connection.prepareStatement(GET_USER_FOR_AUTH_BY_NAME)
-        statement.setString(1, name)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            val userIdString = resultSet.getString("id")
-            val storedPinHashBase64 = resultSet.getString("pin")
-            logger.info("Authenticating user: $userIdString")
-            val storedPinHash = SecurePinProcessor.base64ToByteArray(storedPinHashBase64)
+        connection.prepareStatement(GET_USER_FOR_AUTH_BY_NAME).use { statement ->
+            statement.setString(1, name)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    val userIdString = resultSet.getString("id")
+                    val storedPinHashBase64 = resultSet.getString("pin")
+                    logger.info("Authenticating user: $userIdString")
+                    val storedPinHash = SecurePinProcessor.base64ToByteArray(storedPinHashBase64)
 
-            val isValidPin = SecurePinProcessor.verifyPin(pin, userIdString, storedPinHash, env)
-            pin.fill('\u0000')
+                    val isValidPin = SecurePinProcessor.verifyPin(pin, userIdString, storedPinHash, env)
+                    pin.fill('\u0000')
 
-            if (isValidPin) {
-                val role = resultSet.getString("role")
-                if (role == null) {
-                    throw MissingRoleException()
-                }
+                    if (isValidPin) {
+                        val role = resultSet.getString("role")
+                        if (role == null) {
+                            throw MissingRoleException()
+                        }
 
-                return AuthResponse(
-                    id = userIdString,
-                    name = resultSet.getString("name"),
-                    role = role,
-                    roleId = resultSet.getString("role_id"),
-                    isAdmin = resultSet.getBoolean("isAdmin"),
-                    email = resultSet.getString("email"),
-                    phone = resultSet.getString("phone"),
-                )
+                        return AuthResponse(
+                            id = userIdString,
+                            name = resultSet.getString("name"),
+                            role = role,
+                            roleId = resultSet.getString("role_id"),
+                            isAdmin = resultSet.getBoolean("isAdmin"),
+                            email = resultSet.getString("email"),
+                            phone = resultSet.getString("phone"),
+                        )
+                    }
+                }
             }
         }
         return null
@@ -69,20 +71,21 @@ class AuthService(
         userId: String,
         rolePassword: CharArray,
     ): Boolean {
-        val statement = connection.prepareStatement(GET_USER_AND_ROLE_FOR_AUTH_BY_USERID)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-
-        if (resultSet.next()) {
-            val roleId = resultSet.getString("role_id")
-            val storedPasswordHashBase64 = resultSet.getString("role_password")
-            val storedPasswordHash = SecurePinProcessor.base64ToByteArray(storedPasswordHashBase64)
+        connection.prepareStatement(GET_USER_AND_ROLE_FOR_AUTH_BY_USERID).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    val roleId = resultSet.getString("role_id")
+                    val storedPasswordHashBase64 = resultSet.getString("role_password")
+                    val storedPasswordHash = SecurePinProcessor.base64ToByteArray(storedPasswordHashBase64)
 
-            val isValidPassword =
-                SecurePinProcessor.verifyPin(rolePassword, roleId, storedPasswordHash, env)
-            rolePassword.fill('\u0000')
+                    val isValidPassword =
+                        SecurePinProcessor.verifyPin(rolePassword, roleId, storedPasswordHash, env)
+                    rolePassword.fill('\u0000')
 
-            return isValidPassword
+                    return isValidPassword
+                }
+            }
         }
         return false
     }
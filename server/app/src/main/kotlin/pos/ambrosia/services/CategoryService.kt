@@ -27,15 +27,15 @@ class CategoryService(
         type: String,
         excludeId: String? = null,
     ): Boolean {
-        val statement =
-            connection.prepareStatement(
+        return connection
+            .prepareStatement(
                 "SELECT id FROM categories WHERE name = ? AND type = ? AND is_deleted = 0 AND id != ?",
-            )
-        statement.setString(1, name)
-        statement.setString(2, type)
-        statement.setString(3, excludeId ?: "")
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
+            ).use { statement ->
+                statement.setString(1, name)
+                statement.setString(2, type)
+                statement.setString(3, excludeId ?: "")
+                statement.executeQuery().use { it.next() }
+            }
     }
 
     private fun categoryInUse(
@@ -44,10 +44,12 @@ class CategoryService(
     ): Boolean {
         val table = usageTable(type)
         val sql = "SELECT COUNT(*) as count FROM $table WHERE category_id = ? AND is_deleted = 0"
-        val statement = connection.prepareStatement(sql)
-        statement.setString(1, categoryId)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) resultSet.getInt("count") > 0 else false
+        return connection.prepareStatement(sql).use { statement ->
+            statement.setString(1, categoryId)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) resultSet.getInt("count") > 0 else false
+            }
+        }
     }
 
     suspend fun addCategory(
@@ -62,14 +64,16 @@ class CategoryService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement =
-            connection.prepareStatement(
-                "INSERT INTO categories (id, name, type, is_deleted) VALUES (?, ?, ?, 0)",
-            )
-        statement.setString(1, id)
-        statement.setString(2, category.name)
-        statement.setString(3, type)
-        val rows = statement.executeUpdate()
+        val rows =
+            connection
+                .prepareStatement(
+                    "INSERT INTO categories (id, name, type, is_deleted) VALUES (?, ?, ?, 0)",
+                ).use { statement ->
+                    statement.setString(1, id)
+                    statement.setString(2, category.name)
+                    statement.setString(3, type)
+                    statement.executeUpdate()
+                }
         return if (rows > 0) {
             logger.info("Category created: $id type=$type")
             id
@@ -80,15 +84,17 @@ class CategoryService(
 
     suspend fun getCategories(type: String): List<CategoryItem>? {
         if (!validateType(type)) return null
-        val statement =
-            connection.prepareStatement(
+        return connection
+            .prepareStatement(
                 "SELECT id, name FROM categories WHERE type = ? AND is_deleted = 0",
-            )
-        statement.setString(1, type)
-        val resultSet = statement.executeQuery()
-        val out = mutableListOf<CategoryItem>()
-        while (resultSet.next()) out.add(map(resultSet))
-        return out
+            ).use { statement ->
+                statement.setString(1, type)
+                statement.executeQuery().use { resultSet ->
+                    val out = mutableListOf<CategoryItem>()
+                    while (resultSet.next()) out.add(map(resultSet))
+                    out
+                }
+            }
     }
 
     suspend fun getCategoryById(
@@ -96,14 +102,14 @@ class CategoryService(
         type: String,
     ): CategoryItem? {
         if (!validateType(type)) return null
-        val statement =
-            connection.prepareStatement(
+        return connection
+            .prepareStatement(
                 "SELECT id, name FROM categories WHERE id = ? AND type = ? AND is_deleted = 0",
-            )
-        statement.setString(1, id)
-        statement.setString(2, type)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) map(resultSet) else null
+            ).use { statement ->
+                statement.setString(1, id)
+                statement.setString(2, type)
+                statement.executeQuery().use { resultSet -> if (resultSet.next()) map(resultSet) else null }
+            }
     }
 
     suspend fun updateCategory(
@@ -114,14 +120,16 @@ class CategoryService(
         if (category.id == null) return false
         if (category.name.isBlank()) return false
         if (nameExists(category.name, type, category.id)) return false
-        val statement =
-            connection.prepareStatement(
-                "UPDATE categories SET name = ? WHERE id = ? AND type = ?",
-            )
-        statement.setString(1, category.name)
-        statement.setString(2, category.id)
-        statement.setString(3, type)
-        val rows = statement.executeUpdate()
+        val rows =
+            connection
+                .prepareStatement(
+                    "UPDATE categories SET name = ? WHERE id = ? AND type = ?",
+                ).use { statement ->
+                    statement.setString(1, category.name)
+                    statement.setString(2, category.id)
+                    statement.setString(3, type)
+                    statement.executeUpdate()
+                }
         if (rows > 0) logger.info("Category updated: ${category.id} type=$type")
         return rows > 0
     }
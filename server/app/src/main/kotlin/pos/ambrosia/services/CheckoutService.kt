@@ -47,22 +47,25 @@ class CheckoutService(
             "UPDATE orders SET status = 'closed' WHERE id = ? AND status = 'open' AND table_id IS NULL"
     }
 
-    private fun mapStoreItems(orderId: String): List<StoreOrderItem> {
-        val statement = connection.prepareStatement(STORE_GET_ITEMS)
-        statement.setString(1, orderId)
-        val resultSet = statement.executeQuery()
-        val items = mutableListOf<StoreOrderItem>()
-        while (resultSet.next()) {
-            items.add(
-                StoreOrderItem(
-                    productId = resultSet.getString("product_id"),
-                    quantity = resultSet.getInt("quantity"),
-                    priceAtOrder = resultSet.getInt("price_at_order"),
-                ),
-            )
+    private val salesRollup = SalesRollupService(connection)
+
+    private fun mapStoreItems(orderId: String): List<StoreOrderItem> =
+        connection.prepareStatement(STORE_GET_ITEMS).use { statement ->
+            statement.setString(1, orderId)
+            statement.executeQuery().use { resultSet ->
+                val items = mutableListOf<StoreOrderItem>()
+                while (resultSet.next()) {
+                    items.add(
+                        StoreOrderItem(
+                            productId = resultSet.getString("product_id"),
+                            quantity = resultSet.getInt("quantity"),
+                            priceAtOrder = resultSet.getInt("price_at_order"),
+                        ),
+                    )
+                }
+                items
+            }
         }
-        return items
-    }
 
     private fun mapStoreOrder(resultSet: ResultSet): StoreOrder {
         val id = resultSet.getString("id")
@@ -79,25 +82,30 @@ class CheckoutService(
 
     suspend fun getStoreOrders(status: String? = null): List<StoreOrder> {
         val getOrdersQuery = if (status != null) STORE_GET_ORDERS_BY_STATUS else STORE_GET_ORDERS
-        val statement = connection.prepareStatement(getOrdersQuery)
-        if (status != null) statement.setString(1, status)
-        val resultSet = statement.executeQuery()
-        val orders = mutableListOf<StoreOrder>()
-        while (resultSet.next()) orders.add(mapStoreOrder(resultSet))
-        return orders
+        return connection.prepareStatement(getOrdersQuery).use { statement ->
+            if (status != null) statement.setString(1, status)
+            statement.executeQuery().use { resultSet ->
+                val orders = mutableListOf<StoreOrder>()
+                while (resultSet.next()) orders.add(mapStoreOrder(resultSet))
+                orders
+            }
+        }
     }
 
-    suspend fun getStoreOrderById(id: String): StoreOrder? {
-        val statement = connection.prepareStatement(STORE_GET_ORDER)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) mapStoreOrder(resultSet) else null
-    }
+    suspend fun getStoreOrderById(id: String): StoreOrder? =
+        connection.prepareStatement(STORE_GET_ORDER).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) mapStoreOrder(resultSet) else null
+            }
+        }
 
     suspend fun cancelStoreOrder(id: String): Boolean {
-        val statement = connection.prepareStatement(STORE_CANCEL_ORDER)
-        statement.setString(1, id)
-        val rows = statement.executeUpdate()
+        val rows =
+            connection.prepareStatement(STORE_CANCEL_ORDER).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
         if (rows > 0) logger.info("Store order cancelled: $id")
         return rows > 0
     }
@@ -193,6 +201,10 @@ class CheckoutService(
                 statement.executeUpdate()
             }
 
+            for (item in request.items) {
+                salesRollup.addCheckoutLine(orderId, item.productId, request.paymentMethodId, item.quantity, item.priceAtOrder)
+            }
+
             connection.commit()
             logger.info("Store checkout: order=$orderId ticket=$ticketId payment=$paymentId")
             return StoreCheckoutResponse(orderId, ticketId, paymentId)
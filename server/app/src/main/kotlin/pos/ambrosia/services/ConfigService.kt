@@ -16,39 +16,41 @@ class ConfigService(
         """
     }
 
-    suspend fun getConfig(): Config? {
-        val statement = connection.prepareStatement(GET_CONFIG)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            Config(
-                id = resultSet.getInt("id"),
-                businessType = resultSet.getString("business_type"),
-                businessName = resultSet.getString("business_name"),
-                businessAddress = resultSet.getString("business_address"),
-                businessPhone = resultSet.getString("business_phone"),
-                businessEmail = resultSet.getString("business_email"),
-                businessTaxId = resultSet.getString("business_tax_id"),
-                businessLogoUrl = resultSet.getString("business_logo_url"),
-                businessTypeConfirmed = resultSet.getBoolean("business_type_confirmed"),
-            )
-        } else {
-            logger.warn("Config not found")
-            null
+    suspend fun getConfig(): Config? =
+        connection.prepareStatement(GET_CONFIG).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Config(
+                        id = resultSet.getInt("id"),
+                        businessType = resultSet.getString("business_type"),
+                        businessName = resultSet.getString("business_name"),
+                        businessAddress = resultSet.getString("business_address"),
+                        businessPhone = resultSet.getString("business_phone"),
+                        businessEmail = resultSet.getString("business_email"),
+                        businessTaxId = resultSet.getString("business_tax_id"),
+                        businessLogoUrl = resultSet.getString("business_logo_url"),
+                        businessTypeConfirmed = resultSet.getBoolean("business_type_confirmed"),
+                    )
+                } else {
+                    logger.warn("Config not found")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun updateConfig(config: Config): Boolean {
-        val statement = connection.prepareStatement(UPDATE_CONFIG)
-        statement.setString(1, config.businessType)
-        statement.setString(2, config.businessName)
-        statement.setString(3, config.businessAddress)
-        statement.setString(4, config.businessPhone)
-        statement.setString(5, config.businessEmail)
-        statement.setString(6, config.businessTaxId)
-        statement.setString(7, config.businessLogoUrl)
-        statement.setBoolean(8, config.businessTypeConfirmed)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_CONFIG).use { statement ->
+                statement.setString(1, config.businessType)
+                statement.setString(2, config.businessName)
+                statement.setString(3, config.businessAddress)
+                statement.setString(4, config.businessPhone)
+                statement.setString(5, config.businessEmail)
+                statement.setString(6, config.businessTaxId)
+                statement.setString(7, config.businessLogoUrl)
+                statement.setBoolean(8, config.businessTypeConfirmed)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Config updated successfully")
         } else {
@@ -25,22 +25,17 @@ class DishService(
             "SELECT id, name, price, category_id FROM dishes WHERE category_id = ? AND is_deleted = 0"
     }
 
-    private fun categoryExists(categoryId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_CATEGORY_EXISTS)
-        statement.setString(1, categoryId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun categoryExists(categoryId: String): Boolean =
+        connection.prepareStatement(CHECK_CATEGORY_EXISTS).use { statement ->
+            statement.setString(1, categoryId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun dishInUse(dishId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_DISH_IN_USE)
-        statement.setString(1, dishId)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            return resultSet.getInt("count") > 0
+    private fun dishInUse(dishId: String): Boolean =
+        connection.prepareStatement(CHECK_DISH_IN_USE).use { statement ->
+            statement.setString(1, dishId)
+            statement.executeQuery().use { resultSet -> resultSet.next() && resultSet.getInt("count") > 0 }
         }
-        return false
-    }
 
     private fun mapResultSetToDish(resultSet: java.sql.ResultSet): Dish =
         Dish(
@@ -71,14 +66,14 @@ class DishService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_DISH)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, dish.name)
-        statement.setDouble(3, dish.price)
-        statement.setString(4, dish.categoryId)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_DISH).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, dish.name)
+                statement.setDouble(3, dish.price)
+                statement.setString(4, dish.categoryId)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Dish created successfully with ID: $generatedId")
@@ -89,40 +84,43 @@ class DishService(
         }
     }
 
-    suspend fun getDishes(): List<Dish> {
-        val statement = connection.prepareStatement(GET_DISHES)
-        val resultSet = statement.executeQuery()
-        val dishes = mutableListOf<Dish>()
-        while (resultSet.next()) {
-            dishes.add(mapResultSetToDish(resultSet))
+    suspend fun getDishes(): List<Dish> =
+        connection.prepareStatement(GET_DISHES).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val dishes = mutableListOf<Dish>()
+                while (resultSet.next()) {
+                    dishes.add(mapResultSetToDish(resultSet))
+                }
+                logger.info("Retrieved ${dishes.size} dishes")
+                dishes
+            }
         }
-        logger.info("Retrieved ${dishes.size} dishes")
-        return dishes
-    }
 
-    suspend fun getDishById(id: String): Dish? {
-        val statement = connection.prepareStatement(GET_DISH_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            mapResultSetToDish(resultSet)
-        } else {
-            logger.warn("Dish not found with ID: $id")
-            null
+    suspend fun getDishById(id: String): Dish? =
+        connection.prepareStatement(GET_DISH_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    mapResultSetToDish(resultSet)
+                } else {
+                    logger.warn("Dish not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
-    suspend fun getDishesByCategory(categoryId: String): List<Dish> {
-        val statement = connection.prepareStatement(GET_DISHES_BY_CATEGORY)
-        statement.setString(1, categoryId)
-        val resultSet = statement.executeQuery()
-        val dishes = mutableListOf<Dish>()
-        while (resultSet.next()) {
-            dishes.add(mapResultSetToDish(resultSet))
+    suspend fun getDishesByCategory(categoryId: String): List<Dish> =
+        connection.prepareStatement(GET_DISHES_BY_CATEGORY).use { statement ->
+            statement.setString(1, categoryId)
+            statement.executeQuery().use { resultSet ->
+                val dishes = mutableListOf<Dish>()
+                while (resultSet.next()) {
+                    dishes.add(mapResultSetToDish(resultSet))
+                }
+                logger.info("Retrieved ${dishes.size} dishes for category: $categoryId")
+                dishes
+            }
         }
-        logger.info("Retrieved ${dishes.size} dishes for category: $categoryId")
-        return dishes
-    }
 
     suspend fun updateDish(dish: Dish): Boolean {
         if (dish.id == null) {
@@ -145,13 +143,14 @@ class DishService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_DISH)
-        statement.setString(1, dish.name)
-        statement.setDouble(2, dish.price)
-        statement.setString(3, dish.categoryId)
-        statement.setString(4, dish.id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_DISH).use { statement ->
+                statement.setString(1, dish.name)
+                statement.setDouble(2, dish.price)
+                statement.setString(3, dish.categoryId)
+                statement.setString(4, dish.id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Dish updated successfully: ${dish.id}")
         } else {
@@ -166,9 +165,11 @@ class DishService(
             return false
         }
 
-        val statement = connection.prepareStatement(DELETE_DISH)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_DISH).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Dish soft-deleted successfully: $id")
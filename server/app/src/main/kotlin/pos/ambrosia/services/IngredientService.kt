@@ -27,22 +27,17 @@ class IngredientService(
             "SELECT id, name, category_id, quantity, unit, low_stock_threshold, cost_per_unit FROM ingredients WHERE category_id = ? AND is_deleted = 0"
     }
 
-    private fun categoryExists(categoryId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_CATEGORY_EXISTS)
-        statement.setString(1, categoryId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun categoryExists(categoryId: String): Boolean =
+        connection.prepareStatement(CHECK_CATEGORY_EXISTS).use { statement ->
+            statement.setString(1, categoryId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun ingredientInUse(ingredientId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_INGREDIENT_IN_USE)
-        statement.setString(1, ingredientId)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            return resultSet.getInt("count") > 0
+    private fun ingredientInUse(ingredientId: String): Boolean =
+        connection.prepareStatement(CHECK_INGREDIENT_IN_USE).use { statement ->
+            statement.setString(1, ingredientId)
+            statement.executeQuery().use { resultSet -> resultSet.next() && resultSet.getInt("count") > 0 }
         }
-        return false
-    }
 
     private fun mapResultSetToIngredient(resultSet: java.sql.ResultSet): Ingredient =
         Ingredient(
@@ -79,17 +74,17 @@ class IngredientService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_INGREDIENT)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, ingredient.name)
-        statement.setString(3, ingredient.categoryId)
-        statement.setDouble(4, ingredient.quantity)
-        statement.setString(5, ingredient.unit)
-        statement.setDouble(6, ingredient.lowStockThreshold)
-        statement.setDouble(7, ingredient.costPerUnit)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_INGREDIENT).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, ingredient.name)
+                statement.setString(3, ingredient.categoryId)
+                statement.setDouble(4, ingredient.quantity)
+                statement.setString(5, ingredient.unit)
+                statement.setDouble(6, ingredient.lowStockThreshold)
+                statement.setDouble(7, ingredient.costPerUnit)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Ingredient created successfully with ID: $generatedId")
@@ -100,40 +95,43 @@ class IngredientService(
         }
     }
 
-    suspend fun getIngredients(): List<Ingredient> {
-        val statement = connection.prepareStatement(GET_INGREDIENTS)
-        val resultSet = statement.executeQuery()
-        val ingredients = mutableListOf<Ingredient>()
-        while (resultSet.next()) {
-            ingredients.add(mapResultSetToIngredient(resultSet))
+    suspend fun getIngredients(): List<Ingredient> =
+        connection.prepareStatement(GET_INGREDIENTS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val ingredients = mutableListOf<Ingredient>()
+                while (resultSet.next()) {
+                    ingredients.add(mapResultSetToIngredient(resultSet))
+                }
+                logger.info("Retrieved ${ingredients.size} ingredients")
+                ingredients
+            }
+        }
+
+    suspend fun getIngredientById(id: String): Ingredient? =
+        connection.prepareStatement(GET_INGREDIENT_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    mapResultSetToIngredient(resultSet)
+                } else {
+                    logger.warn("Ingredient not found with ID: $id")
+                    null
+                }
+            }
+        }
+
+    suspend fun getIngredientsByCategory(categoryId: String): List<Ingredient> =
+        connection.prepareStatement(GET_INGREDIENTS_BY_CATEGORY).use { statement ->
+            statement.setString(1, categoryId)
+            statement.executeQuery().use { resultSet ->
+                val ingredients = mutableListOf<Ingredient>()
+                while (resultSet.next()) {
+                    ingredients.add(mapResultSetToIngredient(resultSet))
+                }
+                logger.info("Retrieved ${ingredients.size} ingredients for category: $categoryId")
+                ingredients
+            }
         }
-        logger.info("Retrieved ${ingredients.size} ingredients")
-        return ingredients
-    }
-
-    suspend fun getIngredientById(id: String): Ingredient? {
-        val statement = connection.prepareStatement(GET_INGREDIENT_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            mapResultSetToIngredient(resultSet)
-        } else {
-            logger.warn("Ingredient not found with ID: $id")
-            null
-        }
-    }
-
-    suspend fun getIngredientsByCategory(categoryId: String): List<Ingredient> {
-        val statement = connection.prepareStatement(GET_INGREDIENTS_BY_CATEGORY)
-        statement.setString(1, categoryId)
-        val resultSet = statement.executeQuery()
-        val ingredients = mutableListOf<Ingredient>()
-        while (resultSet.next()) {
-            ingredients.add(mapResultSetToIngredient(resultSet))
-        }
-        logger.info("Retrieved ${ingredients.size} ingredients for category: $categoryId")
-        return ingredients
-    }
 
     suspend fun updateIngredient(ingredient: Ingredient): Boolean {
         if (ingredient.id == null) {
@@ -159,16 +157,17 @@ class IngredientService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_INGREDIENT)
-        statement.setString(1, ingredient.name)
-        statement.setString(2, ingredient.categoryId)
-        statement.setDouble(3, ingredient.quantity)
-        statement.setString(4, ingredient.unit)
-        statement.setDouble(5, ingredient.lowStockThreshold)
-        statement.setDouble(6, ingredient.costPerUnit)
-        statement.setString(7, ingredient.id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_INGREDIENT).use { statement ->
+                statement.setString(1, ingredient.name)
+                statement.setString(2, ingredient.categoryId)
+                statement.setDouble(3, ingredient.quantity)
+                statement.setString(4, ingredient.unit)
+                statement.setDouble(5, ingredient.lowStockThreshold)
+                statement.setDouble(6, ingredient.costPerUnit)
+                statement.setString(7, ingredient.id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Ingredient updated successfully: ${ingredient.id}")
         } else {
@@ -183,9 +182,11 @@ class IngredientService(
             return false
         }
 
-        val statement = connection.prepareStatement(DELETE_INGREDIENT)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_INGREDIENT).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Ingredient soft-deleted successfully: $id")
@@ -195,16 +196,17 @@ class IngredientService(
         return rowsDeleted > 0
     }
 
-    suspend fun getLowStockIngredients(): List<Ingredient> {
-        val statement = connection.prepareStatement(GET_LOW_STOCK_INGREDIENTS)
-        val resultSet = statement.executeQuery()
-        val lowStockIngredients = mutableListOf<Ingredient>()
-        while (resultSet.next()) {
-            lowStockIngredients.add(mapResultSetToIngredient(resultSet))
+    suspend fun getLowStockIngredients(): List<Ingredient> =
+        connection.prepareStatement(GET_LOW_STOCK_INGREDIENTS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val lowStockIngredients = mutableListOf<Ingredient>()
+                while (resultSet.next()) {
+                    lowStockIngredients.add(mapResultSetToIngredient(resultSet))
+                }
+                logger.info("Retrieved ${lowStockIngredients.size} low stock ingredients")
+                lowStockIngredients
+            }
         }
-        logger.info("Retrieved ${lowStockIngredients.size} low stock ingredients")
-        return lowStockIngredients
-    }
 
     suspend fun updateIngredientQuantity(
         id: String,
@@ -215,14 +217,14 @@ class IngredientService(
             return false
         }
 
-        val statement =
+        val rowsUpdated =
             connection.prepareStatement(
                 "UPDATE ingredients SET quantity = ? WHERE id = ? AND is_deleted = 0",
-            )
-        statement.setDouble(1, newQuantity)
-        statement.setString(2, id)
-
-        val rowsUpdated = statement.executeUpdate()
+            ).use { statement ->
+                statement.setDouble(1, newQuantity)
+                statement.setString(2, id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Ingredient quantity updated: $id -> $newQuantity")
         } else {
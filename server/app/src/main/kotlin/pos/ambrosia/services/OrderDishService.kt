@@ -24,19 +24,17 @@ class OrderDishService(
         private const val CHECK_STATUS = "SELECT id FROM orders_dishes WHERE status = ?"
     }
 
-    private fun orderExists(orderId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_ORDER_EXISTS)
-        statement.setString(1, orderId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun orderExists(orderId: String): Boolean =
+        connection.prepareStatement(CHECK_ORDER_EXISTS).use { statement ->
+            statement.setString(1, orderId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun dishExists(dishId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_DISH_EXISTS)
-        statement.setString(1, dishId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun dishExists(dishId: String): Boolean =
+        connection.prepareStatement(CHECK_DISH_EXISTS).use { statement ->
+            statement.setString(1, dishId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun mapResultSetToOrderDish(resultSet: java.sql.ResultSet): OrderDish =
         OrderDish(
@@ -61,17 +59,17 @@ class OrderDishService(
         }
 
         val generatedId = UUID.randomUUID().toString()
-        val statement = connection.prepareStatement(ADD_ORDER_DISH)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, orderDish.orderId)
-        statement.setString(3, orderDish.dishId)
-        statement.setDouble(4, orderDish.priceAtOrder)
-        statement.setString(5, orderDish.notes)
-        statement.setString(6, orderDish.status)
-        statement.setBoolean(7, orderDish.shouldPrepare)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_ORDER_DISH).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, orderDish.orderId)
+                statement.setString(3, orderDish.dishId)
+                statement.setDouble(4, orderDish.priceAtOrder)
+                statement.setString(5, orderDish.notes)
+                statement.setString(6, orderDish.status)
+                statement.setBoolean(7, orderDish.shouldPrepare)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("OrderDish created successfully with ID: $generatedId")
@@ -82,29 +80,31 @@ class OrderDishService(
         }
     }
 
-    suspend fun getOrderDishesByOrderId(orderId: String): List<OrderDish> {
-        val statement = connection.prepareStatement(GET_ORDER_DISHES_BY_ORDER)
-        statement.setString(1, orderId)
-        val resultSet = statement.executeQuery()
-        val orderDishes = mutableListOf<OrderDish>()
-        while (resultSet.next()) {
-            orderDishes.add(mapResultSetToOrderDish(resultSet))
+    suspend fun getOrderDishesByOrderId(orderId: String): List<OrderDish> =
+        connection.prepareStatement(GET_ORDER_DISHES_BY_ORDER).use { statement ->
+            statement.setString(1, orderId)
+            statement.executeQuery().use { resultSet ->
+                val orderDishes = mutableListOf<OrderDish>()
+                while (resultSet.next()) {
+                    orderDishes.add(mapResultSetToOrderDish(resultSet))
+                }
+                logger.info("Retrieved ${orderDishes.size} dishes for order: $orderId")
+                orderDishes
+            }
         }
-        logger.info("Retrieved ${orderDishes.size} dishes for order: $orderId")
-        return orderDishes
-    }
 
-    suspend fun getOrderDishById(id: String): OrderDish? {
-        val statement = connection.prepareStatement(GET_ORDER_DISH_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            mapResultSetToOrderDish(resultSet)
-        } else {
-            logger.warn("OrderDish not found with ID: $id")
-            null
+    suspend fun getOrderDishById(id: String): OrderDish? =
+        connection.prepareStatement(GET_ORDER_DISH_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    mapResultSetToOrderDish(resultSet)
+                } else {
+                    logger.warn("OrderDish not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun updateOrderDish(orderDish: OrderDish): Boolean {
         if (orderDish.id == null) {
@@ -112,14 +112,15 @@ class OrderDishService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_ORDER_DISH)
-        statement.setDouble(1, orderDish.priceAtOrder)
-        statement.setString(2, orderDish.notes)
-        statement.setString(3, orderDish.status)
-        statement.setBoolean(4, orderDish.shouldPrepare)
-        statement.setString(5, orderDish.id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_ORDER_DISH).use { statement ->
+                statement.setDouble(1, orderDish.priceAtOrder)
+                statement.setString(2, orderDish.notes)
+                statement.setString(3, orderDish.status)
+                statement.setBoolean(4, orderDish.shouldPrepare)
+                statement.setString(5, orderDish.id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("OrderDish updated successfully: ${orderDish.id}")
         } else {
@@ -129,9 +130,11 @@ class OrderDishService(
     }
 
     suspend fun deleteOrderDish(id: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_ORDER_DISH)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_ORDER_DISH).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("OrderDish deleted successfully: $id")
@@ -142,9 +145,11 @@ class OrderDishService(
     }
 
     suspend fun deleteOrderDishesByOrderId(orderId: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_ORDER_DISHES_BY_ORDER)
-        statement.setString(1, orderId)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_ORDER_DISHES_BY_ORDER).use { statement ->
+                statement.setString(1, orderId)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Deleted $rowsDeleted dishes for order: $orderId")
@@ -157,12 +162,10 @@ class OrderDishService(
     suspend fun checkOrderDishStatus(
         id: String,
         status: String,
-    ): Boolean {
-        val statement = connection.prepareStatement(CHECK_STATUS)
-        statement.setString(1, status)
-        statement.setString(2, id)
-        val resultSet = statement.executeQuery()
-
-        return resultSet.next()
-    }
+    ): Boolean =
+        connection.prepareStatement(CHECK_STATUS).use { statement ->
+            statement.setString(1, status)
+            statement.setString(2, id)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 }
@@ -3,6 +3,7 @@ package pos.ambrosia.services
 import pos.ambrosia.logger
 import pos.ambrosia.models.Order
 import pos.ambrosia.models.OrderDish
+import pos.ambrosia.utils.runInTransaction
 import java.sql.Connection
 import java.util.UUID
 
@@ -33,20 +34,20 @@ class OrderService(
 
     private val validStatuses = setOf("open", "closed", "paid")
     private val orderDishService = OrderDishService(connection)
+    private val salesRollup = SalesRollupService(connection)
 
-    private fun userExists(userId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_USER_EXISTS)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun userExists(userId: String): Boolean =
+        connection.prepareStatement(CHECK_USER_EXISTS).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun tableExists(tableId: String?): Boolean {
         if (tableId == null) return true
-        val statement = connection.prepareStatement(CHECK_TABLE_EXISTS)
-        statement.setString(1, tableId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
+        return connection.prepareStatement(CHECK_TABLE_EXISTS).use { statement ->
+            statement.setString(1, tableId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
     }
 
     private fun isValidStatus(status: String): Boolean = validStatuses.contains(status)
@@ -79,22 +80,22 @@ class OrderService(
         }
 
         val generatedId = UUID.randomUUID().toString()
-        val statement = connection.prepareStatement(ADD_ORDER)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, order.userId)
-        statement.setString(3, order.tableId)
-        statement.setString(4, orderStatus)
-        statement.setDouble(5, order.total)
-        val createdAt =
-            order.createdAt.ifEmpty {
-                java.time.LocalDateTime
-                    .now()
-                    .toString()
+        val rowsAffected =
+            connection.prepareStatement(ADD_ORDER).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, order.userId)
+                statement.setString(3, order.tableId)
+                statement.setString(4, orderStatus)
+                statement.setDouble(5, order.total)
+                val createdAt =
+                    order.createdAt.ifEmpty {
+                        java.time.LocalDateTime
+                            .now()
+                            .toString()
+                    }
+                statement.setString(6, createdAt)
+                statement.executeUpdate()
             }
-        statement.setString(6, createdAt)
-
-        val rowsAffected = statement.executeUpdate()
 
         return if (rowsAffected > 0) {
             logger.info("Order created successfully with ID: $generatedId")
@@ -105,53 +106,59 @@ class OrderService(
         }
     }
 
-    suspend fun getOrders(): List<Order> {
-        val statement = connection.prepareStatement(GET_ORDERS)
-        val resultSet = statement.executeQuery()
-        val orders = mutableListOf<Order>()
-        while (resultSet.next()) {
-            orders.add(mapResultSetToOrder(resultSet))
+    suspend fun getOrders(): List<Order> =
+        connection.prepareStatement(GET_ORDERS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val orders = mutableListOf<Order>()
+                while (resultSet.next()) {
+                    orders.add(mapResultSetToOrder(resultSet))
+                }
+                logger.info("Retrieved ${orders.size} orders")
+                orders
+            }
         }
-        logger.info("Retrieved ${orders.size} orders")
-        return orders
-    }
 
-    suspend fun getOrderById(id: String): Order? {
-        val statement = connection.prepareStatement(GET_ORDER_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            mapResultSetToOrder(resultSet)
-        } else {
-            logger.warn("Order not found with ID: $id")
-            null
+    suspend fun getOrderById(id: String): Order? =
+        connection.prepareStatement(GET_ORDER_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    mapResultSetToOrder(resultSet)
+                } else {
+                    logger.warn("Order not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun getOrdersByTableId(tableId: String): List<Order>? {
         if (!tableExists(tableId)) return null
-        val statement = connection.prepareStatement(GET_ORDERS_BY_TABLE)
-        statement.setString(1, tableId)
-        val resultSet = statement.executeQuery()
-        val orders = mutableListOf<Order>()
-        while (resultSet.next()) {
-            orders.add(mapResultSetToOrder(resultSet))
+        return connection.prepareStatement(GET_ORDERS_BY_TABLE).use { statement ->
+            statement.setString(1, tableId)
+            statement.executeQuery().use { resultSet ->
+                val orders = mutableListOf<Order>()
+                while (resultSet.next()) {
+                    orders.add(mapResultSetToOrder(resultSet))
+                }
+                logger.info("Retrieved ${orders.size} orders for table: $tableId")
+                orders
+            }
         }
-        logger.info("Retrieved ${orders.size} orders for table: $tableId")
-        return orders
     }
 
     suspend fun getOrdersByUserId(userId: String): List<Order>? {
         if (!userExists(userId)) return null
-        val statement = connection.prepareStatement(GET_ORDERS_BY_USER)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-        val orders = mutableListOf<Order>()
-        while (resultSet.next()) {
-            orders.add(mapResultSetToOrder(resultSet))
+        return connection.prepareStatement(GET_ORDERS_BY_USER).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet ->
+                val orders = mutableListOf<Order>()
+                while (resultSet.next()) {
+                    orders.add(mapResultSetToOrder(resultSet))
+                }
+                logger.info("Retrieved ${orders.size} orders for user: $userId")
+                orders
+            }
         }
-        logger.info("Retrieved ${orders.size} orders for user: $userId")
-        return orders
     }
 
     suspend fun getOrdersByStatus(status: String): List<Order>? {
@@ -160,32 +167,35 @@ class OrderService(
             return null
         }
 
-        val statement = connection.prepareStatement(GET_ORDERS_BY_STATUS)
-        statement.setString(1, status)
-        val resultSet = statement.executeQuery()
-        val orders = mutableListOf<Order>()
-        while (resultSet.next()) {
-            orders.add(mapResultSetToOrder(resultSet))
+        return connection.prepareStatement(GET_ORDERS_BY_STATUS).use { statement ->
+            statement.setString(1, status)
+            statement.executeQuery().use { resultSet ->
+                val orders = mutableListOf<Order>()
+                while (resultSet.next()) {
+                    orders.add(mapResultSetToOrder(resultSet))
+                }
+                logger.info("Retrieved ${orders.size} orders with status: $status")
+                orders
+            }
         }
-        logger.info("Retrieved ${orders.size} orders with status: $status")
-        return orders
     }
 
     suspend fun getOrdersByDateRange(
         startDate: String,
         endDate: String,
-    ): List<Order> {
-        val statement = connection.prepareStatement(GET_ORDERS_BY_DATE_RANGE)
-        statement.setString(1, startDate)
-        statement.setString(2, endDate)
-        val resultSet = statement.executeQuery()
-        val orders = mutableListOf<Order>()
-        while (resultSet.next()) {
-            orders.add(mapResultSetToOrder(resultSet))
+    ): List<Order> =
+        connection.prepareStatement(GET_ORDERS_BY_DATE_RANGE).use { statement ->
+            statement.setString(1, startDate)
+            statement.setString(2, endDate)
+            statement.executeQuery().use { resultSet ->
+                val orders = mutableListOf<Order>()
+                while (resultSet.next()) {
+                    orders.add(mapResultSetToOrder(resultSet))
+                }
+                logger.info("Retrieved ${orders.size} orders between $startDate and $endDate")
+                orders
+            }
         }
-        logger.info("Retrieved ${orders.size} orders between $startDate and $endDate")
-        return orders
-    }
 
     suspend fun updateOrder(order: Order): Boolean {
         if (order.id == null) {
@@ -209,34 +219,42 @@ class OrderService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_ORDER)
-        statement.setString(1, order.userId)
-        statement.setString(2, order.tableId)
-        statement.setString(3, orderStatus)
-        statement.setDouble(4, order.total)
-        statement.setString(5, order.id)
-
-        val rowsUpdated = statement.executeUpdate()
-        if (rowsUpdated > 0) {
-            logger.info("Order updated successfully: ${order.id}")
-        } else {
-            logger.error("Failed to update order: ${order.id}")
+        return runInTransaction(connection) {
+            val rowsUpdated =
+                connection.prepareStatement(UPDATE_ORDER).use { statement ->
+                    statement.setString(1, order.userId)
+                    statement.setString(2, order.tableId)
+                    statement.setString(3, orderStatus)
+                    statement.setDouble(4, order.total)
+                    statement.setString(5, order.id)
+                    statement.executeUpdate()
+                }
+            if (rowsUpdated > 0) {
+                logger.info("Order updated successfully: ${order.id}")
+                salesRollup.refreshOrder(order.id)
+            } else {
+                logger.error("Failed to update order: ${order.id}")
+            }
+            rowsUpdated > 0
         }
-        return rowsUpdated > 0
     }
 
-    suspend fun deleteOrder(id: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_ORDER)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
-
-        if (rowsDeleted > 0) {
-            logger.info("Order soft-deleted successfully: $id")
-        } else {
-            logger.error("Failed to delete order: $id")
+    suspend fun deleteOrder(id: String): Boolean =
+        runInTransaction(connection) {
+            val rowsDeleted =
+                connection.prepareStatement(DELETE_ORDER).use { statement ->
+                    statement.setString(1, id)
+                    statement.executeUpdate()
+                }
+
+            if (rowsDeleted > 0) {
+                logger.info("Order soft-deleted successfully: $id")
+                salesRollup.refreshOrder(id)
+            } else {
+                logger.error("Failed to delete order: $id")
+            }
+            rowsDeleted > 0
         }
-        return rowsDeleted > 0
-    }
 
     suspend fun addDishesToOrder(
         orderId: String,
@@ -5,6 +5,7 @@ import pos.ambrosia.models.Currency
 import pos.ambrosia.models.Payment
 import pos.ambrosia.models.PaymentBitcoinData
 import pos.ambrosia.models.PaymentMethod
+import pos.ambrosia.utils.runInTransaction
 import java.sql.Connection
 
 class PaymentService(
@@ -34,93 +35,93 @@ class PaymentService(
         private const val CHECK_CURRENCY_EXISTS = "SELECT id FROM currency WHERE id = ?"
     }
 
-    private fun paymentInUse(paymentId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_PAYMENT_IN_USE)
-        statement.setString(1, paymentId)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            return resultSet.getInt("count") > 0
+    private val salesRollup = SalesRollupService(connection)
+
+    private fun paymentInUse(paymentId: String): Boolean =
+        connection.prepareStatement(CHECK_PAYMENT_IN_USE).use { statement ->
+            statement.setString(1, paymentId)
+            statement.executeQuery().use { resultSet -> resultSet.next() && resultSet.getInt("count") > 0 }
         }
-        return false
-    }
 
-    private fun paymentMethodExists(methodId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_PAYMENT_METHOD_EXISTS)
-        statement.setString(1, methodId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun paymentMethodExists(methodId: String): Boolean =
+        connection.prepareStatement(CHECK_PAYMENT_METHOD_EXISTS).use { statement ->
+            statement.setString(1, methodId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun currencyExists(currencyId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_CURRENCY_EXISTS)
-        statement.setString(1, currencyId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun currencyExists(currencyId: String): Boolean =
+        connection.prepareStatement(CHECK_CURRENCY_EXISTS).use { statement ->
+            statement.setString(1, currencyId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    suspend fun getPaymentMethods(): List<PaymentMethod> {
-        val statement = connection.prepareStatement(GET_PAYMENT_METHODS)
-        val resultSet = statement.executeQuery()
-        val paymentMethods = mutableListOf<PaymentMethod>()
-        while (resultSet.next()) {
-            val paymentMethod =
-                PaymentMethod(id = resultSet.getString("id"), name = resultSet.getString("name"))
-            paymentMethods.add(paymentMethod)
+    suspend fun getPaymentMethods(): List<PaymentMethod> =
+        connection.prepareStatement(GET_PAYMENT_METHODS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val paymentMethods = mutableListOf<PaymentMethod>()
+                while (resultSet.next()) {
+                    val paymentMethod =
+                        PaymentMethod(id = resultSet.getString("id"), name = resultSet.getString("name"))
+                    paymentMethods.add(paymentMethod)
+                }
+                logger.info("Retrieved ${paymentMethods.size} payment methods")
+                paymentMethods
+            }
         }
-        logger.info("Retrieved ${paymentMethods.size} payment methods")
-        return paymentMethods
-    }
 
-    suspend fun getPaymentMethodById(id: String): PaymentMethod? {
-        val statement = connection.prepareStatement(GET_PAYMENT_METHOD_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            PaymentMethod(id = resultSet.getString("id"), name = resultSet.getString("name"))
-        } else {
-            logger.warn("Payment method not found with ID: $id")
-            null
+    suspend fun getPaymentMethodById(id: String): PaymentMethod? =
+        connection.prepareStatement(GET_PAYMENT_METHOD_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    PaymentMethod(id = resultSet.getString("id"), name = resultSet.getString("name"))
+                } else {
+                    logger.warn("Payment method not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
-    suspend fun getCurrencies(): List<Currency> {
-        val statement = connection.prepareStatement(GET_CURRENCIES)
-        val resultSet = statement.executeQuery()
-        val currencies = mutableListOf<Currency>()
-        while (resultSet.next()) {
-            val currency =
-                Currency(
-                    id = resultSet.getString("id"),
-                    acronym = resultSet.getString("acronym"),
-                    name = resultSet.getString("name"),
-                    symbol = resultSet.getString("symbol"),
-                    countryName = resultSet.getString("country_name"),
-                    countryCode = resultSet.getString("country_code"),
-                )
-            currencies.add(currency)
+    suspend fun getCurrencies(): List<Currency> =
+        connection.prepareStatement(GET_CURRENCIES).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val currencies = mutableListOf<Currency>()
+                while (resultSet.next()) {
+                    val currency =
+                        Currency(
+                            id = resultSet.getString("id"),
+                            acronym = resultSet.getString("acronym"),
+                            name = resultSet.getString("name"),
+                            symbol = resultSet.getString("symbol"),
+                            countryName = resultSet.getString("country_name"),
+                            countryCode = resultSet.getString("country_code"),
+                        )
+                    currencies.add(currency)
+                }
+                logger.info("Retrieved ${currencies.size} currencies")
+                currencies
+            }
         }
-        logger.info("Retrieved ${currencies.size} currencies")
-        return currencies
-    }
 
-    suspend fun getCurrencyById(id: String): Currency? {
-        val statement = connection.prepareStatement(GET_CURRENCY_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            Currency(
-                id = resultSet.getString("id"),
-                acronym = resultSet.getString("acronym"),
-                name = resultSet.getString("name"),
-                symbol = resultSet.getString("symbol"),
-                countryName = resultSet.getString("country_name"),
-                countryCode = resultSet.getString("country_code"),
-            )
-        } else {
-            logger.warn("Currency not found with ID: $id")
-            null
+    suspend fun getCurrencyById(id: String): Currency? =
+        connection.prepareStatement(GET_CURRENCY_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Currency(
+                        id = resultSet.getString("id"),
+                        acronym = resultSet.getString("acronym"),
+                        name = resultSet.getString("name"),
+                        symbol = resultSet.getString("symbol"),
+                        countryName = resultSet.getString("country_name"),
+                        countryCode = resultSet.getString("country_code"),
+                    )
+                } else {
+                    logger.warn("Currency not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun getExchangeRatesByPaymentHashes(hashes: List<String>): Map<String, PaymentBitcoinData> {
         if (hashes.isEmpty()) return emptyMap()
@@ -161,15 +162,15 @@ class PaymentService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_PAYMENT)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, payment.methodId)
-        statement.setString(3, payment.currencyId)
-        statement.setString(4, payment.transactionId)
-        statement.setDouble(5, payment.amount)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_PAYMENT).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, payment.methodId)
+                statement.setString(3, payment.currencyId)
+                statement.setString(4, payment.transactionId)
+                statement.setDouble(5, payment.amount)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Payment created successfully with ID: $generatedId")
@@ -180,42 +181,44 @@ class PaymentService(
         }
     }
 
-    suspend fun getPayments(): List<Payment> {
-        val statement = connection.prepareStatement(GET_PAYMENTS)
-        val resultSet = statement.executeQuery()
-        val payments = mutableListOf<Payment>()
-        while (resultSet.next()) {
-            val payment =
-                Payment(
-                    id = resultSet.getString("id"),
-                    methodId = resultSet.getString("method_id"),
-                    currencyId = resultSet.getString("currency_id"),
-                    transactionId = resultSet.getString("transaction_id"),
-                    amount = resultSet.getDouble("amount"),
-                )
-            payments.add(payment)
+    suspend fun getPayments(): List<Payment> =
+        connection.prepareStatement(GET_PAYMENTS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val payments = mutableListOf<Payment>()
+                while (resultSet.next()) {
+                    val payment =
+                        Payment(
+                            id = resultSet.getString("id"),
+                            methodId = resultSet.getString("method_id"),
+                            currencyId = resultSet.getString("currency_id"),
+                            transactionId = resultSet.getString("transaction_id"),
+                            amount = resultSet.getDouble("amount"),
+                        )
+                    payments.add(payment)
+                }
+                logger.info("Retrieved ${payments.size} payments")
+                payments
+            }
         }
-        logger.info("Retrieved ${payments.size} payments")
-        return payments
-    }
 
-    suspend fun getPaymentById(id: String): Payment? {
-        val statement = connection.prepareStatement(GET_PAYMENT_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            Payment(
-                id = resultSet.getString("id"),
-                methodId = resultSet.getString("method_id"),
-                currencyId = resultSet.getString("currency_id"),
-                transactionId = resultSet.getString("transaction_id"),
-                amount = resultSet.getDouble("amount"),
-            )
-        } else {
-            logger.warn("Payment not found with ID: $id")
-            null
+    suspend fun getPaymentById(id: String): Payment? =
+        connection.prepareStatement(GET_PAYMENT_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Payment(
+                        id = resultSet.getString("id"),
+                        methodId = resultSet.getString("method_id"),
+                        currencyId = resultSet.getString("currency_id"),
+                        transactionId = resultSet.getString("transaction_id"),
+                        amount = resultSet.getDouble("amount"),
+                    )
+                } else {
+                    logger.warn("Payment not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun updatePayment(payment: Payment): Boolean {
         if (payment.id == null) {
@@ -238,20 +241,25 @@ class PaymentService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_PAYMENT)
-        statement.setString(1, payment.methodId)
-        statement.setString(2, payment.currencyId)
-        statement.setString(3, payment.transactionId)
-        statement.setDouble(4, payment.amount)
-        statement.setString(5, payment.id)
-
-        val rowsUpdated = statement.executeUpdate()
-        if (rowsUpdated > 0) {
-            logger.info("Payment updated successfully: ${payment.id}")
-        } else {
-            logger.error("Failed to update payment: ${payment.id}")
+        return runInTransaction(connection) {
+            val rowsUpdated =
+                connection.prepareStatement(UPDATE_PAYMENT).use { statement ->
+                    statement.setString(1, payment.methodId)
+                    statement.setString(2, payment.currencyId)
+                    statement.setString(3, payment.transactionId)
+                    statement.setDouble(4, payment.amount)
+                    statement.setString(5, payment.id)
+                    statement.executeUpdate()
+                }
+            if (rowsUpdated > 0) {
+                logger.info("Payment updated successfully: ${payment.id}")
+                // The rollup is keyed by payment method, which the update may have changed
+                salesRollup.refreshPayment(payment.id)
+            } else {
+                logger.error("Failed to update payment: ${payment.id}")
+            }
+            rowsUpdated > 0
         }
-        return rowsUpdated > 0
     }
 
     suspend fun deletePayment(id: String): Boolean {
@@ -260,9 +268,11 @@ class PaymentService(
             return false
         }
 
-        val statement = connection.prepareStatement(DELETE_PAYMENT)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_PAYMENT).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Payment deleted successfully: $id")
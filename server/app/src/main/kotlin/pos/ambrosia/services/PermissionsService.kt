@@ -29,48 +29,50 @@ class PermissionsService(
         private const val SELECT_ENABLED_PERMISSION_IDS = "SELECT id FROM permissions WHERE enabled = 1"
     }
 
-    fun getAll(): List<Permission> {
-        val statement = connection.prepareStatement(SELECT_ALL)
-        val resultSet = statement.executeQuery()
-        val list = mutableListOf<Permission>()
-        while (resultSet.next()) {
-            list.add(
-                Permission(
-                    id = resultSet.getString("id"),
-                    name = resultSet.getString("name"),
-                    description = resultSet.getString("description"),
-                    enabled = resultSet.getBoolean("enabled"),
-                ),
-            )
+    fun getAll(): List<Permission> =
+        connection.prepareStatement(SELECT_ALL).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val list = mutableListOf<Permission>()
+                while (resultSet.next()) {
+                    list.add(
+                        Permission(
+                            id = resultSet.getString("id"),
+                            name = resultSet.getString("name"),
+                            description = resultSet.getString("description"),
+                            enabled = resultSet.getBoolean("enabled"),
+                        ),
+                    )
+                }
+                list
+            }
         }
-        return list
-    }
 
     fun getByRole(roleId: String?): List<Permission>? {
         if (roleId == null || !roleExists(roleId)) return null
-        val statement = connection.prepareStatement(SELECT_BY_ROLE)
-        statement.setString(1, roleId)
-        val resultSet = statement.executeQuery()
-        val list = mutableListOf<Permission>()
-        while (resultSet.next()) {
-            list.add(
-                Permission(
-                    id = resultSet.getString("id"),
-                    name = resultSet.getString("name"),
-                    description = resultSet.getString("description"),
-                    enabled = resultSet.getBoolean("enabled"),
-                ),
-            )
+        return connection.prepareStatement(SELECT_BY_ROLE).use { statement ->
+            statement.setString(1, roleId)
+            statement.executeQuery().use { resultSet ->
+                val list = mutableListOf<Permission>()
+                while (resultSet.next()) {
+                    list.add(
+                        Permission(
+                            id = resultSet.getString("id"),
+                            name = resultSet.getString("name"),
+                            description = resultSet.getString("description"),
+                            enabled = resultSet.getBoolean("enabled"),
+                        ),
+                    )
+                }
+                list
+            }
         }
-        return list
     }
 
-    fun roleExists(roleId: String): Boolean {
-        val statement = connection.prepareStatement(ROLE_EXISTS)
-        statement.setString(1, roleId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    fun roleExists(roleId: String): Boolean =
+        connection.prepareStatement(ROLE_EXISTS).use { statement ->
+            statement.setString(1, roleId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     fun replaceRolePermissions(
         roleId: String,
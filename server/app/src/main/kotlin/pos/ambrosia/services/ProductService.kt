@@ -48,26 +48,28 @@ class ProductService(
         )
     }
 
-    private fun getCategoryIds(productId: String): List<String> {
-        val statement = connection.prepareStatement(GET_CATEGORY_IDS)
-        statement.setString(1, productId)
-        val resultSet = statement.executeQuery()
-        val ids = mutableListOf<String>()
-        while (resultSet.next()) ids.add(resultSet.getString("category_id"))
-        return ids
-    }
+    private fun getCategoryIds(productId: String): List<String> =
+        connection.prepareStatement(GET_CATEGORY_IDS).use { statement ->
+            statement.setString(1, productId)
+            statement.executeQuery().use { resultSet ->
+                val ids = mutableListOf<String>()
+                while (resultSet.next()) ids.add(resultSet.getString("category_id"))
+                ids
+            }
+        }
 
     private fun insertCategories(
         productId: String,
         categoryIds: List<String>,
     ) {
-        val statement = connection.prepareStatement(INSERT_CATEGORY)
-        for (categoryId in categoryIds) {
-            statement.setString(1, productId)
-            statement.setString(2, categoryId)
-            statement.addBatch()
+        connection.prepareStatement(INSERT_CATEGORY).use { statement ->
+            for (categoryId in categoryIds) {
+                statement.setString(1, productId)
+                statement.setString(2, categoryId)
+                statement.addBatch()
+            }
+            statement.executeBatch()
         }
-        statement.executeBatch()
     }
 
     private fun normalizeSku(sku: String?): String? = sku?.takeIf { it.isNotBlank() }
@@ -97,18 +99,20 @@ class ProductService(
         val prev = connection.autoCommit
         connection.autoCommit = false
         try {
-            val statement = connection.prepareStatement(ADD_PRODUCT)
-            statement.setString(1, id)
-            statement.setString(2, normalizedSku)
-            statement.setString(3, product.name)
-            statement.setString(4, product.description)
-            statement.setString(5, product.imageUrl)
-            statement.setInt(6, product.costCents)
-            statement.setInt(7, product.quantity)
-            statement.setInt(8, product.minStockThreshold)
-            statement.setInt(9, product.maxStockThreshold)
-            statement.setInt(10, product.priceCents)
-            val rows = statement.executeUpdate()
+            val rows =
+                connection.prepareStatement(ADD_PRODUCT).use { statement ->
+                    statement.setString(1, id)
+                    statement.setString(2, normalizedSku)
+                    statement.setString(3, product.name)
+                    statement.setString(4, product.description)
+                    statement.setString(5, product.imageUrl)
+                    statement.setInt(6, product.costCents)
+                    statement.setInt(7, product.quantity)
+                    statement.setInt(8, product.minStockThreshold)
+                    statement.setInt(9, product.maxStockThreshold)
+                    statement.setInt(10, product.priceCents)
+                    statement.executeUpdate()
+                }
             if (rows == 0) {
                 connection.rollback()
                 return null
@@ -129,37 +133,38 @@ class ProductService(
         }
     }
 
-    suspend fun getProducts(): List<Product> {
-        val statement = connection.prepareStatement(GET_PRODUCTS)
-        val resultSet = statement.executeQuery()
-        val out = mutableListOf<Product>()
-        while (resultSet.next()) out.add(map(resultSet))
-        return out
-    }
+    suspend fun getProducts(): List<Product> =
+        connection.prepareStatement(GET_PRODUCTS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val out = mutableListOf<Product>()
+                while (resultSet.next()) out.add(map(resultSet))
+                out
+            }
+        }
 
-    suspend fun getProductById(id: String): Product? {
-        val statement = connection.prepareStatement(GET_PRODUCT_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) map(resultSet) else null
-    }
+    suspend fun getProductById(id: String): Product? =
+        connection.prepareStatement(GET_PRODUCT_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet -> if (resultSet.next()) map(resultSet) else null }
+        }
 
     suspend fun getProductBySKU(sku: String?): Product? {
         val normalizedSku = normalizeSku(sku) ?: return null
-        val statement = connection.prepareStatement(GET_PRODUCT_BY_SKU)
-        statement.setString(1, normalizedSku)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) map(resultSet) else null
+        return connection.prepareStatement(GET_PRODUCT_BY_SKU).use { statement ->
+            statement.setString(1, normalizedSku)
+            statement.executeQuery().use { resultSet -> if (resultSet.next()) map(resultSet) else null }
+        }
     }
 
-    suspend fun getProductsByCategory(category: String): List<Product> {
-        val statement = connection.prepareStatement(GET_PRODUCTS_BY_CATEGORY)
-        statement.setString(1, category)
-        val resultSet = statement.executeQuery()
-        val out = mutableListOf<Product>()
-        while (resultSet.next()) out.add(map(resultSet))
-        return out
-    }
+    suspend fun getProductsByCategory(category: String): List<Product> =
+        connection.prepareStatement(GET_PRODUCTS_BY_CATEGORY).use { statement ->
+            statement.setString(1, category)
+            statement.executeQuery().use { resultSet ->
+                val out = mutableListOf<Product>()
+                while (resultSet.next()) out.add(map(resultSet))
+                out
+            }
+        }
 
     suspend fun updateProduct(product: Product): Boolean {
         if (product.id == null) return false
@@ -211,10 +216,12 @@ class ProductService(
     }
 
     suspend fun deleteProduct(id: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_PRODUCT)
-        statement.setString(1, deletedSku(id))
-        statement.setString(2, id)
-        val rows = statement.executeUpdate()
+        val rows =
+            connection.prepareStatement(DELETE_PRODUCT).use { statement ->
+                statement.setString(1, deletedSku(id))
+                statement.setString(2, id)
+                statement.executeUpdate()
+            }
         if (rows > 0) logger.info("Product deleted: $id")
         return rows > 0
     }
@@ -231,21 +238,22 @@ class ProductService(
         val previousAutoCommit = connection.autoCommit
         connection.autoCommit = false
         try {
-            val statement =
-                connection.prepareStatement(
+            connection
+                .prepareStatement(
                     "UPDATE products SET quantity = quantity - ? WHERE id = ? AND is_deleted = 0 AND quantity >= ?",
-                )
-            for (adjustment in adjustments) {
-                if (adjustment.quantity == 0) continue
-                statement.setInt(1, adjustment.quantity)
-                statement.setString(2, adjustment.productId)
-                statement.setInt(3, adjustment.quantity)
-                val rows = statement.executeUpdate()
-                if (rows == 0) {
-                    connection.rollback()
-                    return false
+                ).use { statement ->
+                    for (adjustment in adjustments) {
+                        if (adjustment.quantity == 0) continue
+                        statement.setInt(1, adjustment.quantity)
+                        statement.setString(2, adjustment.productId)
+                        statement.setInt(3, adjustment.quantity)
+                        val rows = statement.executeUpdate()
+                        if (rows == 0) {
+                            connection.rollback()
+                            return false
+                        }
+                    }
                 }
-            }
             connection.commit()
             return true
         } catch (e: Exception) {
@@ -16,6 +16,20 @@ class ReportService(
     private val connection: Connection,
 ) {
     companion object {
+        private const val PRODUCT_SALES_FROM =
+            """
+            FROM order_products op
+            JOIN orders o           ON o.id  = op.order_id
+            JOIN products p         ON p.id  = op.product_id
+            JOIN users u            ON u.id  = o.user_id
+            JOIN tickets t          ON t.order_id = o.id
+            JOIN ticket_payments tp ON tp.ticket_id = t.id
+            JOIN payments pay       ON pay.id = tp.payment_id
+            JOIN payment_methods pm ON pm.id = pay.method_id
+            WHERE o.status = 'paid'
+              AND o.is_deleted = 0
+            """
+
         private const val GET_PRODUCT_SALES_BASE =
             """
             SELECT o.id AS order_id,
@@ -30,16 +44,22 @@ class ReportService(
                    pay.exchange_rate_currency,
                    pay.fiat_amount_at_payment,
                    pay.id AS payment_id
-            FROM order_products op
-            JOIN orders o           ON o.id  = op.order_id
-            JOIN products p         ON p.id  = op.product_id
-            JOIN users u            ON u.id  = o.user_id
-            JOIN tickets t          ON t.order_id = o.id
-            JOIN ticket_payments tp ON tp.ticket_id = t.id
-            JOIN payments pay       ON pay.id = tp.payment_id
-            JOIN payment_methods pm ON pm.id = pay.method_id
-            WHERE o.status = 'paid'
-              AND o.is_deleted = 0
+            $PRODUCT_SALES_FROM
+            """
+
+        private const val GET_PRODUCT_SALES_TOTALS_BASE =
+            """
+            SELECT COALESCE(SUM(op.quantity), 0) AS items_sold,
+                   COALESCE(SUM(op.price_at_order * op.quantity), 0) AS revenue_cents
+            $PRODUCT_SALES_FROM
+            """
+
+        // A payment can cover several line items, so each one is counted once
+        private const val GET_BTC_TOTAL_BASE =
+            """
+            SELECT DISTINCT pay.id, pay.satoshi_amount
+            $PRODUCT_SALES_FROM
+              AND pay.satoshi_amount IS NOT NULL
             """
 
         private const val GET_ORDERS_WITH_PAYMENTS_BASE =
@@ -66,6 +86,17 @@ class ReportService(
             WHERE o.is_deleted = 0
             """
 
+        private const val GET_ROLLUP_TOTALS_BASE =
+            """
+            SELECT COALESCE(SUM(ds.items_sold), 0) AS items_sold,
+                   COALESCE(SUM(ds.revenue_cents), 0) AS revenue_cents
+            FROM daily_sales ds
+            JOIN products p         ON p.id  = ds.product_id
+            JOIN payment_methods pm ON pm.id = ds.payment_method_id
+            WHERE ds.day >= ?
+              AND ds.day <= ?
+            """
+
         private const val GET_TOTAL_SALES_BY_DATE =
             "SELECT SUM(total) AS total_sales FROM orders WHERE DATE(created_at) = ? AND status = 'paid' AND is_deleted = 0"
     }
@@ -127,6 +158,7 @@ class ReportService(
             when (value) {
                 is String -> statement.setString(index + 1, value)
                 is Double -> statement.setDouble(index + 1, value)
+                is Int -> statement.setInt(index + 1, value)
                 else -> error("Unsupported query parameter type: ${value::class.simpleName}")
             }
         }
@@ -181,6 +213,72 @@ class ReportService(
         }
     }
 
+    // Totals over a date range come from the daily_sales rollup, which only grows with the range's days
+    private fun getRollupTotals(
+        dateRange: Pair<String, String>,
+        productName: String?,
+        userId: String?,
+        paymentMethod: String?,
+    ): Pair<Long, Int> {
+        val whereClauses = mutableListOf<String>()
+        val parameters = mutableListOf<Any>(dateRange.first, dateRange.second)
+        productName?.let {
+            whereClauses.add("p.name LIKE ?")
+            parameters.add("%$it%")
+        }
+        userId?.let {
+            whereClauses.add("ds.user_id = ?")
+            parameters.add(it)
+        }
+        paymentMethod?.let {
+            whereClauses.add("lower(pm.name) = lower(?)")
+            parameters.add(it)
+        }
+
+        val query =
+            buildString {
+                append(GET_ROLLUP_TOTALS_BASE)
+                whereClauses.forEach { append("\n  AND ").append(it) }
+            }
+
+        return sumTotals(query, parameters)
+    }
+
+    private fun sumTotals(
+        query: String,
+        parameters: List<Any>,
+    ): Pair<Long, Int> =
+        connection.prepareStatement(query).use { statement ->
+            bindQueryParameters(statement, parameters)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Pair(resultSet.getLong("revenue_cents"), resultSet.getInt("items_sold"))
+                } else {
+                    Pair(0L, 0)
+                }
+            }
+        }
+
+    private fun getBtcTotal(
+        filter: String,
+        parameters: List<Any>,
+    ): Long {
+        val query = "SELECT COALESCE(SUM(satoshi_amount), 0) AS total FROM ($GET_BTC_TOTAL_BASE$filter)"
+        return connection.prepareStatement(query).use { statement ->
+            bindQueryParameters(statement, parameters)
+            statement.executeQuery().use { resultSet -> if (resultSet.next()) resultSet.getLong("total") else 0L }
+        }
+    }
+
+    /**
+     * Paid line items matching the filters, newest first, with their totals.
+     *
+     * [limit] and [offset] page the line items; a [limit] of 0 skips them and only computes the
+     * totals. Totals always cover every matching item: when all line items were read they are summed
+     * in memory; otherwise revenue and items sold come from the `daily_sales` rollup over a date
+     * range, or from an aggregate query without one. The bitcoin total is per payment rather than
+     * per line, so a paged report sums it with its own aggregate query.
+     */
     fun getProductSalesReport(
         period: String?,
         startDate: String?,
@@ -188,6 +286,8 @@ class ReportService(
         productName: String?,
         userId: String?,
         paymentMethod: String?,
+        limit: Int? = null,
+        offset: Int = 0,
     ): ProductSalesReport {
         val dateRange = resolveDateRange(period, startDate, endDate)
 
@@ -213,37 +313,57 @@ class ReportService(
             parameters.add(it)
         }
 
-        val query =
+        val filter =
             buildString {
-                append(GET_PRODUCT_SALES_BASE)
                 if (whereClauses.isNotEmpty()) {
                     append("\n  AND ")
                     append(whereClauses.joinToString("\n  AND "))
                 }
-                append("\nORDER BY o.created_at DESC")
             }
 
         val sales = mutableListOf<ProductSaleItem>()
-        connection.prepareStatement(query).use { statement ->
-            bindQueryParameters(statement, parameters)
-            statement.executeQuery().use { resultSet ->
-                while (resultSet.next()) {
-                    sales.add(mapRowToProductSaleItem(resultSet))
+        if (limit != 0) {
+            val query =
+                buildString {
+                    append(GET_PRODUCT_SALES_BASE)
+                    append(filter)
+                    append("\nORDER BY o.created_at DESC")
+                    if (limit != null) append("\nLIMIT ? OFFSET ?")
+                }
+            val pageParameters = if (limit != null) parameters + listOf(limit, offset) else parameters
+            connection.prepareStatement(query).use { statement ->
+                bindQueryParameters(statement, pageParameters)
+                statement.executeQuery().use { resultSet ->
+                    while (resultSet.next()) {
+                        sales.add(mapRowToProductSaleItem(resultSet))
+                    }
                 }
             }
         }
 
         logger.info("Product sales report: ${sales.size} line items")
 
+        val allSales = limit == null
         val totalBtcSatoshis =
-            sales
-                .filter { it.satoshiAmount != null && it.paymentId != null }
-                .distinctBy { it.paymentId }
-                .sumOf { it.satoshiAmount!! }
+            if (allSales) {
+                sales
+                    .filter { it.satoshiAmount != null && it.paymentId != null }
+                    .distinctBy { it.paymentId }
+                    .sumOf { it.satoshiAmount!! }
+            } else {
+                getBtcTotal(filter, parameters)
+            }
+
+        val (totalRevenueCents, totalItemsSold) =
+            when {
+                allSales -> Pair(sales.sumOf { it.priceAtOrder.toLong() * it.quantity }, sales.sumOf { it.quantity })
+                dateRange != null -> getRollupTotals(dateRange, productName, userId, paymentMethod)
+                else -> sumTotals(GET_PRODUCT_SALES_TOTALS_BASE + filter, parameters)
+            }
 
         return ProductSalesReport(
-            totalRevenueCents = sales.sumOf { it.priceAtOrder.toLong() * it.quantity },
-            totalItemsSold = sales.sumOf { it.quantity },
+            totalRevenueCents = totalRevenueCents,
+            totalItemsSold = totalItemsSold,
             sales = sales,
             totalBtcSatoshis = totalBtcSatoshis,
         )
@@ -321,27 +441,26 @@ class ReportService(
                 append(orderDirection)
             }
 
-        val statement = connection.prepareStatement(query)
-        bindQueryParameters(statement, parameters)
-
-        val resultSet = statement.executeQuery()
         val orders = mutableListOf<OrderWithPayment>()
-        while (resultSet.next()) {
-            orders.add(mapResultSetToOrderWithPayment(resultSet))
+        connection.prepareStatement(query).use { statement ->
+            bindQueryParameters(statement, parameters)
+            statement.executeQuery().use { resultSet ->
+                while (resultSet.next()) {
+                    orders.add(mapResultSetToOrderWithPayment(resultSet))
+                }
+            }
         }
         logger.info("Retrieved ${orders.size} orders with payments using filters: $filters")
         return orders
     }
 
     suspend fun getTotalSalesByDate(date: String): Double {
-        val statement = connection.prepareStatement(GET_TOTAL_SALES_BY_DATE)
-        statement.setString(1, date)
-        val resultSet = statement.executeQuery()
         val total =
-            if (resultSet.next()) {
-                resultSet.getDouble("total_sales")
-            } else {
-                0.0
+            connection.prepareStatement(GET_TOTAL_SALES_BY_DATE).use { statement ->
+                statement.setString(1, date)
+                statement.executeQuery().use { resultSet ->
+                    if (resultSet.next()) resultSet.getDouble("total_sales") else 0.0
+                }
             }
 
         logger.info("Total sales for $date: $total")
@@ -38,21 +38,21 @@ class RolesService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_ROLE)
-
-        val encryptedPin =
-            SecurePinProcessor.hashPinForStorage(
-                pin = role.password?.toCharArray() ?: charArrayOf(),
-                id = generatedId,
-                env = env,
-            )
-
-        statement.setString(1, generatedId)
-        statement.setString(2, role.role)
-        statement.setString(3, SecurePinProcessor.byteArrayToBase64(encryptedPin))
-        statement.setBoolean(4, role.isAdmin ?: false)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_ROLE).use { statement ->
+                val encryptedPin =
+                    SecurePinProcessor.hashPinForStorage(
+                        pin = role.password?.toCharArray() ?: charArrayOf(),
+                        id = generatedId,
+                        env = env,
+                    )
+
+                statement.setString(1, generatedId)
+                statement.setString(2, role.role)
+                statement.setString(3, SecurePinProcessor.byteArrayToBase64(encryptedPin))
+                statement.setBoolean(4, role.isAdmin ?: false)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Role created successfully with ID: $generatedId")
@@ -63,46 +63,47 @@ class RolesService(
         }
     }
 
-    private suspend fun roleNameExists(roleName: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_ROLE_NAME_EXISTS)
-        statement.setString(1, roleName)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private suspend fun roleNameExists(roleName: String): Boolean =
+        connection.prepareStatement(CHECK_ROLE_NAME_EXISTS).use { statement ->
+            statement.setString(1, roleName)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    suspend fun getRoles(): List<Role> {
-        val statement = connection.prepareStatement(GET_ROLES)
-        val resultSet = statement.executeQuery()
-        val roles = mutableListOf<Role>()
-        while (resultSet.next()) {
-            val role =
-                Role(
-                    id = resultSet.getString("id"),
-                    role = resultSet.getString("role"),
-                    password = "********", // Masked for security
-                    isAdmin = resultSet.getBoolean("isAdmin"),
-                )
-            roles.add(role)
+    suspend fun getRoles(): List<Role> =
+        connection.prepareStatement(GET_ROLES).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val roles = mutableListOf<Role>()
+                while (resultSet.next()) {
+                    val role =
+                        Role(
+                            id = resultSet.getString("id"),
+                            role = resultSet.getString("role"),
+                            password = "********", // Masked for security
+                            isAdmin = resultSet.getBoolean("isAdmin"),
+                        )
+                    roles.add(role)
+                }
+                logger.info("Retrieved ${roles.size} roles")
+                roles
+            }
         }
-        logger.info("Retrieved ${roles.size} roles")
-        return roles
-    }
 
-    suspend fun getRoleById(id: String): Role? {
-        val statement = connection.prepareStatement(GET_ROLE_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            Role(
-                id = resultSet.getString("id"),
-                role = resultSet.getString("role"),
-                isAdmin = resultSet.getBoolean("isAdmin"),
-            )
-        } else {
-            logger.warn("Role not found with ID: $id")
-            null
+    suspend fun getRoleById(id: String): Role? =
+        connection.prepareStatement(GET_ROLE_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Role(
+                        id = resultSet.getString("id"),
+                        role = resultSet.getString("role"),
+                        isAdmin = resultSet.getBoolean("isAdmin"),
+                    )
+                } else {
+                    logger.warn("Role not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun updateRole(
         id: String?,
@@ -121,17 +122,17 @@ class RolesService(
         }
         ensureRoleAdminInvariant(id, role.isAdmin ?: false)
 
-        val statement = connection.prepareStatement(sql.toString())
-
-        statement.setString(1, role.role)
-        statement.setBoolean(2, role.isAdmin ?: false)
-        if (role.password != null) {
-            val encryptedPin = SecurePinProcessor.hashPinForStorage(role.password.toCharArray(), id, env)
-            statement.setString(3, SecurePinProcessor.byteArrayToBase64(encryptedPin))
-        }
-        statement.setString(role.password?.let { 4 } ?: 3, id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(sql.toString()).use { statement ->
+                statement.setString(1, role.role)
+                statement.setBoolean(2, role.isAdmin ?: false)
+                if (role.password != null) {
+                    val encryptedPin = SecurePinProcessor.hashPinForStorage(role.password.toCharArray(), id, env)
+                    statement.setString(3, SecurePinProcessor.byteArrayToBase64(encryptedPin))
+                }
+                statement.setString(role.password?.let { 4 } ?: 3, id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Role updated successfully: ${role.id}")
         } else {
@@ -143,28 +144,29 @@ class RolesService(
     private suspend fun roleNameExistsExcludingId(
         roleName: String,
         excludeId: String,
-    ): Boolean {
-        val statement =
-            connection.prepareStatement(
-                "SELECT id FROM roles WHERE role = ? AND id != ? AND is_deleted = 0",
-            )
-        statement.setString(1, roleName)
-        statement.setString(2, excludeId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    ): Boolean =
+        connection.prepareStatement(
+            "SELECT id FROM roles WHERE role = ? AND id != ? AND is_deleted = 0",
+        ).use { statement ->
+            statement.setString(1, roleName)
+            statement.setString(2, excludeId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     suspend fun deleteRole(id: String): Boolean {
         ensureRoleDeletionKeepsAdmin(id)
 
-        val unassignStmt = connection.prepareStatement(UNASSIGN_ROLE_FROM_USERS)
-        unassignStmt.setString(1, id)
-        unassignStmt.executeUpdate()
+        connection.prepareStatement(UNASSIGN_ROLE_FROM_USERS).use { statement ->
+            statement.setString(1, id)
+            statement.executeUpdate()
+        }
 
-        val statement = connection.prepareStatement(DELETE_ROLE)
-        statement.setString(1, "DELETED-$id")
-        statement.setString(2, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_ROLE).use { statement ->
+                statement.setString(1, "DELETED-$id")
+                statement.setString(2, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Role soft-deleted successfully: $id")
@@ -174,18 +176,13 @@ class RolesService(
         return rowsDeleted > 0
     }
 
-    private suspend fun roleInUse(roleId: String): Boolean {
-        val statement =
-            connection.prepareStatement(
-                "SELECT COUNT(*) as count FROM users WHERE role_id = ? AND is_deleted = 0",
-            )
-        statement.setString(1, roleId)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            return resultSet.getInt("count") > 0
+    private suspend fun roleInUse(roleId: String): Boolean =
+        connection.prepareStatement(
+            "SELECT COUNT(*) as count FROM users WHERE role_id = ? AND is_deleted = 0",
+        ).use { statement ->
+            statement.setString(1, roleId)
+            statement.executeQuery().use { resultSet -> resultSet.next() && resultSet.getInt("count") > 0 }
         }
-        return false
-    }
 
     private fun ensureRoleDeletionKeepsAdmin(roleId: String) {
         val currentIsAdmin = adminGuard.isRoleAdmin(roleId) ?: return
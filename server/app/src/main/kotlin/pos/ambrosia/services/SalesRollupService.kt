@@ -0,0 +1,147 @@
+package pos.ambrosia.services
+
+import pos.ambrosia.logger
+import java.sql.Connection
+
+/**
+ * Maintains `daily_sales`, the paid sales per day, product, user and payment method that
+ * `/reports` totals are read from.
+ *
+ * A store checkout adds its lines directly inside its own transaction. Everything else that can
+ * change what counts as a paid sale (linking or unlinking a ticket payment, changing a payment's
+ * method, moving or deleting a ticket, changing or deleting an order) recomputes the affected days
+ * from the order tables, so the rollup never drifts from
+ * them. [rebuild] recomputes every day and is what the `--rebuild-sales-rollup` command runs.
+ *
+ * Nothing here opens or commits a transaction: every refresh runs inside the transaction of the
+ * change that made it necessary, on the connection that change runs on (the pool's writer, under
+ * `pool.write`), so a change and its rollup update commit or roll back together.
+ */
+class SalesRollupService(
+    private val connection: Connection,
+) {
+    companion object {
+        private const val INSERT_ROLLUP =
+            "INSERT INTO daily_sales (day, product_id, user_id, payment_method_id, items_sold, revenue_cents)"
+
+        // Same joins and filters as the /reports line items, so totals match the listed sales
+        private const val SELECT_PAID_SALES =
+            """
+            SELECT date(o.created_at), op.product_id, o.user_id, pay.method_id, SUM(op.quantity), SUM(op.price_at_order * op.quantity)
+            FROM order_products op
+            JOIN orders o           ON o.id  = op.order_id
+            JOIN products p         ON p.id  = op.product_id
+            JOIN users u            ON u.id  = o.user_id
+            JOIN tickets t          ON t.order_id = o.id
+            JOIN ticket_payments tp ON tp.ticket_id = t.id
+            JOIN payments pay       ON pay.id = tp.payment_id
+            JOIN payment_methods pm ON pm.id = pay.method_id
+            WHERE o.status = 'paid'
+              AND o.is_deleted = 0
+            """
+        private const val GROUP_BY_KEY = "GROUP BY date(o.created_at), op.product_id, o.user_id, pay.method_id"
+
+        private const val REBUILD = "$INSERT_ROLLUP $SELECT_PAID_SALES $GROUP_BY_KEY"
+        private const val REFRESH_DAY = "$INSERT_ROLLUP $SELECT_PAID_SALES AND date(o.created_at) = ? $GROUP_BY_KEY"
+        private const val DELETE_ALL = "DELETE FROM daily_sales"
+        private const val DELETE_DAY = "DELETE FROM daily_sales WHERE day = ?"
+        private const val GET_ORDER_DAY = "SELECT date(created_at) AS day FROM orders WHERE id = ?"
+        private const val GET_TICKET_DAY =
+            "SELECT date(o.created_at) AS day FROM tickets t JOIN orders o ON o.id = t.order_id WHERE t.id = ?"
+        private const val GET_PAYMENT_DAYS =
+            """
+            SELECT DISTINCT date(o.created_at) AS day
+            FROM ticket_payments tp
+            JOIN tickets t ON t.id = tp.ticket_id
+            JOIN orders o  ON o.id = t.order_id
+            WHERE tp.payment_id = ?
+            """
+        private const val ADD_CHECKOUT_LINE =
+            """
+            INSERT INTO daily_sales (day, product_id, user_id, payment_method_id, items_sold, revenue_cents)
+            SELECT date(created_at), ?, user_id, ?, ?, ? FROM orders WHERE id = ?
+            ON CONFLICT (day, product_id, user_id, payment_method_id) DO UPDATE SET
+                items_sold = items_sold + excluded.items_sold,
+                revenue_cents = revenue_cents + excluded.revenue_cents
+            """
+    }
+
+    private fun dayOf(
+        query: String,
+        id: String,
+    ): String? =
+        connection.prepareStatement(query).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) resultSet.getString("day") else null
+            }
+        }
+
+    private fun requireTransaction() {
+        check(!connection.autoCommit) { "daily_sales must be updated inside the caller's transaction" }
+    }
+
+    /** Adds one line of a store checkout; must run in the checkout's transaction, after its order is inserted. */
+    fun addCheckoutLine(
+        orderId: String,
+        productId: String,
+        paymentMethodId: String,
+        quantity: Int,
+        priceAtOrder: Int,
+    ) {
+        connection.prepareStatement(ADD_CHECKOUT_LINE).use { statement ->
+            statement.setString(1, productId)
+            statement.setString(2, paymentMethodId)
+            statement.setInt(3, quantity)
+            statement.setLong(4, priceAtOrder.toLong() * quantity)
+            statement.setString(5, orderId)
+            statement.executeUpdate()
+        }
+    }
+
+    fun refreshDay(day: String) {
+        requireTransaction()
+        connection.prepareStatement(DELETE_DAY).use { statement ->
+            statement.setString(1, day)
+            statement.executeUpdate()
+        }
+        connection.prepareStatement(REFRESH_DAY).use { statement ->
+            statement.setString(1, day)
+            statement.executeUpdate()
+        }
+    }
+
+    fun refreshOrder(orderId: String) {
+        dayOf(GET_ORDER_DAY, orderId)?.let { refreshDay(it) }
+    }
+
+    /** The day the ticket's sales count towards, or null if it has no order; read it before moving or deleting a ticket. */
+    fun ticketDay(ticketId: String): String? = dayOf(GET_TICKET_DAY, ticketId)
+
+    fun refreshTicket(ticketId: String) {
+        ticketDay(ticketId)?.let { refreshDay(it) }
+    }
+
+    /** Recomputes every day with a ticket paid by the payment, e.g. after its method changes. */
+    fun refreshPayment(paymentId: String) {
+        val days =
+            connection.prepareStatement(GET_PAYMENT_DAYS).use { statement ->
+                statement.setString(1, paymentId)
+                statement.executeQuery().use { resultSet ->
+                    val days = mutableListOf<String>()
+                    while (resultSet.next()) days.add(resultSet.getString("day"))
+                    days
+                }
+            }
+        days.forEach { refreshDay(it) }
+    }
+
+    /** Recomputes the whole rollup from the order tables and returns the number of rows written. */
+    fun rebuild(): Int {
+        requireTransaction()
+        connection.prepareStatement(DELETE_ALL).use { it.executeUpdate() }
+        val rows = connection.prepareStatement(REBUILD).use { it.executeUpdate() }
+        logger.info("Rebuilt daily sales rollup: $rows rows")
+        return rows
+    }
+}
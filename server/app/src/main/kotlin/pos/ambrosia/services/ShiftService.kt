@@ -32,12 +32,11 @@ class ShiftService(
             "UPDATE shifts SET end_time = ?, final_amount = ?, difference = ? WHERE id = ? AND is_deleted = 0 AND end_time IS NULL"
     }
 
-    private fun userExists(userId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_USER_EXISTS)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun userExists(userId: String): Boolean =
+        connection.prepareStatement(CHECK_USER_EXISTS).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     suspend fun addShift(shift: Shift): String? {
         val existingOpen = getOpenShift(null)
@@ -54,17 +53,17 @@ class ShiftService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_SHIFT)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, shift.userId)
-        statement.setString(3, shift.shiftDate)
-        statement.setString(4, shift.startTime)
-        statement.setString(5, shift.endTime)
-        statement.setString(6, shift.notes)
-        statement.setDouble(7, shift.initialAmount)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_SHIFT).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, shift.userId)
+                statement.setString(3, shift.shiftDate)
+                statement.setString(4, shift.startTime)
+                statement.setString(5, shift.endTime)
+                statement.setString(6, shift.notes)
+                statement.setDouble(7, shift.initialAmount)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Shift created successfully with ID: $generatedId")
@@ -75,142 +74,144 @@ class ShiftService(
         }
     }
 
-    suspend fun getShifts(): List<Shift> {
-        val statement = connection.prepareStatement(GET_SHIFTS)
-        val resultSet = statement.executeQuery()
-        val shifts = mutableListOf<Shift>()
-        while (resultSet.next()) {
-            val finalAmt = resultSet.getDouble("final_amount")
-            val isFinalNull = resultSet.wasNull()
-            val diffAmt = resultSet.getDouble("difference")
-            val isDiffNull = resultSet.wasNull()
-            val shift =
-                Shift(
-                    id = resultSet.getString("id"),
-                    userId = resultSet.getString("user_id"),
-                    shiftDate = resultSet.getString("shift_date"),
-                    startTime = resultSet.getString("start_time"),
-                    endTime = resultSet.getString("end_time"),
-                    notes = resultSet.getString("notes"),
-                    initialAmount = resultSet.getDouble("initial_amount"),
-                    finalAmount = if (isFinalNull) null else finalAmt,
-                    difference = if (isDiffNull) null else diffAmt,
-                )
-            shifts.add(shift)
+    suspend fun getShifts(): List<Shift> =
+        connection.prepareStatement(GET_SHIFTS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val shifts = mutableListOf<Shift>()
+                while (resultSet.next()) {
+                    val finalAmt = resultSet.getDouble("final_amount")
+                    val isFinalNull = resultSet.wasNull()
+                    val diffAmt = resultSet.getDouble("difference")
+                    val isDiffNull = resultSet.wasNull()
+                    val shift =
+                        Shift(
+                            id = resultSet.getString("id"),
+                            userId = resultSet.getString("user_id"),
+                            shiftDate = resultSet.getString("shift_date"),
+                            startTime = resultSet.getString("start_time"),
+                            endTime = resultSet.getString("end_time"),
+                            notes = resultSet.getString("notes"),
+                            initialAmount = resultSet.getDouble("initial_amount"),
+                            finalAmount = if (isFinalNull) null else finalAmt,
+                            difference = if (isDiffNull) null else diffAmt,
+                        )
+                    shifts.add(shift)
+                }
+                logger.info("Retrieved ${shifts.size} shifts")
+                shifts
+            }
         }
-        logger.info("Retrieved ${shifts.size} shifts")
-        return shifts
-    }
 
-    suspend fun getShiftById(id: String): Shift? {
-        val statement = connection.prepareStatement(GET_SHIFT_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            val finalAmt = resultSet.getDouble("final_amount")
-            val isFinalNull = resultSet.wasNull()
-            val diffAmt = resultSet.getDouble("difference")
-            val isDiffNull = resultSet.wasNull()
-            Shift(
-                id = resultSet.getString("id"),
-                userId = resultSet.getString("user_id"),
-                shiftDate = resultSet.getString("shift_date"),
-                startTime = resultSet.getString("start_time"),
-                endTime = resultSet.getString("end_time"),
-                notes = resultSet.getString("notes"),
-                initialAmount = resultSet.getDouble("initial_amount"),
-                finalAmount = if (isFinalNull) null else finalAmt,
-                difference = if (isDiffNull) null else diffAmt,
-            )
-        } else {
-            logger.warn("Shift not found with ID: $id")
-            null
+    suspend fun getShiftById(id: String): Shift? =
+        connection.prepareStatement(GET_SHIFT_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    val finalAmt = resultSet.getDouble("final_amount")
+                    val isFinalNull = resultSet.wasNull()
+                    val diffAmt = resultSet.getDouble("difference")
+                    val isDiffNull = resultSet.wasNull()
+                    Shift(
+                        id = resultSet.getString("id"),
+                        userId = resultSet.getString("user_id"),
+                        shiftDate = resultSet.getString("shift_date"),
+                        startTime = resultSet.getString("start_time"),
+                        endTime = resultSet.getString("end_time"),
+                        notes = resultSet.getString("notes"),
+                        initialAmount = resultSet.getDouble("initial_amount"),
+                        finalAmount = if (isFinalNull) null else finalAmt,
+                        difference = if (isDiffNull) null else diffAmt,
+                    )
+                } else {
+                    logger.warn("Shift not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
-    suspend fun getShiftsByUser(userId: String): List<Shift> {
-        val statement = connection.prepareStatement(GET_SHIFTS_BY_USER)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-        val shifts = mutableListOf<Shift>()
-        while (resultSet.next()) {
-            val finalAmt = resultSet.getDouble("final_amount")
-            val isFinalNull = resultSet.wasNull()
-            val diffAmt = resultSet.getDouble("difference")
-            val isDiffNull = resultSet.wasNull()
-            val shift =
-                Shift(
-                    id = resultSet.getString("id"),
-                    userId = resultSet.getString("user_id"),
-                    shiftDate = resultSet.getString("shift_date"),
-                    startTime = resultSet.getString("start_time"),
-                    endTime = resultSet.getString("end_time"),
-                    notes = resultSet.getString("notes"),
-                    initialAmount = resultSet.getDouble("initial_amount"),
-                    finalAmount = if (isFinalNull) null else finalAmt,
-                    difference = if (isDiffNull) null else diffAmt,
-                )
-            shifts.add(shift)
+    suspend fun getShiftsByUser(userId: String): List<Shift> =
+        connection.prepareStatement(GET_SHIFTS_BY_USER).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet ->
+                val shifts = mutableListOf<Shift>()
+                while (resultSet.next()) {
+                    val finalAmt = resultSet.getDouble("final_amount")
+                    val isFinalNull = resultSet.wasNull()
+                    val diffAmt = resultSet.getDouble("difference")
+                    val isDiffNull = resultSet.wasNull()
+                    val shift =
+                        Shift(
+                            id = resultSet.getString("id"),
+                            userId = resultSet.getString("user_id"),
+                            shiftDate = resultSet.getString("shift_date"),
+                            startTime = resultSet.getString("start_time"),
+                            endTime = resultSet.getString("end_time"),
+                            notes = resultSet.getString("notes"),
+                            initialAmount = resultSet.getDouble("initial_amount"),
+                            finalAmount = if (isFinalNull) null else finalAmt,
+                            difference = if (isDiffNull) null else diffAmt,
+                        )
+                    shifts.add(shift)
+                }
+                logger.info("Retrieved ${shifts.size} shifts for user: $userId")
+                shifts
+            }
         }
-        logger.info("Retrieved ${shifts.size} shifts for user: $userId")
-        return shifts
-    }
 
-    suspend fun getShiftsByDate(date: String): List<Shift> {
-        val statement = connection.prepareStatement(GET_SHIFTS_BY_DATE)
-        statement.setString(1, date)
-        val resultSet = statement.executeQuery()
-        val shifts = mutableListOf<Shift>()
-        while (resultSet.next()) {
-            val finalAmt = resultSet.getDouble("final_amount")
-            val isFinalNull = resultSet.wasNull()
-            val diffAmt = resultSet.getDouble("difference")
-            val isDiffNull = resultSet.wasNull()
-            val shift =
-                Shift(
-                    id = resultSet.getString("id"),
-                    userId = resultSet.getString("user_id"),
-                    shiftDate = resultSet.getString("shift_date"),
-                    startTime = resultSet.getString("start_time"),
-                    endTime = resultSet.getString("end_time"),
-                    notes = resultSet.getString("notes"),
-                    initialAmount = resultSet.getDouble("initial_amount"),
-                    finalAmount = if (isFinalNull) null else finalAmt,
-                    difference = if (isDiffNull) null else diffAmt,
-                )
-            shifts.add(shift)
+    suspend fun getShiftsByDate(date: String): List<Shift> =
+        connection.prepareStatement(GET_SHIFTS_BY_DATE).use { statement ->
+            statement.setString(1, date)
+            statement.executeQuery().use { resultSet ->
+                val shifts = mutableListOf<Shift>()
+                while (resultSet.next()) {
+                    val finalAmt = resultSet.getDouble("final_amount")
+                    val isFinalNull = resultSet.wasNull()
+                    val diffAmt = resultSet.getDouble("difference")
+                    val isDiffNull = resultSet.wasNull()
+                    val shift =
+                        Shift(
+                            id = resultSet.getString("id"),
+                            userId = resultSet.getString("user_id"),
+                            shiftDate = resultSet.getString("shift_date"),
+                            startTime = resultSet.getString("start_time"),
+                            endTime = resultSet.getString("end_time"),
+                            notes = resultSet.getString("notes"),
+                            initialAmount = resultSet.getDouble("initial_amount"),
+                            finalAmount = if (isFinalNull) null else finalAmt,
+                            difference = if (isDiffNull) null else diffAmt,
+                        )
+                    shifts.add(shift)
+                }
+                logger.info("Retrieved ${shifts.size} shifts for date: $date")
+                shifts
+            }
         }
-        logger.info("Retrieved ${shifts.size} shifts for date: $date")
-        return shifts
-    }
 
     suspend fun getOpenShift(userId: String? = null): Shift? {
-        val statement =
-            if (userId != null) {
-                connection.prepareStatement(GET_OPEN_SHIFT_BY_USER).also { it.setString(1, userId) }
-            } else {
-                connection.prepareStatement(GET_OPEN_SHIFT)
+        val query = if (userId != null) GET_OPEN_SHIFT_BY_USER else GET_OPEN_SHIFT
+        return connection.prepareStatement(query).use { statement ->
+            if (userId != null) statement.setString(1, userId)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    val finalAmt = resultSet.getDouble("final_amount")
+                    val isFinalNull = resultSet.wasNull()
+                    val diffAmt = resultSet.getDouble("difference")
+                    val isDiffNull = resultSet.wasNull()
+                    Shift(
+                        id = resultSet.getString("id"),
+                        userId = resultSet.getString("user_id"),
+                        shiftDate = resultSet.getString("shift_date"),
+                        startTime = resultSet.getString("start_time"),
+                        endTime = resultSet.getString("end_time"),
+                        notes = resultSet.getString("notes"),
+                        initialAmount = resultSet.getDouble("initial_amount"),
+                        finalAmount = if (isFinalNull) null else finalAmt,
+                        difference = if (isDiffNull) null else diffAmt,
+                    )
+                } else {
+                    null
+                }
             }
-
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            val finalAmt = resultSet.getDouble("final_amount")
-            val isFinalNull = resultSet.wasNull()
-            val diffAmt = resultSet.getDouble("difference")
-            val isDiffNull = resultSet.wasNull()
-            Shift(
-                id = resultSet.getString("id"),
-                userId = resultSet.getString("user_id"),
-                shiftDate = resultSet.getString("shift_date"),
-                startTime = resultSet.getString("start_time"),
-                endTime = resultSet.getString("end_time"),
-                notes = resultSet.getString("notes"),
-                initialAmount = resultSet.getDouble("initial_amount"),
-                finalAmount = if (isFinalNull) null else finalAmt,
-                difference = if (isDiffNull) null else diffAmt,
-            )
-        } else {
-            null
         }
     }
 
@@ -225,15 +226,16 @@ class ShiftService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_SHIFT)
-        statement.setString(1, shift.userId)
-        statement.setString(2, shift.shiftDate)
-        statement.setString(3, shift.startTime)
-        statement.setString(4, shift.endTime)
-        statement.setString(5, shift.notes)
-        statement.setString(6, shift.id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_SHIFT).use { statement ->
+                statement.setString(1, shift.userId)
+                statement.setString(2, shift.shiftDate)
+                statement.setString(3, shift.startTime)
+                statement.setString(4, shift.endTime)
+                statement.setString(5, shift.notes)
+                statement.setString(6, shift.id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Shift updated successfully: ${shift.id}")
         } else {
@@ -243,9 +245,11 @@ class ShiftService(
     }
 
     suspend fun deleteShift(id: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_SHIFT)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_SHIFT).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Shift soft-deleted successfully: $id")
@@ -261,21 +265,22 @@ class ShiftService(
         difference: Double? = null,
     ): Boolean {
         val now = LocalTime.now().format(DateTimeFormatter.ofPattern("HH:mm:ss"))
-        val statement = connection.prepareStatement(CLOSE_SHIFT)
-        statement.setString(1, now)
-        if (finalAmount != null) {
-            statement.setDouble(2, finalAmount)
-        } else {
-            statement.setNull(2, java.sql.Types.REAL)
-        }
-        if (difference != null) {
-            statement.setDouble(3, difference)
-        } else {
-            statement.setNull(3, java.sql.Types.REAL)
-        }
-        statement.setString(4, id)
-
-        val rows = statement.executeUpdate()
+        val rows =
+            connection.prepareStatement(CLOSE_SHIFT).use { statement ->
+                statement.setString(1, now)
+                if (finalAmount != null) {
+                    statement.setDouble(2, finalAmount)
+                } else {
+                    statement.setNull(2, java.sql.Types.REAL)
+                }
+                if (difference != null) {
+                    statement.setDouble(3, difference)
+                } else {
+                    statement.setNull(3, java.sql.Types.REAL)
+                }
+                statement.setString(4, id)
+                statement.executeUpdate()
+            }
         if (rows > 0) {
             logger.info("Shift closed successfully: $id at $now")
         } else {
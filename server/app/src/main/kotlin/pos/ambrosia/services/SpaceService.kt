@@ -20,36 +20,29 @@ class SpaceService(
             "SELECT COUNT(*) as count FROM tables WHERE space_id = ? AND is_deleted = 0"
     }
 
-    private fun spaceNameExists(spaceName: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_SPACE_NAME_EXISTS)
-        statement.setString(1, spaceName)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun spaceNameExists(spaceName: String): Boolean =
+        connection.prepareStatement(CHECK_SPACE_NAME_EXISTS).use { statement ->
+            statement.setString(1, spaceName)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun spaceNameExistsExcludingId(
         spaceName: String,
         excludeId: String,
-    ): Boolean {
-        val statement =
-            connection.prepareStatement(
-                "SELECT id FROM spaces WHERE name = ? AND id != ? AND is_deleted = 0",
-            )
-        statement.setString(1, spaceName)
-        statement.setString(2, excludeId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    ): Boolean =
+        connection.prepareStatement(
+            "SELECT id FROM spaces WHERE name = ? AND id != ? AND is_deleted = 0",
+        ).use { statement ->
+            statement.setString(1, spaceName)
+            statement.setString(2, excludeId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun spaceInUse(spaceId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_SPACE_IN_USE)
-        statement.setString(1, spaceId)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            return resultSet.getInt("count") > 0
+    private fun spaceInUse(spaceId: String): Boolean =
+        connection.prepareStatement(CHECK_SPACE_IN_USE).use { statement ->
+            statement.setString(1, spaceId)
+            statement.executeQuery().use { resultSet -> resultSet.next() && resultSet.getInt("count") > 0 }
         }
-        return false
-    }
 
     suspend fun addSpace(space: Space): String? {
         // Verificar que el nombre del espacio no exista ya
@@ -62,12 +55,12 @@ class SpaceService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_SPACE)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, space.name)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_SPACE).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, space.name)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Space created successfully with ID: $generatedId")
@@ -78,29 +71,31 @@ class SpaceService(
         }
     }
 
-    suspend fun getSpaces(): List<Space> {
-        val statement = connection.prepareStatement(GET_SPACES)
-        val resultSet = statement.executeQuery()
-        val spaces = mutableListOf<Space>()
-        while (resultSet.next()) {
-            val space = Space(id = resultSet.getString("id"), name = resultSet.getString("name"))
-            spaces.add(space)
+    suspend fun getSpaces(): List<Space> =
+        connection.prepareStatement(GET_SPACES).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val spaces = mutableListOf<Space>()
+                while (resultSet.next()) {
+                    val space = Space(id = resultSet.getString("id"), name = resultSet.getString("name"))
+                    spaces.add(space)
+                }
+                logger.info("Retrieved ${spaces.size} spaces")
+                spaces
+            }
         }
-        logger.info("Retrieved ${spaces.size} spaces")
-        return spaces
-    }
 
-    suspend fun getSpaceById(id: String): Space? {
-        val statement = connection.prepareStatement(GET_SPACE_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            Space(id = resultSet.getString("id"), name = resultSet.getString("name"))
-        } else {
-            logger.warn("Space not found with ID: $id")
-            null
+    suspend fun getSpaceById(id: String): Space? =
+        connection.prepareStatement(GET_SPACE_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Space(id = resultSet.getString("id"), name = resultSet.getString("name"))
+                } else {
+                    logger.warn("Space not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun updateSpace(space: Space): Boolean {
         if (space.id == null) {
@@ -114,11 +109,12 @@ class SpaceService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_SPACE)
-        statement.setString(1, space.name)
-        statement.setString(2, space.id) // CORREGIDO: era setString(3, ...)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_SPACE).use { statement ->
+                statement.setString(1, space.name)
+                statement.setString(2, space.id) // CORREGIDO: era setString(3, ...)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Space updated successfully: ${space.id}")
         } else {
@@ -134,9 +130,11 @@ class SpaceService(
             return false
         }
 
-        val statement = connection.prepareStatement(DELETE_SPACE)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_SPACE).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Space soft-deleted successfully: $id")
@@ -23,36 +23,29 @@ class SupplierService(
             "SELECT COUNT(*) as count FROM ingredient_suppliers WHERE id_supplier = ?"
     }
 
-    private fun supplierNameExists(supplierName: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_SUPPLIER_NAME_EXISTS)
-        statement.setString(1, supplierName)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun supplierNameExists(supplierName: String): Boolean =
+        connection.prepareStatement(CHECK_SUPPLIER_NAME_EXISTS).use { statement ->
+            statement.setString(1, supplierName)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun supplierNameExistsExcludingId(
         supplierName: String,
         excludeId: String,
-    ): Boolean {
-        val statement =
-            connection.prepareStatement(
-                "SELECT id FROM suppliers WHERE name = ? AND id != ? AND is_deleted = 0",
-            )
-        statement.setString(1, supplierName)
-        statement.setString(2, excludeId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    ): Boolean =
+        connection.prepareStatement(
+            "SELECT id FROM suppliers WHERE name = ? AND id != ? AND is_deleted = 0",
+        ).use { statement ->
+            statement.setString(1, supplierName)
+            statement.setString(2, excludeId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun supplierInUse(supplierId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_SUPPLIER_IN_USE)
-        statement.setString(1, supplierId)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            return resultSet.getInt("count") > 0
+    private fun supplierInUse(supplierId: String): Boolean =
+        connection.prepareStatement(CHECK_SUPPLIER_IN_USE).use { statement ->
+            statement.setString(1, supplierId)
+            statement.executeQuery().use { resultSet -> resultSet.next() && resultSet.getInt("count") > 0 }
         }
-        return false
-    }
 
     suspend fun addSupplier(supplier: Supplier): String? {
         // Verificar que el nombre del proveedor no exista ya
@@ -65,16 +58,16 @@ class SupplierService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_SUPPLIER)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, supplier.name)
-        statement.setString(3, supplier.contact)
-        statement.setString(4, supplier.phone)
-        statement.setString(5, supplier.email)
-        statement.setString(6, supplier.address)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_SUPPLIER).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, supplier.name)
+                statement.setString(3, supplier.contact)
+                statement.setString(4, supplier.phone)
+                statement.setString(5, supplier.email)
+                statement.setString(6, supplier.address)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Supplier created successfully with ID: $generatedId")
@@ -85,44 +78,46 @@ class SupplierService(
         }
     }
 
-    suspend fun getSuppliers(): List<Supplier> {
-        val statement = connection.prepareStatement(GET_SUPPLIERS)
-        val resultSet = statement.executeQuery()
-        val suppliers = mutableListOf<Supplier>()
-        while (resultSet.next()) {
-            val supplier =
-                Supplier(
-                    id = resultSet.getString("id"),
-                    name = resultSet.getString("name"),
-                    contact = resultSet.getString("contact"),
-                    phone = resultSet.getString("phone"),
-                    email = resultSet.getString("email"),
-                    address = resultSet.getString("address"),
-                )
-            suppliers.add(supplier)
+    suspend fun getSuppliers(): List<Supplier> =
+        connection.prepareStatement(GET_SUPPLIERS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val suppliers = mutableListOf<Supplier>()
+                while (resultSet.next()) {
+                    val supplier =
+                        Supplier(
+                            id = resultSet.getString("id"),
+                            name = resultSet.getString("name"),
+                            contact = resultSet.getString("contact"),
+                            phone = resultSet.getString("phone"),
+                            email = resultSet.getString("email"),
+                            address = resultSet.getString("address"),
+                        )
+                    suppliers.add(supplier)
+                }
+                logger.info("Retrieved ${suppliers.size} suppliers")
+                suppliers
+            }
         }
-        logger.info("Retrieved ${suppliers.size} suppliers")
-        return suppliers
-    }
 
-    suspend fun getSupplierById(id: String): Supplier? {
-        val statement = connection.prepareStatement(GET_SUPPLIER_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            Supplier(
-                id = resultSet.getString("id"),
-                name = resultSet.getString("name"),
-                contact = resultSet.getString("contact"),
-                phone = resultSet.getString("phone"),
-                email = resultSet.getString("email"),
-                address = resultSet.getString("address"),
-            )
-        } else {
-            logger.warn("Supplier not found with ID: $id")
-            null
+    suspend fun getSupplierById(id: String): Supplier? =
+        connection.prepareStatement(GET_SUPPLIER_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Supplier(
+                        id = resultSet.getString("id"),
+                        name = resultSet.getString("name"),
+                        contact = resultSet.getString("contact"),
+                        phone = resultSet.getString("phone"),
+                        email = resultSet.getString("email"),
+                        address = resultSet.getString("address"),
+                    )
+                } else {
+                    logger.warn("Supplier not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun updateSupplier(supplier: Supplier): Boolean {
         if (supplier.id == null) {
@@ -136,15 +131,16 @@ class SupplierService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_SUPPLIER)
-        statement.setString(1, supplier.name)
-        statement.setString(2, supplier.contact)
-        statement.setString(3, supplier.phone)
-        statement.setString(4, supplier.email)
-        statement.setString(5, supplier.address)
-        statement.setString(6, supplier.id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_SUPPLIER).use { statement ->
+                statement.setString(1, supplier.name)
+                statement.setString(2, supplier.contact)
+                statement.setString(3, supplier.phone)
+                statement.setString(4, supplier.email)
+                statement.setString(5, supplier.address)
+                statement.setString(6, supplier.id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Supplier updated successfully: ${supplier.id}")
         } else {
@@ -160,9 +156,11 @@ class SupplierService(
             return false
         }
 
-        val statement = connection.prepareStatement(DELETE_SUPPLIER)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_SUPPLIER).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Supplier soft-deleted successfully: $id")
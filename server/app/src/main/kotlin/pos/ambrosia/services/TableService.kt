@@ -27,46 +27,41 @@ class TableService(
 
     private val validStatuses = setOf("available", "occupied", "reserved")
 
-    private fun spaceExists(spaceId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_SPACE_EXISTS)
-        statement.setString(1, spaceId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun spaceExists(spaceId: String): Boolean =
+        connection.prepareStatement(CHECK_SPACE_EXISTS).use { statement ->
+            statement.setString(1, spaceId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun orderExists(orderId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_ORDER_EXISTS)
-        statement.setString(1, orderId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun orderExists(orderId: String): Boolean =
+        connection.prepareStatement(CHECK_ORDER_EXISTS).use { statement ->
+            statement.setString(1, orderId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun tableNameExistsInSpace(
         tableName: String,
         spaceId: String,
-    ): Boolean {
-        val statement = connection.prepareStatement(CHECK_TABLE_NAME_EXISTS)
-        statement.setString(1, tableName)
-        statement.setString(2, spaceId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    ): Boolean =
+        connection.prepareStatement(CHECK_TABLE_NAME_EXISTS).use { statement ->
+            statement.setString(1, tableName)
+            statement.setString(2, spaceId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun tableNameExistsInSpaceExcludingId(
         tableName: String,
         spaceId: String,
         excludeId: String,
-    ): Boolean {
-        val statement =
-            connection.prepareStatement(
-                "SELECT id FROM tables WHERE name = ? AND space_id = ? AND id != ? AND is_deleted = 0",
-            )
-        statement.setString(1, tableName)
-        statement.setString(2, spaceId)
-        statement.setString(3, excludeId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    ): Boolean =
+        connection.prepareStatement(
+            "SELECT id FROM tables WHERE name = ? AND space_id = ? AND id != ? AND is_deleted = 0",
+        ).use { statement ->
+            statement.setString(1, tableName)
+            statement.setString(2, spaceId)
+            statement.setString(3, excludeId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun isValidStatus(status: String): Boolean = validStatuses.contains(status)
 
@@ -91,15 +86,15 @@ class TableService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_TABLE)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, table.name)
-        statement.setString(3, table.spaceId)
-        statement.setString(4, table.orderId)
-        statement.setString(5, tableStatus)
-
-        val rowsAffected = statement.executeUpdate()
+        val rowsAffected =
+            connection.prepareStatement(ADD_TABLE).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, table.name)
+                statement.setString(3, table.spaceId)
+                statement.setString(4, table.orderId)
+                statement.setString(5, tableStatus)
+                statement.executeUpdate()
+            }
 
         return if (rowsAffected > 0) {
             logger.info("Table created successfully with ID: $generatedId")
@@ -110,62 +105,66 @@ class TableService(
         }
     }
 
-    suspend fun getTables(): List<Table> {
-        val statement = connection.prepareStatement(GET_TABLES)
-        val resultSet = statement.executeQuery()
-        val tables = mutableListOf<Table>()
-        while (resultSet.next()) {
-            val table =
-                Table(
-                    id = resultSet.getString("id"),
-                    name = resultSet.getString("name"),
-                    spaceId = resultSet.getString("space_id"),
-                    orderId = resultSet.getString("order_id"),
-                    status = resultSet.getString("status"),
-                )
-            tables.add(table)
-        }
-        logger.info("Retrieved ${tables.size} tables")
-        return tables
-    }
+    suspend fun getTables(): List<Table> =
+        connection.prepareStatement(GET_TABLES).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val tables = mutableListOf<Table>()
+                while (resultSet.next()) {
+                    val table =
+                        Table(
+                            id = resultSet.getString("id"),
+                            name = resultSet.getString("name"),
+                            spaceId = resultSet.getString("space_id"),
+                            orderId = resultSet.getString("order_id"),
+                            status = resultSet.getString("status"),
+                        )
+                    tables.add(table)
+                }
+                logger.info("Retrieved ${tables.size} tables")
+                tables
+            }
+        }
 
-    suspend fun getTableById(id: String): Table? {
-        val statement = connection.prepareStatement(GET_TABLE_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            Table(
-                id = resultSet.getString("id"),
-                name = resultSet.getString("name"),
-                spaceId = resultSet.getString("space_id"),
-                orderId = resultSet.getString("order_id"),
-                status = resultSet.getString("status"),
-            )
-        } else {
-            logger.warn("Table not found with ID: $id")
-            null
+    suspend fun getTableById(id: String): Table? =
+        connection.prepareStatement(GET_TABLE_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    Table(
+                        id = resultSet.getString("id"),
+                        name = resultSet.getString("name"),
+                        spaceId = resultSet.getString("space_id"),
+                        orderId = resultSet.getString("order_id"),
+                        status = resultSet.getString("status"),
+                    )
+                } else {
+                    logger.warn("Table not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
     suspend fun getTablesBySpace(spaceId: String): List<Table>? {
         if (!spaceExists(spaceId)) return null
-        val statement = connection.prepareStatement(GET_TABLES_BY_SPACE)
-        statement.setString(1, spaceId)
-        val resultSet = statement.executeQuery()
-        val tables = mutableListOf<Table>()
-        while (resultSet.next()) {
-            val table =
-                Table(
-                    id = resultSet.getString("id"),
-                    name = resultSet.getString("name"),
-                    spaceId = resultSet.getString("space_id"),
-                    orderId = resultSet.getString("order_id"),
-                    status = resultSet.getString("status"),
-                )
-            tables.add(table)
-        }
-        logger.info("Retrieved ${tables.size} tables for space: $spaceId")
-        return tables
+        return connection.prepareStatement(GET_TABLES_BY_SPACE).use { statement ->
+            statement.setString(1, spaceId)
+            statement.executeQuery().use { resultSet ->
+                val tables = mutableListOf<Table>()
+                while (resultSet.next()) {
+                    val table =
+                        Table(
+                            id = resultSet.getString("id"),
+                            name = resultSet.getString("name"),
+                            spaceId = resultSet.getString("space_id"),
+                            orderId = resultSet.getString("order_id"),
+                            status = resultSet.getString("status"),
+                        )
+                    tables.add(table)
+                }
+                logger.info("Retrieved ${tables.size} tables for space: $spaceId")
+                tables
+            }
+        }
     }
 
     suspend fun updateTable(table: Table): Boolean {
@@ -190,14 +189,15 @@ class TableService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_TABLE)
-        statement.setString(1, table.name)
-        statement.setString(2, table.spaceId)
-        statement.setString(3, table.orderId)
-        statement.setString(4, tableStatus)
-        statement.setString(5, table.id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(UPDATE_TABLE).use { statement ->
+                statement.setString(1, table.name)
+                statement.setString(2, table.spaceId)
+                statement.setString(3, table.orderId)
+                statement.setString(4, tableStatus)
+                statement.setString(5, table.id)
+                statement.executeUpdate()
+            }
         if (rowsUpdated > 0) {
             logger.info("Table updated successfully: ${table.id}")
         } else {
@@ -207,9 +207,11 @@ class TableService(
     }
 
     suspend fun deleteTable(id: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_TABLE)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_TABLE).use { statement ->
+                statement.setString(1, id)
+                statement.executeUpdate()
+            }
 
         if (rowsDeleted > 0) {
             logger.info("Table soft-deleted successfully: $id")
@@ -2,6 +2,7 @@ package pos.ambrosia.services
 
 import pos.ambrosia.logger
 import pos.ambrosia.models.TicketPayment
+import pos.ambrosia.utils.runInTransaction
 import java.sql.Connection
 
 class TicketPaymentService(
@@ -22,19 +23,19 @@ class TicketPaymentService(
         private const val CHECK_PAYMENT_EXISTS = "SELECT id FROM payments WHERE id = ?"
     }
 
-    private fun ticketExists(ticketId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_TICKET_EXISTS)
-        statement.setString(1, ticketId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private val salesRollup = SalesRollupService(connection)
 
-    private fun paymentExists(paymentId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_PAYMENT_EXISTS)
-        statement.setString(1, paymentId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun ticketExists(ticketId: String): Boolean =
+        connection.prepareStatement(CHECK_TICKET_EXISTS).use { statement ->
+            statement.setString(1, ticketId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
+
+    private fun paymentExists(paymentId: String): Boolean =
+        connection.prepareStatement(CHECK_PAYMENT_EXISTS).use { statement ->
+            statement.setString(1, paymentId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     suspend fun addTicketPayment(ticketPayment: TicketPayment): Boolean {
         if (ticketPayment.paymentId.isBlank() || ticketPayment.ticketId.isBlank()) {
@@ -52,90 +53,106 @@ class TicketPaymentService(
             return false
         }
 
-        val statement = connection.prepareStatement(ADD_TICKET_PAYMENT)
-        statement.setString(1, ticketPayment.paymentId)
-        statement.setString(2, ticketPayment.ticketId)
-
-        val rowsAffected = statement.executeUpdate()
-
-        return if (rowsAffected > 0) {
-            logger.info(
-                "Ticket payment created successfully: payment ${ticketPayment.paymentId} -> ticket ${ticketPayment.ticketId}",
-            )
-            true
-        } else {
-            logger.error("Failed to create ticket payment")
-            false
+        return runInTransaction(connection) {
+            val rowsAffected =
+                connection.prepareStatement(ADD_TICKET_PAYMENT).use { statement ->
+                    statement.setString(1, ticketPayment.paymentId)
+                    statement.setString(2, ticketPayment.ticketId)
+                    statement.executeUpdate()
+                }
+
+            if (rowsAffected > 0) {
+                logger.info(
+                    "Ticket payment created successfully: payment ${ticketPayment.paymentId} -> ticket ${ticketPayment.ticketId}",
+                )
+                salesRollup.refreshTicket(ticketPayment.ticketId)
+                true
+            } else {
+                logger.error("Failed to create ticket payment")
+                false
+            }
         }
     }
 
     suspend fun getTicketPaymentsByTicket(ticketId: String): List<TicketPayment>? {
         if (!ticketExists(ticketId)) return null
-        val statement = connection.prepareStatement(GET_TICKET_PAYMENTS_BY_TICKET)
-        statement.setString(1, ticketId)
-        val resultSet = statement.executeQuery()
-        val ticketPayments = mutableListOf<TicketPayment>()
-
-        while (resultSet.next()) {
-            val ticketPayment =
-                TicketPayment(
-                    paymentId = resultSet.getString("payment_id"),
-                    ticketId = resultSet.getString("ticket_id"),
-                )
-            ticketPayments.add(ticketPayment)
+        return connection.prepareStatement(GET_TICKET_PAYMENTS_BY_TICKET).use { statement ->
+            statement.setString(1, ticketId)
+            statement.executeQuery().use { resultSet ->
+                val ticketPayments = mutableListOf<TicketPayment>()
+
+                while (resultSet.next()) {
+                    val ticketPayment =
+                        TicketPayment(
+                            paymentId = resultSet.getString("payment_id"),
+                            ticketId = resultSet.getString("ticket_id"),
+                        )
+                    ticketPayments.add(ticketPayment)
+                }
+
+                logger.info("Retrieved ${ticketPayments.size} payments for ticket: $ticketId")
+                ticketPayments
+            }
         }
-
-        logger.info("Retrieved ${ticketPayments.size} payments for ticket: $ticketId")
-        return ticketPayments
     }
 
     suspend fun getTicketPaymentsByPayment(paymentId: String): List<TicketPayment>? {
         if (!paymentExists(paymentId)) return null
-        val statement = connection.prepareStatement(GET_TICKET_PAYMENTS_BY_PAYMENT)
-        statement.setString(1, paymentId)
-        val resultSet = statement.executeQuery()
-        val ticketPayments = mutableListOf<TicketPayment>()
-
-        while (resultSet.next()) {
-            val ticketPayment =
-                TicketPayment(
-                    paymentId = resultSet.getString("payment_id"),
-                    ticketId = resultSet.getString("ticket_id"),
-                )
-            ticketPayments.add(ticketPayment)
+        return connection.prepareStatement(GET_TICKET_PAYMENTS_BY_PAYMENT).use { statement ->
+            statement.setString(1, paymentId)
+            statement.executeQuery().use { resultSet ->
+                val ticketPayments = mutableListOf<TicketPayment>()
+
+                while (resultSet.next()) {
+                    val ticketPayment =
+                        TicketPayment(
+                            paymentId = resultSet.getString("payment_id"),
+                            ticketId = resultSet.getString("ticket_id"),
+                        )
+                    ticketPayments.add(ticketPayment)
+                }
+
+                logger.info("Retrieved ${ticketPayments.size} tickets for payment: $paymentId")
+                ticketPayments
+            }
         }
-
-        logger.info("Retrieved ${ticketPayments.size} tickets for payment: $paymentId")
-        return ticketPayments
     }
 
     suspend fun deleteTicketPayment(
         paymentId: String,
         ticketId: String,
-    ): Boolean {
-        val statement = connection.prepareStatement(DELETE_TICKET_PAYMENT)
-        statement.setString(1, paymentId)
-        statement.setString(2, ticketId)
-        val rowsDeleted = statement.executeUpdate()
-
-        if (rowsDeleted > 0) {
-            logger.info("Ticket payment deleted successfully: payment $paymentId -> ticket $ticketId")
-        } else {
-            logger.error("Failed to delete ticket payment: payment $paymentId -> ticket $ticketId")
+    ): Boolean =
+        runInTransaction(connection) {
+            val rowsDeleted =
+                connection.prepareStatement(DELETE_TICKET_PAYMENT).use { statement ->
+                    statement.setString(1, paymentId)
+                    statement.setString(2, ticketId)
+                    statement.executeUpdate()
+                }
+
+            if (rowsDeleted > 0) {
+                logger.info("Ticket payment deleted successfully: payment $paymentId -> ticket $ticketId")
+                salesRollup.refreshTicket(ticketId)
+            } else {
+                logger.error("Failed to delete ticket payment: payment $paymentId -> ticket $ticketId")
+            }
+            rowsDeleted > 0
         }
-        return rowsDeleted > 0
-    }
-
-    suspend fun deleteTicketPaymentsByTicket(ticketId: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_TICKET_PAYMENTS_BY_TICKET)
-        statement.setString(1, ticketId)
-        val rowsDeleted = statement.executeUpdate()
 
-        if (rowsDeleted > 0) {
-            logger.info("All payments deleted for ticket: $ticketId ($rowsDeleted payments)")
-        } else {
-            logger.info("No payments found to delete for ticket: $ticketId")
+    suspend fun deleteTicketPaymentsByTicket(ticketId: String): Boolean =
+        runInTransaction(connection) {
+            val rowsDeleted =
+                connection.prepareStatement(DELETE_TICKET_PAYMENTS_BY_TICKET).use { statement ->
+                    statement.setString(1, ticketId)
+                    statement.executeUpdate()
+                }
+
+            if (rowsDeleted > 0) {
+                logger.info("All payments deleted for ticket: $ticketId ($rowsDeleted payments)")
+                salesRollup.refreshTicket(ticketId)
+            } else {
+                logger.info("No payments found to delete for ticket: $ticketId")
+            }
+            true
         }
-        return true
-    }
 }
@@ -2,6 +2,7 @@ package pos.ambrosia.services
 
 import pos.ambrosia.logger
 import pos.ambrosia.models.Ticket
+import pos.ambrosia.utils.runInTransaction
 import java.sql.Connection
 
 class TicketService(
@@ -25,19 +26,19 @@ class TicketService(
             "SELECT id, order_id, user_id, ticket_date, status, total_amount, notes FROM tickets WHERE user_id = ?"
     }
 
-    private fun orderExists(orderId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_ORDER_EXISTS)
-        statement.setString(1, orderId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private val salesRollup = SalesRollupService(connection)
 
-    private fun userExists(userId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_USER_EXISTS)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun orderExists(orderId: String): Boolean =
+        connection.prepareStatement(CHECK_ORDER_EXISTS).use { statement ->
+            statement.setString(1, orderId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
+
+    private fun userExists(userId: String): Boolean =
+        connection.prepareStatement(CHECK_USER_EXISTS).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
     private fun isValidStatus(status: Int): Boolean = status in 0..1
 
@@ -76,23 +77,23 @@ class TicketService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_TICKET)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, ticket.orderId)
-        statement.setString(3, ticket.userId)
-        val ticketDate =
-            ticket.ticketDate.ifEmpty {
-                java.time.LocalDateTime
-                    .now()
-                    .toString()
+        val rowsAffected =
+            connection.prepareStatement(ADD_TICKET).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, ticket.orderId)
+                statement.setString(3, ticket.userId)
+                val ticketDate =
+                    ticket.ticketDate.ifEmpty {
+                        java.time.LocalDateTime
+                            .now()
+                            .toString()
+                    }
+                statement.setString(4, ticketDate)
+                statement.setInt(5, ticket.status)
+                statement.setDouble(6, ticket.totalAmount)
+                statement.setString(7, ticket.notes)
+                statement.executeUpdate()
             }
-        statement.setString(4, ticketDate)
-        statement.setInt(5, ticket.status)
-        statement.setDouble(6, ticket.totalAmount)
-        statement.setString(7, ticket.notes)
-
-        val rowsAffected = statement.executeUpdate()
 
         return if (rowsAffected > 0) {
             logger.info("Ticket created successfully with ID: $generatedId")
@@ -103,52 +104,56 @@ class TicketService(
         }
     }
 
-    suspend fun getTickets(): List<Ticket> {
-        val statement = connection.prepareStatement(GET_TICKETS)
-        val resultSet = statement.executeQuery()
-        val tickets = mutableListOf<Ticket>()
-        while (resultSet.next()) {
-            tickets.add(mapResultSetToTicket(resultSet))
+    suspend fun getTickets(): List<Ticket> =
+        connection.prepareStatement(GET_TICKETS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                val tickets = mutableListOf<Ticket>()
+                while (resultSet.next()) {
+                    tickets.add(mapResultSetToTicket(resultSet))
+                }
+                logger.info("Retrieved ${tickets.size} tickets")
+                tickets
+            }
         }
-        logger.info("Retrieved ${tickets.size} tickets")
-        return tickets
-    }
 
-    suspend fun getTicketById(id: String): Ticket? {
-        val statement = connection.prepareStatement(GET_TICKET_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            mapResultSetToTicket(resultSet)
-        } else {
-            logger.warn("Ticket not found with ID: $id")
-            null
+    suspend fun getTicketById(id: String): Ticket? =
+        connection.prepareStatement(GET_TICKET_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    mapResultSetToTicket(resultSet)
+                } else {
+                    logger.warn("Ticket not found with ID: $id")
+                    null
+                }
+            }
         }
-    }
 
-    suspend fun getTicketsByOrder(orderId: String): List<Ticket> {
-        val statement = connection.prepareStatement(GET_TICKETS_BY_ORDER)
-        statement.setString(1, orderId)
-        val resultSet = statement.executeQuery()
-        val tickets = mutableListOf<Ticket>()
-        while (resultSet.next()) {
-            tickets.add(mapResultSetToTicket(resultSet))
+    suspend fun getTicketsByOrder(orderId: String): List<Ticket> =
+        connection.prepareStatement(GET_TICKETS_BY_ORDER).use { statement ->
+            statement.setString(1, orderId)
+            statement.executeQuery().use { resultSet ->
+                val tickets = mutableListOf<Ticket>()
+                while (resultSet.next()) {
+                    tickets.add(mapResultSetToTicket(resultSet))
+                }
+                logger.info("Retrieved ${tickets.size} tickets for order: $orderId")
+                tickets
+            }
         }
-        logger.info("Retrieved ${tickets.size} tickets for order: $orderId")
-        return tickets
-    }
 
-    suspend fun getTicketsByUser(userId: String): List<Ticket> {
-        val statement = connection.prepareStatement(GET_TICKETS_BY_USER)
-        statement.setString(1, userId)
-        val resultSet = statement.executeQuery()
-        val tickets = mutableListOf<Ticket>()
-        while (resultSet.next()) {
-            tickets.add(mapResultSetToTicket(resultSet))
+    suspend fun getTicketsByUser(userId: String): List<Ticket> =
+        connection.prepareStatement(GET_TICKETS_BY_USER).use { statement ->
+            statement.setString(1, userId)
+            statement.executeQuery().use { resultSet ->
+                val tickets = mutableListOf<Ticket>()
+                while (resultSet.next()) {
+                    tickets.add(mapResultSetToTicket(resultSet))
+                }
+                logger.info("Retrieved ${tickets.size} tickets for user: $userId")
+                tickets
+            }
         }
-        logger.info("Retrieved ${tickets.size} tickets for user: $userId")
-        return tickets
-    }
 
     suspend fun updateTicket(ticket: Ticket): Boolean {
         if (ticket.id == null) {
@@ -162,34 +167,46 @@ class TicketService(
             return false
         }
 
-        val statement = connection.prepareStatement(UPDATE_TICKET)
-        statement.setString(1, ticket.orderId)
-        statement.setString(2, ticket.userId)
-        statement.setString(3, ticket.ticketDate)
-        statement.setInt(4, ticket.status)
-        statement.setDouble(5, ticket.totalAmount)
-        statement.setString(6, ticket.notes)
-        statement.setString(7, ticket.id)
-
-        val rowsUpdated = statement.executeUpdate()
-        if (rowsUpdated > 0) {
-            logger.info("Ticket updated successfully: ${ticket.id}")
-        } else {
-            logger.error("Failed to update ticket: ${ticket.id}")
+        return runInTransaction(connection) {
+            val previousDay = salesRollup.ticketDay(ticket.id)
+            val rowsUpdated =
+                connection.prepareStatement(UPDATE_TICKET).use { statement ->
+                    statement.setString(1, ticket.orderId)
+                    statement.setString(2, ticket.userId)
+                    statement.setString(3, ticket.ticketDate)
+                    statement.setInt(4, ticket.status)
+                    statement.setDouble(5, ticket.totalAmount)
+                    statement.setString(6, ticket.notes)
+                    statement.setString(7, ticket.id)
+                    statement.executeUpdate()
+                }
+            if (rowsUpdated > 0) {
+                logger.info("Ticket updated successfully: ${ticket.id}")
+                // The ticket may have moved to an order on another day, so both days are recomputed
+                setOfNotNull(previousDay, salesRollup.ticketDay(ticket.id)).forEach { salesRollup.refreshDay(it) }
+            } else {
+                logger.error("Failed to update ticket: ${ticket.id}")
+            }
+            rowsUpdated > 0
         }
-        return rowsUpdated > 0
     }
 
-    suspend fun deleteTicket(id: String): Boolean {
-        val statement = connection.prepareStatement(DELETE_TICKET)
-        statement.setString(1, id)
-        val rowsDeleted = statement.executeUpdate()
-
-        if (rowsDeleted > 0) {
-            logger.info("Ticket deleted successfully: $id")
-        } else {
-            logger.error("Failed to delete ticket: $id")
+    suspend fun deleteTicket(id: String): Boolean =
+        runInTransaction(connection) {
+            val previousDay = salesRollup.ticketDay(id)
+            val rowsDeleted =
+                connection.prepareStatement(DELETE_TICKET).use { statement ->
+                    statement.setString(1, id)
+                    statement.executeUpdate()
+                }
+
+            if (rowsDeleted > 0) {
+                logger.info("Ticket deleted successfully: $id")
+                // Its ticket payments are deleted with it, so its sales leave the rollup
+                previousDay?.let { salesRollup.refreshDay(it) }
+            } else {
+                logger.error("Failed to delete ticket: $id")
+            }
+            rowsDeleted > 0
         }
-        return rowsDeleted > 0
-    }
 }
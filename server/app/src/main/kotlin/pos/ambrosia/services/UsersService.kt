@@ -69,25 +69,24 @@ class UsersService(
         """
     }
 
-    private fun roleExists(roleId: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_ROLE_EXISTS)
-        statement.setString(1, roleId)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun roleExists(roleId: String): Boolean =
+        connection.prepareStatement(CHECK_ROLE_EXISTS).use { statement ->
+            statement.setString(1, roleId)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun userNameExists(name: String): Boolean {
-        val statement = connection.prepareStatement(CHECK_USER_NAME_EXISTS)
-        statement.setString(1, name)
-        val resultSet = statement.executeQuery()
-        return resultSet.next()
-    }
+    private fun userNameExists(name: String): Boolean =
+        connection.prepareStatement(CHECK_USER_NAME_EXISTS).use { statement ->
+            statement.setString(1, name)
+            statement.executeQuery().use { resultSet -> resultSet.next() }
+        }
 
-    private fun activeUserCount(): Long {
-        val statement = connection.prepareStatement(COUNT_ACTIVE_USERS)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) resultSet.getLong(1) else 0L
-    }
+    private fun activeUserCount(): Long =
+        connection.prepareStatement(COUNT_ACTIVE_USERS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) resultSet.getLong(1) else 0L
+            }
+        }
 
     suspend fun addUser(user: User): String? {
         if (user.role == null || !roleExists(user.role)) {
@@ -103,11 +102,6 @@ class UsersService(
             java.util.UUID
                 .randomUUID()
                 .toString()
-        val statement = connection.prepareStatement(ADD_USER)
-
-        statement.setString(1, generatedId)
-        statement.setString(2, user.name)
-
         if (user.name == "" || user.pin.isBlank()) {
             logger.error("User name and/or pin cannot be null or blank")
             return null
@@ -119,20 +113,23 @@ class UsersService(
         }
 
         val encryptedPin = SecurePinProcessor.hashPinForStorage(user.pin.toCharArray(), generatedId, env)
-        statement.setString(3, SecurePinProcessor.byteArrayToBase64(encryptedPin))
-        statement.setString(4, user.refreshToken)
-        statement.setString(5, user.role)
-        statement.setString(6, user.email)
-        statement.setString(7, user.phone)
-
         val rowsAffected =
-            try {
-                statement.executeUpdate()
-            } catch (e: java.sql.SQLException) {
-                if (e.message?.contains("UNIQUE constraint failed: users.name") == true) {
-                    throw DuplicateUserNameException()
+            connection.prepareStatement(ADD_USER).use { statement ->
+                statement.setString(1, generatedId)
+                statement.setString(2, user.name)
+                statement.setString(3, SecurePinProcessor.byteArrayToBase64(encryptedPin))
+                statement.setString(4, user.refreshToken)
+                statement.setString(5, user.role)
+                statement.setString(6, user.email)
+                statement.setString(7, user.phone)
+                try {
+                    statement.executeUpdate()
+                } catch (e: java.sql.SQLException) {
+                    if (e.message?.contains("UNIQUE constraint failed: users.name") == true) {
+                        throw DuplicateUserNameException()
+                    }
+                    throw e
                 }
-                throw e
             }
 
         return if (rowsAffected > 0) {
@@ -146,66 +143,71 @@ class UsersService(
 
     suspend fun getUsers(): List<User> {
         val users = mutableListOf<User>()
-        val statement = connection.prepareStatement(GET_USERS)
-        val resultSet = statement.executeQuery()
-        while (resultSet.next()) {
-            val id = resultSet.getString("id")
-            val name = resultSet.getString("name")
-            val role = resultSet.getString("role")
-            val roleId = resultSet.getString("role_id")
-            val email = resultSet.getString("email")
-            val phone = resultSet.getString("phone")
-            users.add(
-                User(
-                    id = id,
-                    name = name,
-                    pin = "****",
-                    refreshToken = "****",
-                    role = role,
-                    roleId = roleId,
-                    email = email,
-                    phone = phone,
-                ),
-            )
+        return connection.prepareStatement(GET_USERS).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                while (resultSet.next()) {
+                    val id = resultSet.getString("id")
+                    val name = resultSet.getString("name")
+                    val role = resultSet.getString("role")
+                    val roleId = resultSet.getString("role_id")
+                    val email = resultSet.getString("email")
+                    val phone = resultSet.getString("phone")
+                    users.add(
+                        User(
+                            id = id,
+                            name = name,
+                            pin = "****",
+                            refreshToken = "****",
+                            role = role,
+                            roleId = roleId,
+                            email = email,
+                            phone = phone,
+                        ),
+                    )
+                }
+                users
+            }
         }
-        return users
     }
 
-    suspend fun getUserCount(): Long {
-        val statement = connection.prepareStatement(GET_USER_COUNT)
-        val resultSet = statement.executeQuery()
-        return if (resultSet.next()) {
-            resultSet.getLong(1)
-        } else {
-            0L
+    suspend fun getUserCount(): Long =
+        connection.prepareStatement(GET_USER_COUNT).use { statement ->
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    resultSet.getLong(1)
+                } else {
+                    0L
+                }
+            }
         }
-    }
 
-    suspend fun getUserById(id: String): User? {
-        val statement = connection.prepareStatement(GET_USER_BY_ID)
-        statement.setString(1, id)
-        val resultSet = statement.executeQuery()
-        if (resultSet.next()) {
-            val userId = resultSet.getString("id")
-            val name = resultSet.getString("name")
-            val refreshToken = resultSet.getString("refresh_token")
-            val role = resultSet.getString("role")
-            val isAdmin = resultSet.getBoolean("isAdmin")
-            val email = resultSet.getString("email")
-            val phone = resultSet.getString("phone")
-            return User(
-                id = userId,
-                name = name,
-                pin = "****",
-                refreshToken = refreshToken,
-                role = role,
-                isAdmin = isAdmin,
-                email = email,
-                phone = phone,
-            )
+    suspend fun getUserById(id: String): User? =
+        connection.prepareStatement(GET_USER_BY_ID).use { statement ->
+            statement.setString(1, id)
+            statement.executeQuery().use { resultSet ->
+                if (resultSet.next()) {
+                    val userId = resultSet.getString("id")
+                    val name = resultSet.getString("name")
+                    val refreshToken = resultSet.getString("refresh_token")
+                    val role = resultSet.getString("role")
+                    val isAdmin = resultSet.getBoolean("isAdmin")
+                    val email = resultSet.getString("email")
+                    val phone = resultSet.getString("phone")
+                    User(
+                        id = userId,
+                        name = name,
+                        pin = "****",
+                        refreshToken = refreshToken,
+                        role = role,
+                        isAdmin = isAdmin,
+                        email = email,
+                        phone = phone,
+                    )
+                } else {
+                    null
+                }
+            }
         }
-        return null
-    }
 
     suspend fun updateUser(
         id: String?,
@@ -252,12 +254,12 @@ class UsersService(
         }
 
         val sql = "UPDATE users SET ${fields.joinToString(", ") { it.first }} WHERE id = ?"
-        val statement = connection.prepareStatement(sql)
-
-        fields.forEachIndexed { index, setter -> setter.second(statement, index + 1) }
-        statement.setString(fields.size + 1, id)
-
-        val rowsUpdated = statement.executeUpdate()
+        val rowsUpdated =
+            connection.prepareStatement(sql).use { statement ->
+                fields.forEachIndexed { index, setter -> setter.second(statement, index + 1) }
+                statement.setString(fields.size + 1, id)
+                statement.executeUpdate()
+            }
         return rowsUpdated > 0
     }
 
@@ -266,10 +268,12 @@ class UsersService(
             throw LastUserDeletionException()
         }
         ensureUserDeletionKeepsAdmin(id)
-        val statement = connection.prepareStatement(DELETE_USER)
-        statement.setString(1, deletedName(id))
-        statement.setString(2, id)
-        val rowsDeleted = statement.executeUpdate()
+        val rowsDeleted =
+            connection.prepareStatement(DELETE_USER).use { statement ->
+                statement.setString(1, deletedName(id))
+                statement.setString(2, id)
+                statement.executeUpdate()
+            }
         return rowsDeleted > 0
     }
 
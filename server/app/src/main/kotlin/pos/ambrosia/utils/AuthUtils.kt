@@ -10,9 +10,8 @@ import io.ktor.server.routing.Route
 import pos.ambrosia.db.DatabaseConnection
 import pos.ambrosia.logger
 import pos.ambrosia.services.TokenService
-import java.sql.Connection
 
-fun ApplicationCall.requireAdmin() {
+suspend fun ApplicationCall.requireAdmin() {
     val refreshToken = request.cookies["refreshToken"]
 
     if (refreshToken.isNullOrBlank()) {
@@ -20,9 +19,8 @@ fun ApplicationCall.requireAdmin() {
         throw AdminOnlyException()
     }
 
-    val connection: Connection = DatabaseConnection.getConnection()
-    val tokenService = TokenService(application.environment, connection)
-    val userFromToken = tokenService.getUserFromRefreshToken(refreshToken)
+    val userFromToken =
+        DatabaseConnection.pool.read { TokenService(application.environment, it).getUserFromRefreshToken(refreshToken) }
     val isAdmin = userFromToken?.isAdmin == true
 
     if (!isAdmin) {
@@ -91,13 +89,15 @@ suspend fun ApplicationCall.requirePermission(name: String) {
   JOIN permissions p ON p.id = rp.permission_id
   WHERE u.id = ? AND p.name = ? AND p.enabled = 1 AND u.is_deleted = 0
   """
-    val connection: Connection = DatabaseConnection.getConnection()
-    connection.prepareStatement(sql).use { statement ->
-        statement.setString(1, userId)
-        statement.setString(2, name)
-        val resultSet = statement.executeQuery()
-        if (!resultSet.next()) throw PermissionDeniedException()
-    }
+    val granted =
+        DatabaseConnection.pool.read { connection ->
+            connection.prepareStatement(sql).use { statement ->
+                statement.setString(1, userId)
+                statement.setString(2, name)
+                statement.executeQuery().use { resultSet -> resultSet.next() }
+            }
+        }
+    if (!granted) throw PermissionDeniedException()
 }
 
 fun Route.authorizePermission(
@@ -79,3 +79,7 @@ class InitialSetupException(
 class DatabaseException(
     message: String = "Database operation failed",
 ) : RuntimeException(message)
+
+class DatabaseBusyException(
+    message: String = "Database is busy",
+) : RuntimeException(message)
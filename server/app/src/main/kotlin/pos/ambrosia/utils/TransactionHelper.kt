@@ -20,3 +20,23 @@ inline fun <T> executeInTransaction(
         connection.autoCommit = true
     }
 }
+
+/**
+ * Runs [block] in a transaction and rethrows whatever made it fail after rolling back. When the
+ * caller already turned autocommit off, [block] runs as part of the caller's transaction instead.
+ */
+inline fun <T> runInTransaction(
+    connection: Connection,
+    block: () -> T,
+): T {
+    if (!connection.autoCommit) return block()
+    connection.autoCommit = false
+    try {
+        return block().also { connection.commit() }
+    } catch (e: Exception) {
+        connection.rollback()
+        throw e
+    } finally {
+        connection.autoCommit = true
+    }
+}
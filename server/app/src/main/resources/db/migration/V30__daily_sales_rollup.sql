@@ -0,0 +1,28 @@
+-- Paid sales per day, product, user and payment method, kept up to date by the services that
+-- write orders and payments so /reports totals do not rescan every order line.
+CREATE TABLE daily_sales (
+    day TEXT NOT NULL,
+    product_id BLOB NOT NULL,
+    user_id BLOB NOT NULL,
+    payment_method_id BLOB NOT NULL,
+    items_sold INTEGER NOT NULL DEFAULT 0,
+    revenue_cents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, product_id, user_id, payment_method_id)
+);
+
+-- Reports and rollup refreshes filter orders by date(created_at)
+CREATE INDEX idx_orders_created_day ON orders (date(created_at));
+
+INSERT INTO daily_sales (day, product_id, user_id, payment_method_id, items_sold, revenue_cents)
+SELECT date(o.created_at), op.product_id, o.user_id, pay.method_id, SUM(op.quantity), SUM(op.price_at_order * op.quantity)
+FROM order_products op
+JOIN orders o           ON o.id  = op.order_id
+JOIN products p         ON p.id  = op.product_id
+JOIN users u            ON u.id  = o.user_id
+JOIN tickets t          ON t.order_id = o.id
+JOIN ticket_payments tp ON tp.ticket_id = t.id
+JOIN payments pay       ON pay.id = tp.payment_id
+JOIN payment_methods pm ON pm.id = pay.method_id
+WHERE o.status = 'paid'
+  AND o.is_deleted = 0
+GROUP BY date(o.created_at), op.product_id, o.user_id, pay.method_id;
@@ -47,6 +47,7 @@ class CheckoutServiceTest {
         ticketStatement: PreparedStatement = mock(),
         paymentStatement: PreparedStatement = mock(),
         ticketPaymentStatement: PreparedStatement = mock(),
+        rollupStatement: PreparedStatement = mock(),
     ) {
         whenever(mockConnection.prepareStatement(contains("INSERT INTO orders"))).thenReturn(orderStatement)
         whenever(mockConnection.prepareStatement(contains("INSERT INTO order_products"))).thenReturn(itemStatement)
@@ -54,6 +55,7 @@ class CheckoutServiceTest {
         whenever(mockConnection.prepareStatement(contains("INSERT INTO tickets"))).thenReturn(ticketStatement)
         whenever(mockConnection.prepareStatement(contains("INSERT INTO payments"))).thenReturn(paymentStatement)
         whenever(mockConnection.prepareStatement(contains("INSERT INTO ticket_payments"))).thenReturn(ticketPaymentStatement)
+        whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(rollupStatement)
         whenever(stockStatement.executeUpdate()).thenReturn(1)
     }
 
@@ -125,6 +127,26 @@ class CheckoutServiceTest {
         }
     }
 
+    @Test
+    fun `checkout adds each item to the daily sales rollup before committing`() {
+        runBlocking {
+            val items =
+                listOf( // Arrange
+                    StoreCheckoutItem("prod-1", 1, 100),
+                    StoreCheckoutItem("prod-2", 3, 200),
+                )
+            val rollupStatement: PreparedStatement = mock() // Arrange
+            setupSuccessfulCheckout(rollupStatement = rollupStatement) // Arrange
+            val service = CheckoutService(mockConnection) // Arrange
+            service.checkout(validStoreRequest(items = items)) // Act
+            verify(rollupStatement, times(2)).executeUpdate() // Assert — one upsert per item
+            verify(rollupStatement).setString(1, "prod-2") // Assert
+            verify(rollupStatement).setLong(4, 600L) // Assert — quantity times price
+            verify(rollupStatement, times(2)).setString(2, "pm-cash") // Assert
+            verify(mockConnection).commit() // Assert
+        }
+    }
+
     @Test
     fun `checkout returns null and rolls back when stock decrement affects 0 rows`() {
         runBlocking {
@@ -194,6 +216,7 @@ class CheckoutServiceTest {
             whenever(mockConnection.prepareStatement(contains("INSERT INTO tickets"))).thenReturn(ticketStatement) // Arrange
             whenever(mockConnection.prepareStatement(contains("INSERT INTO payments"))).thenReturn(paymentStatement) // Arrange
             whenever(mockConnection.prepareStatement(contains("INSERT INTO ticket_payments"))).thenReturn(ticketPaymentStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(mock()) // Arrange
             whenever(stockStatement.executeUpdate()).thenReturn(1) // Arrange
             val service = CheckoutService(mockConnection) // Arrange
             service.checkout(validStoreRequest(transactionId = null)) // Act
@@ -216,6 +239,7 @@ class CheckoutServiceTest {
             whenever(mockConnection.prepareStatement(contains("INSERT INTO tickets"))).thenReturn(ticketStatement) // Arrange
             whenever(mockConnection.prepareStatement(contains("INSERT INTO payments"))).thenReturn(paymentStatement) // Arrange
             whenever(mockConnection.prepareStatement(contains("INSERT INTO ticket_payments"))).thenReturn(ticketPaymentStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(mock()) // Arrange
             whenever(stockStatement.executeUpdate()).thenReturn(1) // Arrange
             val service = CheckoutService(mockConnection) // Arrange
             service.checkout(validStoreRequest(transactionId = "lnbc123")) // Act
@@ -243,6 +267,7 @@ class CheckoutServiceTest {
             whenever(mockConnection.prepareStatement(contains("INSERT INTO tickets"))).thenReturn(ticketStatement) // Arrange
             whenever(mockConnection.prepareStatement(contains("INSERT INTO payments"))).thenReturn(paymentStatement) // Arrange
             whenever(mockConnection.prepareStatement(contains("INSERT INTO ticket_payments"))).thenReturn(ticketPaymentStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(mock()) // Arrange
             whenever(stockStatement.executeUpdate()).thenReturn(1) // Arrange — both items have stock
             val service = CheckoutService(mockConnection) // Arrange
             val result = service.checkout(validStoreRequest(items = items)) // Act
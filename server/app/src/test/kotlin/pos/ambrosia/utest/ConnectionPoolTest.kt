@@ -0,0 +1,127 @@
+package pos.ambrosia.utest
+
+import kotlinx.coroutines.CompletableDeferred
+import kotlinx.coroutines.launch
+import kotlinx.coroutines.runBlocking
+import org.mockito.kotlin.mock
+import pos.ambrosia.db.ConnectionPool
+import pos.ambrosia.utils.DatabaseBusyException
+import java.sql.Connection
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFailsWith
+import kotlin.test.assertNotSame
+import kotlin.test.assertSame
+
+class ConnectionPoolTest {
+    private val writer: Connection = mock()
+    private val opened = mutableListOf<Connection>()
+
+    private fun pool(
+        readers: Int = 2,
+        maxWaiting: Int = 8,
+        acquireTimeoutMs: Long = 1_000L,
+    ) = ConnectionPool(readers, maxWaiting, acquireTimeoutMs) { readOnly ->
+        if (readOnly) mock<Connection>().also { opened.add(it) } else writer
+    }
+
+    @Test
+    fun `write hands out the writer connection`() {
+        runBlocking {
+            val pool = pool() // Arrange
+
+            val connection = pool.write { it } // Act
+
+            assertSame(writer, connection) // Assert
+            assertEquals(1, pool.stats().writeBorrows) // Assert
+        }
+    }
+
+    @Test
+    fun `sequential reads reuse one read-only connection`() {
+        runBlocking {
+            val pool = pool() // Arrange
+
+            val first = pool.read { it } // Act
+            val second = pool.read { it } // Act
+
+            assertSame(first, second) // Assert
+            assertEquals(1, opened.size) // Assert
+            assertEquals(2, pool.stats().readBorrows) // Assert
+        }
+    }
+
+    @Test
+    fun `concurrent reads get their own connections`() {
+        runBlocking {
+            val pool = pool() // Arrange
+            val release = CompletableDeferred<Unit>() // Arrange
+            val borrowed = CompletableDeferred<Connection>() // Arrange
+            val holder =
+                launch {
+                    pool.read {
+                        borrowed.complete(it)
+                        release.await()
+                    }
+                } // Arrange
+            val first = borrowed.await() // Arrange
+
+            val other = pool.read { it } // Act
+            release.complete(Unit)
+            holder.join()
+
+            assertNotSame(first, other) // Assert
+            assertEquals(2, pool.stats().openReaders) // Assert
+        }
+    }
+
+    @Test
+    fun `read times out when every reader is borrowed`() {
+        runBlocking {
+            val pool = pool(readers = 1, acquireTimeoutMs = 50L) // Arrange
+            val release = CompletableDeferred<Unit>() // Arrange
+            val started = CompletableDeferred<Unit>() // Arrange
+            val holder =
+                launch {
+                    pool.read {
+                        started.complete(Unit)
+                        release.await()
+                    }
+                } // Arrange
+            started.await() // Arrange
+
+            assertFailsWith<DatabaseBusyException> {
+                pool.read { } // Act
+            }
+
+            release.complete(Unit)
+            holder.join()
+            assertEquals(1, pool.stats().timeouts) // Assert
+        }
+    }
+
+    @Test
+    fun `read is rejected when the wait queue is full`() {
+        runBlocking {
+            val pool = pool(readers = 1, maxWaiting = 0) // Arrange
+            val release = CompletableDeferred<Unit>() // Arrange
+            val started = CompletableDeferred<Unit>() // Arrange
+            val holder =
+                launch {
+                    pool.read {
+                        started.complete(Unit)
+                        release.await()
+                    }
+                } // Arrange
+            started.await() // Arrange
+
+            assertFailsWith<DatabaseBusyException> {
+                pool.read { } // Act
+            }
+
+            release.complete(Unit)
+            holder.join()
+            assertEquals(1, pool.stats().rejected) // Assert
+        }
+    }
+}
@@ -0,0 +1,58 @@
+package pos.ambrosia.utest
+
+import kotlinx.coroutines.asExecutor
+import kotlinx.coroutines.runBlocking
+import kotlinx.coroutines.withContext
+import pos.ambrosia.db.DbDispatcher
+import java.util.concurrent.CountDownLatch
+import kotlin.test.AfterTest
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertTrue
+
+class DbDispatcherTest {
+    private val dispatcher = DbDispatcher("db-test", 2)
+
+    @AfterTest
+    fun tearDown() {
+        dispatcher.close()
+    }
+
+    @Test
+    fun `work runs on the dispatcher threads`() =
+        runBlocking {
+            val thread = withContext(dispatcher.dispatcher) { Thread.currentThread().name } // Act
+
+            assertTrue(thread.startsWith("db-test-")) // Assert
+        }
+
+    @Test
+    fun `dispatched tasks are counted`() =
+        runBlocking {
+            repeat(3) { withContext(dispatcher.dispatcher) { } } // Act
+
+            val stats = dispatcher.stats() // Assert
+            assertTrue(stats.tasks >= 3) // Assert
+            assertEquals(2, stats.threads) // Assert
+        }
+
+    @Test
+    fun `task waiting for a busy thread is counted as queued`() {
+        val single = DbDispatcher("db-queue", 1) // Arrange
+        val executor = single.dispatcher.asExecutor() // Arrange
+        val started = CountDownLatch(1) // Arrange
+        val release = CountDownLatch(1) // Arrange
+        executor.execute {
+            started.countDown()
+            release.await()
+        } // Arrange
+        started.await() // Arrange
+
+        executor.execute { } // Act
+
+        val stats = single.stats() // Assert
+        release.countDown()
+        single.close()
+        assertEquals(1, stats.maxQueued) // Assert
+    }
+}
@@ -0,0 +1,54 @@
+package pos.ambrosia.utest
+
+import pos.ambrosia.api.LoginRateLimiter
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFalse
+import kotlin.test.assertTrue
+
+class LoginRateLimiterTest {
+    private val ip = "127.0.0.1"
+
+    private fun LoginRateLimiter.fail(times: Int) = repeat(times) { recordFailure(ip) }
+
+    @Test
+    fun `first five failures do not block`() {
+        val limiter = LoginRateLimiter() // Arrange
+
+        limiter.fail(5) // Act
+
+        assertFalse(limiter.isBlocked(ip)) // Assert
+        assertEquals(0, limiter.getRemainingSeconds(ip)) // Assert
+    }
+
+    @Test
+    fun `sixth failure blocks for one minute by default`() {
+        val limiter = LoginRateLimiter() // Arrange
+
+        limiter.fail(6) // Act
+
+        assertTrue(limiter.isBlocked(ip)) // Assert
+        assertEquals(60, limiter.getRemainingSeconds(ip)) // Assert
+    }
+
+    @Test
+    fun `backoff unit scales the Fibonacci schedule`() {
+        val limiter = LoginRateLimiter(backoffUnitMs = 1_000L) // Arrange
+
+        limiter.fail(5 + 5) // Act
+
+        assertEquals(5, limiter.getRemainingSeconds(ip)) // Assert: fib(5) = 5 units
+    }
+
+    @Test
+    fun `reset clears the failure counter`() {
+        val limiter = LoginRateLimiter(backoffUnitMs = 1_000L) // Arrange
+        limiter.fail(7) // Arrange
+
+        limiter.reset(ip) // Act
+        limiter.fail(6) // Act
+
+        assertTrue(limiter.isBlocked(ip)) // Assert
+        assertEquals(1, limiter.getRemainingSeconds(ip)) // Assert: back to fib(1)
+    }
+}
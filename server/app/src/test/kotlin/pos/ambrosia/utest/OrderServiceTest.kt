@@ -12,8 +12,10 @@ import pos.ambrosia.services.OrderService
 import java.sql.Connection
 import java.sql.PreparedStatement
 import java.sql.ResultSet
+import java.sql.SQLException
 import kotlin.test.Test
 import kotlin.test.assertEquals
+import kotlin.test.assertFailsWith
 import kotlin.test.assertFalse
 import kotlin.test.assertNotNull
 import kotlin.test.assertNull
@@ -501,6 +503,8 @@ class OrderServiceTest {
             whenever(tableResultSet.next()).thenReturn(true) // Arrange
             whenever(tableCheckStatement.executeQuery()).thenReturn(tableResultSet) // Arrange
             whenever(updateStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(mockStatement) // Arrange
+            whenever(mockStatement.executeQuery()).thenReturn(mockResultSet) // Arrange — no rollup day to refresh
             val service = OrderService(mockConnection) // Arrange
             val result = service.updateOrder(order) // Act
             assertTrue(result) // Assert
@@ -543,6 +547,7 @@ class OrderServiceTest {
         runBlocking {
             whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
             whenever(mockStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockStatement.executeQuery()).thenReturn(mockResultSet) // Arrange — no rollup day to refresh
             val service = OrderService(mockConnection) // Arrange
             val result = service.deleteOrder("order-1") // Act
             assertTrue(result) // Assert
@@ -559,4 +564,49 @@ class OrderServiceTest {
             assertFalse(result) // Assert
         }
     }
+
+    @Test
+    fun `deleteOrder commits the delete and its rollup refresh together`() {
+        runBlocking {
+            val dayStatement: PreparedStatement = mock() // Arrange
+            val dayResultSet: ResultSet = mock() // Arrange
+            val rollupInsertStatement: PreparedStatement = mock() // Arrange
+            whenever(mockConnection.autoCommit).thenReturn(true, false) // Arrange — autocommit until the transaction opens
+            whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(dayStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(rollupInsertStatement) // Arrange
+            whenever(mockStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(dayStatement.executeQuery()).thenReturn(dayResultSet) // Arrange
+            whenever(dayResultSet.next()).thenReturn(true) // Arrange
+            whenever(dayResultSet.getString("day")).thenReturn("2024-06-15") // Arrange
+            val service = OrderService(mockConnection) // Arrange
+            val result = service.deleteOrder("order-1") // Act
+            assertTrue(result) // Assert
+            verify(rollupInsertStatement).setString(1, "2024-06-15") // Assert
+            verify(mockConnection).autoCommit = false // Assert
+            verify(mockConnection).commit() // Assert
+            verify(mockConnection).autoCommit = true // Assert
+        }
+    }
+
+    @Test
+    fun `deleteOrder rolls back when the rollup refresh fails`() {
+        val dayStatement: PreparedStatement = mock() // Arrange
+        val dayResultSet: ResultSet = mock() // Arrange
+        val rollupInsertStatement: PreparedStatement = mock() // Arrange
+        whenever(mockConnection.autoCommit).thenReturn(true, false) // Arrange
+        whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
+        whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(dayStatement) // Arrange
+        whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(rollupInsertStatement) // Arrange
+        whenever(mockStatement.executeUpdate()).thenReturn(1) // Arrange
+        whenever(dayStatement.executeQuery()).thenReturn(dayResultSet) // Arrange
+        whenever(dayResultSet.next()).thenReturn(true) // Arrange
+        whenever(dayResultSet.getString("day")).thenReturn("2024-06-15") // Arrange
+        whenever(rollupInsertStatement.executeUpdate()).thenThrow(SQLException("forced")) // Arrange
+        val service = OrderService(mockConnection) // Arrange
+        assertFailsWith<SQLException> { runBlocking { service.deleteOrder("order-1") } } // Act
+        verify(mockConnection).rollback() // Assert
+        verify(mockConnection, never()).commit() // Assert
+        verify(mockConnection).autoCommit = true // Assert
+    }
 }
@@ -5,6 +5,7 @@ import org.mockito.ArgumentMatchers.contains
 import org.mockito.kotlin.any
 import org.mockito.kotlin.mock
 import org.mockito.kotlin.never
+import org.mockito.kotlin.times
 import org.mockito.kotlin.verify
 import org.mockito.kotlin.whenever
 import pos.ambrosia.models.Currency
@@ -384,6 +385,8 @@ class PaymentServiceTest {
             whenever(currencyResultSet.next()).thenReturn(true) // Arrange
             whenever(currencyCheckStatement.executeQuery()).thenReturn(currencyResultSet) // Arrange
             whenever(updatePaymentStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(mockStatement) // Arrange
+            whenever(mockStatement.executeQuery()).thenReturn(mockResultSet) // Arrange — no rollup day to refresh
             val service = PaymentService(mockConnection) // Arrange
             val result = service.updatePayment(payment) // Act
             assertTrue(result) // Assert
@@ -526,4 +529,36 @@ class PaymentServiceTest {
             assertFalse(result) // Assert
         }
     }
+
+    @Test
+    fun `updatePayment recomputes every day the payment paid for`() {
+        runBlocking {
+            val payment = Payment(id = "pay-1", methodId = "pm-2", currencyId = "cur-1", transactionId = "txn-1", amount = 100.0)
+            val checkStatement: PreparedStatement = mock() // Arrange
+            val checkResultSet: ResultSet = mock() // Arrange
+            val updatePaymentStatement: PreparedStatement = mock() // Arrange
+            val dayStatement: PreparedStatement = mock() // Arrange
+            val dayResultSet: ResultSet = mock() // Arrange
+            val rollupDeleteStatement: PreparedStatement = mock() // Arrange
+            val rollupInsertStatement: PreparedStatement = mock() // Arrange
+            whenever(mockConnection.prepareStatement(any())).thenReturn(checkStatement) // Arrange — method and currency exist
+            whenever(checkStatement.executeQuery()).thenReturn(checkResultSet) // Arrange
+            whenever(checkResultSet.next()).thenReturn(true) // Arrange
+            whenever(mockConnection.prepareStatement(contains("UPDATE payments"))).thenReturn(updatePaymentStatement) // Arrange
+            whenever(updatePaymentStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(dayStatement) // Arrange
+            whenever(dayStatement.executeQuery()).thenReturn(dayResultSet) // Arrange
+            whenever(dayResultSet.next()).thenReturn(true, true, false) // Arrange
+            whenever(dayResultSet.getString("day")).thenReturn("2024-06-15", "2024-06-16") // Arrange
+            whenever(mockConnection.prepareStatement(contains("DELETE FROM daily_sales"))).thenReturn(rollupDeleteStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(rollupInsertStatement) // Arrange
+            val service = PaymentService(mockConnection) // Arrange
+            val result = service.updatePayment(payment) // Act
+            assertTrue(result) // Assert
+            verify(dayStatement).setString(1, "pay-1") // Assert
+            verify(rollupDeleteStatement).setString(1, "2024-06-15") // Assert
+            verify(rollupDeleteStatement).setString(1, "2024-06-16") // Assert
+            verify(rollupInsertStatement, times(2)).executeUpdate() // Assert
+        }
+    }
 }
@@ -5,6 +5,7 @@ import org.mockito.kotlin.any
 import org.mockito.kotlin.argumentCaptor
 import org.mockito.kotlin.mock
 import org.mockito.kotlin.never
+import org.mockito.kotlin.times
 import org.mockito.kotlin.verify
 import org.mockito.kotlin.whenever
 import pos.ambrosia.models.OrderWithPaymentFilters
@@ -27,6 +28,20 @@ class ReportServiceTest {
     private val mockStatement: PreparedStatement = mock()
     private val mockResultSet: ResultSet = mock()
 
+    private val mockRollupStatement: PreparedStatement = mock()
+    private val mockRollupResultSet: ResultSet = mock()
+
+    // Paged date-ranged reports read their totals from the daily_sales rollup with a later statement
+    private fun setupRollupTotals(
+        itemsSold: Int = 0,
+        revenueCents: Long = 0L,
+    ) {
+        whenever(mockRollupStatement.executeQuery()).thenReturn(mockRollupResultSet)
+        whenever(mockRollupResultSet.next()).thenReturn(true)
+        whenever(mockRollupResultSet.getInt("items_sold")).thenReturn(itemsSold)
+        whenever(mockRollupResultSet.getLong("revenue_cents")).thenReturn(revenueCents)
+    }
+
     private fun setupEmptyResultSet() {
         whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement)
         whenever(mockStatement.executeQuery()).thenReturn(mockResultSet)
@@ -410,6 +425,130 @@ class ReportServiceTest {
         assertTrue(report.sales.isEmpty())
     }
 
+    @Test
+    fun `date-ranged report without a limit sums its totals in memory`() {
+        setupSingleRowResultSet(quantity = 2, priceAtOrder = 1000)
+
+        val service = ReportService(mockConnection)
+        val report =
+            service.getProductSalesReport(
+                period = "year",
+                startDate = null,
+                endDate = null,
+                productName = "Widget",
+                userId = null,
+                paymentMethod = null,
+            )
+
+        verify(mockConnection, times(1)).prepareStatement(any())
+        assertEquals(2000L, report.totalRevenueCents)
+        assertEquals(2, report.totalItemsSold)
+        assertEquals(1, report.sales.size)
+    }
+
+    @Test
+    fun `paged date-ranged totals come from the daily_sales rollup`() {
+        val sqlCaptor = argumentCaptor<String>()
+        val mockBtcStatement: PreparedStatement = mock()
+        val mockBtcResultSet: ResultSet = mock()
+        setupSingleRowResultSet(quantity = 2, priceAtOrder = 1000)
+        whenever(mockConnection.prepareStatement(sqlCaptor.capture()))
+            .thenReturn(mockStatement, mockBtcStatement, mockRollupStatement)
+        whenever(mockBtcStatement.executeQuery()).thenReturn(mockBtcResultSet)
+        whenever(mockBtcResultSet.next()).thenReturn(true)
+        whenever(mockBtcResultSet.getLong("total")).thenReturn(0L)
+        setupRollupTotals(itemsSold = 7, revenueCents = 12_500L)
+
+        val service = ReportService(mockConnection)
+        val report =
+            service.getProductSalesReport(
+                period = "year",
+                startDate = null,
+                endDate = null,
+                productName = "Widget",
+                userId = null,
+                paymentMethod = null,
+                limit = 10,
+            )
+
+        val rollupQuery = sqlCaptor.thirdValue
+        assertTrue(rollupQuery.contains("FROM daily_sales ds"))
+        assertTrue(rollupQuery.contains("p.name LIKE ?"))
+        verify(mockRollupStatement).setString(1, LocalDate.now(ZoneOffset.UTC).withDayOfYear(1).toString())
+        verify(mockRollupStatement).setString(3, "%Widget%")
+        assertEquals(12_500L, report.totalRevenueCents)
+        assertEquals(7, report.totalItemsSold)
+        assertEquals(1, report.sales.size)
+    }
+
+    @Test
+    fun `limit 0 with a date range reads only the rollup`() {
+        val sqlCaptor = argumentCaptor<String>()
+        val mockBtcStatement: PreparedStatement = mock()
+        val mockBtcResultSet: ResultSet = mock()
+        whenever(mockConnection.prepareStatement(sqlCaptor.capture())).thenReturn(mockBtcStatement, mockRollupStatement)
+        whenever(mockBtcStatement.executeQuery()).thenReturn(mockBtcResultSet)
+        whenever(mockBtcResultSet.next()).thenReturn(true)
+        whenever(mockBtcResultSet.getLong("total")).thenReturn(21_000L)
+        setupRollupTotals(itemsSold = 3, revenueCents = 4_500L)
+
+        val service = ReportService(mockConnection)
+        val report =
+            service.getProductSalesReport(
+                period = "month",
+                startDate = null,
+                endDate = null,
+                productName = null,
+                userId = null,
+                paymentMethod = null,
+                limit = 0,
+            )
+
+        assertFalse(sqlCaptor.allValues.any { it.contains("ORDER BY o.created_at") })
+        assertTrue(sqlCaptor.secondValue.contains("FROM daily_sales ds"))
+        assertTrue(report.sales.isEmpty())
+        assertEquals(4_500L, report.totalRevenueCents)
+        assertEquals(3, report.totalItemsSold)
+        assertEquals(21_000L, report.totalBtcSatoshis)
+    }
+
+    @Test
+    fun `limit and offset page the line items but not the totals`() {
+        val sqlCaptor = argumentCaptor<String>()
+        val mockBtcStatement: PreparedStatement = mock()
+        val mockBtcResultSet: ResultSet = mock()
+        setupSingleRowResultSet(quantity = 2, priceAtOrder = 1000)
+        whenever(mockConnection.prepareStatement(sqlCaptor.capture()))
+            .thenReturn(mockStatement, mockBtcStatement, mockRollupStatement)
+        whenever(mockBtcStatement.executeQuery()).thenReturn(mockBtcResultSet)
+        whenever(mockBtcResultSet.next()).thenReturn(true)
+        whenever(mockBtcResultSet.getLong("total")).thenReturn(5_000L)
+        setupRollupTotals(itemsSold = 40, revenueCents = 80_000L)
+
+        val service = ReportService(mockConnection)
+        val report =
+            service.getProductSalesReport(
+                period = null,
+                startDate = null,
+                endDate = null,
+                productName = null,
+                userId = null,
+                paymentMethod = null,
+                limit = 10,
+                offset = 20,
+            )
+
+        assertTrue(sqlCaptor.firstValue.contains("LIMIT ? OFFSET ?"))
+        verify(mockStatement).setInt(1, 10)
+        verify(mockStatement).setInt(2, 20)
+        assertTrue(sqlCaptor.secondValue.contains("SELECT DISTINCT pay.id, pay.satoshi_amount"))
+        assertTrue(sqlCaptor.thirdValue.contains("SUM(op.price_at_order * op.quantity)"))
+        assertEquals(1, report.sales.size)
+        assertEquals(5_000L, report.totalBtcSatoshis)
+        assertEquals(80_000L, report.totalRevenueCents)
+        assertEquals(40, report.totalItemsSold)
+    }
+
     @Test
     fun `correctly maps ResultSet fields to ProductSaleItem`() {
         setupSingleRowResultSet(
@@ -0,0 +1,94 @@
+package pos.ambrosia.utest
+
+import org.mockito.ArgumentMatchers.contains
+import org.mockito.kotlin.any
+import org.mockito.kotlin.mock
+import org.mockito.kotlin.never
+import org.mockito.kotlin.verify
+import org.mockito.kotlin.whenever
+import pos.ambrosia.services.SalesRollupService
+import java.sql.Connection
+import java.sql.PreparedStatement
+import java.sql.ResultSet
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFailsWith
+
+class SalesRollupServiceTest {
+    private val mockConnection: Connection = mock()
+    private val dayStatement: PreparedStatement = mock()
+    private val dayResultSet: ResultSet = mock()
+    private val deleteStatement: PreparedStatement = mock()
+    private val insertStatement: PreparedStatement = mock()
+
+    private fun stubRollupStatements(day: String?) {
+        whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(dayStatement)
+        whenever(dayStatement.executeQuery()).thenReturn(dayResultSet)
+        whenever(dayResultSet.next()).thenReturn(day != null)
+        whenever(dayResultSet.getString("day")).thenReturn(day)
+        whenever(mockConnection.prepareStatement(contains("DELETE FROM daily_sales"))).thenReturn(deleteStatement)
+        whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(insertStatement)
+    }
+
+    @Test
+    fun `refreshOrder recomputes the day of the order`() {
+        stubRollupStatements(day = "2024-06-15") // Arrange
+        val service = SalesRollupService(mockConnection) // Arrange
+
+        service.refreshOrder("order-1") // Act
+
+        verify(dayStatement).setString(1, "order-1") // Assert
+        verify(deleteStatement).setString(1, "2024-06-15") // Assert
+        verify(insertStatement).setString(1, "2024-06-15") // Assert
+        verify(insertStatement).executeUpdate() // Assert
+    }
+
+    @Test
+    fun `refreshTicket does nothing when the ticket has no order`() {
+        stubRollupStatements(day = null) // Arrange
+        val service = SalesRollupService(mockConnection) // Arrange
+
+        service.refreshTicket("missing-ticket") // Act
+
+        verify(mockConnection, never()).prepareStatement(contains("daily_sales")) // Assert
+    }
+
+    @Test
+    fun `refreshDay refuses to run outside the caller's transaction`() {
+        stubRollupStatements(day = null) // Arrange
+        whenever(mockConnection.autoCommit).thenReturn(true) // Arrange
+        val service = SalesRollupService(mockConnection) // Arrange
+
+        assertFailsWith<IllegalStateException> { service.refreshDay("2024-06-15") } // Act
+
+        verify(mockConnection, never()).prepareStatement(contains("daily_sales")) // Assert
+        verify(mockConnection, never()).autoCommit = any() // Assert
+    }
+
+    @Test
+    fun `refreshDay joins the caller's transaction`() {
+        stubRollupStatements(day = null) // Arrange
+        whenever(mockConnection.autoCommit).thenReturn(false) // Arrange
+        val service = SalesRollupService(mockConnection) // Arrange
+
+        service.refreshDay("2024-06-15") // Act
+
+        verify(mockConnection, never()).commit() // Assert
+        verify(mockConnection, never()).autoCommit = any() // Assert
+        verify(insertStatement).executeUpdate() // Assert
+    }
+
+    @Test
+    fun `rebuild clears the rollup and returns the rows written`() {
+        stubRollupStatements(day = null) // Arrange
+        whenever(insertStatement.executeUpdate()).thenReturn(42) // Arrange
+        val service = SalesRollupService(mockConnection) // Arrange
+
+        val rows = service.rebuild() // Act
+
+        assertEquals(42, rows) // Assert
+        verify(deleteStatement).executeUpdate() // Assert
+        verify(mockConnection, never()).prepareStatement(contains("AS day")) // Assert
+        verify(insertStatement, never()).setString(any(), any()) // Assert
+    }
+}
@@ -0,0 +1,110 @@
+package pos.ambrosia.utest
+
+import org.mockito.kotlin.mock
+import org.mockito.kotlin.never
+import org.mockito.kotlin.times
+import org.mockito.kotlin.verify
+import org.mockito.kotlin.whenever
+import pos.ambrosia.db.CachingConnection
+import pos.ambrosia.db.StatementCacheMetrics
+import java.sql.Connection
+import java.sql.PreparedStatement
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFalse
+import kotlin.test.assertTrue
+
+class StatementCacheTest {
+    private val mockConnection: Connection = mock()
+    private val metrics = StatementCacheMetrics()
+
+    private fun stubStatements(vararg sql: String): Map<String, PreparedStatement> =
+        sql.associateWith { text ->
+            mock<PreparedStatement>().also { whenever(mockConnection.prepareStatement(text)).thenReturn(it) }
+        }
+
+    @Test
+    fun `closed statement is reused for the same SQL`() {
+        stubStatements("SELECT 1") // Arrange
+        val connection = CachingConnection(mockConnection, metrics = metrics) // Arrange
+
+        connection.prepareStatement("SELECT 1").close() // Act
+        connection.prepareStatement("SELECT 1").close() // Act
+
+        verify(mockConnection, times(1)).prepareStatement("SELECT 1") // Assert
+        assertEquals(1, metrics.stats().hits) // Assert
+        assertEquals(1, metrics.stats().misses) // Assert
+    }
+
+    @Test
+    fun `statement in use is not handed out twice`() {
+        stubStatements("SELECT 1") // Arrange
+        val connection = CachingConnection(mockConnection, metrics = metrics) // Arrange
+        val first = connection.prepareStatement("SELECT 1") // Arrange
+
+        connection.prepareStatement("SELECT 1") // Act
+
+        verify(mockConnection, times(2)).prepareStatement("SELECT 1") // Assert
+        assertEquals(0, metrics.stats().hits) // Assert
+        first.close()
+    }
+
+    @Test
+    fun `statement never closed is not reused while still live`() {
+        val leakedStatement: PreparedStatement = mock() // Arrange
+        val freshStatement: PreparedStatement = mock() // Arrange
+        whenever(mockConnection.prepareStatement("SELECT 1")).thenReturn(leakedStatement, freshStatement) // Arrange
+        val connection = CachingConnection(mockConnection, metrics = metrics) // Arrange
+        val leaked = connection.prepareStatement("SELECT 1") // Arrange
+
+        connection.prepareStatement("SELECT 1").close() // Act
+        connection.prepareStatement("SELECT 1").close() // Act
+
+        verify(mockConnection, times(2)).prepareStatement("SELECT 1") // Assert
+        verify(leakedStatement, never()).clearParameters() // Assert
+        verify(leakedStatement, never()).close() // Assert
+        assertEquals(1, metrics.stats().hits) // Assert
+        assertEquals(0, metrics.stats().reclaimed) // Assert
+        assertFalse(leaked.isClosed) // Assert
+    }
+
+    @Test
+    fun `least recently used statement is evicted and closed`() {
+        val statements = stubStatements("SELECT 1", "SELECT 2", "SELECT 3") // Arrange
+        val connection = CachingConnection(mockConnection, capacity = 2, metrics = metrics) // Arrange
+
+        connection.prepareStatement("SELECT 1").close() // Act
+        connection.prepareStatement("SELECT 2").close() // Act
+        connection.prepareStatement("SELECT 3").close() // Act
+
+        verify(statements.getValue("SELECT 1")).close() // Assert
+        verify(statements.getValue("SELECT 3"), never()).close() // Assert
+        assertEquals(1, metrics.stats().evictions) // Assert
+        assertEquals(2, metrics.stats().cached) // Assert
+    }
+
+    @Test
+    fun `closing the connection closes idle statements`() {
+        val statements = stubStatements("SELECT 1") // Arrange
+        val connection = CachingConnection(mockConnection, metrics = metrics) // Arrange
+        connection.prepareStatement("SELECT 1").close() // Arrange
+
+        connection.close() // Act
+
+        verify(statements.getValue("SELECT 1")).close() // Assert
+        verify(mockConnection).close() // Assert
+        assertEquals(0, metrics.stats().cached) // Assert
+    }
+
+    @Test
+    fun `returned statement reports closed and clears its parameters`() {
+        val statements = stubStatements("SELECT ?") // Arrange
+        val connection = CachingConnection(mockConnection, metrics = metrics) // Arrange
+        val statement = connection.prepareStatement("SELECT ?") // Arrange
+
+        statement.close() // Act
+
+        assertTrue(statement.isClosed) // Assert
+        verify(statements.getValue("SELECT ?")).clearParameters() // Assert
+    }
+}
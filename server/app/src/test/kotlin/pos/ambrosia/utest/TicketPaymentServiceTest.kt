@@ -241,6 +241,7 @@ class TicketPaymentServiceTest {
         runBlocking {
             whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
             whenever(mockStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockStatement.executeQuery()).thenReturn(mockResultSet) // Arrange — no rollup day to refresh
             val service = TicketPaymentService(mockConnection) // Arrange
             val result = service.deleteTicketPayment("pay-1", "ticket-1") // Act
             assertTrue(result) // Assert
@@ -263,6 +264,7 @@ class TicketPaymentServiceTest {
         runBlocking {
             whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
             whenever(mockStatement.executeUpdate()).thenReturn(3) // Arrange
+            whenever(mockStatement.executeQuery()).thenReturn(mockResultSet) // Arrange — no rollup day to refresh
             val service = TicketPaymentService(mockConnection) // Arrange
             val result = service.deleteTicketPaymentsByTicket("ticket-1") // Act
             assertTrue(result) // Assert
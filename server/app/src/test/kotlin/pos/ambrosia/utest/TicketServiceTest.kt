@@ -5,6 +5,7 @@ import org.mockito.ArgumentMatchers.contains
 import org.mockito.kotlin.any
 import org.mockito.kotlin.mock
 import org.mockito.kotlin.never
+import org.mockito.kotlin.times
 import org.mockito.kotlin.verify
 import org.mockito.kotlin.whenever
 import pos.ambrosia.models.Ticket
@@ -421,6 +422,7 @@ class TicketServiceTest {
         runBlocking {
             whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
             whenever(mockStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockStatement.executeQuery()).thenReturn(mockResultSet) // Arrange — no rollup day to refresh
             val service = TicketService(mockConnection) // Arrange
             val result = service.deleteTicket("ticket-1") // Act
             assertTrue(result) // Assert
@@ -432,9 +434,74 @@ class TicketServiceTest {
         runBlocking {
             whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
             whenever(mockStatement.executeUpdate()).thenReturn(0) // Arrange
+            whenever(mockStatement.executeQuery()).thenReturn(mockResultSet) // Arrange
             val service = TicketService(mockConnection) // Arrange
             val result = service.deleteTicket("not-found-ticket") // Act
             assertFalse(result) // Assert
         }
     }
+
+    @Test
+    fun `updateTicket recomputes the days of the old and the new order`() {
+        runBlocking {
+            val ticket =
+                Ticket(
+                    id = "ticket-1",
+                    orderId = "order-2",
+                    userId = "user-1",
+                    ticketDate = "date-1",
+                    status = 1,
+                    totalAmount = 150.0,
+                    notes = "",
+                ) // Arrange
+            val checkStatement: PreparedStatement = mock() // Arrange
+            val checkResultSet: ResultSet = mock() // Arrange
+            val updateStatement: PreparedStatement = mock() // Arrange
+            val dayStatement: PreparedStatement = mock() // Arrange
+            val dayResultSet: ResultSet = mock() // Arrange
+            val rollupDeleteStatement: PreparedStatement = mock() // Arrange
+            val rollupInsertStatement: PreparedStatement = mock() // Arrange
+            whenever(mockConnection.prepareStatement(any())).thenReturn(checkStatement) // Arrange — order and user exist
+            whenever(checkStatement.executeQuery()).thenReturn(checkResultSet) // Arrange
+            whenever(checkResultSet.next()).thenReturn(true) // Arrange
+            whenever(mockConnection.prepareStatement(contains("UPDATE tickets"))).thenReturn(updateStatement) // Arrange
+            whenever(updateStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(dayStatement) // Arrange
+            whenever(dayStatement.executeQuery()).thenReturn(dayResultSet) // Arrange
+            whenever(dayResultSet.next()).thenReturn(true) // Arrange
+            whenever(dayResultSet.getString("day")).thenReturn("2024-06-15", "2024-06-20") // Arrange — before, after
+            whenever(mockConnection.prepareStatement(contains("DELETE FROM daily_sales"))).thenReturn(rollupDeleteStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(rollupInsertStatement) // Arrange
+            val service = TicketService(mockConnection) // Arrange
+            val result = service.updateTicket(ticket) // Act
+            assertTrue(result) // Assert
+            verify(rollupDeleteStatement).setString(1, "2024-06-15") // Assert
+            verify(rollupDeleteStatement).setString(1, "2024-06-20") // Assert
+            verify(rollupInsertStatement, times(2)).executeUpdate() // Assert
+        }
+    }
+
+    @Test
+    fun `deleteTicket recomputes the day its sales counted towards`() {
+        runBlocking {
+            val dayStatement: PreparedStatement = mock() // Arrange
+            val dayResultSet: ResultSet = mock() // Arrange
+            val rollupDeleteStatement: PreparedStatement = mock() // Arrange
+            val rollupInsertStatement: PreparedStatement = mock() // Arrange
+            whenever(mockConnection.prepareStatement(any())).thenReturn(mockStatement) // Arrange
+            whenever(mockStatement.executeUpdate()).thenReturn(1) // Arrange
+            whenever(mockConnection.prepareStatement(contains("AS day"))).thenReturn(dayStatement) // Arrange
+            whenever(dayStatement.executeQuery()).thenReturn(dayResultSet) // Arrange
+            whenever(dayResultSet.next()).thenReturn(true) // Arrange
+            whenever(dayResultSet.getString("day")).thenReturn("2024-06-15") // Arrange
+            whenever(mockConnection.prepareStatement(contains("DELETE FROM daily_sales"))).thenReturn(rollupDeleteStatement) // Arrange
+            whenever(mockConnection.prepareStatement(contains("INSERT INTO daily_sales"))).thenReturn(rollupInsertStatement) // Arrange
+            val service = TicketService(mockConnection) // Arrange
+            val result = service.deleteTicket("ticket-1") // Act
+            assertTrue(result) // Assert
+            verify(dayStatement).setString(1, "ticket-1") // Assert — read before the ticket is gone
+            verify(rollupDeleteStatement).setString(1, "2024-06-15") // Assert
+            verify(rollupInsertStatement).executeUpdate() // Assert
+        }
+    }
 }
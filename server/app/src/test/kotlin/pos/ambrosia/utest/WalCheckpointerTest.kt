@@ -0,0 +1,71 @@
+package pos.ambrosia.utest
+
+import org.mockito.ArgumentMatchers.contains
+import org.mockito.kotlin.mock
+import org.mockito.kotlin.verify
+import org.mockito.kotlin.whenever
+import pos.ambrosia.db.WalCheckpointer
+import java.sql.Connection
+import java.sql.ResultSet
+import java.sql.Statement
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFalse
+import kotlin.test.assertTrue
+
+class WalCheckpointerTest {
+    private val mockConnection: Connection = mock()
+    private val mockStatement: Statement = mock()
+    private val mockResultSet: ResultSet = mock()
+
+    private fun stubCheckpoint(
+        busy: Int,
+        logFrames: Int,
+        checkpointed: Int,
+    ) {
+        whenever(mockConnection.createStatement()).thenReturn(mockStatement)
+        whenever(mockStatement.executeQuery(contains("wal_checkpoint"))).thenReturn(mockResultSet)
+        whenever(mockResultSet.next()).thenReturn(true)
+        whenever(mockResultSet.getInt(1)).thenReturn(busy)
+        whenever(mockResultSet.getInt(2)).thenReturn(logFrames)
+        whenever(mockResultSet.getInt(3)).thenReturn(checkpointed)
+    }
+
+    @Test
+    fun `small WAL gets a passive checkpoint`() {
+        stubCheckpoint(busy = 0, logFrames = 10, checkpointed = 10) // Arrange
+        val checkpointer = WalCheckpointer({ mockConnection }, { 4_096L }, truncateAboveBytes = 8_192L) // Arrange
+
+        val busy = checkpointer.checkpoint() // Act
+
+        assertFalse(busy) // Assert
+        verify(mockStatement).executeQuery("PRAGMA wal_checkpoint(PASSIVE)") // Assert
+        val stats = checkpointer.stats() // Assert
+        assertEquals(1, stats.runs) // Assert
+        assertEquals(0, stats.truncates) // Assert
+        assertEquals(10, stats.lastCheckpointedFrames) // Assert
+    }
+
+    @Test
+    fun `large WAL gets a truncate checkpoint`() {
+        stubCheckpoint(busy = 0, logFrames = 0, checkpointed = 0) // Arrange
+        val checkpointer = WalCheckpointer({ mockConnection }, { 65_536L }, truncateAboveBytes = 8_192L) // Arrange
+
+        checkpointer.checkpoint() // Act
+
+        verify(mockStatement).executeQuery("PRAGMA wal_checkpoint(TRUNCATE)") // Assert
+        assertEquals(1, checkpointer.stats().truncates) // Assert
+        assertEquals(65_536L, checkpointer.stats().maxWalBytes) // Assert
+    }
+
+    @Test
+    fun `busy checkpoint is counted`() {
+        stubCheckpoint(busy = 1, logFrames = 50, checkpointed = 20) // Arrange
+        val checkpointer = WalCheckpointer({ mockConnection }, { 4_096L }) // Arrange
+
+        val busy = checkpointer.checkpoint() // Act
+
+        assertTrue(busy) // Assert
+        assertEquals(1, checkpointer.stats().busy) // Assert
+    }
+}
@@ -4,14 +4,28 @@ This module provides utility functions for testing authentication endpoints,
 token management, and cookie handling.
 """
 
+import asyncio
+import base64
+import json
+import logging
+import time
+from urllib.parse import urlsplit
+
 import httpx
 
 from ambrosia.api_utils import assert_status_code
 from ambrosia.http_client import AmbrosiaHttpClient
 
+logger = logging.getLogger(__name__)
+
 # Default test user credentials
 DEFAULT_TEST_USER = {"name": "cooluser1", "pin": "0000"}
 
+# A cached access token is handed out only while this share of its lifetime is
+# left, so the client gets close to a full lifetime (5 s in the e2e suite) to
+# run its requests in; older tokens are renewed through /auth/refresh first
+ACCESS_TOKEN_MIN_REMAINING = 0.9
+
 
 def get_tokens_from_response(response: httpx.Response) -> tuple[str, str]:
     """Extract access and refresh tokens from login/refresh response.
@@ -158,3 +172,128 @@ async def create_user(
     response = await admin_client.post("/users", json=user_data)
     assert_status_code(response, 201, f"Failed to create user '{name}'")
     return response.json()["id"]
+
+
+def get_token_expiry(token: str) -> float | None:
+    """Read the ``exp`` claim of a JWT without verifying its signature.
+
+    Args:
+        token: Encoded JWT (e.g. the accessToken cookie value)
+
+    Returns:
+        Expiry as a Unix timestamp, or None if the token cannot be decoded
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class CachedLogin:
+    """Login session shared by many short-lived clients.
+
+    The first call to :meth:`authenticate` logs in; later calls copy the cached
+    cookies into the given client. Unless the access token still has most of
+    its lifetime left it is renewed through ``/auth/refresh``, and a full login
+    is only repeated if the refresh token was revoked or replaced. Concurrent
+    callers that find the token stale wait for one of them to renew it.
+
+    The server keeps a single refresh token per user, so any other login or
+    logout of the same user revokes the cached one (and the cache's next login
+    revokes theirs): tests that exercise login and logout use users of their own.
+    """
+
+    def __init__(
+        self,
+        credentials: dict = None,
+        min_remaining: float = ACCESS_TOKEN_MIN_REMAINING,
+    ):
+        """Initialize the cache.
+
+        Args:
+            credentials: Login credentials dict with 'name' and 'pin'. Defaults to test user.
+            min_remaining: Share of the access token's lifetime that must be
+                left for it to be handed out without a refresh; callers that
+                only need it for one request can pass a small value
+        """
+        self.credentials = credentials or DEFAULT_TEST_USER
+        self.min_remaining = min_remaining
+        self.access_token: str | None = None
+        self.refresh_token: str | None = None
+        self.access_token_expiry = 0.0
+        self.access_token_lifetime = 0.0
+        self.login_count = 0
+        self.refresh_count = 0
+        self._renewing = asyncio.Lock()
+
+    async def authenticate(self, client: AmbrosiaHttpClient) -> None:
+        """Make ``client`` authenticated, logging in or refreshing only if needed.
+
+        Args:
+            client: An open client whose cookie jar receives the tokens
+        """
+        if self._fresh():
+            self._apply_cookies(client)
+            return
+
+        async with self._renewing:
+            if self.refresh_token is None:
+                await self._login(client)
+                return
+            self._apply_cookies(client)
+            # Another caller may have renewed it while this one waited
+            if not self._fresh():
+                await self._refresh(client)
+
+    def _fresh(self) -> bool:
+        """Whether the cached access token can be handed out as is."""
+        if self.refresh_token is None:
+            return False
+        remaining = self.access_token_expiry - time.time()
+        return remaining > self.access_token_lifetime * self.min_remaining
+
+    async def _refresh(self, client: AmbrosiaHttpClient) -> None:
+        """Renew the access token, logging in again if the refresh is rejected."""
+        response = await client.post("/auth/refresh")
+        if response.status_code != 200:
+            logger.debug(
+                f"Cached refresh token for {self.credentials['name']} rejected "
+                f"({response.status_code}), logging in again"
+            )
+            await self._login(client)
+            return
+
+        self.refresh_count += 1
+        self._store_access_token(response.cookies.get("accessToken"))
+
+    async def _login(self, client: AmbrosiaHttpClient) -> None:
+        """Log in with the cached credentials and remember the tokens."""
+        response = await login_user(client, self.credentials)
+        self.login_count += 1
+        access_token, self.refresh_token = get_tokens_from_response(response)
+        self._store_access_token(access_token)
+
+    def _store_access_token(self, access_token: str | None) -> None:
+        """Remember an access token and when it expires."""
+        assert access_token, "Should have accessToken after login/refresh"
+        self.access_token = access_token
+        # Unknown expiry: treat as expired so the next use refreshes it
+        self.access_token_expiry = get_token_expiry(access_token) or 0.0
+        # Tokens carry no issue time, so the lifetime is counted from now
+        self.access_token_lifetime = max(self.access_token_expiry - time.time(), 0.0)
+
+    def _apply_cookies(self, client: AmbrosiaHttpClient) -> None:
+        """Copy the cached tokens into the client's cookie jar.
+
+        Cookies are stored under the server host, like the ones the server
+        sets itself, so later Set-Cookie headers replace them instead of
+        creating duplicates.
+        """
+        assert client._client is not None, "HTTP client should be initialized"
+        domain = urlsplit(client.base_url).hostname or ""
+        client._client.cookies.set("accessToken", self.access_token, domain=domain)
+        client._client.cookies.set("refreshToken", self.refresh_token, domain=domain)
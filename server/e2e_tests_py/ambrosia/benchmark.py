@@ -0,0 +1,219 @@
+"""Endpoint benchmarks with stored baselines.
+
+A :class:`BenchmarkSession` times repeated calls of an endpoint into a
+:class:`~ambrosia.metrics.LatencyHistogram`, writes all results of a run to a
+JSON file tagged with the git revision, and compares each benchmark's
+percentiles with a stored baseline run so regressions fail the suite.
+"""
+
+import json
+import logging
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from ambrosia.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Percentiles stored and compared against the baseline
+PERCENTILES = (50, 95, 99)
+
+# Allowed slowdown relative to the baseline before a percentile regresses
+DEFAULT_TOLERANCE = 0.25
+
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_MS = 1.0
+
+
+def git_revision(cwd: Path | None = None) -> dict:
+    """Describe the checked-out git revision.
+
+    Args:
+        cwd: Directory inside the repository (default: current directory)
+
+    Returns:
+        ``{"sha": ..., "dirty": ...}``; sha is None outside a git checkout
+    """
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {"sha": None, "dirty": None}
+    return {"sha": sha, "dirty": bool(status.strip())}
+
+
+@dataclass
+class Regression:
+    """A percentile slower than the baseline allows.
+
+    Attributes:
+        benchmark: Benchmark name
+        percentile: Percentile that regressed (e.g. 95)
+        baseline_ms: Baseline value in milliseconds
+        current_ms: Current value in milliseconds
+    """
+
+    benchmark: str
+    percentile: int
+    baseline_ms: float
+    current_ms: float
+
+    def __str__(self) -> str:
+        change = self.current_ms / self.baseline_ms - 1 if self.baseline_ms else 0.0
+        return (
+            f"{self.benchmark} p{self.percentile}: {self.current_ms:.2f} ms vs "
+            f"baseline {self.baseline_ms:.2f} ms ({change:+.0%})"
+        )
+
+
+def compare(
+    name: str,
+    current: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[Regression]:
+    """Compare one benchmark's percentiles with its baseline.
+
+    Args:
+        name: Benchmark name
+        current: Current entry (with ``p50_ms``, ``p95_ms``, ``p99_ms``)
+        baseline: Baseline entry of the same benchmark
+        tolerance: Allowed relative slowdown (0.25 = 25 %)
+
+    Returns:
+        The regressed percentiles
+    """
+    regressions = []
+    for percentile in PERCENTILES:
+        key = f"p{percentile}_ms"
+        if key not in baseline:
+            continue
+        allowed = baseline[key] * (1 + tolerance)
+        if current[key] > allowed and current[key] - baseline[key] > MIN_REGRESSION_MS:
+            regressions.append(
+                Regression(name, percentile, baseline[key], current[key])
+            )
+    return regressions
+
+
+class BenchmarkSession:
+    """Collects the benchmark results of one run."""
+
+    def __init__(
+        self,
+        iterations: int,
+        warmup: int,
+        baseline: dict | None = None,
+        tolerance: float = DEFAULT_TOLERANCE,
+    ):
+        """Initialize the session.
+
+        Args:
+            iterations: Timed calls per benchmark
+            warmup: Untimed calls per benchmark before timing starts
+            baseline: A previous run loaded with :func:`load_results`, if any
+            tolerance: Allowed relative slowdown per percentile
+        """
+        self.iterations = iterations
+        self.warmup = warmup
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.results: dict[str, dict] = {}
+
+    async def measure(
+        self,
+        name: str,
+        action: Callable[[], Awaitable[httpx.Response]],
+        expected_status: int = 200,
+        prepare: Callable[[], Awaitable] | None = None,
+    ) -> dict:
+        """Time ``action`` repeatedly and store the result under ``name``.
+
+        Args:
+            name: Benchmark name
+            action: Coroutine function sending one request
+            expected_status: Status every response must have
+            prepare: Untimed coroutine function run before each call
+                (e.g. refreshing the login)
+
+        Returns:
+            The stored entry: count, percentiles, mean and raw histogram
+
+        Raises:
+            AssertionError: If a response has an unexpected status
+        """
+        histogram = LatencyHistogram()
+        for i in range(self.warmup + self.iterations):
+            if prepare is not None:
+                await prepare()
+            start = time.perf_counter()
+            response = await action()
+            elapsed = time.perf_counter() - start
+            assert response.status_code == expected_status, (
+                f"{name}: expected {expected_status}, got {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+            if i >= self.warmup:
+                histogram.record(elapsed)
+
+        entry = {
+            "count": histogram.count,
+            **{f"p{p}_ms": histogram.percentile(p) * 1000 for p in PERCENTILES},
+            "mean_ms": histogram.mean * 1000,
+            "histogram": histogram.to_dict(),
+        }
+        self.results[name] = entry
+        logger.info(
+            f"{name}: "
+            + ", ".join(f"p{p} {entry[f'p{p}_ms']:.2f} ms" for p in PERCENTILES)
+        )
+        return entry
+
+    def regressions(self, name: str) -> list[Regression]:
+        """Compare a measured benchmark with the baseline (none if absent)."""
+        if self.baseline is None:
+            return []
+        baseline = self.baseline.get("benchmarks", {}).get(name)
+        if baseline is None:
+            return []
+        return compare(name, self.results[name], baseline, self.tolerance)
+
+    def to_dict(self, revision: dict) -> dict:
+        """Serialize the run, tagged with ``revision`` (see :func:`git_revision`)."""
+        return {
+            **revision,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "iterations": self.iterations,
+            "warmup": self.warmup,
+            "benchmarks": self.results,
+        }
+
+
+def load_results(path: Path) -> dict | None:
+    """Load a results file, or return None if it does not exist."""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def write_results(path: Path, data: dict) -> None:
+    """Write a results file, creating its directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
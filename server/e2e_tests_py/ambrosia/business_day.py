@@ -0,0 +1,251 @@
+"""The "POS business day" load scenario.
+
+Setup opens a shift (or joins the one already open) and creates a small
+catalog: a dish category with dishes and a product category with stocked
+products. The traffic mix then models a day at the till:
+
+- dine-in orders are created with dishes, their ticket is issued after the
+  guests finish, and the ticket is paid a little later;
+- store (retail) orders are checked out in one call;
+- a manager now and then pulls the weekly sales report.
+
+After the last arrival a closing step closes the shift if the scenario
+opened it. The catalog, orders and tickets are left in place, like a real
+day's data.
+"""
+
+import uuid
+from datetime import UTC, datetime
+
+from ambrosia.http_client import AmbrosiaHttpClient
+from ambrosia.scenario import Scenario, ScenarioContext, Step, StepError
+
+DISHES_PER_DAY = 8
+PRODUCTS_PER_DAY = 8
+
+# Stock of each product, large enough that checkouts never run out
+PRODUCT_STOCK = 1_000_000
+
+# Payment method and currency used for payments (seeded by the migrations)
+PAYMENT_METHOD_NAME = "Cash"
+CURRENCY_ACRONYM = "USD"
+
+
+async def _create_category(
+    client: AmbrosiaHttpClient, context: ScenarioContext, kind: str
+) -> str:
+    name = f"load_{kind}_{uuid.uuid4().hex[:8]}"
+    response = await client.post("/categories", json={"name": name, "type": kind})
+    return context.expect(response, 201).json()["id"]
+
+
+def _find_id(items: list[dict], key: str, value: str, kind: str) -> str:
+    """Return the id of the item whose ``key`` is ``value``, or raise StepError."""
+    for item in items:
+        if item[key] == value:
+            return item["id"]
+    found = ", ".join(item[key] for item in items) or "none"
+    raise StepError(f"No {kind} {value!r} on the server (found: {found})")
+
+
+async def setup(client: AmbrosiaHttpClient, context: ScenarioContext) -> None:
+    """Open the shift and create the day's catalog."""
+    data = context.data
+
+    response = context.expect(await client.get("/users/me"), 200)
+    data["user_id"] = response.json()["user"]["userId"]
+
+    methods = context.expect(await client.get("/payments/methods"), 200).json()
+    data["payment_method_id"] = _find_id(
+        methods, "name", PAYMENT_METHOD_NAME, "payment method"
+    )
+    currencies = context.expect(await client.get("/payments/currencies"), 200).json()
+    data["currency_id"] = _find_id(currencies, "acronym", CURRENCY_ACRONYM, "currency")
+
+    response = await client.get("/shifts/open")
+    if response.status_code == 200:
+        data["shift_id"] = response.json()["id"]
+        data["opened_shift"] = False
+    else:
+        shift = {
+            "userId": data["user_id"],
+            "shiftDate": datetime.now(UTC).strftime("%Y-%m-%d"),
+            "startTime": datetime.now(UTC).strftime("%H:%M:%S"),
+            "notes": "load test business day",
+            "initialAmount": 500.0,
+        }
+        response = await client.post("/shifts", json=shift)
+        if response.status_code == 409:
+            # Another load process opened it first
+            response = context.expect(await client.get("/shifts/open"), 200)
+            data["opened_shift"] = False
+        else:
+            context.expect(response, 201)
+            data["opened_shift"] = True
+        data["shift_id"] = response.json()["id"]
+    if data["opened_shift"]:
+        context.put("open_shifts", data["shift_id"])
+
+    dish_category = await _create_category(client, context, "dish")
+    data["dishes"] = []
+    for i in range(DISHES_PER_DAY):
+        dish = {
+            "name": f"load_dish_{i}_{uuid.uuid4().hex[:6]}",
+            "price": round(context.rng.uniform(5, 30), 2),
+            "categoryId": dish_category,
+        }
+        response = context.expect(await client.post("/dishes", json=dish), 201)
+        data["dishes"].append({"id": response.json()["id"], "price": dish["price"]})
+
+    product_category = await _create_category(client, context, "product")
+    data["products"] = []
+    for i in range(PRODUCTS_PER_DAY):
+        uid = uuid.uuid4().hex[:8]
+        price_cents = context.rng.randrange(100, 5000)
+        product = {
+            "SKU": f"LOAD-{uid}",
+            "name": f"load_product_{i}_{uid}",
+            "costCents": price_cents // 2,
+            "priceCents": price_cents,
+            "quantity": PRODUCT_STOCK,
+            "minStockThreshold": 1,
+            "maxStockThreshold": PRODUCT_STOCK,
+            "categoryIds": [product_category],
+        }
+        response = context.expect(await client.post("/products", json=product), 201)
+        data["products"].append({"id": response.json()["id"], "price": price_cents})
+
+
+async def close_shift(client: AmbrosiaHttpClient, context: ScenarioContext, shift_id):
+    """Close a shift opened by setup."""
+    response = await client.post(
+        f"/shifts/{shift_id}/close", json={"finalAmount": 500.0}
+    )
+    context.expect(response, 200)
+
+
+async def create_order(client: AmbrosiaHttpClient, context: ScenarioContext, _):
+    """Create a dine-in order with 1-4 dishes; provides the order."""
+    data = context.data
+    dishes = context.rng.choices(data["dishes"], k=context.rng.randint(1, 4))
+    payload = {
+        "order": {
+            "userId": data["user_id"],
+            "status": "open",
+            "total": 0.0,
+            "createdAt": "",  # stamped by the server
+        },
+        "dishes": [
+            {
+                "orderId": "",
+                "dishId": dish["id"],
+                "priceAtOrder": dish["price"],
+                "status": "pending",
+                "shouldPrepare": True,
+            }
+            for dish in dishes
+        ],
+    }
+    response = await client.post("/orders/with-dishes", json=payload)
+    order_id = context.expect(response, 201).json()["id"]
+    return {"order_id": order_id, "total": round(sum(d["price"] for d in dishes), 2)}
+
+
+async def issue_ticket(client: AmbrosiaHttpClient, context: ScenarioContext, order):
+    """Issue the ticket of a finished order; provides the ticket."""
+    ticket = {
+        "orderId": order["order_id"],
+        "userId": context.data["user_id"],
+        "ticketDate": "",  # stamped by the server
+        "status": 1,
+        "totalAmount": order["total"],
+        "notes": "",
+    }
+    response = await client.post("/tickets", json=ticket)
+    return order | {"ticket_id": context.expect(response, 201).json()["id"]}
+
+
+async def pay_ticket(client: AmbrosiaHttpClient, context: ScenarioContext, ticket):
+    """Record a payment, link it to the ticket and mark the order paid."""
+    data = context.data
+    payment = {
+        "methodId": data["payment_method_id"],
+        "currencyId": data["currency_id"],
+        "amount": ticket["total"],
+    }
+    response = await client.post("/payments", json=payment)
+    payment_id = context.expect(response, 201).json()["id"]
+    response = await client.post(
+        "/payments/ticket-payments",
+        json={"paymentId": payment_id, "ticketId": ticket["ticket_id"]},
+    )
+    context.expect(response, 201)
+    order = {
+        "userId": data["user_id"],
+        "status": "paid",
+        "total": ticket["total"],
+        "createdAt": "",
+    }
+    response = await client.put(f"/orders/{ticket['order_id']}", json=order)
+    context.expect(response, 200)
+
+
+async def store_checkout(client: AmbrosiaHttpClient, context: ScenarioContext, _):
+    """Check out a store order of 1-3 products in one call."""
+    data = context.data
+    products = context.rng.sample(data["products"], k=context.rng.randint(1, 3))
+    items = [
+        {
+            "productId": product["id"],
+            "quantity": context.rng.randint(1, 3),
+            "priceAtOrder": product["price"],
+        }
+        for product in products
+    ]
+    request = {
+        "userId": data["user_id"],
+        "items": items,
+        "paymentMethodId": data["payment_method_id"],
+        "currencyId": data["currency_id"],
+        "amount": sum(i["quantity"] * i["priceAtOrder"] for i in items) / 100,
+    }
+    response = await client.post("/store/orders/checkout", json=request)
+    context.expect(response, 201)
+
+
+async def weekly_report(client: AmbrosiaHttpClient, context: ScenarioContext, _):
+    """Pull the weekly product sales report."""
+    context.expect(await client.get("/reports", params={"period": "week"}), 200)
+
+
+def business_day() -> Scenario:
+    """Build the POS business day scenario."""
+    return Scenario(
+        name="business-day",
+        setup=setup,
+        steps=[
+            Step("create_order", create_order, weight=4, provides="orders"),
+            Step(
+                "issue_ticket",
+                issue_ticket,
+                weight=4,
+                requires="orders",
+                provides="tickets",
+                think_time=(2.0, 10.0),
+            ),
+            Step(
+                "pay_ticket",
+                pay_ticket,
+                weight=4,
+                requires="tickets",
+                think_time=(0.5, 3.0),
+            ),
+            Step("store_checkout", store_checkout, weight=6),
+            Step("weekly_report", weekly_report, weight=0.5),
+        ],
+        closing=[Step("close_shift", close_shift, requires="open_shifts")],
+    )
+
+
+# Scenarios selectable with ``ambrosia-load --scenario``
+SCENARIOS = {"business-day": business_day}
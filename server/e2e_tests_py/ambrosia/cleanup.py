@@ -0,0 +1,106 @@
+"""Concurrent, dependency-ordered cleanup for test fixtures.
+
+A cleanup plan groups teardown actions into stages that run one after the
+other (e.g. users before the roles they reference). Actions within a stage
+run concurrently under a bound, and all failures are reported together once
+the plan has finished.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of cleanup requests in flight at once
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class CleanupFailure:
+    """A cleanup action that raised or got an error response.
+
+    Attributes:
+        stage: Name of the stage the action belongs to
+        description: Human-readable description of the action
+        error: Exception message or HTTP status description
+    """
+
+    stage: str
+    description: str
+    error: str
+
+
+class CleanupPlan:
+    """Ordered stages of concurrent cleanup actions."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
+        """Initialize an empty plan.
+
+        Args:
+            concurrency: Maximum number of actions running at once
+        """
+        self.concurrency = concurrency
+        self._stages: dict[str, list[tuple[str, Callable[[], Awaitable]]]] = {}
+
+    def add(
+        self, stage: str, description: str, action: Callable[[], Awaitable]
+    ) -> None:
+        """Add an action to a stage.
+
+        Stages run in the order they were first added to.
+
+        Args:
+            stage: Stage name (e.g. "users")
+            description: Description used in the failure report
+            action: Zero-argument coroutine function performing the cleanup
+        """
+        self._stages.setdefault(stage, []).append((description, action))
+
+    async def run(self) -> list[CleanupFailure]:
+        """Run every stage in order and report all failures at once.
+
+        A stage starts after every action of the previous stage finished,
+        whether it succeeded or not. Responses with an HTTP error status
+        count as failures.
+
+        Returns:
+            The failures, also logged as a single warning
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failures: list[CleanupFailure] = []
+
+        async def run_action(stage: str, description: str, action) -> None:
+            async with semaphore:
+                try:
+                    result = await action()
+                except Exception as e:
+                    failures.append(CleanupFailure(stage, description, repr(e)))
+                    return
+            if isinstance(result, httpx.Response) and result.is_error:
+                failures.append(
+                    CleanupFailure(
+                        stage,
+                        description,
+                        f"HTTP {result.status_code}: {result.text[:200]}",
+                    )
+                )
+
+        for stage, actions in self._stages.items():
+            await asyncio.gather(
+                *(
+                    run_action(stage, description, action)
+                    for description, action in actions
+                )
+            )
+        self._stages.clear()
+
+        if failures:
+            report = "\n".join(
+                f"  [{f.stage}] {f.description}: {f.error}" for f in failures
+            )
+            logger.warning(f"{len(failures)} cleanup action(s) failed:\n{report}")
+        return failures
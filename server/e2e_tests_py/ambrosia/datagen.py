@@ -0,0 +1,556 @@
+"""Synthetic store history for scaling tests.
+
+Writes a reproducible dataset straight into the SQLite file of a *stopped*
+server: cashiers, a product catalog with ``product_categories``, and a
+history of store orders with their ``order_products``. Each paid order also
+gets a ticket, a payment and the ``ticket_payments`` link, the same rows
+``POST /store/orders/checkout`` writes. Rows are inserted in bulk, one
+transaction per batch of orders, so a million orders take minutes instead of
+the hours it would take through the API. The ``daily_sales`` rollup that
+``/reports`` reads its date-range totals from is then rebuilt from the order
+tables, as ``ambrosia --rebuild-sales-rollup`` would.
+
+The database must already be migrated (e.g. a copy of the test server's
+template database, see ambrosia.template_db); the generator only inserts
+rows and checks that the migrated tables have the columns it writes.
+
+Usage::
+
+    ambrosia-datagen /tmp/ambrosia-test-data/ambrosia.db --orders 100000
+"""
+
+import argparse
+import base64
+import hashlib
+import logging
+import random
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+from ambrosia.test_server import AmbrosiaTestServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 1234
+
+# Orders inserted per transaction
+BATCH_ORDERS = 10_000
+
+# Prefix of every generated user, category and product name
+NAME_PREFIX = "datagen"
+
+# PIN of the generated cashiers; hashed like SecurePinProcessor does
+CASHIER_PIN = "1234"
+PIN_HASH_ITERATIONS = 10_000
+
+# Store opening hours (UTC) and the relative traffic of each hour
+OPENING_HOURS = range(8, 22)
+HOUR_WEIGHTS = [2, 3, 4, 6, 8, 7, 5, 4, 5, 6, 7, 6, 4, 2]
+
+# Relative traffic from Monday to Sunday
+WEEKDAY_WEIGHTS = [0.8, 0.85, 0.9, 1.0, 1.3, 1.5, 1.1]
+
+# Share of orders in each status; only paid orders have a ticket and payment
+STATUS_WEIGHTS = {"paid": 0.92, "closed": 0.03, "open": 0.05}
+
+# Payment method names (seeded by the migrations) and their share of payments
+PAYMENT_METHOD_WEIGHTS = {
+    "Cash": 0.45,
+    "Credit Card": 0.3,
+    "Debit Card": 0.2,
+    "BTC": 0.05,
+}
+CURRENCY_ACRONYM = "USD"
+BTC_USD_RATE = 60_000.0
+
+# Product names are "<adjective> <noun>", so name filters match groups of them
+PRODUCT_ADJECTIVES = [
+    "Classic",
+    "Organic",
+    "Large",
+    "Small",
+    "Spicy",
+    "Sweet",
+    "Roasted",
+    "Fresh",
+    "Dark",
+    "Vanilla",
+]
+PRODUCT_NOUNS = [
+    "Coffee",
+    "Tea",
+    "Bread",
+    "Cookie",
+    "Juice",
+    "Soda",
+    "Chocolate",
+    "Cheese",
+    "Salsa",
+    "Tortilla",
+    "Honey",
+    "Granola",
+]
+
+# Columns written to each table; checked against the migrated schema
+COLUMNS = {
+    "users": ("id", "name", "pin", "role_id", "is_deleted"),
+    "categories": ("id", "name", "type", "is_deleted"),
+    "products": (
+        "id",
+        "SKU",
+        "name",
+        "cost_cents",
+        "quantity",
+        "min_stock_threshold",
+        "max_stock_threshold",
+        "price_cents",
+        "is_deleted",
+    ),
+    "product_categories": ("product_id", "category_id"),
+    "orders": ("id", "user_id", "table_id", "status", "total", "created_at"),
+    "order_products": ("order_id", "product_id", "quantity", "price_at_order"),
+    "tickets": (
+        "id",
+        "order_id",
+        "user_id",
+        "ticket_date",
+        "status",
+        "total_amount",
+        "notes",
+    ),
+    "payments": (
+        "id",
+        "method_id",
+        "currency_id",
+        "transaction_id",
+        "amount",
+        "date",
+        "satoshi_amount",
+        "exchange_rate_at_payment",
+        "payment_hash",
+        "exchange_rate_currency",
+        "fiat_amount_at_payment",
+    ),
+    "ticket_payments": ("payment_id", "ticket_id"),
+    "daily_sales": (
+        "day",
+        "product_id",
+        "user_id",
+        "payment_method_id",
+        "items_sold",
+        "revenue_cents",
+    ),
+}
+
+# Recomputes daily_sales from the order tables; the same query as the server's
+# SalesRollupService.rebuild and the V30 migration's backfill
+REBUILD_SALES_ROLLUP = """
+INSERT INTO daily_sales (day, product_id, user_id, payment_method_id, items_sold, revenue_cents)
+SELECT date(o.created_at), op.product_id, o.user_id, pay.method_id, SUM(op.quantity), SUM(op.price_at_order * op.quantity)
+FROM order_products op
+JOIN orders o           ON o.id  = op.order_id
+JOIN products p         ON p.id  = op.product_id
+JOIN users u            ON u.id  = o.user_id
+JOIN tickets t          ON t.order_id = o.id
+JOIN ticket_payments tp ON tp.ticket_id = t.id
+JOIN payments pay       ON pay.id = tp.payment_id
+JOIN payment_methods pm ON pm.id = pay.method_id
+WHERE o.status = 'paid'
+  AND o.is_deleted = 0
+GROUP BY date(o.created_at), op.product_id, o.user_id, pay.method_id
+"""
+
+
+@dataclass
+class DatasetSpec:
+    """Size and shape of a generated dataset.
+
+    Attributes:
+        orders: Store orders to generate
+        days: Days of history the orders are spread over
+        end: Last day of the history (default: today, UTC), so relative
+            report periods such as ``week`` cover generated orders
+        users: Cashiers taking the orders
+        products: Products in the catalog
+        categories: Product categories; each product is in one or two
+        seed: Random seed; the same spec always yields the same rows
+    """
+
+    orders: int
+    days: int = 365
+    end: date | None = None
+    users: int = 8
+    products: int = 200
+    categories: int = 12
+    seed: int = DEFAULT_SEED
+
+
+def hash_pin(pin: str, user_id: str, secret: str) -> str:
+    """Hash a PIN for the ``users.pin`` column like the server does.
+
+    Args:
+        pin: Plain PIN
+        user_id: ID of the user, part of the salt
+        secret: Server secret, the other part of the salt
+
+    Returns:
+        Base64 of PBKDF2-HMAC-SHA256 over the PIN
+    """
+    digest = hashlib.pbkdf2_hmac(
+        "sha256",
+        pin.encode(),
+        secret.encode() + user_id.encode(),
+        PIN_HASH_ITERATIONS,
+    )
+    return base64.b64encode(digest).decode()
+
+
+def check_schema(connection: sqlite3.Connection) -> None:
+    """Check that the database is migrated far enough for the generator.
+
+    Raises:
+        ValueError: If a table or column the generator writes is missing
+    """
+    missing = []
+    for table, columns in COLUMNS.items():
+        existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        if not existing:
+            missing.append(table)
+        else:
+            missing.extend(f"{table}.{c}" for c in columns if c not in existing)
+    if missing:
+        raise ValueError(
+            f"Database is not fully migrated, missing: {', '.join(missing)}. "
+            "Start the server on it once to run the migrations."
+        )
+
+
+def _insert(connection: sqlite3.Connection, table: str, rows: list[tuple]) -> None:
+    columns = COLUMNS[table]
+    connection.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))})",
+        rows,
+    )
+
+
+class DatasetGenerator:
+    """Generates the rows of one :class:`DatasetSpec` into a database."""
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        spec: DatasetSpec,
+        secret: str = AmbrosiaTestServer.SECRET,
+    ):
+        """Initialize the generator.
+
+        Args:
+            connection: Connection to the migrated database
+            spec: Dataset to generate
+            secret: Server secret the cashier PINs are hashed with
+        """
+        self.connection = connection
+        self.spec = spec
+        self.secret = secret
+        self.rng = random.Random(spec.seed)
+        self.counts = dict.fromkeys(COLUMNS, 0)
+        self.user_ids: list[str] = []
+        self.products: list[tuple[str, int]] = []
+        self.methods: list[tuple[str, str]] = []
+        self.method_weights: list[float] = []
+        self.currency_id = ""
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _write(self, table: str, rows: list[tuple]) -> None:
+        _insert(self.connection, table, rows)
+        self.counts[table] += len(rows)
+
+    def _load_reference_data(self) -> None:
+        methods = dict(self.connection.execute("SELECT name, id FROM payment_methods"))
+        self.methods = [
+            (name, methods[name]) for name in PAYMENT_METHOD_WEIGHTS if name in methods
+        ]
+        if not self.methods:
+            raise ValueError("No known payment methods in the database")
+        self.method_weights = [PAYMENT_METHOD_WEIGHTS[name] for name, _ in self.methods]
+
+        row = self.connection.execute(
+            "SELECT id FROM currency WHERE acronym = ?", (CURRENCY_ACRONYM,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Currency {CURRENCY_ACRONYM} not found in the database")
+        self.currency_id = row[0]
+
+    def _generate_users(self) -> None:
+        # Give the cashiers the role of an existing user, so they can log in
+        row = self.connection.execute(
+            "SELECT role_id FROM users WHERE is_deleted = 0 AND role_id IS NOT NULL "
+            "LIMIT 1"
+        ).fetchone()
+        role_id = row[0] if row else None
+        rows = []
+        for i in range(self.spec.users):
+            user_id = self._uuid()
+            pin = hash_pin(CASHIER_PIN, user_id, self.secret)
+            rows.append((user_id, f"{NAME_PREFIX}_cashier_{i}", pin, role_id, 0))
+            self.user_ids.append(user_id)
+        self._write("users", rows)
+
+    def _generate_catalog(self) -> None:
+        categories = [
+            (self._uuid(), f"{NAME_PREFIX}_category_{i}", "product", 0)
+            for i in range(self.spec.categories)
+        ]
+        self._write("categories", categories)
+
+        products = []
+        links = []
+        for i in range(self.spec.products):
+            product_id = self._uuid()
+            name = (
+                f"{self.rng.choice(PRODUCT_ADJECTIVES)} "
+                f"{self.rng.choice(PRODUCT_NOUNS)} {i}"
+            )
+            price_cents = self.rng.randrange(50, 5000, 5)
+            products.append(
+                (
+                    product_id,
+                    f"{NAME_PREFIX.upper()}-{i:06d}",
+                    name,
+                    price_cents // 2,
+                    self.rng.randint(0, 500),
+                    10,
+                    500,
+                    price_cents,
+                    0,
+                )
+            )
+            for category in self.rng.sample(categories, k=self.rng.randint(1, 2)):
+                links.append((product_id, category[0]))
+            self.products.append((product_id, price_cents))
+        self._write("products", products)
+        self._write("product_categories", links)
+
+    def _order_days(self) -> list[tuple[date, int]]:
+        """Spread the orders over the days, weighted by weekday."""
+        end = self.spec.end or datetime.now(UTC).date()
+        days = [end - timedelta(days=d) for d in range(self.spec.days - 1, -1, -1)]
+        weights = [WEEKDAY_WEIGHTS[day.weekday()] for day in days]
+        scale = self.spec.orders / sum(weights)
+        shares = [w * scale for w in weights]
+        counts = [int(s) for s in shares]
+        # Hand the rounding remainder to the days that lost the most
+        remainder = self.spec.orders - sum(counts)
+        by_fraction = sorted(range(len(days)), key=lambda d: counts[d] - shares[d])
+        for d in by_fraction[:remainder]:
+            counts[d] += 1
+        return list(zip(days, counts, strict=True))
+
+    def _timestamps(self, day: date, count: int) -> list[str]:
+        """Sorted order times within a day, following the hourly traffic."""
+        hours = self.rng.choices(OPENING_HOURS, weights=HOUR_WEIGHTS, k=count)
+        seconds = sorted(h * 3600 + self.rng.randrange(3600) for h in hours)
+        start = datetime(day.year, day.month, day.day)
+        # Same format as datetime('now') in the store checkout
+        return [
+            (start + timedelta(seconds=s)).strftime("%Y-%m-%d %H:%M:%S")
+            for s in seconds
+        ]
+
+    def _order_rows(self, created_at: str, rows: dict[str, list[tuple]]) -> None:
+        order_id = self._uuid()
+        user_id = self.rng.choice(self.user_ids)
+        items = self.rng.sample(self.products, k=self.rng.randint(1, 4))
+        total_cents = 0
+        for product_id, price_cents in items:
+            quantity = self.rng.choices((1, 2, 3, 4), weights=(6, 3, 1, 0.5))[0]
+            total_cents += quantity * price_cents
+            rows["order_products"].append((order_id, product_id, quantity, price_cents))
+        total = total_cents / 100
+        status = self.rng.choices(
+            list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values())
+        )[0]
+        rows["orders"].append((order_id, user_id, None, status, total, created_at))
+        if status != "paid":
+            return
+
+        ticket_id = self._uuid()
+        rows["tickets"].append((ticket_id, order_id, user_id, created_at, 1, total, ""))
+
+        payment_id = self._uuid()
+        method, method_id = self.rng.choices(self.methods, weights=self.method_weights)[
+            0
+        ]
+        btc = (None, None, None, None, None)
+        if method == "BTC":
+            rate = BTC_USD_RATE * self.rng.uniform(0.8, 1.2)
+            btc = (
+                round(total / rate * 100_000_000),
+                rate,
+                f"{self.rng.getrandbits(256):064x}",
+                CURRENCY_ACRONYM,
+                total,
+            )
+        rows["payments"].append(
+            (payment_id, method_id, self.currency_id, "", total, created_at, *btc)
+        )
+        rows["ticket_payments"].append((payment_id, ticket_id))
+
+    def _flush(self, rows: dict[str, list[tuple]]) -> None:
+        # Parents before children, in the order the checkout inserts them
+        for table in ("orders", "order_products", "tickets", "payments"):
+            self._write(table, rows[table])
+        self._write("ticket_payments", rows["ticket_payments"])
+        self.connection.commit()
+        for batch in rows.values():
+            batch.clear()
+
+    def _generate_orders(self) -> None:
+        rows: dict[str, list[tuple]] = {
+            table: []
+            for table in (
+                "orders",
+                "order_products",
+                "tickets",
+                "payments",
+                "ticket_payments",
+            )
+        }
+        pending = 0
+        for day, count in self._order_days():
+            for created_at in self._timestamps(day, count):
+                self._order_rows(created_at, rows)
+                pending += 1
+                if pending == BATCH_ORDERS:
+                    self._flush(rows)
+                    pending = 0
+                    logger.info(f"Generated {self.counts['orders']} orders")
+        self._flush(rows)
+
+    def _rebuild_sales_rollup(self) -> None:
+        # The server only rolls up the sales it writes itself
+        with self.connection:
+            self.connection.execute("DELETE FROM daily_sales")
+            cursor = self.connection.execute(REBUILD_SALES_ROLLUP)
+        self.counts["daily_sales"] = cursor.rowcount
+        logger.info(f"Rebuilt daily_sales: {cursor.rowcount} rows")
+
+    def generate(self) -> dict[str, int]:
+        """Generate the dataset.
+
+        Returns:
+            Rows inserted per table
+
+        Raises:
+            ValueError: If the database is not migrated, lacks the seeded
+                reference data or already holds a generated dataset
+        """
+        check_schema(self.connection)
+        self._load_reference_data()
+        existing = self.connection.execute(
+            "SELECT COUNT(*) FROM users WHERE substr(name, 1, ?) = ?",
+            (len(NAME_PREFIX) + 1, f"{NAME_PREFIX}_"),
+        ).fetchone()[0]
+        if existing:
+            raise ValueError("Database already contains a generated dataset")
+
+        with self.connection:
+            self._generate_users()
+            self._generate_catalog()
+        self._generate_orders()
+        self._rebuild_sales_rollup()
+        return dict(self.counts)
+
+
+def generate(
+    database: Path,
+    spec: DatasetSpec,
+    secret: str = AmbrosiaTestServer.SECRET,
+) -> dict[str, int]:
+    """Generate a dataset into the database of a stopped server.
+
+    Args:
+        database: Path of the migrated ``ambrosia.db``
+        spec: Dataset to generate
+        secret: Server secret the cashier PINs are hashed with
+
+    Returns:
+        Rows inserted per table
+
+    Raises:
+        ValueError: If the database is missing, not migrated or already
+            holds a generated dataset
+    """
+    if not database.exists():
+        raise ValueError(f"Database not found: {database}")
+    start = time.perf_counter()
+    connection = sqlite3.connect(database)
+    try:
+        # Bulk load: a crash loses the dataset anyway, so skip the fsyncs
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA foreign_keys = ON")
+        counts = DatasetGenerator(connection, spec, secret).generate()
+    finally:
+        connection.close()
+    logger.info(
+        f"Generated {spec.orders} orders over {spec.days} days in "
+        f"{time.perf_counter() - start:.1f}s: {counts}"
+    )
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="ambrosia-datagen",
+        description="Write a synthetic store history into a stopped server's DB",
+    )
+    parser.add_argument("database", type=Path, help="Migrated ambrosia.db")
+    parser.add_argument("--orders", type=int, required=True)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument(
+        "--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD, default today)"
+    )
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--secret",
+        default=AmbrosiaTestServer.SECRET,
+        help="Server secret for the cashier PINs",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    spec = DatasetSpec(
+        orders=args.orders,
+        days=args.days,
+        end=args.end,
+        users=args.users,
+        products=args.products,
+        categories=args.categories,
+        seed=args.seed,
+    )
+    try:
+        counts = generate(args.database, spec, args.secret)
+    except ValueError as e:
+        raise SystemExit(str(e)) from e
+    for table, count in counts.items():
+        print(f"{table:<20} {count:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,11 +5,70 @@ of the Ktor HttpClient used in the Kotlin tests.
 """
 
 import logging
+import time
 
 import httpx
 
+from ambrosia.metrics import LatencyRecorder, default_recorder, route_template
+
 logger = logging.getLogger(__name__)
 
+# Default connection pool limits
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 5.0  # seconds
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Connection pool that several AmbrosiaHttpClient instances can share.
+
+    Clients using a shared transport keep their own cookie jars but reuse its
+    pooled keep-alive connections, so they do not pay a new TCP handshake each.
+    Clients never close it; call :meth:`aclose` once all of them are done.
+    Like any httpx transport it must only be used from one event loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    ):
+        """Initialize the pool.
+
+        Args:
+            max_connections: Maximum number of concurrent connections
+            max_keepalive_connections: Maximum number of idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept open
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = httpx.AsyncHTTPTransport(limits=self.limits)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request over a pooled connection."""
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        await self._transport.aclose()
+
+
+class _BorrowedTransport(httpx.AsyncBaseTransport):
+    """Client-side view of a SharedTransport that is not closed with the client."""
+
+    def __init__(self, shared: SharedTransport):
+        self._shared = shared
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._shared.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
 
 class AmbrosiaHttpClient:
     """HTTP client for testing API endpoints.
@@ -18,24 +77,61 @@ class AmbrosiaHttpClient:
     that matches the behavior of the Ktor HttpClient used in Kotlin tests.
     """
 
-    def __init__(self, base_url: str = "http://127.0.0.1:9154", timeout: float = 30.0):
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:9154",
+        timeout: float = 30.0,
+        transport: SharedTransport | None = None,
+        limits: httpx.Limits | None = None,
+        recorder: LatencyRecorder | None = default_recorder,
+        local_address: str | None = None,
+    ):
         """Initialize the HTTP client.
 
         Args:
             base_url: Base URL of the server
             timeout: Request timeout in seconds
+            transport: Shared connection pool to use instead of a private one
+            limits: Connection limits of the private pool (ignored with transport)
+            recorder: Per-route latency recorder (None disables recording)
+            local_address: Local IP to send from (e.g. 127.0.0.2), so the server
+                sees this client as its own remote address. Needs a private pool
+
+        Raises:
+            ValueError: If both transport and local_address are given
         """
+        if transport is not None and local_address is not None:
+            raise ValueError("local_address requires a private pool, not a transport")
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.transport = transport
+        self.limits = limits
+        self.recorder = recorder
+        self.local_address = local_address
         self._client: httpx.AsyncClient | None = None
 
     async def __aenter__(self):
         """Async context manager entry."""
+        if self.transport is not None:
+            pool_options = {"transport": _BorrowedTransport(self.transport)}
+        else:
+            pool_options = {}
+            if self.limits is not None:
+                pool_options["limits"] = self.limits
+            if self.local_address is not None:
+                # httpx only takes a source address on the transport
+                pool_options = {
+                    "transport": httpx.AsyncHTTPTransport(
+                        local_address=self.local_address, **pool_options
+                    )
+                }
+
         # Configure client with cookie jar and redirect following
         self._client = httpx.AsyncClient(
             timeout=self.timeout,
             follow_redirects=True,
             cookies=httpx.Cookies(),  # Explicit cookie jar
+            **pool_options,
         )
         return self
 
@@ -55,13 +151,7 @@ class AmbrosiaHttpClient:
         Returns:
             httpx.Response object
         """
-        full_url = self._build_url(url)
-
-        logger.debug(f"GET {full_url}")
-        response = await self._client.get(full_url, **kwargs)
-        logger.debug(f"Response: {response.status_code}")
-
-        return response
+        return await self._request("GET", url, **kwargs)
 
     async def post(self, url: str, **kwargs) -> httpx.Response:
         """Make a POST request.
@@ -73,13 +163,7 @@ class AmbrosiaHttpClient:
         Returns:
             httpx.Response object
         """
-        full_url = self._build_url(url)
-
-        logger.debug(f"POST {full_url}")
-        response = await self._client.post(full_url, **kwargs)
-        logger.debug(f"Response: {response.status_code}")
-
-        return response
+        return await self._request("POST", url, **kwargs)
 
     async def put(self, url: str, **kwargs) -> httpx.Response:
         """Make a PUT request.
@@ -91,13 +175,7 @@ class AmbrosiaHttpClient:
         Returns:
             httpx.Response object
         """
-        full_url = self._build_url(url)
-
-        logger.debug(f"PUT {full_url}")
-        response = await self._client.put(full_url, **kwargs)
-        logger.debug(f"Response: {response.status_code}")
-
-        return response
+        return await self._request("PUT", url, **kwargs)
 
     async def delete(self, url: str, **kwargs) -> httpx.Response:
         """Make a DELETE request.
@@ -109,12 +187,26 @@ class AmbrosiaHttpClient:
         Returns:
             httpx.Response object
         """
+        return await self._request("DELETE", url, **kwargs)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request and record its latency under its route template."""
         full_url = self._build_url(url)
 
-        logger.debug(f"DELETE {full_url}")
-        response = await self._client.delete(full_url, **kwargs)
+        logger.debug(f"{method} {full_url}")
+        start = time.perf_counter()
+        response = await self._client.request(method, full_url, **kwargs)
+        elapsed = time.perf_counter() - start
         logger.debug(f"Response: {response.status_code}")
 
+        if self.recorder is not None:
+            self.recorder.record(
+                method,
+                route_template(full_url),
+                response.status_code,
+                len(response.content),
+                elapsed,
+            )
         return response
 
     def _build_url(self, url: str) -> str:
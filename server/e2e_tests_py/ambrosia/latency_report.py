@@ -0,0 +1,90 @@
+"""Pytest plugin reporting per-route request latency at session end.
+
+Every AmbrosiaHttpClient records into ``metrics.default_recorder``. At the end
+of the session this plugin writes p50/p95/p99 per ``(method, route)`` to a
+JSON file and prints the slowest routes in the terminal summary. Under
+pytest-xdist each worker ships its raw histograms to the controller, which
+merges them before reporting, so percentiles are exact across workers.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from ambrosia.metrics import LatencyRecorder, default_recorder, format_summary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_PATH = "latency-report.json"
+
+# Number of routes shown in the terminal summary
+SUMMARY_ROUTES = 15
+
+# Key of the recorder data in xdist's workeroutput
+_WORKER_OUTPUT_KEY = "ambrosia_latency"
+
+
+def pytest_addoption(parser):
+    """Add the latency report options."""
+    group = parser.getgroup("ambrosia-latency", "Ambrosia request latency report")
+    group.addoption(
+        "--latency-report",
+        default=DEFAULT_REPORT_PATH,
+        metavar="PATH",
+        help=f"Write per-route latency percentiles as JSON (default: "
+        f"{DEFAULT_REPORT_PATH}, relative to the rootdir)",
+    )
+    group.addoption(
+        "--no-latency-report",
+        action="store_true",
+        default=False,
+        help="Do not write or print the latency report",
+    )
+
+
+def _is_worker(config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Merge a finished xdist worker's latencies into the controller's recorder."""
+    data = getattr(node, "workeroutput", {}).get(_WORKER_OUTPUT_KEY)
+    if data:
+        default_recorder.merge(LatencyRecorder.from_dict(data))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Ship worker latencies to the controller, or write the JSON report."""
+    config = session.config
+    if _is_worker(config):
+        config.workeroutput[_WORKER_OUTPUT_KEY] = default_recorder.to_dict()
+        return
+    if config.getoption("--no-latency-report") or not default_recorder.routes:
+        return
+
+    path = Path(config.getoption("--latency-report"))
+    if not path.is_absolute():
+        path = config.rootpath / path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"routes": default_recorder.summary()}, indent=2))
+    logger.info(f"Latency report written to {path}")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Print the slowest routes by p99."""
+    if _is_worker(config) or config.getoption("--no-latency-report"):
+        return
+    rows = default_recorder.summary()
+    if not rows:
+        return
+
+    terminalreporter.section("request latency (slowest p99 first)")
+    for line in format_summary(rows, SUMMARY_ROUTES):
+        terminalreporter.write_line(line)
+    if len(rows) > SUMMARY_ROUTES:
+        terminalreporter.write_line(
+            f"... {len(rows) - SUMMARY_ROUTES} more route(s) in the JSON report"
+        )
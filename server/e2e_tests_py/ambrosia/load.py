@@ -0,0 +1,761 @@
+"""Open-loop load generator for the Ambrosia API.
+
+Requests are started at a constant arrival rate (optionally ramped up
+linearly) regardless of how fast the server answers, the way real customers
+arrive at a till. A fixed number of virtual users, each an AmbrosiaHttpClient
+with its own cookie jar on a shared connection pool, pick up the scheduled
+arrivals. If all of them are busy, arrivals queue up.
+
+Latency is measured from each request's *intended* start time, not from when
+a virtual user got around to sending it, so time spent queued behind a slow
+server is counted (coordinated-omission correction). The uncorrected
+per-request service time is reported alongside it.
+
+Usage::
+
+    ambrosia-load --rps 50 --duration 60 --ramp-up 10 --users 32 \\
+        --method GET --path /products
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+
+import httpx
+
+from ambrosia.auth_utils import DEFAULT_TEST_USER, CachedLogin
+from ambrosia.http_client import AmbrosiaHttpClient, SharedTransport
+from ambrosia.metrics import LatencyRecorder, format_summary, route_template
+from ambrosia.resource_monitor import DEFAULT_INTERVAL, ResourceSampler, summarize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVER_URL = "http://127.0.0.1:9154"
+
+# Seconds load processes wait for each other to finish setup
+WORKER_SETUP_TIMEOUT = 300.0
+
+# Status recorded for requests that failed without a response
+TRANSPORT_ERROR_STATUS = 0
+
+# Method column of jobs that failed outside a request; the route column
+# holds the exception type
+JOB_ERROR_METHOD = "ERROR"
+
+# Share of the access token's lifetime that must be left when an arrival uses
+# it; an arrival only needs it for one job, so it is refreshed late
+LOGIN_MIN_REMAINING = 0.2
+
+# A job performs one unit of work with an authenticated client
+Job = Callable[[AmbrosiaHttpClient], Awaitable[httpx.Response]]
+
+
+@dataclass
+class LoadConfig:
+    """Parameters of a load run.
+
+    Attributes:
+        rps: Target arrival rate (requests per second) after ramp-up
+        duration: Seconds during which arrivals are scheduled, ramp-up included
+        ramp_up: Seconds over which the rate grows linearly from 0 to rps
+        users: Number of virtual users (maximum requests in flight)
+        server_url: Base URL of the server
+        timeout: Per-request timeout in seconds
+        credentials: Login credentials, or None to send unauthenticated requests
+        worker_index: Index of this process among ``worker_count`` load processes
+        worker_count: Number of processes sharing the arrival schedule; each
+            takes every ``worker_count``-th arrival
+    """
+
+    rps: float
+    duration: float
+    ramp_up: float = 0.0
+    users: int = 16
+    server_url: str = DEFAULT_SERVER_URL
+    timeout: float = 30.0
+    credentials: dict | None = field(default_factory=lambda: dict(DEFAULT_TEST_USER))
+    worker_index: int = 0
+    worker_count: int = 1
+
+
+@dataclass
+class Workload:
+    """What each arrival does, in a form that can be sent to worker processes.
+
+    Attributes:
+        method: HTTP method of the single-request workload
+        path: Path of the single-request workload
+        body: Optional JSON body of the single-request workload
+        scenario: Name of a scenario to run instead (see ``business_day.SCENARIOS``)
+        seed: Random seed of the scenario
+    """
+
+    method: str = "GET"
+    path: str = "/products"
+    body: dict | None = None
+    scenario: str | None = None
+    seed: int | None = None
+
+
+@dataclass
+class LoadResult:
+    """Outcome of a load run.
+
+    Attributes:
+        elapsed: Wall-clock seconds from the first arrival to the last response
+        scheduled: Number of arrivals scheduled
+        completed: Number of arrivals that got a response
+        errors: Number of arrivals that failed with an exception or a 5xx status
+        response_time: Latency from intended start, per route (CO-corrected)
+        service_time: Latency of each HTTP request as sent, per route
+    """
+
+    elapsed: float
+    scheduled: int
+    completed: int
+    errors: int
+    response_time: LatencyRecorder
+    service_time: LatencyRecorder
+
+    @property
+    def throughput(self) -> float:
+        """Completed arrivals per second."""
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            "elapsed": self.elapsed,
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "errors": self.errors,
+            "throughput": self.throughput,
+            "response_time": self.response_time.summary(),
+            "service_time": self.service_time.summary(),
+        }
+
+    def serialize(self) -> dict:
+        """Serialize with the raw histograms, so results can be merged later."""
+        return {
+            "elapsed": self.elapsed,
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "errors": self.errors,
+            "response_time": self.response_time.to_dict(),
+            "service_time": self.service_time.to_dict(),
+        }
+
+    @classmethod
+    def deserialize(cls, data: dict) -> "LoadResult":
+        """Deserialize a dict produced by :meth:`serialize`."""
+        return cls(
+            elapsed=data["elapsed"],
+            scheduled=data["scheduled"],
+            completed=data["completed"],
+            errors=data["errors"],
+            response_time=LatencyRecorder.from_dict(data["response_time"]),
+            service_time=LatencyRecorder.from_dict(data["service_time"]),
+        )
+
+    @classmethod
+    def combine(cls, results: list["LoadResult"]) -> "LoadResult":
+        """Merge the results of processes that ran side by side.
+
+        Counts and histograms are added; elapsed is the longest run, since
+        the processes started their schedules together.
+        """
+        combined = cls(0.0, 0, 0, 0, LatencyRecorder(), LatencyRecorder())
+        for result in results:
+            combined.elapsed = max(combined.elapsed, result.elapsed)
+            combined.scheduled += result.scheduled
+            combined.completed += result.completed
+            combined.errors += result.errors
+            combined.response_time.merge(result.response_time)
+            combined.service_time.merge(result.service_time)
+        return combined
+
+
+def arrival_times(rps: float, duration: float, ramp_up: float = 0.0) -> Iterator[float]:
+    """Yield the intended start offsets of a constant-arrival-rate run.
+
+    During ramp-up the rate grows linearly from 0 to ``rps``, so the k-th
+    arrival is placed where the integrated rate reaches k.
+
+    Args:
+        rps: Target arrival rate after ramp-up
+        duration: Total seconds during which arrivals are scheduled
+        ramp_up: Seconds of linear ramp-up (0 for a constant rate)
+
+    Yields:
+        Offsets in seconds from the start of the run, in increasing order
+    """
+    if rps <= 0:
+        return
+    ramp_up = min(ramp_up, duration)
+    ramp_arrivals = rps * ramp_up / 2
+    k = 0
+    while True:
+        if k < ramp_arrivals:
+            offset = math.sqrt(2 * ramp_up * k / rps)
+        else:
+            offset = ramp_up + (k - ramp_arrivals) / rps
+        if offset >= duration:
+            return
+        yield offset
+        k += 1
+
+
+def request_job(method: str, path: str, body: dict | None = None) -> Job:
+    """Build a job sending the same request every time.
+
+    Args:
+        method: HTTP method (GET, POST, PUT or DELETE)
+        path: Path relative to the server URL
+        body: Optional JSON body
+
+    Returns:
+        The job
+    """
+    kwargs = {"json": body} if body is not None else {}
+
+    async def job(client: AmbrosiaHttpClient) -> httpx.Response:
+        return await getattr(client, method.lower())(path, **kwargs)
+
+    return job
+
+
+class LoadGenerator:
+    """Runs one open-loop load run against a server."""
+
+    def __init__(self, config: LoadConfig, job: Job | None = None):
+        """Initialize the generator.
+
+        Args:
+            config: Run parameters
+            job: Work performed for each arrival (subclasses overriding
+                :meth:`_serve` may omit it)
+        """
+        self.config = config
+        self.job = job
+        self.response_time = LatencyRecorder()
+        self.service_time = LatencyRecorder()
+        self.completed = 0
+        self.errors = 0
+        # Set by the multi-process driver to line processes up after setup
+        self.start_barrier: threading.Barrier | None = None
+
+    async def run(self) -> LoadResult:
+        """Schedule every arrival, wait for all of them and return the result."""
+        config = self.config
+        login = (
+            CachedLogin(config.credentials, min_remaining=LOGIN_MIN_REMAINING)
+            if config.credentials
+            else None
+        )
+        transport = SharedTransport(
+            max_connections=config.users, max_keepalive_connections=config.users
+        )
+        queue: asyncio.Queue[float] = asyncio.Queue()
+        clients = [
+            AmbrosiaHttpClient(
+                config.server_url,
+                timeout=config.timeout,
+                transport=transport,
+                recorder=self.service_time,
+            )
+            for _ in range(config.users)
+        ]
+
+        try:
+            for client in clients:
+                await client.__aenter__()
+            if login is not None:
+                await login.authenticate(clients[0])
+            await self._setup(clients[0])
+            if self.start_barrier is not None:
+                await asyncio.to_thread(self.start_barrier.wait)
+
+            try:
+                workers = [
+                    asyncio.create_task(self._virtual_user(client, login, queue))
+                    for client in clients
+                ]
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                scheduled = await self._schedule(queue, start)
+                await queue.join()
+                elapsed = loop.time() - start
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+            finally:
+                if login is not None:
+                    await login.authenticate(clients[0])
+                await self._teardown(clients[0])
+        finally:
+            for client in clients:
+                await client.__aexit__(None, None, None)
+            await transport.aclose()
+
+        return LoadResult(
+            elapsed=elapsed,
+            scheduled=scheduled,
+            completed=self.completed,
+            errors=self.errors,
+            response_time=self.response_time,
+            service_time=self.service_time,
+        )
+
+    async def _setup(self, client: AmbrosiaHttpClient) -> None:
+        """Prepare the server before the first arrival (no-op by default)."""
+
+    async def _teardown(self, client: AmbrosiaHttpClient) -> None:
+        """Clean up after the last arrival (no-op by default)."""
+
+    async def _schedule(self, queue: asyncio.Queue, start: float) -> int:
+        """Enqueue each arrival at its intended time; return how many."""
+        config = self.config
+        loop = asyncio.get_running_loop()
+        scheduled = 0
+        arrivals = arrival_times(config.rps, config.duration, config.ramp_up)
+        for offset in itertools.islice(
+            arrivals, config.worker_index, None, config.worker_count
+        ):
+            intended = start + offset
+            delay = intended - loop.time()
+            # When behind schedule, release every due arrival without sleeping
+            if delay > 0:
+                await asyncio.sleep(delay)
+            queue.put_nowait(intended)
+            scheduled += 1
+        return scheduled
+
+    async def _virtual_user(
+        self,
+        client: AmbrosiaHttpClient,
+        login: CachedLogin | None,
+        queue: asyncio.Queue,
+    ) -> None:
+        """Serve arrivals from the queue until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            intended = await queue.get()
+            try:
+                await self._serve(client, login, intended, loop)
+            finally:
+                queue.task_done()
+
+    async def _serve(
+        self,
+        client: AmbrosiaHttpClient,
+        login: CachedLogin | None,
+        intended: float,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """Run the job for one arrival and record its corrected latency."""
+        try:
+            if login is not None:
+                await login.authenticate(client)
+            response = await self.job(client)
+        except Exception as e:
+            # Any failure of the job, not only HTTP errors, must leave the
+            # virtual user alive: nothing else would drain its arrivals
+            self.errors += 1
+            logger.debug(f"Request failed: {e!r}")
+            request = _failed_request(e)
+            if request is not None:
+                method, route = request.method, route_template(str(request.url))
+            else:
+                method, route = JOB_ERROR_METHOD, type(e).__name__
+            self.response_time.record(
+                method, route, TRANSPORT_ERROR_STATUS, 0, loop.time() - intended
+            )
+            return
+
+        self.completed += 1
+        if response.status_code >= 500:
+            self.errors += 1
+        self.response_time.record(
+            response.request.method,
+            route_template(str(response.request.url)),
+            response.status_code,
+            len(response.content),
+            loop.time() - intended,
+        )
+
+
+def _failed_request(error: Exception) -> httpx.Request | None:
+    """Return the request an exception was raised for, if it is known."""
+    if not isinstance(error, httpx.HTTPError):
+        return None
+    try:
+        return error.request
+    except RuntimeError:
+        return None
+
+
+def run_load(config: LoadConfig, job: Job) -> LoadResult:
+    """Run a load test in a new event loop.
+
+    Args:
+        config: Run parameters
+        job: Work performed for each arrival
+
+    Returns:
+        The result of the run
+    """
+    return asyncio.run(LoadGenerator(config, job).run())
+
+
+def _scenario_factory(name: str):
+    """Return the factory of a registered scenario, or raise ValueError."""
+    # Imported here: the scenario modules build on this one
+    from ambrosia.business_day import SCENARIOS
+
+    if name not in SCENARIOS:
+        raise ValueError(f"Unknown scenario {name!r}, choose from {sorted(SCENARIOS)}")
+    return SCENARIOS[name]
+
+
+def build_generator(config: LoadConfig, workload: Workload) -> LoadGenerator:
+    """Build the generator running ``workload`` in this process."""
+    if workload.scenario is None:
+        job = request_job(workload.method, workload.path, workload.body)
+        return LoadGenerator(config, job)
+
+    from ambrosia.scenario import ScenarioLoad
+
+    scenario = _scenario_factory(workload.scenario)()
+    # Give every process its own, still reproducible, random stream
+    seed = None if workload.seed is None else workload.seed + config.worker_index
+    return ScenarioLoad(config, scenario, seed)
+
+
+def _worker_main(
+    config: LoadConfig,
+    workload: Workload,
+    barrier: threading.Barrier,
+    results: multiprocessing.Queue,
+) -> None:
+    """Entry point of a load process: run its share and report raw histograms."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    try:
+        generator = build_generator(config, workload)
+        generator.start_barrier = barrier
+        result = asyncio.run(generator.run())
+    except BaseException as e:
+        # Release the processes waiting for this one at the barrier
+        barrier.abort()
+        results.put((config.worker_index, None, repr(e)))
+        return
+    results.put((config.worker_index, result.serialize(), None))
+
+
+def run_workload(
+    config: LoadConfig, workload: Workload, processes: int = 1
+) -> LoadResult:
+    """Run a workload, optionally fanned out over several processes.
+
+    A single asyncio loop saturates well below what the server can handle,
+    so with ``processes > 1`` each process runs its own event loop and
+    connection pool. Every process takes every N-th arrival of the global
+    schedule with ``ceil(users / N)`` virtual users, the processes start
+    their schedules together once all finished setup, and their raw
+    histograms are merged into one result.
+
+    Args:
+        config: Run parameters for the whole run
+        workload: What each arrival does
+        processes: Number of load processes
+
+    Returns:
+        The combined result
+
+    Raises:
+        ValueError: If the workload names an unknown scenario
+        RuntimeError: If a load process fails
+    """
+    if workload.scenario is not None:
+        _scenario_factory(workload.scenario)
+    if processes <= 1:
+        return asyncio.run(build_generator(config, workload).run())
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(processes, timeout=WORKER_SETUP_TIMEOUT)
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=_worker_main,
+            args=(
+                replace(
+                    config,
+                    users=math.ceil(config.users / processes),
+                    worker_index=index,
+                    worker_count=processes,
+                ),
+                workload,
+                barrier,
+                results,
+            ),
+            name=f"ambrosia-load-{index}",
+            daemon=True,
+        )
+        for index in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    collected: dict[int, LoadResult] = {}
+    try:
+        while len(collected) < processes:
+            try:
+                index, data, error = results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [w.name for w in workers if w.exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError(f"Load process(es) died: {dead}") from None
+                continue
+            if error is not None:
+                raise RuntimeError(f"Load process {index} failed: {error}")
+            collected[index] = LoadResult.deserialize(data)
+            logger.info(
+                f"Load process {index}: {collected[index].completed} completed, "
+                f"{collected[index].throughput:.1f}/s"
+            )
+    finally:
+        for worker in workers:
+            if worker.is_alive() and len(collected) < processes:
+                worker.terminate()
+            worker.join()
+
+    return LoadResult.combine(list(collected.values()))
+
+
+def print_result(result: LoadResult) -> None:
+    """Print a human-readable summary of a load run."""
+    print(
+        f"scheduled {result.scheduled}, completed {result.completed}, "
+        f"errors {result.errors}, elapsed {result.elapsed:.1f}s, "
+        f"throughput {result.throughput:.1f}/s"
+    )
+    print("\nresponse time (from intended start):")
+    print("\n".join(format_summary(result.response_time.summary())))
+    print("\nservice time (as sent):")
+    print("\n".join(format_summary(result.service_time.summary())))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="ambrosia-load",
+        description="Open-loop (constant-arrival-rate) load generator for Ambrosia",
+    )
+    parser.add_argument("--server-url", default=DEFAULT_SERVER_URL)
+    parser.add_argument("--rps", type=float, required=True, help="Arrival rate")
+    parser.add_argument(
+        "--duration", type=float, default=60.0, help="Seconds, ramp-up included"
+    )
+    parser.add_argument(
+        "--ramp-up", type=float, default=0.0, help="Seconds of linear ramp-up"
+    )
+    parser.add_argument(
+        "--users", type=int, default=16, help="Virtual users (max in flight)"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--path", default="/products")
+    parser.add_argument("--json", dest="body", help="JSON request body")
+    parser.add_argument(
+        "--scenario",
+        help="Run a weighted scenario (e.g. business-day) instead of one request",
+    )
+    parser.add_argument("--seed", type=int, help="Random seed of the scenario")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Worker processes sharing the arrival rate and virtual users",
+    )
+    parser.add_argument("--user", default=DEFAULT_TEST_USER["name"])
+    parser.add_argument("--pin", default=DEFAULT_TEST_USER["pin"])
+    parser.add_argument(
+        "--no-login", action="store_true", help="Send unauthenticated requests"
+    )
+    parser.add_argument("--output", type=Path, help="Write the result as JSON")
+    parser.add_argument(
+        "--server-pid", type=int, help="Sample this server process during the run"
+    )
+    parser.add_argument(
+        "--server-db", type=Path, help="The server's ambrosia.db, sampled with its WAL"
+    )
+    parser.add_argument(
+        "--resource-interval",
+        type=float,
+        help=f"Seconds between server resource samples (default: {DEFAULT_INTERVAL}, "
+        "5 with --soak)",
+    )
+    parser.add_argument(
+        "--resource-timeline", type=Path, help="Write server samples as JSON lines"
+    )
+
+    # Imported here: the soak module builds on this one
+    from ambrosia import soak
+
+    group = parser.add_argument_group(
+        "soak", "Long steady runs that fail when resources or p99 trend upwards"
+    )
+    group.add_argument(
+        "--soak",
+        action="store_true",
+        help="Fit trend lines to server RSS, FDs and per-route p99 (single process)",
+    )
+    group.add_argument(
+        "--window",
+        type=float,
+        default=soak.DEFAULT_WINDOW,
+        help="Seconds of each p99 window",
+    )
+    group.add_argument(
+        "--warmup",
+        type=float,
+        default=soak.DEFAULT_WARMUP,
+        help="Seconds at the start left out of the trend fits",
+    )
+    group.add_argument(
+        "--max-rss-slope",
+        type=float,
+        default=soak.DEFAULT_MAX_RSS_SLOPE,
+        help="Largest accepted server RSS growth in MB per hour",
+    )
+    group.add_argument(
+        "--max-fd-slope",
+        type=float,
+        default=soak.DEFAULT_MAX_FD_SLOPE,
+        help="Largest accepted open file descriptor growth per hour",
+    )
+    group.add_argument(
+        "--max-p99-slope",
+        type=float,
+        default=soak.DEFAULT_MAX_P99_SLOPE,
+        help="Largest accepted p99 growth per hour, as a fraction of the p99 "
+        "after warm-up (0.1 = 10%%)",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    config = LoadConfig(
+        rps=args.rps,
+        duration=args.duration,
+        ramp_up=args.ramp_up,
+        users=args.users,
+        server_url=args.server_url,
+        timeout=args.timeout,
+        credentials=None if args.no_login else {"name": args.user, "pin": args.pin},
+    )
+    workload = Workload(
+        method=args.method,
+        path=args.path,
+        body=json.loads(args.body) if args.body else None,
+        scenario=args.scenario,
+        seed=args.seed,
+    )
+    # Imported here: the soak module builds on this one
+    from ambrosia import soak
+
+    if args.soak:
+        if args.processes > 1:
+            raise SystemExit("--soak runs in a single process")
+        if args.duration <= args.warmup:
+            raise SystemExit("--duration must be longer than --warmup with --soak")
+        if args.server_pid is None:
+            logger.warning("No --server-pid: only per-route p99 trends are checked")
+    interval = args.resource_interval
+    if interval is None:
+        interval = soak.DEFAULT_RESOURCE_INTERVAL if args.soak else DEFAULT_INTERVAL
+
+    sampler = None
+    if args.server_pid is not None:
+        sampler = ResourceSampler(
+            args.server_pid,
+            database=args.server_db,
+            interval=interval,
+            timeline=args.resource_timeline,
+        )
+        sampler.start()
+    started = time.time()
+    windows = None
+    try:
+        if args.soak:
+            soaked = soak.run_soak(config, workload, args.window)
+            result, windows = soaked.result, soaked.windows
+        else:
+            result = run_workload(config, workload, args.processes)
+    except ValueError as e:
+        raise SystemExit(str(e)) from e
+    finally:
+        if sampler is not None:
+            sampler.stop()
+    print_result(result)
+    resources = summarize(sampler.samples) if sampler is not None else None
+    if resources is not None:
+        print(
+            f"\nserver: RSS {resources['rss_mb']:.1f} MB "
+            f"({resources['rss_delta_mb']:+.1f}, max {resources['rss_max_mb']:.1f}), "
+            f"FDs {resources['fds']} ({resources['fds_delta']:+d}), "
+            f"threads max {resources['threads_max']}, "
+            f"CPU {resources['cpu_mean']:.0f}%, "
+            f"DB {resources['db_delta_bytes'] / 1024:+.0f} KB"
+        )
+
+    trends = []
+    if windows is not None:
+        limits = soak.SoakLimits(
+            rss_mb_per_hour=args.max_rss_slope,
+            fds_per_hour=args.max_fd_slope,
+            p99_per_hour=args.max_p99_slope,
+        )
+        trends = soak.analyze(
+            windows,
+            sampler.samples if sampler is not None else [],
+            started + args.warmup,
+            limits,
+        )
+        print(f"\ntrends after {args.warmup:.0f}s warm-up:")
+        print("\n".join(soak.format_trends(trends)))
+
+    if args.output:
+        run = asdict(config) | asdict(workload) | {"processes": args.processes}
+        for key in ("credentials", "worker_index", "worker_count"):
+            run.pop(key)
+        data = {"started": started, "config": run} | result.to_dict()
+        if resources is not None:
+            data["resources"] = resources
+        if windows is not None:
+            data["windows"] = [asdict(window) for window in windows]
+            data["trends"] = [trend.to_dict() for trend in trends]
+        args.output.write_text(json.dumps(data, indent=2))
+    if any(trend.breached for trend in trends):
+        return 1
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
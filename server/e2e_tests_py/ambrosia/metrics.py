@@ -0,0 +1,303 @@
+"""Low-overhead request latency metrics.
+
+This module provides a mergeable log-bucketed latency histogram and a
+recorder that keeps one histogram per ``(method, route template)``, where ids
+in the path are collapsed (``/tables/3f2a...`` becomes ``/tables/{id}``).
+Histograms serialize to plain dicts, so results from pytest-xdist workers or
+load-generator processes can be combined exactly. A least-squares line fit
+is shared by the analyses that look for growth in latency or resources.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+# Bucket width: each bucket's upper bound is 2% above its lower bound, which
+# bounds the relative error of any reported percentile to 2%
+BUCKET_GROWTH = 1.02
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+
+# Values are bucketed in microseconds; everything below 1 µs lands in bucket 0
+_UNIT = 1e-6
+
+_ID_SEGMENT = re.compile(
+    r"^(?:"
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|\d+"
+    r"|[0-9a-fA-F]{16,}"
+    r")$"
+)
+
+
+def route_template(url: str) -> str:
+    """Collapse ids in a request path into ``{id}`` placeholders.
+
+    UUIDs, integers and long hex strings (e.g. payment hashes) are treated as
+    ids. The query string is dropped.
+
+    Args:
+        url: Absolute URL or path
+
+    Returns:
+        The path with id segments replaced, e.g. ``/tables/by-space/{id}``
+    """
+    path = urlsplit(url).path or "/"
+    return "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")
+    )
+
+
+def linear_fit(points: list[tuple[float, float]]) -> tuple[float, float] | None:
+    """Least-squares line through ``(x, y)`` points.
+
+    Returns:
+        ``(slope, intercept)``, or None with fewer than two distinct x values
+    """
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = covariance / variance
+    return slope, mean_y - slope * mean_x
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in seconds.
+
+    Buckets grow geometrically by BUCKET_GROWTH, so memory stays small for any
+    range of latencies while percentiles keep a bounded relative error.
+    Count, sum, min and max are tracked exactly.
+    """
+
+    def __init__(self):
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def _bucket_index(seconds: float) -> int:
+        units = seconds / _UNIT
+        if units <= 1.0:
+            return 0
+        return int(math.log(units) / _LOG_GROWTH) + 1
+
+    @staticmethod
+    def _bucket_upper_bound(index: int) -> float:
+        return _UNIT * BUCKET_GROWTH**index
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        """Record a duration.
+
+        Args:
+            seconds: Duration in seconds
+            count: Number of occurrences to record
+        """
+        index = self._bucket_index(seconds)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add every sample of ``other`` to this histogram."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        """Return the duration below which ``percent`` % of the samples fall.
+
+        Args:
+            percent: Percentile between 0 and 100
+
+        Returns:
+            Upper bound of the matching bucket, clamped to the observed
+            min/max; 0.0 if the histogram is empty
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(self._bucket_upper_bound(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Average duration in seconds (0.0 if empty)."""
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        """Deserialize a dict produced by :meth:`to_dict`."""
+        histogram = cls()
+        histogram.buckets = {int(k): v for k, v in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"] if data["min"] is not None else math.inf
+        histogram.max = data["max"]
+        return histogram
+
+
+@dataclass
+class RouteStats:
+    """Latency and traffic statistics for one ``(method, route)``.
+
+    Attributes:
+        histogram: Wall-clock latency of the requests
+        statuses: Number of responses per HTTP status code
+        bytes: Total response body bytes
+    """
+
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    statuses: Counter = field(default_factory=Counter)
+    bytes: int = 0
+
+    def merge(self, other: "RouteStats") -> None:
+        """Add ``other``'s statistics to these."""
+        self.histogram.merge(other.histogram)
+        self.statuses.update(other.statuses)
+        self.bytes += other.bytes
+
+
+class LatencyRecorder:
+    """Per-route request statistics, safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+
+    def record(
+        self, method: str, route: str, status: int, nbytes: int, seconds: float
+    ) -> None:
+        """Record one request.
+
+        Args:
+            method: HTTP method
+            route: Route template (see :func:`route_template`)
+            status: Response status code
+            nbytes: Response body size in bytes
+            seconds: Wall-clock latency in seconds
+        """
+        with self._lock:
+            stats = self.routes.get((method, route))
+            if stats is None:
+                stats = self.routes[(method, route)] = RouteStats()
+            stats.histogram.record(seconds)
+            stats.statuses[status] += 1
+            stats.bytes += nbytes
+
+    def merge(self, other: "LatencyRecorder") -> None:
+        """Add every route of ``other`` to this recorder."""
+        with self._lock:
+            for key, stats in other.routes.items():
+                self.routes.setdefault(key, RouteStats()).merge(stats)
+
+    def reset(self) -> None:
+        """Drop all recorded statistics."""
+        with self._lock:
+            self.routes.clear()
+
+    def summary(self) -> list[dict]:
+        """Summarize each route, slowest p99 first.
+
+        Returns:
+            One dict per route with count, percentiles and mean in milliseconds,
+            response bytes and status counts
+        """
+        with self._lock:
+            items = list(self.routes.items())
+        rows = [
+            {
+                "method": method,
+                "route": route,
+                "count": stats.histogram.count,
+                "p50_ms": stats.histogram.percentile(50) * 1000,
+                "p95_ms": stats.histogram.percentile(95) * 1000,
+                "p99_ms": stats.histogram.percentile(99) * 1000,
+                "max_ms": stats.histogram.max * 1000,
+                "mean_ms": stats.histogram.mean * 1000,
+                "bytes": stats.bytes,
+                "statuses": {str(k): v for k, v in sorted(stats.statuses.items())},
+            }
+            for (method, route), stats in items
+        ]
+        rows.sort(key=lambda row: row["p99_ms"], reverse=True)
+        return rows
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict."""
+        with self._lock:
+            return {
+                "routes": [
+                    {
+                        "method": method,
+                        "route": route,
+                        "histogram": stats.histogram.to_dict(),
+                        "statuses": {str(k): v for k, v in stats.statuses.items()},
+                        "bytes": stats.bytes,
+                    }
+                    for (method, route), stats in self.routes.items()
+                ]
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyRecorder":
+        """Deserialize a dict produced by :meth:`to_dict`."""
+        recorder = cls()
+        for item in data["routes"]:
+            recorder.routes[(item["method"], item["route"])] = RouteStats(
+                histogram=LatencyHistogram.from_dict(item["histogram"]),
+                statuses=Counter({int(k): v for k, v in item["statuses"].items()}),
+                bytes=item["bytes"],
+            )
+        return recorder
+
+
+def format_summary(rows: list[dict], limit: int | None = None) -> list[str]:
+    """Format :meth:`LatencyRecorder.summary` rows as a text table.
+
+    Args:
+        rows: Summary rows
+        limit: Maximum number of rows shown (all if None)
+
+    Returns:
+        Table lines, header first
+    """
+    lines = [
+        f"{'method':<7} {'route':<48} {'count':>6} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for row in rows[:limit]:
+        lines.append(
+            f"{row['method']:<7} {row['route']:<48} {row['count']:>6} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+    return lines
+
+
+# Recorder used by AmbrosiaHttpClient unless another one is passed
+default_recorder = LatencyRecorder()
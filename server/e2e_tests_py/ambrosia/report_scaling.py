@@ -0,0 +1,426 @@
+"""Report latency as a function of dataset size.
+
+For each dataset size a fresh server data directory is built from the
+template database, filled with :mod:`ambrosia.datagen`, and a server is
+started on it. ``GET /reports`` is then timed for every combination of the
+``period``, ``productName`` and ``paymentMethod`` filters. The resulting
+curves are written to a CSV file and to a self-contained HTML page with an
+SVG chart per period, plus the fitted scaling exponent of each curve
+(latency ~ orders^k; k > 1 means superlinear growth).
+
+Usage::
+
+    ambrosia-report-scaling --sizes 1000,10000,100000 \\
+        --output-dir benchmarks/results/report-scaling
+"""
+
+import argparse
+import asyncio
+import csv
+import html
+import itertools
+import logging
+import math
+import tempfile
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+from ambrosia.auth_utils import CachedLogin
+from ambrosia.benchmark import BenchmarkSession
+from ambrosia.datagen import DEFAULT_SEED, DatasetSpec, generate
+from ambrosia.http_client import AmbrosiaHttpClient
+from ambrosia.metrics import linear_fit
+from ambrosia.template_db import DATABASE_FILE, ensure_template, install_template
+from ambrosia.test_server import AmbrosiaTestServer, find_free_port
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_ITERATIONS = 10
+DEFAULT_WARMUP = 2
+
+# Large reports return every sale line, so allow slow responses
+REQUEST_TIMEOUT = 600.0
+
+# Filter values; None leaves the filter out. The product name matches one of
+# the generated name nouns, the payment method one of the seeded methods.
+PERIODS = (None, "week", "month", "year")
+PRODUCT_NAMES = (None, "Coffee")
+PAYMENT_METHODS = (None, "Cash")
+
+# Chart geometry (pixels) and one color per productName/paymentMethod pair
+CHART_WIDTH = 420
+CHART_HEIGHT = 300
+CHART_MARGIN = 50
+SERIES_COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728")
+
+
+@dataclass
+class ScalingPoint:
+    """Latency of one filter combination on one dataset size.
+
+    Attributes:
+        orders: Orders in the dataset
+        period: ``period`` filter, or empty if not set
+        product_name: ``productName`` filter, or empty if not set
+        payment_method: ``paymentMethod`` filter, or empty if not set
+        sales: Sale lines in the report
+        count: Timed requests
+        p50_ms: Median latency
+        p95_ms: 95th percentile latency
+        p99_ms: 99th percentile latency
+        mean_ms: Mean latency
+    """
+
+    orders: int
+    period: str
+    product_name: str
+    payment_method: str
+    sales: int
+    count: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+
+    @property
+    def series(self) -> tuple[str, str, str]:
+        """The filter combination, identifying the curve the point is on."""
+        return (self.period, self.product_name, self.payment_method)
+
+
+def filter_combinations() -> list[dict[str, str]]:
+    """Every combination of the report filters, as query parameters."""
+    combinations = []
+    for period, product, method in itertools.product(
+        PERIODS, PRODUCT_NAMES, PAYMENT_METHODS
+    ):
+        params = {"period": period, "productName": product, "paymentMethod": method}
+        combinations.append({k: v for k, v in params.items() if v is not None})
+    return combinations
+
+
+def scaling_exponent(points: list[ScalingPoint]) -> float | None:
+    """Least-squares slope of log(p50) over log(orders) for one curve.
+
+    Returns:
+        The exponent k of latency ~ orders^k, or None with fewer than two sizes
+    """
+    samples = [
+        (math.log(p.orders), math.log(p.p50_ms))
+        for p in points
+        if p.orders > 0 and p.p50_ms > 0
+    ]
+    fit = linear_fit(samples)
+    return fit[0] if fit is not None else None
+
+
+def _curves(points: list[ScalingPoint]) -> dict[tuple, list[ScalingPoint]]:
+    curves: dict[tuple, list[ScalingPoint]] = {}
+    for point in sorted(points, key=lambda p: p.orders):
+        curves.setdefault(point.series, []).append(point)
+    return curves
+
+
+async def measure_reports(
+    server_url: str,
+    orders: int,
+    iterations: int = DEFAULT_ITERATIONS,
+    warmup: int = DEFAULT_WARMUP,
+) -> list[ScalingPoint]:
+    """Time every filter combination of ``GET /reports`` on a running server.
+
+    Args:
+        server_url: URL of a server whose database holds the dataset
+        orders: Orders in the dataset, stored with each point
+        iterations: Timed requests per combination
+        warmup: Untimed requests per combination before timing
+
+    Returns:
+        One point per filter combination
+    """
+    session = BenchmarkSession(iterations=iterations, warmup=warmup)
+    login = CachedLogin()
+    points = []
+    async with AmbrosiaHttpClient(
+        server_url, timeout=REQUEST_TIMEOUT, recorder=None
+    ) as client:
+        for params in filter_combinations():
+            name = f"{orders}:" + "&".join(f"{k}={v}" for k, v in params.items())
+            responses = []
+
+            async def report(params=params, responses=responses):
+                response = await client.get("/reports", params=params)
+                responses.append(response)
+                return response
+
+            entry = await session.measure(
+                name, report, prepare=lambda: login.authenticate(client)
+            )
+            points.append(
+                ScalingPoint(
+                    orders=orders,
+                    period=params.get("period", ""),
+                    product_name=params.get("productName", ""),
+                    payment_method=params.get("paymentMethod", ""),
+                    sales=len(responses[-1].json()["sales"]),
+                    count=entry["count"],
+                    p50_ms=entry["p50_ms"],
+                    p95_ms=entry["p95_ms"],
+                    p99_ms=entry["p99_ms"],
+                    mean_ms=entry["mean_ms"],
+                )
+            )
+    return points
+
+
+def measure_size(
+    template_dir: Path,
+    orders: int,
+    seed: int = DEFAULT_SEED,
+    iterations: int = DEFAULT_ITERATIONS,
+    warmup: int = DEFAULT_WARMUP,
+) -> list[ScalingPoint]:
+    """Build a dataset of ``orders`` orders, start a server on it and measure.
+
+    Args:
+        template_dir: Template database directory (see ambrosia.template_db)
+        orders: Orders to generate
+        seed: Random seed of the dataset
+        iterations: Timed requests per combination
+        warmup: Untimed requests per combination before timing
+
+    Returns:
+        One point per filter combination
+    """
+    with tempfile.TemporaryDirectory(prefix="ambrosia-scaling-") as scratch:
+        data_dir = Path(scratch)
+        install_template(template_dir, data_dir)
+        generate(data_dir / DATABASE_FILE, DatasetSpec(orders=orders, seed=seed))
+
+        server = AmbrosiaTestServer(
+            port=find_free_port(), https_port=find_free_port(), data_dir=data_dir
+        )
+        server.start_server()
+        try:
+            return asyncio.run(
+                measure_reports(server.server_url, orders, iterations, warmup)
+            )
+        finally:
+            server.stop_server()
+
+
+def write_csv(path: Path, points: list[ScalingPoint]) -> None:
+    """Write the points as CSV, one row per size and filter combination."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=[field.name for field in fields(ScalingPoint)]
+        )
+        writer.writeheader()
+        for point in sorted(points, key=lambda p: (p.series, p.orders)):
+            writer.writerow(asdict(point))
+
+
+def _log_scale(values: list[float], start: float, length: float, flip: bool):
+    """Map values onto [start, start + length] on a log scale."""
+    low = math.log10(min(values))
+    high = math.log10(max(values))
+    span = high - low or 1.0
+
+    def scale(value: float) -> float:
+        fraction = (math.log10(value) - low) / span
+        return start + length * ((1 - fraction) if flip else fraction)
+
+    return scale
+
+
+def _chart(title: str, curves: dict[tuple, list[ScalingPoint]]) -> str:
+    """One log-log SVG chart of p50 latency over dataset size."""
+    points = [p for curve in curves.values() for p in curve if p.p50_ms > 0]
+    if not points:
+        return ""
+    plot = CHART_WIDTH - 2 * CHART_MARGIN
+    height = CHART_HEIGHT - 2 * CHART_MARGIN
+    sizes = sorted({p.orders for p in points})
+    latencies = [p.p50_ms for p in points]
+    x = _log_scale(sizes, CHART_MARGIN, plot, flip=False)
+    y = _log_scale(latencies, CHART_MARGIN, height, flip=True)
+    bottom = CHART_MARGIN + height
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" '
+        f'height="{CHART_HEIGHT}" font-family="sans-serif" font-size="11">',
+        f'<text x="{CHART_WIDTH / 2}" y="20" text-anchor="middle" '
+        f'font-size="13">{html.escape(title)}</text>',
+        f'<line x1="{CHART_MARGIN}" y1="{bottom}" x2="{CHART_MARGIN + plot}" '
+        f'y2="{bottom}" stroke="#333"/>',
+        f'<line x1="{CHART_MARGIN}" y1="{CHART_MARGIN}" x2="{CHART_MARGIN}" '
+        f'y2="{bottom}" stroke="#333"/>',
+        f'<text x="{CHART_MARGIN + plot / 2}" y="{CHART_HEIGHT - 8}" '
+        f'text-anchor="middle">orders</text>',
+        f'<text x="12" y="{CHART_MARGIN + height / 2}" text-anchor="middle" '
+        f'transform="rotate(-90 12 {CHART_MARGIN + height / 2})">p50 ms</text>',
+    ]
+    for size in sizes:
+        parts.append(
+            f'<text x="{x(size):.1f}" y="{bottom + 15}" '
+            f'text-anchor="middle">{size:,}</text>'
+        )
+    for latency in (min(latencies), max(latencies)):
+        parts.append(
+            f'<text x="{CHART_MARGIN - 4}" y="{y(latency) + 4:.1f}" '
+            f'text-anchor="end">{latency:.3g}</text>'
+        )
+    for index, ((_, product, method), curve) in enumerate(curves.items()):
+        color = SERIES_COLORS[index % len(SERIES_COLORS)]
+        curve = [p for p in curve if p.p50_ms > 0]
+        path = " ".join(f"{x(p.orders):.1f},{y(p.p50_ms):.1f}" for p in curve)
+        parts.append(
+            f'<polyline points="{path}" fill="none" stroke="{color}" stroke-width="2"/>'
+        )
+        for p in curve:
+            parts.append(
+                f'<circle cx="{x(p.orders):.1f}" cy="{y(p.p50_ms):.1f}" r="3" '
+                f'fill="{color}"><title>{p.orders:,} orders: {p.p50_ms:.1f} ms '
+                f"p50, {p.p95_ms:.1f} ms p95, {p.sales:,} sales</title></circle>"
+            )
+        label = f"productName={product or '-'} paymentMethod={method or '-'}"
+        legend_y = CHART_MARGIN + 14 * index
+        parts.append(
+            f'<text x="{CHART_MARGIN + 8}" y="{legend_y}" '
+            f'fill="{color}">{html.escape(label)}</text>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def write_html(path: Path, points: list[ScalingPoint]) -> None:
+    """Write a self-contained HTML page with the charts and exponents."""
+    curves = _curves(points)
+    charts = []
+    for period in PERIODS:
+        period_curves = {s: c for s, c in curves.items() if s[0] == (period or "")}
+        charts.append(_chart(f"period={period or '(none)'}", period_curves))
+
+    sizes = sorted({p.orders for p in points})
+    header = "".join(f"<th>p50 ms @ {size:,}</th>" for size in sizes)
+    rows = []
+    for (period, product, method), curve in curves.items():
+        by_size = {p.orders: p for p in curve}
+        cells = "".join(
+            f"<td>{by_size[size].p50_ms:.1f}</td>" if size in by_size else "<td></td>"
+            for size in sizes
+        )
+        exponent = scaling_exponent(curve)
+        rows.append(
+            f"<tr><td>{html.escape(period or '-')}</td>"
+            f"<td>{html.escape(product or '-')}</td>"
+            f"<td>{html.escape(method or '-')}</td>{cells}"
+            f"<td>{'' if exponent is None else f'{exponent:.2f}'}</td></tr>"
+        )
+
+    page = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>GET /reports latency by dataset size</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+svg {{ margin: 0 1em 1em 0; border: 1px solid #ddd; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+</style>
+</head>
+<body>
+<h1>GET /reports latency by dataset size</h1>
+<p>Median latency per filter combination (log-log). The exponent k is the
+fitted slope of latency ~ orders^k; k &gt; 1 means superlinear growth.</p>
+{"".join(charts)}
+<table>
+<tr><th>period</th><th>productName</th><th>paymentMethod</th>{header}<th>k</th></tr>
+{"".join(rows)}
+</table>
+</body>
+</html>
+"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(page)
+
+
+def run_scaling(
+    sizes: list[int],
+    output_dir: Path,
+    seed: int = DEFAULT_SEED,
+    iterations: int = DEFAULT_ITERATIONS,
+    warmup: int = DEFAULT_WARMUP,
+) -> list[ScalingPoint]:
+    """Measure every size and write ``report-scaling.csv`` and ``.html``.
+
+    The CSV and HTML are rewritten after each size, so a long run that is
+    interrupted keeps the sizes it finished.
+
+    Args:
+        sizes: Dataset sizes (orders), measured in increasing order
+        output_dir: Directory receiving the CSV and HTML files
+        seed: Random seed of the datasets
+        iterations: Timed requests per combination
+        warmup: Untimed requests per combination before timing
+
+    Returns:
+        All measured points
+    """
+    template_dir = ensure_template(
+        AmbrosiaTestServer(port=find_free_port(), https_port=find_free_port())
+    )
+    points: list[ScalingPoint] = []
+    for orders in sorted(sizes):
+        logger.info(f"Measuring /reports with {orders:,} orders")
+        points.extend(measure_size(template_dir, orders, seed, iterations, warmup))
+        write_csv(output_dir / "report-scaling.csv", points)
+        write_html(output_dir / "report-scaling.html", points)
+
+    for (period, product, method), curve in _curves(points).items():
+        exponent = scaling_exponent(curve)
+        if exponent is not None:
+            logger.info(
+                f"period={period or '-'} productName={product or '-'} "
+                f"paymentMethod={method or '-'}: k = {exponent:.2f}"
+            )
+    return points
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="ambrosia-report-scaling",
+        description="Measure GET /reports latency over increasing dataset sizes",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated order counts (default: 1000,10000,100000)",
+    )
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--output-dir", type=Path, default=Path("benchmarks/results/report-scaling")
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    run_scaling(args.sizes, args.output_dir, args.seed, args.iterations, args.warmup)
+    print(f"Wrote {args.output_dir / 'report-scaling.csv'} and .html")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,240 @@
+"""Resource sampling of the server process.
+
+A :class:`ResourceSampler` polls a process tree (the server launcher and the
+JVM it starts) from a background thread and records its resident memory,
+CPU usage, thread count and open file descriptors, together with the size of
+the SQLite database and its WAL file. Samples can be streamed to a JSON-lines
+timeline, and :func:`summarize` reduces the samples taken between two points
+in time (e.g. the start and end of a test) to growth and peak figures.
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background samples
+DEFAULT_INTERVAL = 0.5
+
+MB = 1024 * 1024
+
+
+@dataclass
+class ResourceSample:
+    """Resource usage of the process tree at one point in time.
+
+    Attributes:
+        time: Unix timestamp of the sample
+        rss: Resident set size in bytes, summed over the tree
+        cpu_percent: CPU usage since the previous sample (100 = one core)
+        threads: Threads in the tree
+        fds: Open file descriptors (handles on Windows) in the tree
+        db_bytes: Size of the SQLite database file
+        wal_bytes: Size of its write-ahead log (0 if there is none)
+        label: Why the sample was taken, empty for background samples
+    """
+
+    time: float
+    rss: int
+    cpu_percent: float
+    threads: int
+    fds: int
+    db_bytes: int
+    wal_bytes: int
+    label: str = ""
+
+
+def _file_size(path: Path | None) -> int:
+    try:
+        return path.stat().st_size if path is not None else 0
+    except FileNotFoundError:
+        return 0
+
+
+def _open_fds(process: psutil.Process) -> int:
+    if hasattr(process, "num_fds"):
+        return process.num_fds()
+    return process.num_handles()
+
+
+class ResourceSampler:
+    """Samples a process tree at a fixed interval from a background thread."""
+
+    def __init__(
+        self,
+        pid: int,
+        database: Path | None = None,
+        interval: float = DEFAULT_INTERVAL,
+        timeline: Path | None = None,
+    ):
+        """Initialize the sampler.
+
+        Args:
+            pid: Root process; its children (e.g. the JVM) are included
+            database: SQLite database file; ``<database>-wal`` is its WAL
+            interval: Seconds between background samples
+            timeline: JSON-lines file receiving every sample, if any
+        """
+        self.root = psutil.Process(pid)
+        self.database = database
+        self.wal = database.with_name(f"{database.name}-wal") if database else None
+        self.interval = interval
+        self.timeline = timeline
+        self.samples: list[ResourceSample] = []
+        self._processes: dict[int, psutil.Process] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._timeline_file = None
+
+    def start(self) -> None:
+        """Take a first sample and start sampling in the background."""
+        if self.timeline is not None:
+            self.timeline.parent.mkdir(parents=True, exist_ok=True)
+            self._timeline_file = self.timeline.open("w")
+        self.sample("start")
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="resource-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and close the timeline."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sample("stop")
+        with self._lock:
+            if self._timeline_file is not None:
+                self._timeline_file.close()
+                self._timeline_file = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _tree(self) -> list[psutil.Process]:
+        """The root and its descendants, reusing Process objects for cpu_percent."""
+        try:
+            current = [self.root, *self.root.children(recursive=True)]
+        except psutil.NoSuchProcess:
+            return []
+        processes = {}
+        for process in current:
+            processes[process.pid] = self._processes.get(process.pid, process)
+        self._processes = processes
+        return list(processes.values())
+
+    def sample(self, label: str = "") -> ResourceSample | None:
+        """Take a sample now.
+
+        Args:
+            label: Stored with the sample (e.g. ``"start <test id>"``)
+
+        Returns:
+            The sample, or None if the process has exited
+        """
+        with self._lock:
+            rss = threads = fds = 0
+            cpu = 0.0
+            alive = False
+            for process in self._tree():
+                try:
+                    with process.oneshot():
+                        rss += process.memory_info().rss
+                        cpu += process.cpu_percent()
+                        threads += process.num_threads()
+                        fds += _open_fds(process)
+                    alive = True
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            if not alive:
+                return None
+
+            sample = ResourceSample(
+                time=time.time(),
+                rss=rss,
+                cpu_percent=cpu,
+                threads=threads,
+                fds=fds,
+                db_bytes=_file_size(self.database),
+                wal_bytes=_file_size(self.wal),
+                label=label,
+            )
+            self.samples.append(sample)
+            if self._timeline_file is not None:
+                self._timeline_file.write(json.dumps(asdict(sample)) + "\n")
+                self._timeline_file.flush()
+            return sample
+
+    def between(self, start: float, end: float) -> list[ResourceSample]:
+        """Samples taken from ``start`` to ``end`` (Unix timestamps), inclusive."""
+        with self._lock:
+            times = [s.time for s in self.samples]
+            return self.samples[
+                bisect.bisect_left(times, start) : bisect.bisect_right(times, end)
+            ]
+
+
+def summarize(samples: list[ResourceSample]) -> dict | None:
+    """Reduce consecutive samples to growth and peak figures.
+
+    Args:
+        samples: Samples in time order; the first and last are the baseline
+            and the final state
+
+    Returns:
+        Duration, RSS/FD/thread/DB growth, peaks and mean CPU, or None
+        without samples
+    """
+    if not samples:
+        return None
+    first, last = samples[0], samples[-1]
+    return {
+        "seconds": last.time - first.time,
+        "samples": len(samples),
+        "rss_mb": last.rss / MB,
+        "rss_delta_mb": (last.rss - first.rss) / MB,
+        "rss_max_mb": max(s.rss for s in samples) / MB,
+        "fds": last.fds,
+        "fds_delta": last.fds - first.fds,
+        "fds_max": max(s.fds for s in samples),
+        "threads_delta": last.threads - first.threads,
+        "threads_max": max(s.threads for s in samples),
+        "cpu_mean": sum(s.cpu_percent for s in samples[1:]) / max(len(samples) - 1, 1),
+        "db_delta_bytes": last.db_bytes - first.db_bytes,
+        "wal_max_bytes": max(s.wal_bytes for s in samples),
+    }
+
+
+def format_summaries(rows: list[dict], limit: int | None = None) -> list[str]:
+    """Format per-test summaries (with a ``test`` key) as aligned table lines.
+
+    Args:
+        rows: Summaries as returned by :func:`summarize`, plus ``test``
+        limit: Show at most this many rows
+
+    Returns:
+        Header and one line per row
+    """
+    lines = [
+        f"{'RSS Δ MB':>9} {'RSS MB':>8} {'FDs Δ':>6} {'thr Δ':>6} "
+        f"{'CPU %':>6} {'DB Δ KB':>8}  test"
+    ]
+    for row in rows[:limit]:
+        lines.append(
+            f"{row['rss_delta_mb']:>+9.1f} {row['rss_mb']:>8.1f} "
+            f"{row['fds_delta']:>+6d} {row['threads_delta']:>+6d} "
+            f"{row['cpu_mean']:>6.0f} {row['db_delta_bytes'] / 1024:>+8.0f}  "
+            f"{row['test']}"
+        )
+    return lines
@@ -0,0 +1,180 @@
+"""Pytest plugin sampling the test server's resources per test.
+
+While the session server runs, a :class:`~ambrosia.resource_monitor.ResourceSampler`
+records its RSS, CPU, threads, open file descriptors and SQLite/WAL size to a
+JSON-lines timeline. A sample is also taken right before and after each test,
+so every test gets its own growth figures. At session end the per-test
+summaries are written to a JSON file, and the tests that grew the server's
+memory or file descriptors the most are printed in the terminal summary.
+Under pytest-xdist each worker samples its own server and writes its own
+timeline (suffixed with the worker id); the summaries go to the controller.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from ambrosia.resource_monitor import (
+    DEFAULT_INTERVAL,
+    ResourceSampler,
+    format_summaries,
+    summarize,
+)
+from ambrosia.test_server import AmbrosiaTestServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMELINE_PATH = "resource-timeline.jsonl"
+DEFAULT_SUMMARY_PATH = "resource-summary.json"
+
+# Number of tests shown in the terminal summary
+SUMMARY_TESTS = 10
+
+# Key of the per-test summaries in xdist's workeroutput
+_WORKER_OUTPUT_KEY = "ambrosia_resources"
+
+_sampler_key = pytest.StashKey[ResourceSampler]()
+_tests_key = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    """Add the resource monitor options."""
+    group = parser.getgroup("ambrosia-resources", "Ambrosia server resource monitor")
+    group.addoption(
+        "--resource-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between server resource samples (default: {DEFAULT_INTERVAL})",
+    )
+    group.addoption(
+        "--resource-timeline",
+        default=DEFAULT_TIMELINE_PATH,
+        metavar="PATH",
+        help=f"Write every sample as JSON lines (default: {DEFAULT_TIMELINE_PATH}, "
+        "relative to the rootdir)",
+    )
+    group.addoption(
+        "--resource-summary",
+        default=DEFAULT_SUMMARY_PATH,
+        metavar="PATH",
+        help=f"Write the per-test summaries as JSON (default: {DEFAULT_SUMMARY_PATH}, "
+        "relative to the rootdir)",
+    )
+    group.addoption(
+        "--no-resource-monitor",
+        action="store_true",
+        default=False,
+        help="Do not sample the server's resources",
+    )
+
+
+def pytest_configure(config):
+    """Prepare the per-test summary list."""
+    config.stash[_tests_key] = []
+
+
+def _is_worker(config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+def _output_path(config, option: str) -> Path:
+    path = Path(config.getoption(option))
+    if not path.is_absolute():
+        path = config.rootpath / path
+    return path
+
+
+@pytest.fixture(scope="session", autouse=True)
+def resource_sampler(request, test_server: AmbrosiaTestServer, manage_server_lifecycle):
+    """Sample the session server's resources while it runs.
+
+    Yields:
+        The running ResourceSampler, or None if disabled
+    """
+    config = request.config
+    if config.getoption("--no-resource-monitor") or test_server.server_process is None:
+        yield None
+        return
+
+    timeline = _output_path(config, "--resource-timeline")
+    if _is_worker(config):
+        worker_id = config.workerinput["workerid"]
+        timeline = timeline.with_name(f"{timeline.stem}-{worker_id}{timeline.suffix}")
+
+    sampler = test_server.resource_sampler(
+        interval=config.getoption("--resource-interval"), timeline=timeline
+    )
+    sampler.start()
+    config.stash[_sampler_key] = sampler
+    logger.info(f"Sampling server resources to {timeline}")
+    yield sampler
+    del config.stash[_sampler_key]
+    sampler.stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Sample the server right before and after each test.
+
+    The first test starts the session server inside its setup and the last
+    one stops it in its teardown, so neither is summarized.
+    """
+    sampler = item.config.stash.get(_sampler_key, None)
+    start = sampler.sample(f"start {item.nodeid}") if sampler else None
+    yield
+    if start is None or _sampler_key not in item.config.stash:
+        return
+    end = sampler.sample(f"end {item.nodeid}")
+    if end is None:
+        return
+    summary = summarize(sampler.between(start.time, end.time))
+    item.config.stash[_tests_key].append({"test": item.nodeid, **summary})
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Collect a finished xdist worker's per-test summaries."""
+    rows = getattr(node, "workeroutput", {}).get(_WORKER_OUTPUT_KEY)
+    if rows:
+        node.config.stash[_tests_key].extend(rows)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Ship worker summaries to the controller, or write the JSON summary."""
+    config = session.config
+    rows = config.stash[_tests_key]
+    if _is_worker(config):
+        config.workeroutput[_WORKER_OUTPUT_KEY] = rows
+        return
+    if config.getoption("--no-resource-monitor") or not rows:
+        return
+
+    path = _output_path(config, "--resource-summary")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"tests": rows}, indent=2))
+    logger.info(f"Resource summary written to {path}")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Print the tests that grew the server's memory and FDs the most."""
+    if _is_worker(config) or config.getoption("--no-resource-monitor"):
+        return
+    rows = config.stash[_tests_key]
+    if not rows:
+        return
+
+    terminalreporter.section("server resources (largest RSS growth first)")
+    by_rss = sorted(rows, key=lambda row: row["rss_delta_mb"], reverse=True)
+    for line in format_summaries(by_rss, SUMMARY_TESTS):
+        terminalreporter.write_line(line)
+
+    leaks = [row for row in rows if row["fds_delta"] > 0]
+    if leaks:
+        terminalreporter.write_line("")
+        terminalreporter.write_line("tests after which the server held more FDs:")
+        by_fds = sorted(leaks, key=lambda row: row["fds_delta"], reverse=True)
+        for line in format_summaries(by_fds, SUMMARY_TESTS):
+            terminalreporter.write_line(line)
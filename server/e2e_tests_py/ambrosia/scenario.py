@@ -0,0 +1,273 @@
+"""Weighted scenario DSL for load runs.
+
+A :class:`Scenario` is a traffic mix made of :class:`Step` objects. Each
+arrival of the open-loop load generator runs one step, picked at random by
+weight among the steps that can currently run. Steps hand data to each
+other through named pools: a step may ``provide`` an item (e.g. the id of a
+new order) that a later step ``requires`` (e.g. creating the order's ticket).
+A consuming step only picks up an item after a random think time has passed
+since it was produced, modelling the pause between ordering and paying.
+Items whose think time has passed are consumed first, so weights set the mix
+of new work (orders, checkouts, reports) and follow-up steps keep pace.
+
+Setup runs once before the first arrival. After the last arrival the
+scenario's closing steps run once each (a step requiring a pool runs once
+per item left in it), then teardown. Every step's latency is recorded under
+``("STEP", name)``, measured from the arrival's intended start (from its own
+start for closing steps), next to the per-route service times.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from ambrosia.auth_utils import CachedLogin
+from ambrosia.http_client import AmbrosiaHttpClient
+from ambrosia.load import LoadConfig, LoadGenerator, LoadResult
+
+logger = logging.getLogger(__name__)
+
+# Method column used for step latencies in the recorders
+STEP_METHOD = "STEP"
+
+# Status recorded for steps that failed
+STEP_FAILED_STATUS = 0
+
+
+class StepError(Exception):
+    """A step got an unexpected response."""
+
+
+class ScenarioContext:
+    """State shared by the steps of one scenario run.
+
+    Attributes:
+        data: Values set up once and read by steps (user id, catalog ids, ...)
+        rng: Random generator used for step selection, think times and payloads
+    """
+
+    def __init__(self, seed: int | None = None):
+        """Initialize an empty context.
+
+        Args:
+            seed: Seed of the random generator, for reproducible traffic mixes
+        """
+        self.data: dict[str, Any] = {}
+        self.rng = random.Random(seed)
+        self._pools: dict[str, list[tuple[float, int, Any]]] = {}
+        self._sequence = itertools.count()
+
+    def put(self, pool: str, item: Any, ready_at: float = 0.0) -> None:
+        """Add an item to a pool.
+
+        Args:
+            pool: Pool name
+            item: Item handed to a consuming step
+            ready_at: ``time.monotonic()`` value before which it cannot be taken
+        """
+        items = self._pools.setdefault(pool, [])
+        heapq.heappush(items, (ready_at, next(self._sequence), item))
+
+    def ready(self, pool: str) -> bool:
+        """Whether an item of a pool can be taken now."""
+        items = self._pools.get(pool)
+        return bool(items) and items[0][0] <= time.monotonic()
+
+    def take(self, pool: str) -> Any:
+        """Remove and return the item of a pool that became ready first."""
+        return heapq.heappop(self._pools[pool])[2]
+
+    def pending(self, pool: str) -> int:
+        """Number of items waiting in a pool."""
+        return len(self._pools.get(pool, ()))
+
+    @staticmethod
+    def expect(response: httpx.Response, status: int) -> httpx.Response:
+        """Return the response if it has the expected status, else raise StepError."""
+        if response.status_code != status:
+            raise StepError(
+                f"{response.request.method} {response.request.url.path} returned "
+                f"{response.status_code} (expected {status}): {response.text[:200]}"
+            )
+        return response
+
+
+# A step action receives the client, the context and the required item (or
+# None) and returns the item to put into its ``provides`` pool (or None)
+StepAction = Callable[[AmbrosiaHttpClient, ScenarioContext, Any], Awaitable[Any]]
+
+# Setup/teardown hooks receive an authenticated client and the context
+ScenarioHook = Callable[[AmbrosiaHttpClient, ScenarioContext], Awaitable[None]]
+
+
+@dataclass
+class Step:
+    """One kind of unit of work in a scenario.
+
+    Attributes:
+        name: Name used in the latency report
+        action: Coroutine function performing the step
+        weight: Relative frequency among the steps that can run
+        requires: Pool the step takes its input item from, if any
+        provides: Pool the step's returned item is put into, if any
+        think_time: ``(min, max)`` seconds the input item must have waited
+            before the step may take it
+    """
+
+    name: str
+    action: StepAction
+    weight: float = 1.0
+    requires: str | None = None
+    provides: str | None = None
+    think_time: tuple[float, float] = (0.0, 0.0)
+
+
+@dataclass
+class Scenario:
+    """A weighted mix of steps with one-time setup, closing steps and teardown.
+
+    Attributes:
+        name: Scenario name
+        steps: Steps of the traffic mix; at least one must not require input
+        setup: Hook run once before the first arrival
+        closing: Steps run in order after the last arrival and recorded like
+            the traffic mix; one requiring a pool runs for each item left in
+            it, regardless of think time, and weights are ignored
+        teardown: Hook run once after the closing steps
+    """
+
+    name: str
+    steps: list[Step]
+    setup: ScenarioHook | None = None
+    closing: list[Step] = field(default_factory=list)
+    teardown: ScenarioHook | None = None
+
+    def __post_init__(self):
+        if all(step.requires is not None for step in self.steps):
+            raise ValueError(
+                f"Scenario {self.name} needs at least one step without requirements"
+            )
+
+    def pick(self, context: ScenarioContext) -> Step:
+        """Pick the step to run for one arrival.
+
+        Steps whose input is ready take precedence; otherwise a step without
+        requirements is picked. Either way the choice is weighted.
+        """
+        runnable = [
+            step
+            for step in self.steps
+            if step.requires is not None and context.ready(step.requires)
+        ]
+        if not runnable:
+            runnable = [step for step in self.steps if step.requires is None]
+        return context.rng.choices(runnable, [s.weight for s in runnable])[0]
+
+
+class ScenarioLoad(LoadGenerator):
+    """Open-loop load generator running one scenario step per arrival."""
+
+    def __init__(self, config: LoadConfig, scenario: Scenario, seed: int | None = None):
+        """Initialize the generator.
+
+        Args:
+            config: Run parameters (credentials are required)
+            scenario: Traffic mix to run
+            seed: Seed of the scenario's random generator
+        """
+        super().__init__(config)
+        self.scenario = scenario
+        self.context = ScenarioContext(seed)
+
+    async def _setup(self, client: AmbrosiaHttpClient) -> None:
+        if self.scenario.setup is not None:
+            await self.scenario.setup(client, self.context)
+
+    async def _teardown(self, client: AmbrosiaHttpClient) -> None:
+        context = self.context
+        loop = asyncio.get_running_loop()
+        for step in self.scenario.closing:
+            if step.requires is None:
+                await self._run_step(client, None, step, None, loop.time(), loop)
+                continue
+            while context.pending(step.requires):
+                item = context.take(step.requires)
+                await self._run_step(client, None, step, item, loop.time(), loop)
+        if self.scenario.teardown is not None:
+            await self.scenario.teardown(client, context)
+
+    async def _serve(
+        self,
+        client: AmbrosiaHttpClient,
+        login: CachedLogin | None,
+        intended: float,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """Run one step and record its latency from the intended start."""
+        context = self.context
+        step = self.scenario.pick(context)
+        item = context.take(step.requires) if step.requires else None
+        await self._run_step(client, login, step, item, intended, loop)
+
+    async def _run_step(
+        self,
+        client: AmbrosiaHttpClient,
+        login: CachedLogin | None,
+        step: Step,
+        item: Any,
+        intended: float,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """Run a step on an item, count it and record its latency."""
+        context = self.context
+        status = 200
+        try:
+            if login is not None:
+                await login.authenticate(client)
+            produced = await step.action(client, context, item)
+        except Exception as e:
+            # Not only HTTP errors and StepError: a 2xx body without the
+            # expected fields raises KeyError, and the virtual user must
+            # survive it, or nothing drains its arrivals
+            self.errors += 1
+            status = STEP_FAILED_STATUS
+            logger.debug(f"Step {step.name} failed: {e!r}")
+        else:
+            self.completed += 1
+            if step.provides is not None and produced is not None:
+                self._provide(step.provides, produced)
+
+        self.response_time.record(
+            STEP_METHOD, step.name, status, 0, loop.time() - intended
+        )
+
+    def _provide(self, pool: str, item: Any) -> None:
+        """Put an item into a pool, ready once its consumer's think time passed."""
+        consumer = next((s for s in self.scenario.steps if s.requires == pool), None)
+        low, high = consumer.think_time if consumer else (0.0, 0.0)
+        ready_at = time.monotonic() + self.context.rng.uniform(low, high)
+        self.context.put(pool, item, ready_at)
+
+
+def run_scenario(
+    config: LoadConfig, scenario: Scenario, seed: int | None = None
+) -> LoadResult:
+    """Run a scenario under open-loop load in a new event loop.
+
+    Args:
+        config: Run parameters
+        scenario: Traffic mix to run
+        seed: Seed of the scenario's random generator
+
+    Returns:
+        The result of the run; step latencies are keyed ``("STEP", name)``
+    """
+    return asyncio.run(ScenarioLoad(config, scenario, seed).run())
@@ -0,0 +1,183 @@
+"""Prebuilt server distribution cache for the test server.
+
+This module builds the Ambrosia fat jar once with Gradle and caches it under a
+key derived from the server sources, so test sessions can start the server
+directly with ``java -jar`` instead of running ``./gradlew run`` every time.
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+if os.name != "nt":
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+# server/ directory containing the Gradle wrapper
+SERVER_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Local cache directory for build artifacts (ignored by git)
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+# Files and directories whose contents determine the server build
+SOURCE_PATHS = (
+    "app/src/main",
+    "app/build.gradle.kts",
+    "settings.gradle.kts",
+    "gradle.properties",
+    "gradle/libs.versions.toml",
+)
+
+BUILD_TIMEOUT = 600  # seconds
+
+
+@dataclass
+class ServerBuild:
+    """A server jar ready to be launched.
+
+    Attributes:
+        jar_path: Path to the cached fat jar
+        source_hash: Hash of the server sources the jar was built from
+        build_seconds: Time spent building (0 when served from cache)
+        cached: Whether the jar was already in the cache
+    """
+
+    jar_path: Path
+    source_hash: str
+    build_seconds: float
+    cached: bool
+
+
+def hash_paths(root: Path, paths: tuple[str, ...]) -> str:
+    """Compute a stable hash over the given files and directories.
+
+    Args:
+        root: Directory the paths are relative to
+        paths: Relative file or directory paths to include
+
+    Returns:
+        Hex digest covering every file's relative path and contents
+    """
+    digest = hashlib.sha256()
+    for relative in paths:
+        path = root / relative
+        if not path.exists():
+            continue
+        files = (
+            sorted(p for p in path.rglob("*") if p.is_file())
+            if path.is_dir()
+            else [path]
+        )
+        for file in files:
+            digest.update(file.relative_to(root).as_posix().encode())
+            digest.update(b"\0")
+            digest.update(file.read_bytes())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def cache_lock(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive inter-process lock on ``lock_path``.
+
+    Used so that parallel pytest-xdist workers build each cache entry once
+    while the others wait for it. On Windows no lock is taken.
+
+    Args:
+        lock_path: Lock file to create if needed
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        if os.name != "nt":
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name != "nt":
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def hash_server_sources(server_dir: Path = SERVER_DIR) -> str:
+    """Compute the cache key for the server build.
+
+    Args:
+        server_dir: The server/ directory containing the Gradle project
+
+    Returns:
+        Hex digest of the server sources and build configuration
+    """
+    return hash_paths(server_dir, SOURCE_PATHS)
+
+
+def ensure_server_jar(
+    server_dir: Path = SERVER_DIR, cache_dir: Path = CACHE_DIR
+) -> ServerBuild:
+    """Return a server jar matching the current sources, building it if stale.
+
+    Args:
+        server_dir: The server/ directory containing the Gradle project
+        cache_dir: Directory where built jars are cached
+
+    Returns:
+        The cached (or freshly built) server jar
+
+    Raises:
+        RuntimeError: If the Gradle build fails or produces no jar
+    """
+    source_hash = hash_server_sources(server_dir)
+    cached_jar = cache_dir / "server" / source_hash / "ambrosia.jar"
+
+    if cached_jar.exists():
+        logger.info(f"Using cached server jar {cached_jar} ({source_hash[:12]})")
+        return ServerBuild(cached_jar, source_hash, 0.0, True)
+
+    with cache_lock(cache_dir / "server.lock"):
+        # Another worker may have finished the build while we waited
+        if cached_jar.exists():
+            logger.info(f"Using server jar built by another worker: {cached_jar}")
+            return ServerBuild(cached_jar, source_hash, 0.0, True)
+        return _build_server_jar(server_dir, cached_jar, source_hash)
+
+
+def _build_server_jar(
+    server_dir: Path, cached_jar: Path, source_hash: str
+) -> ServerBuild:
+    """Build the fat jar with Gradle and copy it into the cache."""
+
+    logger.info(f"Server jar cache is stale ({source_hash[:12]}), building with Gradle")
+    start_time = time.perf_counter()
+    result = subprocess.run(
+        ["./gradlew", ":app:jar", "--no-daemon", "--quiet"],
+        cwd=server_dir,
+        capture_output=True,
+        text=True,
+        timeout=BUILD_TIMEOUT,
+    )
+    if result.returncode != 0:
+        logger.error(f"Gradle stdout: {result.stdout}")
+        logger.error(f"Gradle stderr: {result.stderr}")
+        raise RuntimeError(f"Gradle build failed with exit code {result.returncode}")
+
+    jars = sorted(
+        (server_dir / "app" / "build" / "libs").glob("ambrosia-*.jar"),
+        key=lambda p: p.stat().st_mtime,
+    )
+    if not jars:
+        raise RuntimeError("Gradle build did not produce an ambrosia-*.jar")
+
+    cached_jar.parent.mkdir(parents=True, exist_ok=True)
+    staging = cached_jar.with_suffix(".jar.tmp")
+    shutil.copy2(jars[-1], staging)
+    staging.replace(cached_jar)
+
+    build_seconds = time.perf_counter() - start_time
+    logger.info(f"Built server jar in {build_seconds:.1f}s: {cached_jar}")
+    return ServerBuild(cached_jar, source_hash, build_seconds, False)
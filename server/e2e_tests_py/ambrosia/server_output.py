@@ -0,0 +1,141 @@
+"""Background draining of the test server's console output.
+
+This module reads the server's stdout and stderr line by line as they arrive,
+so the JVM never blocks on a full pipe buffer. Every line is written to a
+size-bounded rotating log file, the most recent lines are kept in memory for
+failure reports, and a readiness signal is raised when the server logs that
+it is accepting connections.
+"""
+
+import logging
+import logging.handlers
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import IO
+
+logger = logging.getLogger(__name__)
+
+# Number of trailing output lines kept in memory for error reports
+TAIL_LINES = 200
+
+# Rotating log file settings
+LOG_FILE_NAME = "server-output.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+
+class ServerOutputReader:
+    """Drains server output streams on daemon threads.
+
+    One thread per stream consumes lines as soon as they are written. Lines
+    matching ``ready_pattern`` mark the server as ready, and the end of all
+    streams marks it as exited.
+    """
+
+    def __init__(
+        self,
+        streams: dict[str, IO[bytes]],
+        log_path: Path | None = None,
+        ready_pattern: re.Pattern[str] | None = None,
+        tail_lines: int = TAIL_LINES,
+        max_bytes: int = LOG_MAX_BYTES,
+        backup_count: int = LOG_BACKUP_COUNT,
+    ):
+        """Start draining the streams.
+
+        Args:
+            streams: Binary streams to read keyed by name (e.g. ``{"stdout": ...}``)
+            log_path: Rotating log file receiving every line, or None to skip it
+            ready_pattern: Regex that marks the server as ready when a line matches
+            tail_lines: Number of trailing lines kept for :meth:`tail`
+            max_bytes: Size at which the log file is rotated
+            backup_count: Number of rotated log files kept
+        """
+        self._ready_pattern = ready_pattern
+        self._tail: deque[str] = deque(maxlen=tail_lines)
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._open_streams = len(streams)
+        self.ready = False
+        self.closed = not streams
+        self.log_path = log_path
+
+        self._file_handler: logging.Handler | None = None
+        self._file_logger: logging.Logger | None = None
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file_handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=max_bytes, backupCount=backup_count
+            )
+            self._file_handler.setFormatter(logging.Formatter("%(message)s"))
+            # Standalone logger: not registered globally and never propagated
+            self._file_logger = logging.Logger(f"{__name__}.file")
+            self._file_logger.addHandler(self._file_handler)
+
+        self._threads = [
+            threading.Thread(
+                target=self._run,
+                args=(name, stream),
+                name=f"ambrosia-server-{name}",
+                daemon=True,
+            )
+            for name, stream in streams.items()
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self, name: str, stream: IO[bytes]) -> None:
+        """Consume one stream until end of file."""
+        prefix = "" if name == "stdout" else f"[{name}] "
+        try:
+            for raw in iter(stream.readline, b""):
+                line = prefix + raw.decode(errors="replace").rstrip("\r\n")
+                with self._lock:
+                    self._tail.append(line)
+                if self._file_logger is not None:
+                    self._file_logger.info(line)
+                if (
+                    not self.ready
+                    and self._ready_pattern is not None
+                    and self._ready_pattern.search(line)
+                ):
+                    self.ready = True
+                    self._changed.set()
+        except (OSError, ValueError) as e:
+            logger.debug(f"Server {name} stream closed: {e}")
+        finally:
+            with self._lock:
+                self._open_streams -= 1
+                if self._open_streams == 0:
+                    self.closed = True
+                    self._changed.set()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait until the server is ready or its output streams close.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the server logged that it is ready
+        """
+        self._changed.wait(timeout)
+        return self.ready
+
+    def tail(self) -> str:
+        """Return the most recent output lines joined by newlines."""
+        with self._lock:
+            return "\n".join(self._tail)
+
+    def join(self, timeout: float = 1.0) -> None:
+        """Wait for the reader threads to finish after the process exited."""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Wait for the reader threads and close the log file."""
+        self.join(timeout)
+        if self._file_handler is not None:
+            self._file_handler.close()
@@ -0,0 +1,315 @@
+"""Soak testing: hours of steady load with leak detection.
+
+A soak run is an ordinary open-loop load run (see :mod:`ambrosia.load`) whose
+per-route response times are cut into fixed windows. After the run, a
+least-squares trend line is fitted over time to the server's RSS and open
+file descriptors (from a :class:`~ambrosia.resource_monitor.ResourceSampler`)
+and to the p99 of every route. A slope above its limit means something grows
+with uptime rather than with load: a cache or map that never evicts, sessions
+that are never removed, statements or connections that are never closed.
+
+Samples taken during the warm-up (JIT compilation, heap sizing, connection
+pools filling) are left out of the fits.
+
+Usage::
+
+    ambrosia-load --soak --rps 20 --duration 14400 --scenario business-day \\
+        --server-pid 12345 --server-db ~/.Ambrosia-POS/ambrosia.db
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+
+from ambrosia.load import LoadConfig, LoadResult, Workload, build_generator
+from ambrosia.metrics import LatencyRecorder, linear_fit
+from ambrosia.resource_monitor import MB, ResourceSample
+
+logger = logging.getLogger(__name__)
+
+# Seconds of each latency window
+DEFAULT_WINDOW = 60.0
+
+# Seconds at the start of the run left out of the trend fits
+DEFAULT_WARMUP = 600.0
+
+# Seconds between server resource samples; hours of 0.5 s samples add nothing
+DEFAULT_RESOURCE_INTERVAL = 5.0
+
+# Trend limits: RSS in MB per hour, FDs per hour, and p99 growth per hour as
+# a fraction of the route's p99 at the end of the warm-up
+DEFAULT_MAX_RSS_SLOPE = 20.0
+DEFAULT_MAX_FD_SLOPE = 5.0
+DEFAULT_MAX_P99_SLOPE = 0.10
+
+# A window's p99 is only used for a route with at least this many requests
+MIN_WINDOW_REQUESTS = 50
+
+# Fewer points than this are not enough to call a trend
+MIN_FIT_POINTS = 3
+
+HOUR = 3600.0
+
+
+@dataclass
+class Window:
+    """Response times of one window of a soak run.
+
+    Attributes:
+        start: Unix timestamp at which the window opened
+        end: Unix timestamp at which it closed
+        completed: Arrivals completed during the window
+        errors: Arrivals failed during the window
+        routes: :meth:`LatencyRecorder.summary` rows of the window
+    """
+
+    start: float
+    end: float
+    completed: int
+    errors: int
+    routes: list[dict] = field(default_factory=list)
+
+    @property
+    def middle(self) -> float:
+        """Unix timestamp halfway through the window."""
+        return (self.start + self.end) / 2
+
+
+@dataclass
+class SoakLimits:
+    """Largest trend slopes a soak run accepts.
+
+    Attributes:
+        rss_mb_per_hour: Server RSS growth in MB per hour
+        fds_per_hour: Open file descriptor growth per hour
+        p99_per_hour: Per-route p99 growth per hour, as a fraction of the
+            fitted p99 at the end of the warm-up
+    """
+
+    rss_mb_per_hour: float = DEFAULT_MAX_RSS_SLOPE
+    fds_per_hour: float = DEFAULT_MAX_FD_SLOPE
+    p99_per_hour: float = DEFAULT_MAX_P99_SLOPE
+
+
+@dataclass
+class Trend:
+    """A least-squares line fitted to one metric over time.
+
+    Attributes:
+        metric: What was fitted, e.g. ``rss_mb`` or ``p99_ms GET /products``
+        points: Number of points in the fit
+        slope: Growth of the metric per hour
+        intercept: Fitted value at the end of the warm-up
+        limit: Largest accepted :attr:`rate`
+        relative: Whether the limit applies to ``slope / intercept``
+    """
+
+    metric: str
+    points: int
+    slope: float
+    intercept: float
+    limit: float
+    relative: bool = False
+
+    @property
+    def rate(self) -> float:
+        """The value compared with the limit."""
+        if not self.relative:
+            return self.slope
+        return self.slope / self.intercept if self.intercept > 0 else 0.0
+
+    @property
+    def breached(self) -> bool:
+        """Whether the metric grows faster than its limit."""
+        return self.rate > self.limit
+
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict."""
+        return asdict(self) | {"rate": self.rate, "breached": self.breached}
+
+
+@dataclass
+class SoakResult:
+    """Outcome of a soak run.
+
+    Attributes:
+        result: The whole run, as a plain load run would report it
+        windows: Per-window response times, in time order
+    """
+
+    result: LoadResult
+    windows: list[Window]
+
+
+class SoakLoad:
+    """Runs a load generator and cuts its response times into windows."""
+
+    def __init__(self, config: LoadConfig, workload: Workload, window: float):
+        """Initialize the soak run.
+
+        Args:
+            config: Run parameters; runs in a single process
+            workload: What each arrival does
+            window: Seconds of each latency window
+        """
+        self.generator = build_generator(config, workload)
+        self.window = window
+        self.windows: list[Window] = []
+        self._total = LatencyRecorder()
+        self._opened = 0.0
+        self._completed = 0
+        self._errors = 0
+
+    async def run(self) -> SoakResult:
+        """Run the load, closing a window every :attr:`window` seconds."""
+        self._opened = time.time()
+        ticker = asyncio.create_task(self._tick())
+        try:
+            result = await self.generator.run()
+        finally:
+            ticker.cancel()
+            await asyncio.gather(ticker, return_exceptions=True)
+        self._close_window()
+        # The generator's recorder only holds the last window
+        result.response_time = self._total
+        return SoakResult(result, self.windows)
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.window)
+            self._close_window()
+
+    def _close_window(self) -> None:
+        """Move the generator's response times into a new window.
+
+        Runs on the event loop without awaiting, so no request is recorded
+        between the copy and the reset.
+        """
+        generator = self.generator
+        recorder = LatencyRecorder()
+        recorder.merge(generator.response_time)
+        generator.response_time.reset()
+        self._total.merge(recorder)
+
+        now = time.time()
+        window = Window(
+            start=self._opened,
+            end=now,
+            completed=generator.completed - self._completed,
+            errors=generator.errors - self._errors,
+            routes=recorder.summary(),
+        )
+        self._opened = now
+        self._completed = generator.completed
+        self._errors = generator.errors
+        if not window.completed and not window.errors:
+            return
+        self.windows.append(window)
+        slowest = window.routes[0] if window.routes else None
+        logger.info(
+            f"Window {len(self.windows)}: {window.completed} completed, "
+            f"{window.errors} errors"
+            + (
+                f", slowest p99 {slowest['p99_ms']:.1f} ms "
+                f"({slowest['method']} {slowest['route']})"
+                if slowest
+                else ""
+            )
+        )
+
+
+def run_soak(config: LoadConfig, workload: Workload, window: float) -> SoakResult:
+    """Run a soak test in a new event loop.
+
+    Args:
+        config: Run parameters
+        workload: What each arrival does
+        window: Seconds of each latency window
+
+    Returns:
+        The whole run and its windows
+    """
+    return asyncio.run(SoakLoad(config, workload, window).run())
+
+
+def _trend(
+    metric: str,
+    points: list[tuple[float, float]],
+    since: float,
+    limit: float,
+    relative: bool = False,
+) -> Trend | None:
+    """Fit ``points`` (Unix time, value) with x in hours since ``since``."""
+    if len(points) < MIN_FIT_POINTS:
+        return None
+    fit = linear_fit([((t - since) / HOUR, value) for t, value in points])
+    if fit is None:
+        return None
+    slope, intercept = fit
+    return Trend(metric, len(points), slope, intercept, limit, relative)
+
+
+def analyze(
+    windows: list[Window],
+    samples: list[ResourceSample],
+    since: float,
+    limits: SoakLimits,
+) -> list[Trend]:
+    """Fit trend lines to the server's resources and per-route p99.
+
+    Args:
+        windows: Latency windows of the run
+        samples: Server resource samples (empty if the server was not sampled)
+        since: Unix timestamp at which the warm-up ended; earlier windows and
+            samples are ignored
+        limits: Largest accepted slopes
+
+    Returns:
+        One trend per metric with enough points after the warm-up: RSS and
+        FDs first, then routes by decreasing relative p99 growth
+    """
+    samples = [s for s in samples if s.time >= since]
+    trends = [
+        _trend(
+            "rss_mb",
+            [(s.time, s.rss / MB) for s in samples],
+            since,
+            limits.rss_mb_per_hour,
+        ),
+        _trend("fds", [(s.time, s.fds) for s in samples], since, limits.fds_per_hour),
+    ]
+
+    p99s: dict[str, list[tuple[float, float]]] = {}
+    for window in windows:
+        if window.start < since:
+            continue
+        for row in window.routes:
+            if row["count"] >= MIN_WINDOW_REQUESTS:
+                route = f"{row['method']} {row['route']}"
+                p99s.setdefault(route, []).append((window.middle, row["p99_ms"]))
+    routes = [
+        _trend(f"p99_ms {route}", points, since, limits.p99_per_hour, relative=True)
+        for route, points in p99s.items()
+    ]
+    routes = [trend for trend in routes if trend is not None]
+    routes.sort(key=lambda trend: trend.rate, reverse=True)
+    return [trend for trend in trends if trend is not None] + routes
+
+
+def format_trends(trends: list[Trend]) -> list[str]:
+    """Format trends as aligned table lines, marking the breached ones."""
+    lines = [f"{'slope/h':>10} {'start':>10} {'limit/h':>10} {'pts':>5}  metric"]
+    for trend in trends:
+        if trend.relative:
+            slope = f"{trend.rate:+.1%}"
+            limit = f"{trend.limit:.0%}"
+        else:
+            slope = f"{trend.slope:+.2f}"
+            limit = f"{trend.limit:.2f}"
+        mark = "  EXCEEDED" if trend.breached else ""
+        lines.append(
+            f"{slope:>10} {trend.intercept:>10.1f} {limit:>10} {trend.points:>5}  "
+            f"{trend.metric}{mark}"
+        )
+    return lines
@@ -0,0 +1,149 @@
+"""Pre-seeded template database for the test server.
+
+Instead of letting every fresh data directory run all Flyway migrations and
+the ``POST /initial-setup`` round trip, a fully migrated and initialized
+``ambrosia.db`` is built once, cached under a key derived from the migration
+directory, and copied into each server's data directory before it starts.
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+
+from ambrosia.server_build import CACHE_DIR, SERVER_DIR, cache_lock, hash_paths
+
+if TYPE_CHECKING:
+    from ambrosia.test_server import AmbrosiaTestServer
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PATH = "app/src/main/resources/db/migration"
+
+DATABASE_FILE = "ambrosia.db"
+
+# Files copied from the template into a server data directory.
+# The keystore is derived from the server secret, so it can be reused as well.
+TEMPLATE_FILES = (DATABASE_FILE, "keystore.jks")
+
+# Initial setup payload used to seed the default test user (cooluser1 / 0000)
+INITIAL_SETUP_DATA = {
+    "businessType": "store",
+    "userName": "cooluser1",
+    "userPassword": "password123",
+    "userPin": "0000",
+    "businessName": "Test Store",
+    "businessAddress": "123 Test St",
+    "businessPhone": "1234567890",
+    "businessEmail": "test@example.com",
+    "businessCurrency": "USD",
+}
+
+
+def template_key(secret: str, server_dir: Path = SERVER_DIR) -> str:
+    """Compute the cache key for the template database.
+
+    Args:
+        secret: Server secret used to hash the seeded user's PIN
+        server_dir: The server/ directory containing the migrations
+
+    Returns:
+        Hex digest of the migrations, the setup payload and the secret
+    """
+    digest = hashlib.sha256()
+    digest.update(hash_paths(server_dir, (MIGRATIONS_PATH,)).encode())
+    digest.update(json.dumps(INITIAL_SETUP_DATA, sort_keys=True).encode())
+    digest.update(secret.encode())
+    return digest.hexdigest()
+
+
+def ensure_template(server: "AmbrosiaTestServer", cache_dir: Path = CACHE_DIR) -> Path:
+    """Return the template directory for the current migrations, building it if stale.
+
+    Args:
+        server: A stopped server instance on free ports, used only to build
+            the template. Its data directory is replaced by a scratch directory.
+        cache_dir: Directory where templates are cached
+
+    Returns:
+        Directory containing the TEMPLATE_FILES
+    """
+    key = template_key(server.SECRET)
+    template_dir = cache_dir / "template" / key
+
+    if (template_dir / DATABASE_FILE).exists():
+        return template_dir
+
+    with cache_lock(cache_dir / "template.lock"):
+        if (template_dir / DATABASE_FILE).exists():
+            return template_dir
+        _build_template(server, template_dir)
+    return template_dir
+
+
+def _build_template(server: "AmbrosiaTestServer", template_dir: Path) -> None:
+    """Start a server on a scratch data dir, run initial setup and snapshot it."""
+    logger.info(f"Building template database {template_dir.name[:12]}")
+
+    with tempfile.TemporaryDirectory(prefix="ambrosia-template-") as scratch:
+        server.data_dir = Path(scratch)
+        server.start_server()
+        try:
+            response = httpx.post(
+                f"{server.server_url}/initial-setup",
+                json=INITIAL_SETUP_DATA,
+                timeout=30.0,
+            )
+            if response.status_code != 201:
+                raise RuntimeError(
+                    f"Template initial setup failed with status "
+                    f"{response.status_code}: {response.text[:200]}"
+                )
+        finally:
+            server.stop_server()
+
+        staging = template_dir.with_name(f"{template_dir.name}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        # VACUUM INTO writes a compact, self-contained copy (no journal/WAL files)
+        source = sqlite3.connect(Path(scratch) / DATABASE_FILE)
+        try:
+            source.execute("VACUUM INTO ?", (str(staging / DATABASE_FILE),))
+        finally:
+            source.close()
+
+        for name in TEMPLATE_FILES:
+            path = Path(scratch) / name
+            if name != DATABASE_FILE and path.exists():
+                shutil.copy2(path, staging / name)
+
+        staging.replace(template_dir)
+
+    logger.info(f"Template database ready at {template_dir}")
+
+
+def install_template(template_dir: Path, data_dir: Path) -> None:
+    """Copy the template files into a server data directory.
+
+    Any existing database (including leftover journal/WAL files) is replaced,
+    so each session starts from the same seeded state.
+
+    Args:
+        template_dir: Directory returned by :func:`ensure_template`
+        data_dir: Server data directory (AMBROSIA_DATADIR)
+    """
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for suffix in ("-journal", "-wal", "-shm"):
+        (data_dir / f"{DATABASE_FILE}{suffix}").unlink(missing_ok=True)
+    for name in TEMPLATE_FILES:
+        source = template_dir / name
+        if source.exists():
+            shutil.copy2(source, data_dir / name)
+    logger.info(f"Installed template database into {data_dir}")
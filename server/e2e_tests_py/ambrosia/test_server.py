@@ -6,7 +6,10 @@ handling server startup, shutdown, and health checking for API tests.
 
 import logging
 import os
+import re
+import shutil
 import signal
+import socket
 import subprocess
 import time
 from pathlib import Path
@@ -15,6 +18,11 @@ import httpx
 import psutil
 import pytest
 
+from ambrosia.resource_monitor import DEFAULT_INTERVAL, ResourceSampler
+from ambrosia.server_build import ensure_server_jar
+from ambrosia.server_output import LOG_FILE_NAME, ServerOutputReader
+from ambrosia.template_db import DATABASE_FILE, ensure_template, install_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,69 +30,214 @@ class AmbrosiaTestServer:
     """Test server manager that replicates TestServer.kt functionality.
 
     This class manages the lifecycle of the Ambrosia POS server for testing,
-    including starting the server via Gradle, waiting for it to be ready,
-    and properly shutting it down after tests complete.
+    including starting the server, waiting for it to be ready, and properly
+    shutting it down after tests complete.
+
+    The server is launched from a cached fat jar with ``java -jar`` by default.
+    Set ``AMBROSIA_TEST_LAUNCH_MODE=gradle`` to use ``./gradlew run`` instead.
+
+    Each instance can run on its own ports and data directory, so several
+    servers (one per pytest-xdist worker) can run side by side.
     """
 
     # Server configuration constants (matching TestServer.kt)
     SERVER_PORT = 9154
+    SERVER_HTTPS_PORT = 9443
     SERVER_HOST = "127.0.0.1"
-    HEALTH_CHECK_URL = f"http://{SERVER_HOST}:{SERVER_PORT}/"
+    DATA_DIR = Path("/tmp/ambrosia-test-data")
+
+    # Fixed secret so a cached template database (and its PIN hashes) is valid
+    # for every test server
+    SECRET = "ambrosia-e2e-test-secret"
 
     # Timeout settings
     STARTUP_TIMEOUT = 30  # seconds
-    HEALTH_CHECK_INTERVAL = 1  # seconds
-
-    def __init__(self):
+    GRADLE_STARTUP_TIMEOUT = 180  # seconds, includes compilation
+    HEALTH_CHECK_INITIAL_DELAY = 0.05  # seconds, doubled after each probe
+    HEALTH_CHECK_MAX_DELAY = 1.0  # seconds
+
+    # Launch modes
+    LAUNCH_MODE_ENV = "AMBROSIA_TEST_LAUNCH_MODE"
+    LAUNCH_MODE_JAR = "jar"
+    LAUNCH_MODE_GRADLE = "gradle"
+
+    # Login backoff time unit (one minute in production), so rate limiter
+    # blocks last a fraction of a second per Fibonacci step
+    LOGIN_BACKOFF_UNIT_MS = 500
+
+    # Application arguments passed to the server in every launch mode.
+    # Use shorter access token expiration (5 seconds) for faster E2E testing
+    SERVER_ARGS = [
+        "--phoenixd-url=http://localhost:9740",
+        "--phoenixd-password=test-password",
+        "--phoenixd-webhook-secret=test-webhook-secret",
+        "--jwt-access-token-expiration",
+        "5",
+        f"--login-backoff-unit-ms={LOGIN_BACKOFF_UNIT_MS}",
+        f"--secret={SECRET}",
+    ]
+
+    def __init__(
+        self,
+        port: int | None = None,
+        https_port: int | None = None,
+        data_dir: Path | None = None,
+        template_dir: Path | None = None,
+    ):
+        """Configure the server instance.
+
+        Args:
+            port: HTTP port. Defaults to SERVER_PORT
+            https_port: HTTPS port. Defaults to SERVER_HTTPS_PORT
+            data_dir: Server data directory (AMBROSIA_DATADIR). Defaults to DATA_DIR
+            template_dir: Pre-seeded template copied into data_dir before each
+                start (see ambrosia.template_db). None starts from data_dir as is
+        """
         self.server_process: subprocess.Popen | None = None
-        self.server_url = f"http://{self.SERVER_HOST}:{self.SERVER_PORT}"
+        self.server_output: ServerOutputReader | None = None
+        self.port = port or self.SERVER_PORT
+        self.https_port = https_port or self.SERVER_HTTPS_PORT
+        self.data_dir = data_dir or self.DATA_DIR
+        self.template_dir = template_dir
+        self.server_url = f"http://{self.SERVER_HOST}:{self.port}"
+        self.health_check_url = f"{self.server_url}/api/health"
+        # Ktor logs this once the HTTP connector is bound
+        self.ready_log_pattern = re.compile(
+            rf"Responding at {re.escape(self.server_url)}\b"
+        )
         self._gradle_dir = Path(__file__).parent.parent.parent
+        self.launch_mode = os.environ.get(self.LAUNCH_MODE_ENV, self.LAUNCH_MODE_JAR)
+        self.build_seconds: float | None = None
+        self.startup_seconds: float | None = None
 
     def start_server(self) -> None:
-        """Start the server using Gradle, equivalent to runGradleApp() in TestServer.kt."""
+        """Start the server, equivalent to runGradleApp() in TestServer.kt.
+
+        In jar mode the fat jar is rebuilt with Gradle only when the server
+        sources changed since the cached build; otherwise it is started directly.
+        """
         if self.server_process is not None:
             logger.warning("Server is already running")
             return
 
         logger.info(f"Starting server from directory: {self._gradle_dir}")
 
-        # Change to the app directory and run gradlew with Phoenix configuration
-        cmd = [
-            "./gradlew",
-            "run",
-            "--no-daemon",
-            # Note: All application arguments must be in a single quoted string after --args
-            # Use shorter access token expiration (5 seconds) for faster E2E testing
-            "--args=--phoenixd-url=http://localhost:9740 "
-            "--phoenixd-password=test-password "
-            "--phoenixd-webhook-secret=test-webhook-secret "
-            "--jwt-access-token-expiration 5",
-        ]
+        if self.launch_mode == self.LAUNCH_MODE_GRADLE:
+            cmd, cwd = self._gradle_command()
+            timeout = self.GRADLE_STARTUP_TIMEOUT
+        elif self.launch_mode == self.LAUNCH_MODE_JAR:
+            cmd, cwd = self._jar_command()
+            timeout = self.STARTUP_TIMEOUT
+        else:
+            raise ValueError(
+                f"Unknown {self.LAUNCH_MODE_ENV}={self.launch_mode!r}, "
+                f"expected '{self.LAUNCH_MODE_JAR}' or '{self.LAUNCH_MODE_GRADLE}'"
+            )
 
         logger.info(f"Starting server with command: {' '.join(cmd)}")
 
+        if self.template_dir is not None:
+            install_template(self.template_dir, self.data_dir)
+
         env = os.environ.copy()
-        env["AMBROSIA_DATADIR"] = "/tmp/ambrosia-test-data"
+        env["AMBROSIA_DATADIR"] = str(self.data_dir)
+        # Keep phoenix.conf webhook updates inside this instance's data dir
+        env["PHOENIX_DATADIR"] = str(self.data_dir / "phoenix")
 
         try:
+            start_time = time.perf_counter()
             self.server_process = subprocess.Popen(
                 cmd,
-                cwd=self._gradle_dir,
+                cwd=cwd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 preexec_fn=os.setsid if os.name != "nt" else None,
                 env=env,
             )
             logger.info(f"Server process started with PID: {self.server_process.pid}")
+            # Drain both pipes so a chatty JVM never blocks on a full buffer
+            self.server_output = ServerOutputReader(
+                {
+                    "stdout": self.server_process.stdout,
+                    "stderr": self.server_process.stderr,
+                },
+                log_path=self.data_dir / LOG_FILE_NAME,
+                ready_pattern=self.ready_log_pattern,
+            )
+            logger.info(f"Server output is logged to {self.server_output.log_path}")
 
             # Wait for server to be ready
-            self._wait_for_server()
+            self._wait_for_server(timeout)
+            self.startup_seconds = time.perf_counter() - start_time
+            logger.info(
+                f"Server startup took {self.startup_seconds:.1f}s "
+                f"(build: {self.build_seconds or 0.0:.1f}s, mode: {self.launch_mode})"
+            )
 
         except Exception as e:
             logger.error(f"Failed to start server: {e}")
             self._cleanup_server()
             raise
 
+    def _server_args(self) -> list[str]:
+        """Application arguments for this instance."""
+        return [
+            *self.SERVER_ARGS,
+            f"--http-bind-ip={self.SERVER_HOST}",
+            f"--http-bind-port={self.port}",
+            f"--https-bind-port={self.https_port}",
+        ]
+
+    def _gradle_command(self) -> tuple[list[str], Path]:
+        """Build the ``./gradlew run`` command line."""
+        # Note: All application arguments must be in a single quoted string after --args
+        cmd = [
+            "./gradlew",
+            "run",
+            "--no-daemon",
+            f"--args={' '.join(self._server_args())}",
+        ]
+        return cmd, self._gradle_dir
+
+    def _jar_command(self) -> tuple[list[str], Path]:
+        """Build the ``java -jar`` command line, rebuilding the jar if stale."""
+        build = ensure_server_jar(self._gradle_dir)
+        self.build_seconds = build.build_seconds
+        cmd = [
+            shutil.which("java") or "java",
+            # Same logging configuration as the Gradle run task
+            "-Dlogback.configurationFile=Ambrosia-Logs.xml",
+            "-jar",
+            str(build.jar_path),
+            *self._server_args(),
+        ]
+        # Run from the app directory, like the Gradle run task does
+        return cmd, self._gradle_dir / "app"
+
+    def resource_sampler(
+        self, interval: float = DEFAULT_INTERVAL, timeline: Path | None = None
+    ) -> ResourceSampler:
+        """Create a sampler of the running server's process tree and database.
+
+        Args:
+            interval: Seconds between background samples
+            timeline: JSON-lines file receiving every sample, if any
+
+        Returns:
+            A sampler that is not started yet
+
+        Raises:
+            RuntimeError: If the server is not running
+        """
+        if self.server_process is None:
+            raise RuntimeError("Server is not running")
+        return ResourceSampler(
+            self.server_process.pid,
+            database=self.data_dir / DATABASE_FILE,
+            interval=interval,
+            timeline=timeline,
+        )
+
     def stop_server(self) -> None:
         """Stop the server process, equivalent to stopServer() in TestServer.kt."""
         if self.server_process is None:
@@ -116,33 +269,53 @@ class AmbrosiaTestServer:
         finally:
             self._cleanup_server()
 
-    def _wait_for_server(self) -> None:
-        """Wait for server to be ready, equivalent to waitForServer() in TestServer.kt."""
-        start_time = time.time()
-        timeout = self.STARTUP_TIMEOUT
+    def _wait_for_server(self, timeout: float) -> None:
+        """Wait for server to be ready, equivalent to waitForServer() in TestServer.kt.
+
+        Readiness is detected as soon as Ktor logs that it is listening. As a
+        fallback the health endpoint is probed with exponential backoff, and
+        the wait fails immediately if the server process exits.
+        """
+        deadline = time.monotonic() + timeout
+        delay = self.HEALTH_CHECK_INITIAL_DELAY
 
         logger.info(f"Waiting for server to be ready (timeout: {timeout}s)")
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() < deadline:
+            # Wakes up early when the ready line is logged or the stream closes
+            if self.server_output.wait(min(delay, deadline - time.monotonic())):
+                logger.info("Server reported it is listening")
+                return
+
+            # Output closes just before the process exits; give it a moment
+            if self.server_output.closed:
+                try:
+                    self.server_process.wait(timeout=1.0)
+                except subprocess.TimeoutExpired:
+                    pass
+
+            # Check if process is still running
+            if self.server_process.poll() is not None:
+                self.server_output.join()
+                logger.error(
+                    f"Server process died unexpectedly:\n{self.server_output.tail()}"
+                )
+                raise RuntimeError(
+                    "Server process died during startup "
+                    f"(exit code {self.server_process.returncode})"
+                )
+
             try:
                 # Check if server is responding
-                response = httpx.get(self.HEALTH_CHECK_URL, timeout=5.0)
+                response = httpx.get(self.health_check_url, timeout=1.0)
                 if response.status_code == 200:
                     logger.info("Server is ready and responding")
                     return
 
-            except (httpx.ConnectError, httpx.TimeoutException, httpx.HTTPError) as e:
+            except httpx.HTTPError as e:
                 logger.debug(f"Server not ready yet: {e}")
 
-            # Check if process is still running
-            if self.server_process and self.server_process.poll() is not None:
-                stdout, stderr = self.server_process.communicate()
-                logger.error(
-                    f"Server process died unexpectedly. stdout: {stdout}, stderr: {stderr}"
-                )
-                raise RuntimeError("Server process died during startup")
-
-            time.sleep(self.HEALTH_CHECK_INTERVAL)
+            delay = min(delay * 2, self.HEALTH_CHECK_MAX_DELAY)
 
         # If we get here, server didn't start in time
         self._log_server_output()
@@ -167,14 +340,21 @@ class AmbrosiaTestServer:
             logger.error(f"Error force killing server: {e}")
 
     def _kill_processes_by_name(self, process_name: str) -> None:
-        """Kill processes by name as a fallback cleanup method."""
+        """Kill processes by name as a fallback cleanup method.
+
+        Only processes started with this instance's port are killed, so servers
+        belonging to other workers are left alone.
+        """
+        port_arg = f"--http-bind-port={self.port}"
         try:
             for proc in psutil.process_iter(["pid", "name", "cmdline"]):
                 try:
                     if proc.info["name"] and process_name in proc.info["name"].lower():
                         # Check if it's likely our server process
-                        cmdline = proc.info.get("cmdline", [])
-                        if any("ambrosia" in str(arg).lower() for arg in cmdline):
+                        cmdline = proc.info.get("cmdline") or []
+                        if port_arg in cmdline and any(
+                            "ambrosia" in str(arg).lower() for arg in cmdline
+                        ):
                             logger.info(
                                 f"Killing process {proc.info['pid']}: {cmdline}"
                             )
@@ -190,29 +370,54 @@ class AmbrosiaTestServer:
 
     def _cleanup_server(self) -> None:
         """Clean up server process references."""
+        if self.server_output:
+            self.server_output.close()
+            self.server_output = None
         if self.server_process:
             self.server_process = None
 
     def _log_server_output(self) -> None:
-        """Log server output for debugging."""
-        if self.server_process:
-            try:
-                stdout, stderr = self.server_process.communicate(timeout=1)
-                if stdout:
-                    logger.error(f"Server stdout: {stdout.decode()}")
-                if stderr:
-                    logger.error(f"Server stderr: {stderr.decode()}")
-            except subprocess.TimeoutExpired:
-                logger.error("Could not read server output (timeout)")
-            except Exception as e:
-                logger.error(f"Error reading server output: {e}")
+        """Log the most recent server output for debugging."""
+        if self.server_output:
+            logger.error(
+                f"Server output (most recent lines):\n{self.server_output.tail()}"
+            )
+
+
+def find_free_port(host: str = AmbrosiaTestServer.SERVER_HOST) -> int:
+    """Ask the OS for a currently unused TCP port on ``host``."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
 
 
 # Pytest fixtures for easy integration
 @pytest.fixture(scope="session")
-def test_server() -> AmbrosiaTestServer:
-    """Session-scoped fixture that provides a TestServer instance."""
-    return AmbrosiaTestServer()
+def test_server(worker_id: str) -> AmbrosiaTestServer:
+    """Session-scoped fixture that provides a TestServer instance.
+
+    Without pytest-xdist (``worker_id == "master"``) the default port and data
+    directory are used. Each xdist worker gets free ports and a private data
+    directory, so ``pytest -n auto`` runs one isolated server per worker.
+
+    The data directory is seeded from the cached template database, which is
+    built once (by whichever worker gets there first) when migrations change.
+    """
+    template_dir = ensure_template(
+        AmbrosiaTestServer(port=find_free_port(), https_port=find_free_port())
+    )
+
+    if worker_id == "master":
+        return AmbrosiaTestServer(template_dir=template_dir)
+
+    return AmbrosiaTestServer(
+        port=find_free_port(),
+        https_port=find_free_port(),
+        data_dir=AmbrosiaTestServer.DATA_DIR.with_name(
+            f"{AmbrosiaTestServer.DATA_DIR.name}-{worker_id}"
+        ),
+        template_dir=template_dir,
+    )
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,129 @@
+"""Session-wide pool of test users keyed by permission set.
+
+Creating a role, granting permissions, creating a user and logging in costs
+several HTTP calls and two PBKDF2 hashes on the server. The pool does this
+once per distinct permission set and hands out independent clients (each with
+its own cookie jar) for the same user afterwards.
+"""
+
+import logging
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from ambrosia.auth_utils import (
+    CachedLogin,
+    create_role,
+    create_user,
+    grant_permissions,
+)
+from ambrosia.cleanup import CleanupFailure, CleanupPlan
+from ambrosia.http_client import AmbrosiaHttpClient, SharedTransport
+
+logger = logging.getLogger(__name__)
+
+# PIN shared by all pooled users
+POOLED_USER_PIN = "1234"
+
+
+@dataclass
+class PooledUser:
+    """A ready-to-use user holding exactly one permission set.
+
+    Attributes:
+        role_id: ID of the role created for the permission set
+        user_id: ID of the user assigned to that role
+        login: Cached login shared by every client of this user
+    """
+
+    role_id: str
+    user_id: str
+    login: CachedLogin = field(repr=False)
+
+
+class PermissionUserPool:
+    """Memoizes one user per ``frozenset(permissions)`` for the whole session."""
+
+    def __init__(self, server_url: str, transport: SharedTransport | None = None):
+        """Initialize an empty pool.
+
+        Args:
+            server_url: Base URL of the server the users are created on
+            transport: Shared connection pool for the clients handed out
+        """
+        self.server_url = server_url
+        self.transport = transport
+        self._users: dict[frozenset[str], PooledUser] = {}
+
+    async def client(
+        self, admin_client: AmbrosiaHttpClient, permissions: Iterable[str] = None
+    ) -> AmbrosiaHttpClient:
+        """Return a new authenticated client for a user with ``permissions``.
+
+        The user is created on first use of a permission set. The returned
+        client is open and must be closed by the caller.
+
+        Args:
+            admin_client: An authenticated admin client, used to create the user
+            permissions: Permission names granted to the user's role
+
+        Returns:
+            An open client with its own cookie jar
+        """
+        key = frozenset(permissions or ())
+        user = self._users.get(key)
+        if user is None:
+            user = await self._create_user(admin_client, key)
+            self._users[key] = user
+
+        client = AmbrosiaHttpClient(self.server_url, transport=self.transport)
+        await client.__aenter__()
+        try:
+            await user.login.authenticate(client)
+        except BaseException:
+            await client.__aexit__(None, None, None)
+            raise
+        return client
+
+    async def _create_user(
+        self, admin_client: AmbrosiaHttpClient, permissions: frozenset[str]
+    ) -> PooledUser:
+        """Create a role and user holding ``permissions``."""
+        uid = str(uuid.uuid4())[:8]
+        role_name = f"role_{uid}"
+        user_name = f"user_{uid}"
+
+        role_id = await create_role(admin_client, role_name)
+        if permissions:
+            await grant_permissions(admin_client, role_id, sorted(permissions))
+        user_id = await create_user(admin_client, user_name, POOLED_USER_PIN, role_id)
+
+        logger.debug(f"Pooled user {user_name} for permissions {sorted(permissions)}")
+        return PooledUser(
+            role_id, user_id, CachedLogin({"name": user_name, "pin": POOLED_USER_PIN})
+        )
+
+    async def cleanup(self, admin_client: AmbrosiaHttpClient) -> list[CleanupFailure]:
+        """Delete every pooled user, then every pooled role, concurrently.
+
+        Args:
+            admin_client: An authenticated admin client
+
+        Returns:
+            The cleanup failures (already logged as one report)
+        """
+        plan = CleanupPlan()
+        for user in self._users.values():
+            plan.add(
+                "users",
+                f"user {user.user_id}",
+                lambda path=f"/users/{user.user_id}": admin_client.delete(path),
+            )
+        for user in self._users.values():
+            plan.add(
+                "roles",
+                f"role {user.role_id}",
+                lambda path=f"/roles/{user.role_id}": admin_client.delete(path),
+            )
+        self._users.clear()
+        return await plan.run()
@@ -0,0 +1,275 @@
+"""Pytest configuration and fixtures for the endpoint benchmarks.
+
+The benchmarks run against the same session test server as the e2e tests,
+seed it with a small catalog and order history, and time each endpoint.
+Results are written to ``benchmarks/results/<sha>.json`` and compared with
+the baseline file, if one has been saved.
+"""
+
+import logging
+import uuid
+from pathlib import Path
+
+import pytest
+
+from ambrosia.api_utils import assert_status_code
+from ambrosia.auth_utils import CachedLogin, create_role, create_user, grant_permissions
+from ambrosia.benchmark import (
+    DEFAULT_TOLERANCE,
+    BenchmarkSession,
+    git_revision,
+    load_results,
+    write_results,
+)
+from ambrosia.http_client import AmbrosiaHttpClient, SharedTransport
+
+pytest_plugins = [
+    "ambrosia.test_server",
+    "ambrosia.latency_report",
+    "ambrosia.resource_report",
+]
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_DIR = Path(__file__).parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+SEED_PRODUCTS = 50
+SEED_TABLES = 20
+SEED_CHECKOUTS = 200
+
+# Stock of each seeded product, enough for every checkout benchmark call
+SEED_PRODUCT_STOCK = 1_000_000
+
+# Seeded user for the login benchmark, so the admin's refresh token is not
+# replaced on every iteration
+BENCH_USER_PIN = "4321"
+
+# Payment method and currency seeded by the migrations
+CASH_PAYMENT_METHOD_ID = "32332081-7a2b-4e67-a198-fddf2451f426"
+USD_CURRENCY_ID = "bccfc932-d89b-477a-b65b-04f97cae4aae"
+
+
+def pytest_addoption(parser):
+    """Add benchmark options."""
+    group = parser.getgroup("ambrosia-benchmarks", "Ambrosia endpoint benchmarks")
+    group.addoption(
+        "--benchmark-iterations",
+        type=int,
+        default=200,
+        help="Timed calls per benchmark (default: 200)",
+    )
+    group.addoption(
+        "--benchmark-warmup",
+        type=int,
+        default=20,
+        help="Untimed warm-up calls per benchmark (default: 20)",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline results to compare against (default: benchmarks/baseline.json)",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed relative slowdown per percentile (default: {DEFAULT_TOLERANCE})",
+    )
+    group.addoption(
+        "--benchmark-save-baseline",
+        action="store_true",
+        default=False,
+        help="Also save this run's results as the new baseline",
+    )
+
+
+@pytest.fixture(scope="session")
+def bench(request) -> BenchmarkSession:
+    """Session collecting every benchmark result.
+
+    At session end the results are written, tagged with the git revision,
+    and optionally saved as the new baseline.
+    """
+    config = request.config
+    baseline_path = config.getoption("--benchmark-baseline")
+    baseline = load_results(baseline_path)
+    if baseline is None:
+        logger.warning(f"No baseline at {baseline_path}, regressions are not checked")
+    else:
+        logger.info(
+            f"Comparing against baseline {baseline_path} (sha {baseline.get('sha')})"
+        )
+
+    session = BenchmarkSession(
+        iterations=config.getoption("--benchmark-iterations"),
+        warmup=config.getoption("--benchmark-warmup"),
+        baseline=baseline,
+        tolerance=config.getoption("--benchmark-tolerance"),
+    )
+    yield session
+
+    if not session.results:
+        return
+    revision = git_revision(BENCHMARKS_DIR)
+    data = session.to_dict(revision)
+    sha = (revision["sha"] or "unknown")[:12]
+    path = RESULTS_DIR / f"{sha}{'-dirty' if revision['dirty'] else ''}.json"
+    write_results(path, data)
+    logger.info(f"Benchmark results written to {path}")
+    if config.getoption("--benchmark-save-baseline"):
+        write_results(baseline_path, data)
+        logger.info(f"Baseline saved to {baseline_path}")
+
+
+@pytest.fixture
+def check_baseline(bench: BenchmarkSession):
+    """Return a function failing the test if a benchmark regressed."""
+
+    def _check(name: str) -> None:
+        regressions = bench.regressions(name)
+        if regressions:
+            pytest.fail(
+                "Performance regression:\n"
+                + "\n".join(f"  {regression}" for regression in regressions)
+            )
+
+    return _check
+
+
+@pytest.fixture(scope="session")
+async def bench_transport():
+    """Connection pool shared by the benchmark clients."""
+    transport = SharedTransport()
+    yield transport
+    await transport.aclose()
+
+
+@pytest.fixture(scope="session")
+def bench_login() -> CachedLogin:
+    """Cached login of the default admin user."""
+    return CachedLogin()
+
+
+@pytest.fixture(scope="session")
+async def bench_client(
+    server_url: str, bench_login: CachedLogin, bench_transport: SharedTransport
+):
+    """Admin client shared by all benchmarks.
+
+    Benchmarks re-authenticate through ``bench_login`` before each call,
+    since test access tokens expire after a few seconds.
+    """
+    async with AmbrosiaHttpClient(server_url, transport=bench_transport) as client:
+        await bench_login.authenticate(client)
+        yield client
+
+
+@pytest.fixture
+def refresh_login(bench_client: AmbrosiaHttpClient, bench_login: CachedLogin):
+    """Return a coroutine function renewing bench_client's cookies if needed."""
+    return lambda: bench_login.authenticate(bench_client)
+
+
+@pytest.fixture(scope="session")
+async def seeded(bench_client: AmbrosiaHttpClient) -> dict:
+    """Seed the server with products, tables, a login user and order history.
+
+    The session server starts from the template database, so the seeded data
+    does not outlive the session and is not cleaned up.
+
+    Returns:
+        Ids used by the benchmarks: ``user_id``, ``products``, ``space_id`` and
+        the login benchmark's ``credentials``
+    """
+    client = bench_client
+    uid = uuid.uuid4().hex[:8]
+
+    response = await client.get("/users/me")
+    assert_status_code(response, 200, "Failed to fetch current user")
+    user_id = response.json()["user"]["userId"]
+
+    response = await client.post(
+        "/categories", json={"name": f"bench_cat_{uid}", "type": "product"}
+    )
+    assert_status_code(response, 201, "Failed to create benchmark category")
+    category_id = response.json()["id"]
+
+    products = []
+    for i in range(SEED_PRODUCTS):
+        price_cents = 100 + 37 * i
+        response = await client.post(
+            "/products",
+            json={
+                "SKU": f"BENCH-{uid}-{i}",
+                "name": f"bench_product_{uid}_{i}",
+                "costCents": price_cents // 2,
+                "priceCents": price_cents,
+                "quantity": SEED_PRODUCT_STOCK,
+                "minStockThreshold": 1,
+                "maxStockThreshold": SEED_PRODUCT_STOCK,
+                "categoryIds": [category_id],
+            },
+        )
+        assert_status_code(response, 201, "Failed to create benchmark product")
+        products.append({"id": response.json()["id"], "price": price_cents})
+
+    response = await client.post("/spaces", json={"name": f"bench_space_{uid}"})
+    assert_status_code(response, 201, "Failed to create benchmark space")
+    space_id = response.json()["id"]
+    for i in range(SEED_TABLES):
+        response = await client.post(
+            "/tables",
+            json={
+                "name": f"bench_{uid}_{i}",
+                "spaceId": space_id,
+                "status": "available",
+            },
+        )
+        assert_status_code(response, 201, "Failed to create benchmark table")
+
+    seeded = {"user_id": user_id, "products": products, "space_id": space_id}
+    for i in range(SEED_CHECKOUTS):
+        response = await client.post(
+            "/store/orders/checkout", json=_checkout_request(seeded, i)
+        )
+        assert_status_code(response, 201, "Failed to seed a checkout")
+
+    role_id = await create_role(client, f"bench_role_{uid}")
+    await grant_permissions(client, role_id, ["products_read"])
+    await create_user(client, f"bench_user_{uid}", BENCH_USER_PIN, role_id)
+    seeded["credentials"] = {"name": f"bench_user_{uid}", "pin": BENCH_USER_PIN}
+
+    logger.info(
+        f"Seeded {SEED_PRODUCTS} products, {SEED_TABLES} tables and "
+        f"{SEED_CHECKOUTS} checkouts"
+    )
+    return seeded
+
+
+@pytest.fixture
+def checkout_request(seeded: dict):
+    """Return a function building the i-th deterministic store checkout."""
+    return lambda index: _checkout_request(seeded, index)
+
+
+def _checkout_request(seeded: dict, index: int) -> dict:
+    """Build a deterministic store checkout of 1-3 seeded products."""
+    products = seeded["products"]
+    items = [
+        {
+            "productId": products[(index + k * 7) % len(products)]["id"],
+            "quantity": 1 + (index + k) % 3,
+            "priceAtOrder": products[(index + k * 7) % len(products)]["price"],
+        }
+        for k in range(1 + index % 3)
+    ]
+    return {
+        "userId": seeded["user_id"],
+        "items": items,
+        "paymentMethodId": CASH_PAYMENT_METHOD_ID,
+        "currencyId": USD_CURRENCY_ID,
+        "amount": sum(i["quantity"] * i["priceAtOrder"] for i in items) / 100,
+    }
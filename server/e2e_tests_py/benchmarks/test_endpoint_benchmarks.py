@@ -0,0 +1,92 @@
+"""Latency benchmarks of key endpoints against the seeded server.
+
+Each benchmark times sequential calls from one client and fails if a p50,
+p95 or p99 regressed beyond the tolerance relative to the stored baseline.
+"""
+
+import itertools
+import logging
+
+import pytest
+
+from ambrosia.http_client import AmbrosiaHttpClient
+
+logger = logging.getLogger(__name__)
+
+
+class TestEndpointBenchmarks:
+    """Benchmarks of the endpoints on the POS hot paths."""
+
+    @pytest.mark.asyncio
+    async def test_auth_login(self, bench, check_baseline, server_url, seeded):
+        """POST /auth/login with a seeded user."""
+        async with AmbrosiaHttpClient(server_url) as client:
+            await bench.measure(
+                "auth_login",
+                lambda: client.post("/auth/login", json=seeded["credentials"]),
+            )
+        check_baseline("auth_login")
+
+    @pytest.mark.asyncio
+    async def test_products(
+        self, bench, check_baseline, bench_client, refresh_login, seeded
+    ):
+        """GET /products with the seeded catalog."""
+        await bench.measure(
+            "products",
+            lambda: bench_client.get("/products"),
+            prepare=refresh_login,
+        )
+        check_baseline("products")
+
+    @pytest.mark.asyncio
+    async def test_orders_with_payments(
+        self, bench, check_baseline, bench_client, refresh_login, seeded
+    ):
+        """GET /orders/with-payments over the seeded order history."""
+        await bench.measure(
+            "orders_with_payments",
+            lambda: bench_client.get("/orders/with-payments"),
+            prepare=refresh_login,
+        )
+        check_baseline("orders_with_payments")
+
+    @pytest.mark.asyncio
+    async def test_reports(
+        self, bench, check_baseline, bench_client, refresh_login, seeded
+    ):
+        """GET /reports over the seeded order history."""
+        await bench.measure(
+            "reports",
+            lambda: bench_client.get("/reports"),
+            prepare=refresh_login,
+        )
+        check_baseline("reports")
+
+    @pytest.mark.asyncio
+    async def test_store_checkout(
+        self, bench, check_baseline, bench_client, refresh_login, checkout_request
+    ):
+        """POST /store/orders/checkout with 1-3 seeded products."""
+        calls = itertools.count()
+        await bench.measure(
+            "store_checkout",
+            lambda: bench_client.post(
+                "/store/orders/checkout", json=checkout_request(next(calls))
+            ),
+            expected_status=201,
+            prepare=refresh_login,
+        )
+        check_baseline("store_checkout")
+
+    @pytest.mark.asyncio
+    async def test_tables_by_space(
+        self, bench, check_baseline, bench_client, refresh_login, seeded
+    ):
+        """GET /tables/by-space/{id} for the seeded space."""
+        await bench.measure(
+            "tables_by_space",
+            lambda: bench_client.get(f"/tables/by-space/{seeded['space_id']}"),
+            prepare=refresh_login,
+        )
+        check_baseline("tables_by_space")
@@ -5,25 +5,29 @@ available to all test modules in the tests directory.
 """
 
 import asyncio
+import itertools
 import logging
 import os
+import socket
 import sys
 from pathlib import Path
 
 import pytest
 
-from ambrosia.auth_utils import (
-    create_role,
-    create_user,
-    grant_permissions,
-    login_user,
-)
-from ambrosia.http_client import AmbrosiaHttpClient
+from ambrosia.auth_utils import CachedLogin
+from ambrosia.cleanup import CleanupPlan
+from ambrosia.http_client import AmbrosiaHttpClient, SharedTransport
+from ambrosia.template_db import INITIAL_SETUP_DATA
+from ambrosia.user_pool import PermissionUserPool
 
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-pytest_plugins = ["ambrosia.test_server"]
+pytest_plugins = [
+    "ambrosia.test_server",
+    "ambrosia.latency_report",
+    "ambrosia.resource_report",
+]
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -31,6 +35,10 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Last octet of the next address handed out by loopback_address
+# (127.0.0.1 is left to every other client)
+_loopback_hosts = itertools.count(2)
+
 
 def pytest_addoption(parser):
     """Add custom command-line options."""
@@ -54,10 +62,6 @@ def pytest_collection_modifyitems(config, items):
             if "slow" in item.keywords:
                 item.add_marker(skip_slow)
 
-    rate_limit = [i for i in items if "test_rate_limit" in i.nodeid]
-    others = [i for i in items if "test_rate_limit" not in i.nodeid]
-    items[:] = others + rate_limit
-
 
 os.environ.setdefault("TESTING", "true")
 os.environ.setdefault("LOG_LEVEL", "INFO")
@@ -68,7 +72,8 @@ def initialize_database(manage_server_lifecycle, server_url: str):
     """Ensure the database is initialized with the default user before any tests run.
 
     This fixture runs once per test session after the server starts but before any tests.
-    It checks if the database is initialized and creates the default user if needed.
+    The server normally starts from the pre-seeded template database, so this only
+    confirms it is initialized; the default user is created here as a fallback.
 
     Args:
         manage_server_lifecycle: Ensures server is started before this runs
@@ -89,19 +94,9 @@ def initialize_database(manage_server_lifecycle, server_url: str):
             logger.info(
                 "Attempting to initialize database with default user for tests..."
             )
-            setup_data = {
-                "businessType": "store",
-                "userName": "cooluser1",
-                "userPassword": "password123",
-                "userPin": "0000",
-                "businessName": "Test Store",
-                "businessAddress": "123 Test St",
-                "businessPhone": "1234567890",
-                "businessEmail": "test@example.com",
-                "businessCurrency": "USD",
-            }
-
-            setup_response = await client.post("/initial-setup", json=setup_data)
+            setup_response = await client.post(
+                "/initial-setup", json=INITIAL_SETUP_DATA
+            )
 
             if setup_response.status_code == 201:
                 logger.info("✓ Database initialized successfully with default user")
@@ -143,78 +138,122 @@ def initialize_database(manage_server_lifecycle, server_url: str):
     yield
 
 
+@pytest.fixture(scope="session")
+async def http_transport():
+    """Session-wide connection pool shared by the fixture-provided clients.
+
+    Every client keeps its own cookie jar, but keep-alive connections to the
+    server are reused across tests. This relies on the session-scoped event
+    loop configured in pyproject.toml.
+    """
+    transport = SharedTransport()
+    yield transport
+    await transport.aclose()
+
+
+@pytest.fixture(scope="session")
+def admin_login() -> CachedLogin:
+    """Session-wide cached login for the default admin user.
+
+    Logging in costs a PBKDF2 hash and a refresh-token write on the server,
+    so it is done once and the tokens are reused (and refreshed) by every
+    admin_client.
+    """
+    return CachedLogin()
+
+
 @pytest.fixture
-async def admin_client(server_url: str):
+async def admin_client(
+    server_url: str, admin_login: CachedLogin, http_transport: SharedTransport
+):
     """Fixture that provides an authenticated admin client.
 
-    This fixture creates a new AmbrosiaHttpClient, performs login with
-    default admin credentials, and yields the authenticated client.
-    The client is automatically closed after the test.
+    This fixture creates a new AmbrosiaHttpClient with its own cookie jar on
+    the shared connection pool, authenticates it from the session's cached
+    admin login, and yields it. The client is automatically closed after the test.
     """
-    async with AmbrosiaHttpClient(server_url) as client:
-        await login_user(client)
+    async with AmbrosiaHttpClient(server_url, transport=http_transport) as client:
+        await admin_login.authenticate(client)
         yield client
 
 
 @pytest.fixture
-async def public_client(server_url: str):
+async def public_client(server_url: str, http_transport: SharedTransport):
     """Fixture that provides an unauthenticated client.
 
     The client is automatically closed after the test.
     """
-    async with AmbrosiaHttpClient(server_url) as client:
+    async with AmbrosiaHttpClient(server_url, transport=http_transport) as client:
         yield client
 
 
 @pytest.fixture
-async def client_factory(server_url: str, admin_client):
-    """Factory to create authenticated clients with specific permissions.
+def loopback_address() -> str:
+    """A loopback address (127.0.0.x) no other test of this session sends from.
 
-    This fixture returns an async function that creates a temporary user
-    and role, assigns the requested permissions, logs in, and returns
-    the client. Resources are automatically cleaned up after the test.
+    The login rate limiter keys its state by remote address, so a client
+    created with ``AmbrosiaHttpClient(..., local_address=loopback_address)``
+    gets its own bucket and does not block, or get blocked by, other tests.
     """
-    users = []
-    roles = []
-    clients = []
+    host = next(_loopback_hosts)
+    assert host < 255, "Out of 127.0.0.x loopback addresses"
+    address = f"127.0.0.{host}"
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind((address, 0))
+        except OSError:
+            pytest.skip(
+                f"{address} is not a local address "
+                f"(on macOS: sudo ifconfig lo0 alias {address})"
+            )
+    return address
 
-    async def _factory(permissions: list[str] = None):
-        import uuid
 
-        uid = str(uuid.uuid4())[:8]
-        role_name = f"role_{uid}"
-        user_name = f"user_{uid}"
-        user_pin = "1234"
+@pytest.fixture(scope="session")
+def permission_pool(
+    server_url: str, admin_login: CachedLogin, http_transport: SharedTransport
+):
+    """Session-wide pool of users keyed by permission set.
 
-        role_id = await create_role(admin_client, role_name)
-        roles.append(role_id)
+    Each distinct permission set is turned into a role and user only once.
+    All pooled users and roles are deleted concurrently at session end.
+    """
+    pool = PermissionUserPool(server_url, transport=http_transport)
 
-        if permissions:
-            await grant_permissions(admin_client, role_id, permissions)
+    yield pool
 
-        user_id = await create_user(admin_client, user_name, user_pin, role_id)
-        users.append(user_id)
+    async def cleanup():
+        async with AmbrosiaHttpClient(server_url) as client:
+            await admin_login.authenticate(client)
+            await pool.cleanup(client)
 
-        client = AmbrosiaHttpClient(server_url)
-        await client.__aenter__()
-        await login_user(client, {"name": user_name, "pin": user_pin})
-        clients.append(client)
+    asyncio.run(cleanup())
 
+
+@pytest.fixture
+async def client_factory(admin_client, permission_pool: PermissionUserPool):
+    """Factory to create authenticated clients with specific permissions.
+
+    This fixture returns an async function that returns a logged-in client
+    for a user holding exactly the requested permissions. Users come from the
+    session's permission pool, so repeated permission sets reuse the same
+    user; every call still gets its own client and cookie jar. Clients are
+    closed concurrently after the test.
+    """
+    clients = []
+
+    async def _factory(permissions: list[str] = None):
+        client = await permission_pool.client(admin_client, permissions)
+        clients.append(client)
         return client
 
     yield _factory
 
+    plan = CleanupPlan()
     for client in clients:
-        await client.__aexit__(None, None, None)
-
-    for user_id in users:
-        try:
-            await admin_client.delete(f"/users/{user_id}")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup user {user_id}: {e}")
-
-    for role_id in roles:
-        try:
-            await admin_client.delete(f"/roles/{role_id}")
-        except Exception as e:
-            logger.warning(f"Failed to cleanup role {role_id}: {e}")
+        plan.add(
+            "clients",
+            f"client {client.base_url}",
+            lambda client=client: client.__aexit__(None, None, None),
+        )
+    await plan.run()
@@ -11,6 +11,7 @@ This module tests the authentication flow including:
 
 import asyncio
 import logging
+import uuid
 
 import pytest
 
@@ -19,23 +20,55 @@ from ambrosia.auth_utils import (
     assert_cookies_absent,
     assert_cookies_present,
     assert_success_message,
+    create_role,
+    create_user,
     get_tokens_from_response,
     login_user,
     set_cookie_in_jar,
 )
+from ambrosia.cleanup import CleanupPlan
 from ambrosia.http_client import AmbrosiaHttpClient
 
 logger = logging.getLogger(__name__)
 
+AUTH_USER_PIN = "1234"
+
+
+@pytest.fixture
+async def auth_user(admin_client, admin_login):
+    """Credentials of a user created for this test alone.
+
+    The server keeps one refresh token per user, so logging the default user in
+    or out here would revoke the session's cached admin login, and the cache's
+    next login would in turn revoke the tokens this test is checking.
+    """
+    uid = uuid.uuid4().hex[:8]
+    role_id = await create_role(admin_client, f"auth_role_{uid}")
+    name = f"auth_user_{uid}"
+    user_id = await create_user(admin_client, name, AUTH_USER_PIN, role_id)
+
+    yield {"name": name, "pin": AUTH_USER_PIN}
+
+    # The test may outlast the admin's access token
+    await admin_login.authenticate(admin_client)
+    plan = CleanupPlan()
+    plan.add(
+        "users", f"user {user_id}", lambda: admin_client.delete(f"/users/{user_id}")
+    )
+    plan.add(
+        "roles", f"role {role_id}", lambda: admin_client.delete(f"/roles/{role_id}")
+    )
+    await plan.run()
+
 
 class TestAuthentication:
     """Tests for authentication endpoints and token management."""
 
     @pytest.mark.asyncio
-    async def test_successful_login_sets_both_tokens(self, server_url: str):
+    async def test_successful_login_sets_both_tokens(self, server_url: str, auth_user):
         """Test that successful login sets both accessToken and refreshToken cookies."""
         async with AmbrosiaHttpClient(server_url) as client:
-            response = await login_user(client)
+            response = await login_user(client, auth_user)
 
             # Check response message
             assert_success_message(response)
@@ -75,11 +108,11 @@ class TestAuthentication:
             )
 
     @pytest.mark.asyncio
-    async def test_refresh_with_invalid_token_fails(self, server_url: str):
+    async def test_refresh_with_invalid_token_fails(self, server_url: str, auth_user):
         """Test that refresh endpoint fails with invalid refreshToken."""
         async with AmbrosiaHttpClient(server_url) as client:
             # First, login to get a valid refresh token
-            login_response = await login_user(client)
+            login_response = await login_user(client, auth_user)
 
             # Verify we have a valid refresh token from login (just to ensure login worked)
             get_tokens_from_response(login_response)
@@ -94,7 +127,9 @@ class TestAuthentication:
             )
 
     @pytest.mark.asyncio
-    async def test_access_token_expiration_and_refresh(self, server_url: str):
+    async def test_access_token_expiration_and_refresh(
+        self, server_url: str, auth_user
+    ):
         """Test that access token expires and refresh token still works.
 
         This test verifies:
@@ -105,7 +140,7 @@ class TestAuthentication:
         """
         async with AmbrosiaHttpClient(server_url) as client:
             # Login to get tokens
-            login_response = await login_user(client)
+            login_response = await login_user(client, auth_user)
 
             original_access_token, refresh_token = get_tokens_from_response(
                 login_response
@@ -154,7 +189,7 @@ class TestAuthentication:
             logger.info("✓ Access token expiration and refresh verified")
 
     @pytest.mark.asyncio
-    async def test_logout_revokes_tokens(self, server_url: str):
+    async def test_logout_revokes_tokens(self, server_url: str, auth_user):
         """Test that logout revokes refresh tokens and prevents further refresh.
 
         This test verifies that:
@@ -165,7 +200,7 @@ class TestAuthentication:
         """
         async with AmbrosiaHttpClient(server_url) as client:
             # Login first and verify that the tokens are set and valid
-            login_response = await login_user(client)
+            login_response = await login_user(client, auth_user)
 
             assert_success_message(login_response)
             assert_cookies_present(login_response, "accessToken", "refreshToken")
@@ -239,7 +274,9 @@ class TestAuthentication:
             )
 
     @pytest.mark.asyncio
-    async def test_multiple_refreshes_generate_unique_tokens(self, server_url: str):
+    async def test_multiple_refreshes_generate_unique_tokens(
+        self, server_url: str, auth_user
+    ):
         """Test that multiple token refreshes work and generate unique tokens.
 
         This test verifies:
@@ -250,7 +287,7 @@ class TestAuthentication:
         """
         async with AmbrosiaHttpClient(server_url) as client:
             # Login
-            login_response = await login_user(client)
+            login_response = await login_user(client, auth_user)
 
             # Get tokens and verify they exist
             original_access_token, _ = get_tokens_from_response(login_response)
@@ -341,32 +378,27 @@ class TestAuthentication:
             )
 
     @pytest.mark.asyncio
-    async def test_login_fails_when_role_deleted(self, server_url: str):
+    async def test_login_fails_when_role_deleted(
+        self, server_url: str, admin_client: AmbrosiaHttpClient
+    ):
         """Test that login fails with a helpful error when the user's role is deleted."""
-        from ambrosia.auth_utils import create_role, create_user
-
-        async with AmbrosiaHttpClient(server_url) as admin_client:
-            await login_user(admin_client)
-
-            import random
-
-            suffix = random.randint(1000, 9999)
-            role_id = await create_role(admin_client, f"TempRole_{suffix}")
-            user_name = f"testuser_{suffix}"
-            user_pin = "1234"
-            await create_user(admin_client, user_name, user_pin, role_id)
-
-            delete_response = await admin_client.delete(f"/roles/{role_id}")
-            assert delete_response.status_code == 204
-
-            async with AmbrosiaHttpClient(server_url) as user_client:
-                login_response = await user_client.post(
-                    "/auth/login", json={"name": user_name, "pin": user_pin}
-                )
+        suffix = uuid.uuid4().hex[:8]
+        role_id = await create_role(admin_client, f"TempRole_{suffix}")
+        user_name = f"testuser_{suffix}"
+        user_pin = "1234"
+        await create_user(admin_client, user_name, user_pin, role_id)
+
+        delete_response = await admin_client.delete(f"/roles/{role_id}")
+        assert delete_response.status_code == 204
+
+        async with AmbrosiaHttpClient(server_url) as user_client:
+            login_response = await user_client.post(
+                "/auth/login", json={"name": user_name, "pin": user_pin}
+            )
 
-                assert login_response.status_code == 401
-                assert (
-                    login_response.json()["message"]
-                    == "No assigned role for this user, contact Admin"
-                )
-                assert_cookies_absent(login_response, "accessToken", "refreshToken")
+            assert login_response.status_code == 401
+            assert (
+                login_response.json()["message"]
+                == "No assigned role for this user, contact Admin"
+            )
+            assert_cookies_absent(login_response, "accessToken", "refreshToken")
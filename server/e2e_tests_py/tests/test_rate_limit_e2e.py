@@ -1,63 +1,71 @@
 """End-to-end tests for the login rate limiter (LoginRateLimiter in Authorize.kt).
 
-The rate limiter uses a precomputed Fibonacci sequence for backoff (minutes per IP):
+The rate limiter uses a precomputed Fibonacci sequence for backoff (time units per IP):
   - Successful login           → counter reset
   - Failed login (1–5)         → counter incremented, no block → 401 Invalid credentials
-  - Failed login (6+)          → counter incremented, IP blocked for FIB[count-5] minutes
-  - FIB[1]=1min, FIB[2]=1min, FIB[3]=2min, FIB[4]=3min, FIB[5]=5min, ...
+  - Failed login (6+)          → counter incremented, IP blocked for FIB[count-5] units
+  - FIB[1]=1, FIB[2]=1, FIB[3]=2, FIB[4]=3, FIB[5]=5, ...
+
+A unit is one minute in production. The test server compresses it to
+AmbrosiaTestServer.LOGIN_BACKOFF_UNIT_MS, so each block lasts a fraction of a second.
 
 Every failed login beyond FREE_ATTEMPTS returns 429 Too Many Requests with a Retry-After
-header (in seconds). The counter is cumulative and only resets on a successful login.
+header (in seconds, rounded up). The counter is cumulative and only resets on a
+successful login.
+
+Each test sends from its own loopback address (the loopback_address fixture), so
+it starts with a fresh counter and its blocks never affect other tests.
 """
 
 import asyncio
 import logging
+import math
 
 import pytest
 
 from ambrosia.auth_utils import DEFAULT_TEST_USER
 from ambrosia.http_client import AmbrosiaHttpClient
+from ambrosia.test_server import AmbrosiaTestServer
 
 logger = logging.getLogger(__name__)
 
 FREE_ATTEMPTS = 5  # failures allowed before blocking kicks in
-FIBONACCI_FIRST_S = 60  # fib(1) = 1 minute expressed in seconds (Retry-After unit)
+FIBONACCI = [0, 1, 1, 2, 3, 5, 8]  # backoff units per step (index 0 unused)
 INVALID_CREDS = {"name": "nonexistent_user", "pin": "9999"}
 
+# Extra wait after a block should have expired
+BLOCK_EXPIRY_MARGIN_S = 0.2
 
-async def reset_block(client) -> None:
-    """Wait for any active block to expire, then log in successfully to reset the counter.
 
-    While blocked the IP gets 429 regardless of credentials. This helper retries until
-    the block window expires and a successful login resets the failure counter.
-    """
-    while True:
-        response = await client.post("/auth/login", json=DEFAULT_TEST_USER)
-        if response.status_code == 200:
-            return
-        assert response.status_code == 429, (
-            f"reset_block: unexpected status {response.status_code}"
-        )
-        retry_after = response.json().get("retryAfter", 1)
-        logger.info(f"reset_block: still blocked, waiting {retry_after}s...")
-        await asyncio.sleep(retry_after + 0.5)
+def block_seconds(step: int) -> float:
+    """Duration of the step-th block (1 = first block after the free attempts)."""
+    return FIBONACCI[step] * AmbrosiaTestServer.LOGIN_BACKOFF_UNIT_MS / 1000
+
+
+def retry_after_seconds(step: int) -> int:
+    """Retry-After the server reports for a fresh step-th block."""
+    return math.ceil(block_seconds(step))
+
+
+FIBONACCI_FIRST_S = retry_after_seconds(1)  # Retry-After of the first block
 
 
 class TestLoginRateLimit:
     """Tests for the Fibonacci-backoff login rate limiter."""
 
     @pytest.mark.asyncio
-    @pytest.mark.slow
-    async def test_successful_logins_reset_fibonacci_counter(self, server_url: str):
+    async def test_successful_logins_reset_fibonacci_counter(
+        self, server_url: str, loopback_address: str
+    ):
         """Successful login resets the failure counter back to zero.
 
         After a reset the next FREE_ATTEMPTS failed attempts return 401 (no block),
         and the (FREE_ATTEMPTS+1)-th failure returns 429 with retryAfter == FIBONACCI_FIRST_S,
         confirming the counter was cleared.
         """
-        async with AmbrosiaHttpClient(server_url) as client:
-            await reset_block(client)
-
+        async with AmbrosiaHttpClient(
+            server_url, local_address=loopback_address
+        ) as client:
             for _ in range(FREE_ATTEMPTS):
                 r = await client.post("/auth/login", json=INVALID_CREDS)
                 assert r.status_code == 401, (
@@ -74,7 +82,7 @@ class TestLoginRateLimit:
             )
             logger.info(f"First block: 429 with retryAfter={retry_after}s ✓")
 
-            await asyncio.sleep(retry_after + 0.5)
+            await asyncio.sleep(block_seconds(1) + BLOCK_EXPIRY_MARGIN_S)
             response = await client.post("/auth/login", json=DEFAULT_TEST_USER)
             assert response.status_code == 200, (
                 f"Successful login after block expiry: expected 200, got {response.status_code}"
@@ -103,9 +111,8 @@ class TestLoginRateLimit:
         logger.info("✓ Successful login correctly resets the Fibonacci failure counter")
 
     @pytest.mark.asyncio
-    @pytest.mark.slow
     async def test_grace_period_then_block_shared_across_sessions(
-        self, server_url: str
+        self, server_url: str, loopback_address: str
     ):
         """First FREE_ATTEMPTS failures return 401; the next one triggers a 429 block.
 
@@ -113,9 +120,9 @@ class TestLoginRateLimit:
         - Subsequent wrong attempts from a blocked IP continue to return 429
         - A brand-new client session from the same IP shares the blocked bucket
         """
-        async with AmbrosiaHttpClient(server_url) as client:
-            await reset_block(client)
-
+        async with AmbrosiaHttpClient(
+            server_url, local_address=loopback_address
+        ) as client:
             for i in range(FREE_ATTEMPTS):
                 response = await client.post("/auth/login", json=INVALID_CREDS)
                 assert response.status_code == 401, (
@@ -135,7 +142,9 @@ class TestLoginRateLimit:
             )
             logger.info(f"Wrong creds on blocked IP: {response.status_code} ✓")
 
-        async with AmbrosiaHttpClient(server_url) as new_client:
+        async with AmbrosiaHttpClient(
+            server_url, local_address=loopback_address
+        ) as new_client:
             response = await new_client.post("/auth/login", json=INVALID_CREDS)
             assert response.status_code == 429, (
                 "New session from same IP should share the blocked bucket, "
@@ -151,16 +160,18 @@ class TestLoginRateLimit:
         )
 
     @pytest.mark.asyncio
-    @pytest.mark.slow
-    async def test_rate_limit_429_includes_retry_after(self, server_url: str):
+    async def test_rate_limit_429_includes_retry_after(
+        self, server_url: str, loopback_address: str
+    ):
         """The 429 response must include retryAfter in the body and Retry-After header.
 
-        Both values must match and be >= FIBONACCI_FIRST_S (fib(1) = 1 minute = 60 s).
+        Both values must match and be >= FIBONACCI_FIRST_S (fib(1) = 1 unit, rounded
+        up to whole seconds).
         Requires FREE_ATTEMPTS+1 failures to reach the first block.
         """
-        async with AmbrosiaHttpClient(server_url) as client:
-            await reset_block(client)
-
+        async with AmbrosiaHttpClient(
+            server_url, local_address=loopback_address
+        ) as client:
             response = None
             for _ in range(FREE_ATTEMPTS + 1):
                 response = await client.post("/auth/login", json=INVALID_CREDS)
@@ -178,7 +189,7 @@ class TestLoginRateLimit:
             f"retryAfter must be an int, got {type(retry_after_body)}"
         )
         assert retry_after_body >= FIBONACCI_FIRST_S, (
-            f"retryAfter={retry_after_body} must be >= {FIBONACCI_FIRST_S}s (fib(1) = 1 min)"
+            f"retryAfter={retry_after_body} must be >= {FIBONACCI_FIRST_S}s (fib(1) = 1 unit)"
         )
         logger.info(f"Body retryAfter: {retry_after_body}s ✓")
 
@@ -194,3 +205,51 @@ class TestLoginRateLimit:
         logger.info(
             "✓ 429 response includes matching retryAfter body and Retry-After header"
         )
+
+    @pytest.mark.asyncio
+    async def test_fibonacci_schedule_later_steps(
+        self, server_url: str, loopback_address: str
+    ):
+        """Each failure after a block expires blocks for the next Fibonacci step.
+
+        Walks the first five blocks (1, 1, 2, 3, 5 units). For each step the 429
+        reports the step's Retry-After, a correct login during the block is still
+        rejected, and once the block expires the next failure starts the next step.
+        """
+        async with AmbrosiaHttpClient(
+            server_url, local_address=loopback_address
+        ) as client:
+            for i in range(FREE_ATTEMPTS):
+                response = await client.post("/auth/login", json=INVALID_CREDS)
+                assert response.status_code == 401, (
+                    f"Free attempt {i + 1}: expected 401, got {response.status_code}"
+                )
+
+            for step in range(1, 6):
+                response = await client.post("/auth/login", json=INVALID_CREDS)
+                assert response.status_code == 429, (
+                    f"Step {step}: expected 429, got {response.status_code}"
+                )
+                retry_after = response.json()["retryAfter"]
+                assert retry_after == retry_after_seconds(step), (
+                    f"Step {step}: expected retryAfter {retry_after_seconds(step)}s "
+                    f"(fib({step}) = {FIBONACCI[step]} units), got {retry_after}s"
+                )
+
+                response = await client.post("/auth/login", json=DEFAULT_TEST_USER)
+                assert response.status_code == 429, (
+                    f"Step {step}: correct login during the block should get 429, "
+                    f"got {response.status_code}"
+                )
+                logger.info(
+                    f"Step {step}: blocked for {block_seconds(step):.1f}s, "
+                    f"retryAfter={retry_after}s ✓"
+                )
+                await asyncio.sleep(block_seconds(step) + BLOCK_EXPIRY_MARGIN_S)
+
+            response = await client.post("/auth/login", json=DEFAULT_TEST_USER)
+            assert response.status_code == 200, (
+                f"Login after the last block: expected 200, got {response.status_code}"
+            )
+
+        logger.info("✓ Fibonacci backoff schedule followed through step 5")
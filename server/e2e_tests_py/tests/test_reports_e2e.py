@@ -1,5 +1,7 @@
 """End-to-end tests for the /reports endpoint."""
 
+import uuid
+
 import pytest
 
 from ambrosia.api_utils import assert_status_code
@@ -157,3 +159,132 @@ class TestReportsEndpoint:
         data = response.json()
         assert "sales" in data
         assert isinstance(data["sales"], list)
+
+
+async def _checkout(client, product_name: str, quantity: int = 3) -> dict:
+    """Check out one store order of a new product; returns the checkout and its ids."""
+    user_id = (await client.get("/users/me")).json()["user"]["userId"]
+    methods = (await client.get("/payments/methods")).json()
+    currencies = (await client.get("/payments/currencies")).json()
+
+    response = await client.post(
+        "/categories", json={"name": f"{product_name}_cat", "type": "product"}
+    )
+    assert_status_code(response, 201)
+    product = {
+        "SKU": product_name.upper(),
+        "name": product_name,
+        "costCents": 100,
+        "priceCents": 250,
+        "quantity": 100,
+        "minStockThreshold": 1,
+        "maxStockThreshold": 100,
+        "categoryIds": [response.json()["id"]],
+    }
+    response = await client.post("/products", json=product)
+    assert_status_code(response, 201)
+
+    request = {
+        "userId": user_id,
+        "items": [
+            {
+                "productId": response.json()["id"],
+                "quantity": quantity,
+                "priceAtOrder": 250,
+            }
+        ],
+        "paymentMethodId": methods[0]["id"],
+        "currencyId": currencies[0]["id"],
+        "amount": quantity * 2.5,
+    }
+    response = await client.post("/store/orders/checkout", json=request)
+    assert_status_code(response, 201)
+    return response.json() | {"userId": user_id, "methods": methods, "request": request}
+
+
+async def _assert_rollup_matches_detail(client, product_name: str, **filters) -> dict:
+    """The date-ranged totals alone (from the rollup) equal the sum of the listed sales."""
+    params = {"period": "year", "productName": product_name} | filters
+    response = await client.get("/reports", params=params)
+    assert_status_code(response, 200)
+    data = response.json()
+    sales = data["sales"]
+
+    # limit=0 skips the line items, so the totals can only come from the rollup
+    response = await client.get("/reports", params=params | {"limit": 0})
+    assert_status_code(response, 200)
+    totals = response.json()
+    assert totals["totalItemsSold"] == sum(s["quantity"] for s in sales), (
+        f"Rollup items sold disagree with the line items for {params}"
+    )
+    assert totals["totalRevenueCents"] == sum(
+        s["quantity"] * s["priceAtOrder"] for s in sales
+    ), f"Rollup revenue disagrees with the line items for {params}"
+    return data
+
+
+class TestReportsRollup:
+    """Date-ranged /reports totals stay in step with the sales after edits."""
+
+    @pytest.mark.asyncio
+    async def test_payment_method_change_moves_the_sales(self, admin_client):
+        """Changing a payment's method moves its sales to the new method."""
+        product_name = f"rollup_pay_{uuid.uuid4().hex[:8]}"
+        checkout = await _checkout(admin_client, product_name)
+        old_method, new_method = checkout["methods"][0], checkout["methods"][1]
+
+        payment = {
+            "methodId": new_method["id"],
+            "currencyId": checkout["request"]["currencyId"],
+            "amount": checkout["request"]["amount"],
+        }
+        response = await admin_client.put(
+            f"/payments/{checkout['paymentId']}", json=payment
+        )
+        assert_status_code(response, 200)
+
+        moved = await _assert_rollup_matches_detail(
+            admin_client, product_name, paymentMethod=new_method["name"]
+        )
+        assert moved["totalItemsSold"] == 3
+        left = await _assert_rollup_matches_detail(
+            admin_client, product_name, paymentMethod=old_method["name"]
+        )
+        assert left["totalItemsSold"] == 0
+
+    @pytest.mark.asyncio
+    async def test_ticket_moved_to_another_order(self, admin_client):
+        """Moving a paid ticket to another order recomputes both orders' sales."""
+        first_name = f"rollup_move_{uuid.uuid4().hex[:8]}"
+        second_name = f"rollup_move_{uuid.uuid4().hex[:8]}"
+        first = await _checkout(admin_client, first_name, quantity=2)
+        second = await _checkout(admin_client, second_name, quantity=4)
+
+        ticket = {
+            "orderId": second["orderId"],
+            "userId": first["userId"],
+            "ticketDate": "",
+            "status": 1,
+            "totalAmount": first["request"]["amount"],
+            "notes": "",
+        }
+        response = await admin_client.put(f"/tickets/{first['ticketId']}", json=ticket)
+        assert_status_code(response, 200)
+
+        left = await _assert_rollup_matches_detail(admin_client, first_name)
+        assert left["totalItemsSold"] == 0
+        await _assert_rollup_matches_detail(admin_client, second_name)
+
+    @pytest.mark.asyncio
+    async def test_ticket_delete_removes_the_sales(self, admin_client):
+        """Deleting a paid ticket drops its sales from the totals."""
+        product_name = f"rollup_del_{uuid.uuid4().hex[:8]}"
+        checkout = await _checkout(admin_client, product_name)
+        await _assert_rollup_matches_detail(admin_client, product_name)
+
+        response = await admin_client.delete(f"/tickets/{checkout['ticketId']}")
+        assert_status_code(response, 204)
+
+        data = await _assert_rollup_matches_detail(admin_client, product_name)
+        assert data["totalItemsSold"] == 0
+        assert data["totalRevenueCents"] == 0
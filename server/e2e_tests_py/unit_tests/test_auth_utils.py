@@ -0,0 +1,100 @@
+"""Unit tests for the shared login session in ambrosia.auth_utils."""
+
+import asyncio
+import base64
+import json
+import time
+
+import httpx
+import pytest
+
+from ambrosia.auth_utils import CachedLogin
+from ambrosia.http_client import AmbrosiaHttpClient
+
+BASE_URL = "http://127.0.0.1:9154"
+
+
+def jwt(expires_in: float) -> str:
+    """Unsigned JWT expiring ``expires_in`` seconds from now."""
+
+    def encode(claims: dict) -> str:
+        return (
+            base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+        )
+
+    payload = encode({"exp": int(time.time() + expires_in)})
+    return f"{encode({'alg': 'none'})}.{payload}.sig"
+
+
+class FakeAuthServer:
+    """Answers /auth/login and /auth/refresh, counting the calls."""
+
+    def __init__(self, login_expires_in: float):
+        self.login_expires_in = login_expires_in
+        self.calls = {"/auth/login": 0, "/auth/refresh": 0}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls[request.url.path] += 1
+        # Let every concurrent caller reach the lock before this one answers
+        await asyncio.sleep(0.01)
+        if request.url.path == "/auth/login":
+            cookies = [
+                f"accessToken={jwt(self.login_expires_in)}",
+                "refreshToken=refresh",
+            ]
+        else:
+            cookies = [f"accessToken={jwt(60)}"]
+        headers = [("set-cookie", f"{cookie}; Path=/") for cookie in cookies]
+        return httpx.Response(200, headers=headers, request=request)
+
+
+async def authenticate_all(login: CachedLogin, server: FakeAuthServer, users: int):
+    """Authenticate ``users`` clients at once over the fake server."""
+    clients = [AmbrosiaHttpClient(BASE_URL, transport=server) for _ in range(users)]
+    for client in clients:
+        await client.__aenter__()
+    try:
+        await asyncio.gather(*(login.authenticate(client) for client in clients))
+        return [client._client.cookies.get("accessToken") for client in clients]
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+
+
+class TestCachedLogin:
+    """Tests for sharing one login between concurrent clients."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_use_logs_in_once(self):
+        """Clients starting together wait for a single login."""
+        server = FakeAuthServer(login_expires_in=60)
+        login = CachedLogin()
+
+        tokens = await authenticate_all(login, server, users=20)
+
+        assert server.calls == {"/auth/login": 1, "/auth/refresh": 0}
+        assert set(tokens) == {login.access_token}
+
+    @pytest.mark.asyncio
+    async def test_stale_token_is_refreshed_once(self):
+        """Clients finding the token stale wait for a single refresh."""
+        server = FakeAuthServer(login_expires_in=-1)
+        login = CachedLogin()
+        await authenticate_all(login, server, users=1)
+
+        tokens = await authenticate_all(login, server, users=20)
+
+        assert server.calls == {"/auth/login": 1, "/auth/refresh": 1}
+        assert login.refresh_count == 1
+        assert set(tokens) == {login.access_token}
+
+    @pytest.mark.asyncio
+    async def test_fresh_token_is_reused_without_requests(self):
+        """A token with most of its lifetime left is handed out as is."""
+        server = FakeAuthServer(login_expires_in=60)
+        login = CachedLogin()
+        await authenticate_all(login, server, users=1)
+
+        await authenticate_all(login, server, users=5)
+
+        assert server.calls == {"/auth/login": 1, "/auth/refresh": 0}
@@ -0,0 +1,161 @@
+"""Unit tests for the deterministic dataset generator in ambrosia.datagen."""
+
+import sqlite3
+from datetime import date
+
+import pytest
+
+from ambrosia.datagen import COLUMNS, NAME_PREFIX, DatasetSpec, check_schema, generate
+
+END = date(2026, 3, 31)
+
+# Seeded reference data the generator looks up, as the migrations insert it
+PAYMENT_METHODS = [("m-cash", "Cash"), ("m-card", "Credit Card"), ("m-btc", "BTC")]
+CURRENCIES = [("c-usd", "USD"), ("c-eur", "EUR")]
+
+# Columns outside COLUMNS that the generator's queries read
+EXTRA_COLUMNS = {"orders": ("is_deleted INTEGER NOT NULL DEFAULT 0",)}
+
+
+def create_schema(path) -> None:
+    """Create the tables the generator writes and reads, columns untyped."""
+    connection = sqlite3.connect(path)
+    with connection:
+        for table, columns in COLUMNS.items():
+            definitions = [f'"{c}"' for c in columns] + list(
+                EXTRA_COLUMNS.get(table, ())
+            )
+            connection.execute(f"CREATE TABLE {table} ({', '.join(definitions)})")
+        connection.execute("CREATE TABLE payment_methods (id, name)")
+        connection.executemany(
+            "INSERT INTO payment_methods VALUES (?, ?)", PAYMENT_METHODS
+        )
+        connection.execute("CREATE TABLE currency (id, acronym)")
+        connection.executemany("INSERT INTO currency VALUES (?, ?)", CURRENCIES)
+    connection.close()
+
+
+def dump(path) -> dict[str, list[tuple]]:
+    """Every generated row, per table, in a stable order."""
+    connection = sqlite3.connect(path)
+    try:
+        return {
+            table: sorted(
+                connection.execute(f"SELECT * FROM {table}").fetchall(), key=repr
+            )
+            for table in COLUMNS
+        }
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of an empty database with the minimal migrated schema."""
+    path = tmp_path / "ambrosia.db"
+    create_schema(path)
+    return path
+
+
+@pytest.fixture
+def other_database(tmp_path):
+    """A second, independent database with the same schema."""
+    path = tmp_path / "other.db"
+    create_schema(path)
+    return path
+
+
+SPEC = DatasetSpec(orders=500, days=30, end=END, users=3, products=20, categories=4)
+
+
+class TestDeterminism:
+    """Tests that a spec always produces the same dataset."""
+
+    def test_same_spec_yields_identical_rows(self, database, other_database):
+        """Two databases generated from one spec hold exactly the same rows."""
+        first = generate(database, SPEC)
+        second = generate(other_database, SPEC)
+        assert first == second
+        assert dump(database) == dump(other_database)
+
+    def test_another_seed_yields_other_rows(self, database, other_database):
+        """Changing only the seed changes the generated ids and orders."""
+        generate(database, SPEC)
+        generate(other_database, DatasetSpec(**{**vars(SPEC), "seed": SPEC.seed + 1}))
+        assert dump(database)["orders"] != dump(other_database)["orders"]
+
+
+class TestDatasetShape:
+    """Tests for the rows the generator writes."""
+
+    def test_counts_follow_the_spec(self, database):
+        """Orders, users and products match the spec; paid orders get a ticket."""
+        counts = generate(database, SPEC)
+        rows = dump(database)
+
+        assert counts["orders"] == SPEC.orders
+        assert counts["users"] == SPEC.users
+        assert counts["products"] == SPEC.products
+        assert counts["categories"] == SPEC.categories
+        paid = [o for o in rows["orders"] if o[3] == "paid"]
+        assert counts["tickets"] == counts["payments"] == len(paid)
+        assert counts["ticket_payments"] == len(paid)
+        for table, table_rows in rows.items():
+            assert counts[table] == len(table_rows), f"Count of {table} is off"
+
+    def test_orders_stay_within_the_history(self, database):
+        """Every order falls on one of the spec's days, inside opening hours."""
+        generate(database, SPEC)
+        created = [row[5] for row in dump(database)["orders"]]
+        days = {c[:10] for c in created}
+        assert min(days) >= "2026-03-02"
+        assert max(days) <= END.isoformat()
+        assert all("08:00:00" <= c[11:] < "22:00:00" for c in created)
+
+    def test_payments_use_seeded_reference_data(self, database):
+        """Payments reference the seeded methods and the USD currency."""
+        generate(database, SPEC)
+        payments = dump(database)["payments"]
+        assert {p[1] for p in payments} <= {m[0] for m in PAYMENT_METHODS}
+        assert {p[2] for p in payments} == {"c-usd"}
+
+    def test_sales_rollup_matches_paid_order_lines(self, database):
+        """daily_sales sums the order lines of paid orders."""
+        generate(database, SPEC)
+        connection = sqlite3.connect(database)
+        try:
+            rollup = connection.execute(
+                "SELECT SUM(items_sold), SUM(revenue_cents) FROM daily_sales"
+            ).fetchone()
+            detail = connection.execute(
+                "SELECT SUM(op.quantity), SUM(op.quantity * op.price_at_order) "
+                "FROM order_products op JOIN orders o ON o.id = op.order_id "
+                "WHERE o.status = 'paid'"
+            ).fetchone()
+        finally:
+            connection.close()
+        assert rollup == detail
+
+
+class TestChecks:
+    """Tests for the generator's refusals."""
+
+    def test_unmigrated_database_is_rejected(self, database):
+        """A missing table or column is reported by name."""
+        connection = sqlite3.connect(database)
+        connection.execute("DROP TABLE daily_sales")
+        with pytest.raises(ValueError, match="daily_sales"):
+            check_schema(connection)
+        connection.close()
+
+    def test_second_dataset_is_rejected(self, database):
+        """A database that already holds a dataset is left alone."""
+        generate(database, SPEC)
+        with pytest.raises(ValueError, match="already contains"):
+            generate(database, SPEC)
+        connection = sqlite3.connect(database)
+        users = connection.execute(
+            "SELECT COUNT(*) FROM users WHERE name LIKE ?", (f"{NAME_PREFIX}_%",)
+        ).fetchone()[0]
+        connection.close()
+        assert users == SPEC.users
@@ -0,0 +1,126 @@
+"""Unit tests for the open-loop schedule and latency correction in ambrosia.load."""
+
+import asyncio
+import math
+from itertools import pairwise
+
+import httpx
+import pytest
+
+from ambrosia.load import (
+    JOB_ERROR_METHOD,
+    TRANSPORT_ERROR_STATUS,
+    LoadConfig,
+    LoadGenerator,
+    arrival_times,
+)
+
+
+def fake_job(service_time: float):
+    """Build a job that takes ``service_time`` seconds and never hits the network."""
+
+    async def job(client):
+        await asyncio.sleep(service_time)
+        request = httpx.Request("GET", f"{client.base_url}/products")
+        return httpx.Response(200, request=request, content=b"[]")
+
+    return job
+
+
+def offline_config(**overrides) -> LoadConfig:
+    """Load config for runs that need no server or login."""
+    return LoadConfig(**{"rps": 50, "duration": 0.4, "credentials": None} | overrides)
+
+
+class TestArrivalTimes:
+    """Tests for the intended start offsets of a run."""
+
+    def test_constant_rate_is_evenly_spaced(self):
+        """Without ramp-up arrivals come every 1/rps seconds until duration."""
+        offsets = list(arrival_times(rps=10, duration=1.0))
+        assert len(offsets) == 10
+        for k, offset in enumerate(offsets):
+            assert math.isclose(offset, k / 10, abs_tol=1e-9)
+
+    def test_zero_rate_schedules_nothing(self):
+        """A non-positive rate yields no arrivals."""
+        assert list(arrival_times(rps=0, duration=10)) == []
+        assert list(arrival_times(rps=-1, duration=10)) == []
+
+    def test_ramp_up_integrates_a_linear_rate(self):
+        """The ramp carries rps * ramp_up / 2 arrivals, with shrinking gaps."""
+        rps, duration, ramp_up = 20, 5.0, 2.0
+        offsets = list(arrival_times(rps, duration, ramp_up))
+
+        during_ramp = [o for o in offsets if o < ramp_up]
+        assert len(during_ramp) == rps * ramp_up / 2
+        assert len(offsets) == rps * ramp_up / 2 + rps * (duration - ramp_up)
+
+        gaps = [b - a for a, b in pairwise(during_ramp)]
+        assert all(b < a for a, b in pairwise(gaps)), "Ramp should speed up"
+        steady = [o for o in offsets if o >= ramp_up]
+        for a, b in pairwise(steady):
+            assert math.isclose(b - a, 1 / rps, abs_tol=1e-9)
+
+    def test_ramp_up_longer_than_duration_is_clamped(self):
+        """A ramp longer than the run stops at duration, still increasing."""
+        offsets = list(arrival_times(rps=10, duration=2.0, ramp_up=10.0))
+        assert len(offsets) == 10
+        assert offsets == sorted(offsets)
+        assert offsets[-1] < 2.0
+
+
+class TestOpenLoop:
+    """Tests for the generator's scheduling and coordinated-omission correction."""
+
+    @pytest.mark.asyncio
+    async def test_queued_arrivals_count_their_wait(self):
+        """With one busy user the latency of late arrivals includes the queueing.
+
+        Arrivals come every 20 ms but each takes 40 ms, so the k-th one
+        finishes at (k + 1) * 40 ms and waits k * 20 ms before it starts.
+        """
+        generator = LoadGenerator(offline_config(users=1), fake_job(0.04))
+        result = await generator.run()
+
+        histogram = result.response_time.routes[("GET", "/products")].histogram
+        assert result.scheduled == result.completed == 20
+        assert histogram.min < 0.06, "The first arrival should not wait"
+        # The last arrival (k = 19) waits about 380 ms on top of its 40 ms
+        assert histogram.max > 0.3, "Queueing delay should be counted"
+        assert histogram.percentile(50) > 0.15
+
+    @pytest.mark.asyncio
+    async def test_enough_users_report_the_service_time(self):
+        """When no arrival waits, the latency is just the job's duration."""
+        generator = LoadGenerator(offline_config(users=20), fake_job(0.04))
+        result = await generator.run()
+
+        histogram = result.response_time.routes[("GET", "/products")].histogram
+        assert result.completed == 20
+        assert histogram.max < 0.1
+
+    @pytest.mark.asyncio
+    async def test_processes_share_the_schedule(self):
+        """Each of N processes takes every N-th arrival of the same schedule."""
+        scheduled = 0
+        for index in range(3):
+            config = offline_config(users=4, worker_index=index, worker_count=3)
+            result = await LoadGenerator(config, fake_job(0.0)).run()
+            scheduled += result.scheduled
+        assert scheduled == len(list(arrival_times(rps=50, duration=0.4)))
+
+    @pytest.mark.asyncio
+    async def test_failing_job_does_not_stall_the_run(self):
+        """A job raising a non-HTTP error counts as an error; users keep serving."""
+
+        async def job(client):
+            raise ValueError("malformed body")
+
+        config = offline_config(users=2)
+        result = await asyncio.wait_for(LoadGenerator(config, job).run(), timeout=10)
+
+        assert result.scheduled == result.errors == 20
+        assert result.completed == 0
+        stats = result.response_time.routes[(JOB_ERROR_METHOD, "ValueError")]
+        assert stats.statuses == {TRANSPORT_ERROR_STATUS: 20}
@@ -0,0 +1,182 @@
+"""Unit tests for the latency histogram, recorder and line fit in ambrosia.metrics."""
+
+import math
+import random
+
+from ambrosia.metrics import (
+    BUCKET_GROWTH,
+    LatencyHistogram,
+    LatencyRecorder,
+    linear_fit,
+    route_template,
+)
+
+
+def exact_percentile(samples: list[float], percent: float) -> float:
+    """Nearest-rank percentile of raw samples."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(len(ordered) * percent / 100))
+    return ordered[rank - 1]
+
+
+class TestBucketing:
+    """Tests for how durations map to histogram buckets."""
+
+    def test_sub_microsecond_durations_share_bucket_zero(self):
+        """Everything up to 1 µs, including zero, lands in bucket 0."""
+        histogram = LatencyHistogram()
+        for seconds in (0.0, 1e-9, 1e-6):
+            histogram.record(seconds)
+        assert histogram.buckets == {0: 3}
+
+    def test_bucket_bounds_contain_the_duration(self):
+        """A duration lies within its bucket, whose width is BUCKET_GROWTH."""
+        for seconds in (2e-6, 1.5e-4, 0.003, 0.25, 7.0, 120.0):
+            index = LatencyHistogram._bucket_index(seconds)
+            upper = LatencyHistogram._bucket_upper_bound(index)
+            lower = LatencyHistogram._bucket_upper_bound(index - 1)
+            assert lower <= seconds <= upper, f"{seconds}s outside [{lower}, {upper}]"
+            assert math.isclose(upper / lower, BUCKET_GROWTH)
+
+    def test_record_with_count_weights_the_sample(self):
+        """record(count=n) is the same as recording the duration n times."""
+        weighted = LatencyHistogram()
+        weighted.record(0.01, count=5)
+        repeated = LatencyHistogram()
+        for _ in range(5):
+            repeated.record(0.01)
+        assert weighted.to_dict() == repeated.to_dict()
+
+
+class TestPercentiles:
+    """Tests for percentile estimates."""
+
+    def test_empty_histogram_reports_zero(self):
+        """An empty histogram reports 0 for every percentile and the mean."""
+        histogram = LatencyHistogram()
+        assert histogram.percentile(50) == 0.0
+        assert histogram.percentile(99) == 0.0
+        assert histogram.mean == 0.0
+
+    def test_percentiles_stay_within_bucket_error(self):
+        """Estimates are never below the exact value nor 2% above it."""
+        rng = random.Random(7)
+        samples = [rng.lognormvariate(-4, 1) for _ in range(10_000)]
+        histogram = LatencyHistogram()
+        for seconds in samples:
+            histogram.record(seconds)
+
+        for percent in (1, 50, 90, 95, 99, 99.9, 100):
+            exact = exact_percentile(samples, percent)
+            estimate = histogram.percentile(percent)
+            assert exact <= estimate <= exact * BUCKET_GROWTH, (
+                f"p{percent}: estimate {estimate} too far from {exact}"
+            )
+
+    def test_percentiles_are_clamped_to_observed_range(self):
+        """A single sample is reported exactly, not as its bucket's upper bound."""
+        histogram = LatencyHistogram()
+        histogram.record(0.0123)
+        assert histogram.percentile(0) == 0.0123
+        assert histogram.percentile(100) == 0.0123
+
+
+class TestMerge:
+    """Tests for merging histograms and recorders."""
+
+    def test_merged_percentiles_match_a_single_histogram(self):
+        """Merging shards gives the same result as recording everything in one."""
+        rng = random.Random(11)
+        samples = [rng.expovariate(50) for _ in range(5_000)]
+        combined = LatencyHistogram()
+        shards = [LatencyHistogram() for _ in range(4)]
+        for i, seconds in enumerate(samples):
+            combined.record(seconds)
+            shards[i % 4].record(seconds)
+
+        merged = LatencyHistogram()
+        for shard in shards:
+            merged.merge(shard)
+
+        assert merged.buckets == combined.buckets
+        assert merged.count == combined.count
+        assert merged.min == combined.min
+        assert merged.max == combined.max
+        assert math.isclose(merged.total, combined.total)
+        for percent in (50, 95, 99):
+            assert merged.percentile(percent) == combined.percentile(percent)
+
+    def test_merging_an_empty_histogram_changes_nothing(self):
+        """An empty shard keeps min, max and percentiles unchanged."""
+        histogram = LatencyHistogram()
+        histogram.record(0.5)
+        histogram.merge(LatencyHistogram())
+        assert histogram.min == 0.5
+        assert histogram.count == 1
+        assert histogram.percentile(50) == 0.5
+
+    def test_histogram_survives_a_dict_round_trip(self):
+        """from_dict(to_dict()) restores buckets and stats, empty or not."""
+        histogram = LatencyHistogram()
+        for seconds in (0.001, 0.002, 0.5):
+            histogram.record(seconds)
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+        assert restored.to_dict() == histogram.to_dict()
+        assert restored.percentile(99) == histogram.percentile(99)
+
+        empty = LatencyHistogram.from_dict(LatencyHistogram().to_dict())
+        assert empty.min == math.inf
+        assert empty.count == 0
+
+    def test_recorders_merge_per_route(self):
+        """Recorders merge histograms, statuses and bytes route by route."""
+        first = LatencyRecorder()
+        first.record("GET", "/orders", 200, 100, 0.01)
+        first.record("GET", "/orders/{id}", 404, 10, 0.002)
+        second = LatencyRecorder()
+        second.record("GET", "/orders", 500, 50, 0.03)
+
+        merged = LatencyRecorder.from_dict(first.to_dict())
+        merged.merge(LatencyRecorder.from_dict(second.to_dict()))
+
+        orders = merged.routes[("GET", "/orders")]
+        assert orders.histogram.count == 2
+        assert orders.statuses == {200: 1, 500: 1}
+        assert orders.bytes == 150
+        assert merged.routes[("GET", "/orders/{id}")].histogram.count == 1
+
+
+class TestRouteTemplate:
+    """Tests for collapsing ids in request paths."""
+
+    def test_ids_are_collapsed(self):
+        """UUIDs, integers and long hex strings become {id}; the query is dropped."""
+        url = (
+            "http://127.0.0.1:9154/tables/by-space/"
+            "3f2a1b4c-1d2e-4f3a-8b9c-0d1e2f3a4b5c?limit=5"
+        )
+        assert route_template(url) == "/tables/by-space/{id}"
+        assert route_template("/orders/42/dishes") == "/orders/{id}/dishes"
+        assert route_template("/wallet/" + "ab" * 16) == "/wallet/{id}"
+        assert route_template("/reports") == "/reports"
+
+
+class TestLinearFit:
+    """Tests for the least-squares line."""
+
+    def test_exact_line_is_recovered(self):
+        """Points on a line give back its slope and intercept."""
+        slope, intercept = linear_fit([(x, 3.0 * x + 2.0) for x in range(5)])
+        assert math.isclose(slope, 3.0)
+        assert math.isclose(intercept, 2.0)
+
+    def test_noise_averages_out(self):
+        """Alternating noise around a line does not bias the slope."""
+        points = [(x, 2.0 * x + (1 if x % 2 else -1)) for x in range(100)]
+        slope, _ = linear_fit(points)
+        assert math.isclose(slope, 2.0, rel_tol=1e-3)
+
+    def test_single_x_has_no_fit(self):
+        """Without two distinct x values there is no line."""
+        assert linear_fit([]) is None
+        assert linear_fit([(1.0, 1.0), (1.0, 5.0)]) is None
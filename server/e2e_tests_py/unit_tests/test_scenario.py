@@ -0,0 +1,69 @@
+"""Unit tests for running weighted scenarios in ambrosia.scenario."""
+
+import asyncio
+
+import pytest
+
+from ambrosia.load import LoadConfig
+from ambrosia.scenario import (
+    STEP_FAILED_STATUS,
+    STEP_METHOD,
+    Scenario,
+    ScenarioLoad,
+    Step,
+)
+
+
+def offline_config(**overrides) -> LoadConfig:
+    """Load config for runs that need no server or login."""
+    return LoadConfig(**{"rps": 50, "duration": 0.4, "credentials": None} | overrides)
+
+
+async def run(scenario: Scenario, **overrides):
+    """Run a scenario offline, failing instead of hanging."""
+    generator = ScenarioLoad(offline_config(**overrides), scenario, seed=1)
+    return await asyncio.wait_for(generator.run(), timeout=10)
+
+
+class TestScenarioLoad:
+    """Tests for the scenario runner."""
+
+    @pytest.mark.asyncio
+    async def test_step_raising_any_error_is_a_failed_step(self):
+        """A KeyError from a step is recorded as a failure and the run completes."""
+
+        async def broken(client, context, _):
+            return {}["id"]
+
+        result = await run(Scenario("broken", [Step("broken", broken)]), users=2)
+
+        assert result.scheduled == result.errors == 20
+        assert result.completed == 0
+        stats = result.response_time.routes[(STEP_METHOD, "broken")]
+        assert stats.statuses == {STEP_FAILED_STATUS: 20}
+
+    @pytest.mark.asyncio
+    async def test_closing_steps_take_every_item_left(self):
+        """A closing step runs once per item left in its pool, after the traffic."""
+        closed = []
+
+        async def setup(client, context):
+            context.put("shifts", "a")
+            context.put("shifts", "b")
+
+        async def idle(client, context, _):
+            return None
+
+        async def close(client, context, shift):
+            closed.append(shift)
+
+        scenario = Scenario(
+            "day",
+            [Step("idle", idle)],
+            setup=setup,
+            closing=[Step("close", close, requires="shifts")],
+        )
+        result = await run(scenario)
+
+        assert sorted(closed) == ["a", "b"]
+        assert result.response_time.routes[(STEP_METHOD, "close")].histogram.count == 2
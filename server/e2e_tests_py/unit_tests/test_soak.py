@@ -0,0 +1,134 @@
+"""Unit tests for the trend fitting and leak detection in ambrosia.soak."""
+
+import math
+
+from ambrosia.resource_monitor import MB, ResourceSample
+from ambrosia.soak import (
+    HOUR,
+    MIN_WINDOW_REQUESTS,
+    SoakLimits,
+    Trend,
+    Window,
+    analyze,
+    format_trends,
+)
+
+# Unix time at which the warm-up of the synthetic runs ends
+SINCE = 1_800_000_000.0
+
+
+def sample(hours: float, rss_mb: float, fds: int) -> ResourceSample:
+    """Resource sample taken ``hours`` after the warm-up."""
+    return ResourceSample(
+        time=SINCE + hours * HOUR,
+        rss=int(rss_mb * MB),
+        cpu_percent=10.0,
+        threads=40,
+        fds=fds,
+        db_bytes=0,
+        wal_bytes=0,
+    )
+
+
+def window(hours: float, p99_ms: float, count: int = 100) -> Window:
+    """Ten-minute window starting ``hours`` after the warm-up, one route."""
+    start = SINCE + hours * HOUR
+    row = {"method": "GET", "route": "/products", "count": count, "p99_ms": p99_ms}
+    return Window(start, start + 600, completed=count, errors=0, routes=[row])
+
+
+def trend(trends: list[Trend], metric: str) -> Trend:
+    return next(t for t in trends if t.metric == metric)
+
+
+class TestTrend:
+    """Tests for comparing a trend with its limit."""
+
+    def test_absolute_trend_compares_the_slope(self):
+        """An absolute trend is breached when its slope exceeds the limit."""
+        assert Trend("rss_mb", 10, 25.0, 300.0, 20.0).breached
+        assert not Trend("rss_mb", 10, 15.0, 300.0, 20.0).breached
+
+    def test_relative_trend_compares_growth_to_the_start(self):
+        """A relative trend divides the slope by the fitted starting value."""
+        growing = Trend("p99_ms GET /x", 10, 30.0, 100.0, 0.10, relative=True)
+        assert math.isclose(growing.rate, 0.3)
+        assert growing.breached
+        assert not Trend("p99_ms GET /x", 10, 5.0, 100.0, 0.10, relative=True).breached
+
+    def test_relative_trend_from_zero_is_not_breached(self):
+        """A non-positive starting value gives a rate of 0 instead of dividing."""
+        assert Trend("p99_ms GET /x", 10, 5.0, 0.0, 0.10, relative=True).rate == 0.0
+
+
+class TestAnalyze:
+    """Tests for fitting a run's resources and p99 over time."""
+
+    def test_growing_rss_is_flagged(self):
+        """RSS growing 30 MB/h breaches the 20 MB/h default; flat FDs do not."""
+        samples = [sample(h / 4, 300 + 30 * h / 4, 120) for h in range(17)]
+        trends = analyze([], samples, SINCE, SoakLimits())
+
+        rss = trend(trends, "rss_mb")
+        assert math.isclose(rss.slope, 30.0, rel_tol=1e-3)
+        assert math.isclose(rss.intercept, 300.0, rel_tol=1e-3)
+        assert rss.breached
+        assert not trend(trends, "fds").breached
+
+    def test_warm_up_is_left_out(self):
+        """Samples and windows before ``since`` do not enter the fits."""
+        warm_up = [sample(-1 + h / 10, 100 + 200 * h / 10, 50) for h in range(10)]
+        steady = [sample(h / 4, 400, 120) for h in range(8)]
+        windows = [window(-1, 500)] + [window(h / 4, 20) for h in range(8)]
+        trends = analyze(windows, warm_up + steady, SINCE, SoakLimits())
+
+        assert trend(trends, "rss_mb").points == len(steady)
+        assert trend(trends, "rss_mb").slope == 0.0
+        p99 = trend(trends, "p99_ms GET /products")
+        assert p99.points == 8
+        assert not p99.breached
+
+    def test_growing_p99_is_flagged_relative_to_its_start(self):
+        """A p99 growing 20 ms/h from about 20 ms breaches the 10%/h default."""
+        windows = [window(h / 6, 20 * (1 + h / 6)) for h in range(12)]
+        p99 = trend(analyze(windows, [], SINCE, SoakLimits()), "p99_ms GET /products")
+        assert math.isclose(p99.slope, 20.0, rel_tol=1e-3)
+        # Windows are fitted at their middle, 5 minutes after they open
+        assert math.isclose(p99.rate, 20.0 / p99.intercept)
+        assert p99.breached
+
+    def test_sparse_routes_and_short_runs_are_skipped(self):
+        """Routes below MIN_WINDOW_REQUESTS and metrics with too few points are not fitted."""
+        sparse = [window(h, 20 * (1 + h), MIN_WINDOW_REQUESTS - 1) for h in range(6)]
+        short = [sample(0, 300, 100), sample(1, 900, 500)]
+        assert analyze(sparse, short, SINCE, SoakLimits()) == []
+
+    def test_routes_are_sorted_by_growth(self):
+        """Resource trends come first, then routes by decreasing relative growth."""
+        windows = []
+        for h in range(6):
+            start = SINCE + h * HOUR
+            rows = [
+                {"method": "GET", "route": "/flat", "count": 100, "p99_ms": 10.0},
+                {"method": "GET", "route": "/leaky", "count": 100, "p99_ms": 10 + h},
+            ]
+            windows.append(Window(start, start + 600, 200, 0, rows))
+        samples = [sample(h, 300, 100) for h in range(6)]
+        trends = analyze(windows, samples, SINCE, SoakLimits())
+        assert [t.metric for t in trends] == [
+            "rss_mb",
+            "fds",
+            "p99_ms GET /leaky",
+            "p99_ms GET /flat",
+        ]
+
+    def test_breached_trends_are_marked(self):
+        """format_trends marks exactly the breached trends."""
+        lines = format_trends(
+            [
+                Trend("rss_mb", 10, 25.0, 300.0, 20.0),
+                Trend("fds", 10, 1.0, 100.0, 5.0),
+            ]
+        )
+        assert lines[1].endswith("rss_mb  EXCEEDED")
+        assert lines[2].endswith("fds")